@@ -0,0 +1,106 @@
+"""
+Data Path Benchmarks
+
+Corporate-action adjustment, Parquet load/store, bars from trades and data
+validation on synthetic data. At scale 1: a million minute bars, a
+ten-million-trade day and 25 years of actions for 500 symbols.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from harness import Case
+from synthetic_data import corporate_actions, minute_bars, symbols, tick_table
+
+BARS = 1_000_000
+TICKS = 10_000_000
+SYMBOLS = 500
+
+
+def _scaled(count: int, scale: float, minimum: int = 1000) -> int:
+    return max(minimum, int(count * scale))
+
+
+def adjustment_cases(scale: float):
+    from corporate_actions import CorporateActionsManager
+
+    tickers = symbols(_scaled(SYMBOLS, scale, minimum=10))
+    splits, dividends = corporate_actions(tickers)
+    manager = CorporateActionsManager()
+    manager.splits, manager.dividends = splits, dividends
+    yield Case('corporate_actions.create_adjustment_maps', manager._create_adjustment_maps,
+               items=len(splits) + len(dividends), unit='actions')
+
+    # apply_adjustments compares the index with naive action dates
+    n = _scaled(BARS, scale)
+    bars = minute_bars(n, tz=None)
+    counts = splits['symbol'].value_counts().add(dividends['symbol'].value_counts(), fill_value=0)
+    symbol = counts.idxmax()
+    yield Case('corporate_actions.apply_adjustments', lambda: manager.apply_adjustments(bars, symbol),
+               items=n, unit='bars')
+
+    # Vectorized equivalent used by the feature bridge, over mixed symbols
+    timestamps = bars.index.as_unit('ms').asi8.astype(float)
+    bar_symbols = np.random.default_rng(0).choice(np.asarray(tickers, dtype=object), n)
+
+    def factors():
+        manager._factor_tables = None
+        return manager.adjustment_factors(bar_symbols, timestamps)
+
+    yield Case('corporate_actions.adjustment_factors', factors, items=n, unit='bars')
+
+
+def parquet_cases(scale: float):
+    n_bars = _scaled(BARS, scale)
+    n_ticks = _scaled(TICKS, scale)
+    with tempfile.TemporaryDirectory() as directory:
+        bars_path = os.path.join(directory, 'aggregates_minute.parquet')
+        trades_path = os.path.join(directory, 'trades_2023-01-03.parquet')
+        bars = minute_bars(n_bars)
+        bars.to_parquet(bars_path)
+        pq.write_table(tick_table(n_ticks), trades_path)
+
+        yield Case('parquet.write_minute_bars', lambda: bars.to_parquet(bars_path), items=n_bars, unit='bars')
+        yield Case('parquet.read_minute_bars', lambda: pd.read_parquet(bars_path), items=n_bars, unit='bars')
+        # Full frame: conditions become an object column of arrays
+        yield Case('parquet.read_trades', lambda: pd.read_parquet(trades_path), items=n_ticks, unit='trades', repeat=3)
+        yield Case('parquet.read_trades_columns',
+                   lambda: pd.read_parquet(trades_path, columns=['sip_timestamp', 'price', 'size']),
+                   items=n_ticks, unit='trades')
+
+
+def bar_cases(scale: float):
+    from bar_builder import dollar_bars, time_bars
+
+    n_ticks = _scaled(TICKS, scale)
+    trades = tick_table(n_ticks)
+    yield Case('bars.second_from_trades', lambda: time_bars(trades, '1s'), items=n_ticks, unit='trades')
+    yield Case('bars.minute_from_trades', lambda: time_bars(trades, '1min'), items=n_ticks, unit='trades')
+    yield Case('bars.dollar_from_trades', lambda: dollar_bars(trades, 1e6), items=n_ticks, unit='trades')
+
+
+def validation_cases(scale: float):
+    import validate_data
+
+    n_bars = _scaled(BARS, scale)
+    bars = minute_bars(n_bars).drop(columns='n')
+    aggregates = bars.reset_index()
+    yield Case('validation.validate_aggregates', lambda: validate_data.validate_aggregates(aggregates),
+               items=n_bars, unit='bars')
+    yield Case('validation.check_aggregates', lambda: validate_data.check_aggregates(bars), items=n_bars, unit='bars')
+
+    n_ticks = _scaled(TICKS, scale)
+    trades = tick_table(n_ticks).drop_columns(['conditions']).to_pandas()
+    yield Case('validation.check_trades', lambda: validate_data.check_trades(trades), items=n_ticks, unit='trades')
+
+    splits, dividends = corporate_actions(symbols(_scaled(SYMBOLS, scale, minimum=10)))
+    yield Case('validation.check_corporate_actions',
+               lambda: validate_data.check_splits(splits) and validate_data.check_dividends(dividends),
+               items=len(splits) + len(dividends), unit='actions')
+
+
+SUITES = [adjustment_cases, parquet_cases, bar_cases, validation_cases]
@@ -0,0 +1,96 @@
+"""
+Model Benchmarks
+
+Regime detection (feature engineering and HMM prediction) and the hybrid
+LSTM/CNN model's build, training and prediction throughput, and batched
+feature attribution over its windows. Suites are skipped when
+hmmlearn/scikit-learn or TensorFlow are not installed.
+"""
+
+import os
+
+import numpy as np
+
+from harness import Case, load_module, requires
+from synthetic_data import minute_bars
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BARS = 1_000_000
+SAMPLES = 10_000
+TIMESTEPS, FEATURES = 60, 6
+WINDOW = 390       # one session of minute bars per regime prediction
+PREDICTIONS = 100  # windows per timed call
+FIT_ROWS = 20_000
+ATTRIBUTION_WINDOWS = 4096
+ATTRIBUTION_STEPS = 16
+
+
+def regime_cases(scale: float):
+    requires('hmmlearn')
+    requires('sklearn')
+    detector = load_module(os.path.join(ROOT, 'risk-management', 'regime-detector.py'), 'regime_detector')
+
+    n = max(FIT_ROWS + WINDOW, int(BARS * scale))
+    bars = minute_bars(n)
+    classifier = detector.MarketRegimeClassifier()
+    yield Case('regime.get_regime_features', lambda: classifier.get_regime_features(bars), items=n, unit='bars')
+
+    features = classifier.get_regime_features(bars)
+    classifier.model.n_iter = 50  # fitting is setup, not measured
+    classifier.fit(features.iloc[:FIT_ROWS])
+    starts = np.linspace(0, len(features) - WINDOW, PREDICTIONS).astype(int)
+    windows = [features.iloc[start:start + WINDOW] for start in starts]
+
+    def predict():
+        for window in windows:
+            classifier.predict_regime(window)
+
+    yield Case('regime.predict_regime', predict, items=PREDICTIONS, unit='predictions')
+
+
+def hybrid_model_cases(scale: float):
+    tf = requires('tensorflow')
+    from model_training import create_hybrid_model
+
+    samples = max(256, int(SAMPLES * scale))
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((samples, TIMESTEPS, FEATURES), dtype=np.float32)
+    targets = [rng.integers(0, 2, samples).astype(np.float32), rng.random(samples, dtype=np.float32),
+               rng.random(samples, dtype=np.float32)]
+
+    yield Case('hybrid_model.create', lambda: create_hybrid_model((TIMESTEPS, FEATURES)), unit='models', repeat=3)
+
+    model = create_hybrid_model((TIMESTEPS, FEATURES))
+    yield Case('hybrid_model.train_epoch', lambda: model.fit(X, targets, epochs=1, batch_size=32, verbose=0),
+               items=samples, unit='samples', repeat=3)
+    yield Case('hybrid_model.predict_batch', lambda: model.predict(X, batch_size=256, verbose=0),
+               items=samples, unit='samples')
+
+    # Live path: one window at a time
+    single = tf.constant(X[:1])
+
+    def predict_single():
+        for _ in range(PREDICTIONS):
+            [output.numpy() for output in model(single, training=False)]
+
+    yield Case('hybrid_model.predict_single', predict_single, items=PREDICTIONS, unit='predictions')
+
+
+def attribution_cases(scale: float):
+    requires('tensorflow')
+    from feature_attribution import accumulate, make_explainer
+    from model_training import create_hybrid_model
+
+    windows = max(256, int(ATTRIBUTION_WINDOWS * scale))
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((windows, TIMESTEPS, FEATURES), dtype=np.float32)
+    background = X[:256]
+    model = create_hybrid_model((TIMESTEPS, FEATURES))
+
+    for method in ('gradient', 'integrated', 'expected'):
+        explainer = make_explainer(model, method, background, steps=ATTRIBUTION_STEPS)
+        yield Case(f'attribution.{method}', lambda explainer=explainer: accumulate(explainer, X, batch_size=256),
+                   items=windows, unit='windows', repeat=3)
+
+
+SUITES = [regime_cases, hybrid_model_cases, attribution_cases]
@@ -0,0 +1,183 @@
+"""
+Benchmark Harness
+
+Minimal timeit-style runner with a JSON-lines result history:
+
+- A suite is a generator function (scale) -> Case; its setup runs in the
+  generator, only Case.fn is timed, so data is built once per suite
+- Each case runs once to warm up, then `repeat` times with GC disabled;
+  median, min, mean and stdev are kept, plus items/s from the median
+- Every run appends one line (commit, machine, scale, results) to the
+  history; the baseline for a run is the latest entry from a different
+  commit on the same machine and scale
+- A case regresses when its median is more than `threshold` slower than the
+  baseline median and the difference is above the noise floor
+"""
+
+import gc
+import importlib
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_THRESHOLD = 0.2
+NOISE_FLOOR = 0.001  # seconds
+
+
+class Skip(Exception):
+    """Raised by a suite whose optional dependencies are missing"""
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], object]
+    items: int = 1            # records processed per call, for throughput
+    unit: str = 'rows'
+    repeat: Optional[int] = None  # overrides the run's repeat for slow cases
+
+
+def requires(module: str):
+    """Import an optional dependency or skip the suite"""
+    try:
+        return importlib.import_module(module)
+    except ImportError as error:
+        raise Skip(f'{module} not installed ({error})') from error
+
+
+def load_module(path: str, name: str):
+    """Import a module from a file whose name is not a valid identifier (regime-detector.py)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_case(case: Case, repeat: int) -> Dict[str, float]:
+    case.fn()  # warm up caches, lazy imports and compiled kernels
+    timings = []
+    enabled = gc.isenabled()
+    try:
+        for _ in range(case.repeat or repeat):
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            case.fn()
+            timings.append(time.perf_counter() - start)
+            if enabled:
+                gc.enable()
+    finally:
+        if enabled:
+            gc.enable()
+    median = statistics.median(timings)
+    return {
+        'median': median,
+        'min': min(timings),
+        'mean': statistics.fmean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'repeat': len(timings),
+        'items': case.items,
+        'unit': case.unit,
+        'rate': case.items / median if median > 0 else float('inf'),
+    }
+
+
+def git_revision(cwd: str) -> Dict[str, object]:
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+    try:
+        return {'commit': git('rev-parse', '--short', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': 'unknown', 'dirty': True}
+
+
+def machine() -> Dict[str, object]:
+    return {
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def versions(modules: List[str]) -> Dict[str, str]:
+    found = {}
+    for name in modules:
+        try:
+            found[name] = importlib.import_module(name).__version__
+        except (ImportError, AttributeError):
+            pass
+    return found
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as history:
+        return [json.loads(line) for line in history if line.strip()]
+
+
+def save_run(path: str, run: Dict):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as history:
+        history.write(json.dumps(run) + '\n')
+
+
+def new_run(cwd: str, scale: float, modules: List[str]) -> Dict:
+    return {
+        **git_revision(cwd),
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': machine(),
+        'versions': versions(modules),
+        'scale': scale,
+        'results': {},
+        'skipped': {},
+    }
+
+
+def select_baseline(history: List[Dict], run: Dict, commit: Optional[str] = None) -> Optional[Dict]:
+    """Latest comparable run: same host, python and scale, from `commit` or any other commit"""
+    for entry in reversed(history):
+        if entry['scale'] != run['scale']:
+            continue
+        if (entry['machine']['host'], entry['machine']['python']) != (run['machine']['host'], run['machine']['python']):
+            continue
+        if commit is not None:
+            if entry['commit'].startswith(commit):
+                return entry
+        elif entry['commit'] != run['commit']:
+            return entry
+    return None
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    threshold: float = DEFAULT_THRESHOLD,
+    noise_floor: float = NOISE_FLOOR
+) -> Dict[str, Dict]:
+    """Per case: baseline median, ratio and status (regression, improvement, unchanged or new)"""
+    changes = {}
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            changes[name] = {'status': 'new'}
+            continue
+        ratio = result['median'] / before['median'] if before['median'] > 0 else float('inf')
+        delta = result['median'] - before['median']
+        if ratio > 1 + threshold and delta > noise_floor:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold) and -delta > noise_floor:
+            status = 'improvement'
+        else:
+            status = 'unchanged'
+        changes[name] = {'status': status, 'baseline': before['median'], 'ratio': ratio}
+    return changes
@@ -0,0 +1,98 @@
+"""
+Benchmark Runner
+
+Times the Python data and model hot paths on synthetic data, appends the run
+to a JSON-lines history and flags regressions against the previous commit.
+
+    python benchmarks/run_benchmarks.py [--scale 1.0] [--filter parquet] [--repeat 5]
+        [--threshold 0.2] [--baseline COMMIT] [--history PATH] [--no-save]
+        [--fail-on-regression]
+
+Use the same --scale for runs that should be compared; --scale 0.01 is a
+quick smoke run. Exits 1 on regressions with --fail-on-regression.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Repo modules live in hyphenated folders (same as tests/conftest.py)
+for folder in ('ml-core', 'data-ingestion', 'risk-management', 'tests'):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import bench_data  # noqa: E402
+import bench_models  # noqa: E402
+from harness import (DEFAULT_THRESHOLD, Skip, compare, load_history, new_run, save_run,  # noqa: E402
+                     select_baseline, time_case)
+
+SUITES = bench_data.SUITES + bench_models.SUITES
+HISTORY = os.path.join(ROOT, 'benchmarks', 'results', 'history.jsonl')
+VERSIONS = ['numpy', 'pandas', 'pyarrow', 'sklearn', 'hmmlearn', 'tensorflow']
+
+
+def run_suites(scale: float, repeat: int, pattern: str = None) -> dict:
+    results, skipped = {}, {}
+    for suite in SUITES:
+        try:
+            for case in suite(scale):
+                if pattern and pattern not in case.name:
+                    continue
+                result = time_case(case, repeat)
+                results[case.name] = result
+                print(f"  {case.name:<42} {result['median'] * 1000:>10.2f} ms  "
+                      f"{result['rate']:>14,.0f} {case.unit}/s", flush=True)
+        except Skip as reason:
+            skipped[suite.__name__] = str(reason)
+            print(f"  {suite.__name__:<42} skipped: {reason}", flush=True)
+    return results, skipped
+
+
+def report(changes: dict, baseline: dict) -> int:
+    print(f"\nCompared with {baseline['commit']}{' (dirty)' if baseline.get('dirty') else ''} from {baseline['time']}")
+    regressions = 0
+    for name, change in changes.items():
+        if change['status'] == 'new':
+            print(f"  {name:<42} new")
+            continue
+        marker = {'regression': '  <-- REGRESSION', 'improvement': '  (faster)'}.get(change['status'], '')
+        print(f"  {name:<42} {change['baseline'] * 1000:>10.2f} ms -> x{change['ratio']:.2f}{marker}")
+        regressions += change['status'] == 'regression'
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Python data and model hot paths')
+    parser.add_argument('--scale', type=float, default=1.0, help='fraction of the full data sizes')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', help='only cases whose name contains this')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown of the median flagged as a regression')
+    parser.add_argument('--baseline', help='compare with this commit instead of the previous one')
+    parser.add_argument('--history', default=HISTORY)
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the history')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # the adjustment path logs per call
+    run = new_run(ROOT, args.scale, VERSIONS)
+    print(f"Benchmarks at {run['commit']}{' (dirty)' if run['dirty'] else ''}, scale {args.scale}")
+    run['results'], run['skipped'] = run_suites(args.scale, args.repeat, args.filter)
+
+    baseline = select_baseline(load_history(args.history), run, args.baseline)
+    regressions = report(compare(run['results'], baseline['results'], args.threshold), baseline) if baseline else 0
+    if not baseline:
+        print('\nNo comparable run in the history yet')
+    if not args.no_save:
+        save_run(args.history, run)
+    if regressions:
+        print(f"\n{regressions} regression(s) over {args.threshold:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
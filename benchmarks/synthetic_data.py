@@ -0,0 +1,111 @@
+"""
+Synthetic Market Data
+
+Deterministic benchmark inputs at production scale, in the shapes
+historical_data_fetcher writes and CorporateActionsManager holds:
+
+- minute_bars: OHLCV + vwap + n, indexed by bar start, regular-session
+  minutes (14:30-21:00 UTC) on weekdays
+- tick_table: one day of trades (sip_timestamp ns, price, size, conditions)
+  as an Arrow table, so ten million rows with list-valued conditions are
+  built without ten million Python lists
+- corporate_actions: splits and quarterly dividends for many symbols
+
+The same seed and size always produce the same data.
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+SESSION_OPEN = pd.Timedelta(hours=14, minutes=30)
+SESSION_MINUTES = 390
+NS_PER_MINUTE = 60_000_000_000
+
+
+def session_minutes(n: int, start: str = '2000-01-03', tz: str = 'UTC') -> pd.DatetimeIndex:
+    """First n regular-session minute timestamps on weekdays from start"""
+    days = pd.bdate_range(start, periods=-(-n // SESSION_MINUTES))
+    opens = (days + SESSION_OPEN).as_unit('ns').asi8[:, None]
+    stamps = (opens + np.arange(SESSION_MINUTES) * NS_PER_MINUTE).ravel()[:n]
+    index = pd.DatetimeIndex(stamps.astype('datetime64[ns]'), name='timestamp')
+    return index.tz_localize(tz) if tz else index
+
+
+def minute_bars(n: int = 1_000_000, seed: int = 0, start: str = '2000-01-03', tz: str = 'UTC') -> pd.DataFrame:
+    """Random-walk minute bars with consistent OHLC, volume and vwap"""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.0008, n)))
+    open_ = np.r_[100.0, close[:-1]] * (1 + rng.normal(0, 0.0002, n))
+    wick = np.abs(rng.normal(0, 0.0006, (2, n)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = np.round(rng.lognormal(8, 1, n))
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+        'vwap': (high + low + close) / 3,
+        'n': rng.poisson(40, n) + 1,
+    }, index=session_minutes(n, start, tz))
+
+
+def tick_table(n: int = 10_000_000, seed: int = 0, date: str = '2023-01-03') -> pa.Table:
+    """One session of trades sorted by sip_timestamp (ns)"""
+    rng = np.random.default_rng(seed)
+    session_open = (pd.Timestamp(date) + SESSION_OPEN).as_unit('ns').value
+    offsets = np.sort(rng.integers(0, SESSION_MINUTES * NS_PER_MINUTE, n))
+    price = np.round(100.0 * np.exp(np.cumsum(rng.normal(0, 0.00005, n))), 4)
+    size = np.where(rng.random(n) < 0.7, 100, rng.integers(1, 1000, n))
+
+    # 80% regular trades [0], the rest odd lot / intermarket sweep [12, 37]
+    regular = rng.random(n) < 0.8
+    counts = np.where(regular, 1, 2)
+    condition_offsets = np.r_[0, np.cumsum(counts)].astype(np.int32)
+    values = np.empty(condition_offsets[-1], dtype=np.int32)
+    starts = condition_offsets[:-1]
+    values[starts] = np.where(regular, 0, 12)
+    values[starts[~regular] + 1] = 37
+
+    return pa.table({
+        'sip_timestamp': pa.array(session_open + offsets, pa.int64()),
+        'price': pa.array(price),
+        'size': pa.array(size, pa.int64()),
+        'conditions': pa.ListArray.from_arrays(condition_offsets, values),
+    })
+
+
+def symbols(n: int) -> list:
+    """n distinct ticker-like symbols"""
+    letters = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    return [''.join(letters[list(np.unravel_index(i, (26, 26, 26, 26)))]) for i in range(n)]
+
+
+def corporate_actions(
+    tickers: Sequence[str],
+    start: str = '2000-01-01',
+    years: int = 25,
+    seed: int = 0
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (splits, dividends) in CorporateActionsManager's columns: a 2:1/3:1/4:1
+    split every ~8 years per symbol and quarterly dividends for ~70% of symbols
+    """
+    rng = np.random.default_rng(seed)
+    first = pd.Timestamp(start)
+    span_days = years * 365
+    split_rows, dividend_rows = [], []
+    for ticker in tickers:
+        for day in np.sort(rng.integers(0, span_days, rng.poisson(years / 8))):
+            split_rows.append((ticker, first + pd.Timedelta(days=int(day)), 1, int(rng.choice([2, 3, 4]))))
+        if rng.random() < 0.7:
+            amount = rng.uniform(0.05, 1.0)
+            for quarter, day in enumerate(range(int(rng.integers(0, 90)), span_days, 91)):
+                dividend_rows.append((ticker, first + pd.Timedelta(days=day), round(amount * 1.01 ** (quarter // 4), 4)))
+    splits = pd.DataFrame(split_rows, columns=['symbol', 'execution_date', 'split_from', 'split_to'])
+    dividends = pd.DataFrame(dividend_rows, columns=['symbol', 'ex_dividend_date', 'cash_amount'])
+    return splits, dividends
@@ -0,0 +1,255 @@
+"""
+Bar Builder
+
+Builds OHLCV + VWAP bars from stored trades, so fetch_all_data only downloads
+trades instead of also requesting second and minute aggregates, and custom
+bars (volume, dollar) cost one pass over a trades Parquet file.
+
+- Condition filtering follows the consolidated SIP update rules Polygon's
+  aggregates use: a trade with any condition that does not update high/low
+  (odd lot, average price, Form T, ...) is left out of high and low, one that
+  does not update last is left out of open and close, and official open/close
+  prints carry no volume
+- A bar exists for every bucket with at least one trade that updates
+  high/low; open/close fall back to those trades when none updates last
+- Volume, vwap and n cover every trade in the bucket that updates volume
+- Trades are binned on sorted sip_timestamps: bucket boundaries are where the
+  bucket id changes (time bars) or np.searchsorted over cumulative volume or
+  notional (volume/dollar bars), and each column is one ufunc.reduceat
+- Output matches fetch_aggregates: a UTC `timestamp` index (bar start) and
+  volume, vwap, open, close, high, low, n columns. Bars are as traded;
+  split_adjust gives Polygon's adjusted=true prices
+"""
+
+import argparse
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+HIGH_LOW, LAST, VOLUME = 0, 1, 2
+DAY_NS = 86_400_000_000_000
+SESSION_TZ = 'America/New_York'  # day bars start at midnight ET, like Polygon's
+COLUMNS = ['volume', 'vwap', 'open', 'close', 'high', 'low', 'n']
+
+# Polygon condition code -> (updates high/low, updates open/close, updates volume);
+# codes not listed update all three
+SIP_RULES: Dict[int, Tuple[bool, bool, bool]] = {
+    2: (False, False, True),    # Average Price Trade
+    7: (False, False, True),    # Cash Sale
+    10: (True, False, True),    # Derivatively Priced
+    12: (False, False, True),   # Form T (extended hours)
+    13: (False, False, True),   # Extended Hours (Sold Out Of Sequence)
+    15: (False, False, False),  # Market Center Official Close
+    16: (False, False, False),  # Market Center Official Open
+    20: (False, False, True),   # Next Day
+    21: (False, False, True),   # Price Variation Trade
+    22: (True, False, True),    # Prior Reference Price
+    29: (False, False, True),   # Seller
+    32: (True, False, True),    # Sold (Out Of Sequence)
+    33: (True, False, True),    # Sold (Out Of Sequence) and Stopped Stock
+    37: (False, False, True),   # Odd Lot Trade
+    38: (False, False, False),  # Corrected Consolidated Close
+    52: (False, False, True),   # Contingent Trade
+    53: (False, False, True),   # Qualified Contingent Trade
+}
+
+Trades = Union[pd.DataFrame, pa.Table]
+
+
+def load_trades(*paths: str) -> pa.Table:
+    """Trades Parquet files as one Arrow table (conditions stay a list column)"""
+    tables = []
+    for path in paths:
+        names = pq.read_schema(path).names
+        tables.append(pq.read_table(path, columns=[c for c in ('sip_timestamp', 'timestamp', 'price', 'size', 'conditions') if c in names]))
+    return pa.concat_tables(tables, promote_options='default') if len(tables) > 1 else tables[0]
+
+
+def _to_ns(values) -> np.ndarray:
+    """int64 UTC nanoseconds from an int column or a (tz-aware) datetime column"""
+    if isinstance(values, pa.ChunkedArray):
+        if pa.types.is_timestamp(values.type):
+            values = values.cast(pa.timestamp('ns', values.type.tz)).cast(pa.int64())
+        return values.to_numpy().astype(np.int64, copy=False)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        index = pd.DatetimeIndex(values)
+        return (index.tz_convert('UTC') if index.tz else index).as_unit('ns').asi8
+    return np.asarray(values, dtype=np.int64)
+
+
+def _columns(trades: Trades):
+    """Sorted (timestamp ns, price, size, conditions list array or None)"""
+    if isinstance(trades, pa.Table):
+        names = trades.column_names
+        column = trades.column
+        conditions = trades.column('conditions').combine_chunks() if 'conditions' in names else None
+    else:
+        names = list(trades.columns)
+        column = trades.__getitem__
+        conditions = pa.array(trades['conditions'], from_pandas=True) if 'conditions' in names else None
+    timestamps = _to_ns(column('sip_timestamp' if 'sip_timestamp' in names else 'timestamp'))
+    price = np.asarray(column('price'), dtype=float)
+    size = np.asarray(column('size'), dtype=float)
+    if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, price, size = timestamps[order], price[order], size[order]
+        conditions = conditions.take(pa.array(order)) if conditions is not None else None
+    return timestamps, price, size, conditions
+
+
+def eligibility(conditions: Optional[pa.Array], n: int, rules: Dict[int, Tuple[bool, bool, bool]] = SIP_RULES) -> np.ndarray:
+    """[3, n] masks: trade updates high/low, open/close, volume"""
+    eligible = np.ones((3, n), dtype=bool)
+    # An all-null column (e.g. every trade had conditions=None) loads as a null-typed array
+    if conditions is None or pa.types.is_null(conditions.type) or not rules or n == 0:
+        return eligible
+    codes = pc.list_flatten(conditions).to_numpy(zero_copy_only=False).astype(np.int64)
+    if len(codes) == 0:
+        return eligible
+    parents = pc.list_parent_indices(conditions).to_numpy(zero_copy_only=False)
+    table = np.ones((3, max(max(rules), int(codes.max())) + 1), dtype=bool)
+    for code, flags in rules.items():
+        table[:, code] = flags
+    blocked = ~table[:, codes]
+    for rule in (HIGH_LOW, LAST, VOLUME):
+        eligible[rule, parents[blocked[rule]]] = False
+    return eligible
+
+
+def _groups(bucket: np.ndarray, mask: np.ndarray, bars: np.ndarray):
+    """Runs of masked trades per bucket: (starts, ends) into the masked arrays and bar positions"""
+    ids = bucket[mask]
+    if len(ids) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, np.empty(0, dtype=bool)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+    positions = np.minimum(np.searchsorted(bars, ids[starts]), len(bars) - 1)
+    found = bars[positions] == ids[starts]
+    return starts, ends, positions, found
+
+
+def _aggregate(bucket: np.ndarray, price: np.ndarray, size: np.ndarray, eligible: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Bar ids (sorted) and bar columns for non-decreasing per-trade bucket ids"""
+    high_low = eligible[HIGH_LOW]
+    ids = bucket[high_low]
+    if len(ids) == 0:
+        return np.empty(0, dtype=np.int64), {name: np.empty(0) for name in COLUMNS}
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    bars = ids[starts]
+    hl_price = price[high_low]
+    ends = np.r_[starts[1:], len(ids)]
+    columns = {
+        'high': np.maximum.reduceat(hl_price, starts),
+        'low': np.minimum.reduceat(hl_price, starts),
+        'open': hl_price[starts],
+        'close': hl_price[ends - 1],
+    }
+
+    last_starts, last_ends, positions, found = _groups(bucket, eligible[LAST], bars)
+    last_price = price[eligible[LAST]]
+    columns['open'][positions[found]] = last_price[last_starts[found]]
+    columns['close'][positions[found]] = last_price[last_ends[found] - 1]
+
+    volume_mask = eligible[VOLUME]
+    volume_starts, volume_ends, positions, found = _groups(bucket, volume_mask, bars)
+    volume = np.zeros(len(bars))
+    notional = np.zeros(len(bars))
+    n = np.zeros(len(bars), dtype=np.int64)
+    if len(volume_starts):
+        volume[positions[found]] = np.add.reduceat(size[volume_mask], volume_starts)[found]
+        notional[positions[found]] = np.add.reduceat(price[volume_mask] * size[volume_mask], volume_starts)[found]
+        n[positions[found]] = (volume_ends - volume_starts)[found]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        columns['vwap'] = np.where(volume > 0, notional / volume, columns['close'])
+    columns['volume'] = volume
+    columns['n'] = n
+    return bars, columns
+
+
+def _frame(index_ns: np.ndarray, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    index = pd.DatetimeIndex(index_ns.astype('datetime64[ns]'), name='timestamp').tz_localize('UTC')
+    return pd.DataFrame({name: columns[name] for name in COLUMNS}, index=index)
+
+
+def time_bars(trades: Trades, freq: str = '1min', rules: Dict[int, Tuple[bool, bool, bool]] = SIP_RULES, tz: str = SESSION_TZ) -> pd.DataFrame:
+    """Bars per `freq` interval with trades; intervals of a day or more start at midnight in `tz`"""
+    timestamps, price, size, conditions = _columns(trades)
+    step = pd.Timedelta(freq).value
+    eligible = eligibility(conditions, len(timestamps), rules)
+    if step < DAY_NS:
+        bars, columns = _aggregate(timestamps // step, price, size, eligible)
+        return _frame(bars * step, columns)
+
+    local = pd.DatetimeIndex(timestamps.astype('datetime64[ns]')).tz_localize('UTC').tz_convert(tz).tz_localize(None)
+    bars, columns = _aggregate(local.as_unit('ns').asi8 // step, price, size, eligible)
+    starts = pd.DatetimeIndex((bars * step).astype('datetime64[ns]')).tz_localize(tz).tz_convert('UTC')
+    return _frame(starts.as_unit('ns').asi8, columns)
+
+
+def _threshold_bars(trades: Trades, threshold: float, weight, rules) -> pd.DataFrame:
+    timestamps, price, size, conditions = _columns(trades)
+    eligible = eligibility(conditions, len(timestamps), rules)
+    # A bar closes on the trade that takes its cumulative weight to the threshold
+    weights = np.where(eligible[VOLUME], weight(price, size), 0.0)
+    before = np.cumsum(weights) - weights
+    boundaries = np.arange(1, int(before[-1] // threshold) + 1) * threshold if len(before) else np.empty(0)
+    bucket = np.searchsorted(boundaries, before, side='right')
+    bars, columns = _aggregate(bucket, price, size, eligible)
+    first = np.searchsorted(bucket, bars, side='left')
+    return _frame(timestamps[first], columns)
+
+
+def volume_bars(trades: Trades, threshold: float, rules: Dict[int, Tuple[bool, bool, bool]] = SIP_RULES) -> pd.DataFrame:
+    """Bars of `threshold` shares, indexed by their first trade"""
+    return _threshold_bars(trades, threshold, lambda price, size: size, rules)
+
+
+def dollar_bars(trades: Trades, threshold: float, rules: Dict[int, Tuple[bool, bool, bool]] = SIP_RULES) -> pd.DataFrame:
+    """Bars of `threshold` traded notional, indexed by their first trade"""
+    return _threshold_bars(trades, threshold, lambda price, size: price * size, rules)
+
+
+def split_adjust(bars: pd.DataFrame, splits: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Divide prices (multiply volume) before each split by its ratio, as Polygon's adjusted=true does"""
+    if splits is None or splits.empty or bars.empty:
+        return bars
+    dates = pd.DatetimeIndex(pd.to_datetime(splits['execution_date']))
+    dates = (dates.tz_convert('UTC') if dates.tz else dates.tz_localize(SESSION_TZ).tz_convert('UTC')).as_unit('ns').asi8
+    order = np.argsort(dates, kind='stable')
+    ratio = (splits['split_to'].to_numpy(dtype=float) / splits['split_from'].to_numpy(dtype=float))[order]
+    # Factor for a bar: product of the ratios of every later split
+    later = np.r_[np.cumprod(ratio[::-1])[::-1], 1.0]
+    factor = later[np.searchsorted(dates[order], bars.index.as_unit('ns').asi8, side='right')]
+    adjusted = bars.copy()
+    for column in ['open', 'high', 'low', 'close', 'vwap']:
+        adjusted[column] = adjusted[column] / factor
+    adjusted['volume'] = adjusted['volume'] * factor
+    return adjusted
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build bars from stored trades Parquet files')
+    parser.add_argument('trades', nargs='+', help='trades_*.parquet files')
+    parser.add_argument('--out', required=True, help='bars Parquet path')
+    kind = parser.add_mutually_exclusive_group()
+    kind.add_argument('--freq', default='1min', help='time bar interval (1s, 1min, 1D, ...)')
+    kind.add_argument('--volume', type=float, help='shares per volume bar')
+    kind.add_argument('--dollar', type=float, help='notional per dollar bar')
+    parser.add_argument('--all-trades', action='store_true', help='ignore condition codes')
+    args = parser.parse_args()
+
+    rules = {} if args.all_trades else SIP_RULES
+    table = load_trades(*args.trades)
+    if args.volume:
+        bars = volume_bars(table, args.volume, rules)
+    elif args.dollar:
+        bars = dollar_bars(table, args.dollar, rules)
+    else:
+        bars = time_bars(table, args.freq, rules)
+    bars.to_parquet(args.out)
+    print(f'{len(bars)} bars from {table.num_rows} trades -> {args.out}')
@@ -1,5 +1,5 @@
 import os
-import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Dict, List
@@ -16,6 +16,7 @@ class CorporateActionsManager:
         self.splits = pd.DataFrame(columns=['symbol', 'execution_date', 'split_from', 'split_to'])
         self.dividends = pd.DataFrame(columns=['symbol', 'ex_dividend_date', 'cash_amount'])
         self.loaded_symbols = set()
+        self._factor_tables = None
         
     def fetch_corporate_actions(self, symbols: List[str], start_date: str, end_date: str):
         """Fetch splits and dividends for multiple symbols"""
@@ -57,6 +58,7 @@ class CorporateActionsManager:
             
     def _create_adjustment_maps(self):
         """Create fast lookup structures for adjustments"""
+        self._factor_tables = None
         # Convert to datetime
         self.splits['execution_date'] = pd.to_datetime(self.splits['execution_date'])
         self.dividends['ex_dividend_date'] = pd.to_datetime(self.dividends['ex_dividend_date'])
@@ -78,34 +80,92 @@ class CorporateActionsManager:
         """Adjust historical data for corporate actions"""
         logger = logging.getLogger(__name__)
         if symbol not in self.split_map and symbol not in self.dividend_map:
-            logger.debug(f"No corporate actions found for {symbol}")
+            logger.debug("No corporate actions found for %s", symbol)
             return data_window
             
-        logger.info(f"Applying corporate actions to {symbol} data")
-        logger.debug(f"Original data:\n{data_window.head()}")
+        logger.info("Applying corporate actions to %s data", symbol)
+        logger.debug("Original data:\n%s", data_window.head())
 
         # Make copy to avoid modifying original data
         adjusted_data = data_window.copy()
         
         # Apply splits
         if symbol in self.split_map:
-            logger.info(f"Found {len(self.split_map[symbol])} splits for {symbol}")
+            logger.info("Found %d splits for %s", len(self.split_map[symbol]), symbol)
             for dt, ratio in self.split_map[symbol].items():
                 mask = adjusted_data.index >= dt
                 adjusted_data.loc[mask, ['open', 'high', 'low', 'close']] /= ratio
                 adjusted_data.loc[mask, 'volume'] *= ratio
-                logger.debug(f"Post-split sample:\n{adjusted_data[mask].head(1)}")
+                logger.debug("Post-split sample:\n%s", adjusted_data[mask].head(1))
 
         # Apply dividends 
         if symbol in self.dividend_map:
-            logger.info(f"Found {len(self.dividend_map[symbol])} dividends for {symbol}")
+            logger.info("Found %d dividends for %s", len(self.dividend_map[symbol]), symbol)
             for dt, amount in self.dividend_map[symbol].items():
                 mask = adjusted_data.index >= dt
                 adjusted_data.loc[mask, ['open', 'high', 'low', 'close']] -= amount
-                logger.debug(f"Post-dividend sample:\n{adjusted_data[mask].head(1)}")
+                logger.debug("Post-dividend sample:\n%s", adjusted_data[mask].head(1))
 
-        logger.debug(f"Adjusted data:\n{adjusted_data.tail()}")
+        logger.debug("Adjusted data:\n%s", adjusted_data.tail())
         return adjusted_data
 
+    def _build_factor_tables(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Per symbol: sorted action times (ms) with cumulative split ratio and dividend"""
+        def to_ms(dates: pd.Series) -> np.ndarray:
+            return ((pd.to_datetime(dates, utc=True) - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=float)
+
+        tables: Dict[str, Dict[str, np.ndarray]] = {}
+        splits = self.splits.sort_values('execution_date', kind='stable')
+        for symbol, group in splits.groupby('symbol'):
+            ratio = group['split_to'].to_numpy(dtype=float) / group['split_from'].to_numpy(dtype=float)
+            tables.setdefault(symbol, {})['split'] = (to_ms(group['execution_date']), np.r_[1.0, np.cumprod(ratio)])
+        dividends = self.dividends.sort_values('ex_dividend_date', kind='stable')
+        for symbol, group in dividends.groupby('symbol'):
+            amount = group['cash_amount'].to_numpy(dtype=float)
+            tables.setdefault(symbol, {})['dividend'] = (to_ms(group['ex_dividend_date']), np.r_[0.0, np.cumsum(amount)])
+        return tables
+
+    def adjustment_factors(self, symbols: List[str], timestamps: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Factors equivalent to apply_adjustments for a bar at each (symbol, timestamp ms):
+        adjusted price = price * price_scale + price_offset, volume * volume_scale,
+        valid over [valid_from, valid_until) (between consecutive actions)
+        """
+        if self._factor_tables is None:
+            self._factor_tables = self._build_factor_tables()
+        symbols = np.asarray(symbols, dtype=object)
+        timestamps = np.asarray(timestamps, dtype=float)
+        n = len(timestamps)
+        result = {
+            'price_scale': np.ones(n),
+            'price_offset': np.zeros(n),
+            'volume_scale': np.ones(n),
+            'valid_from': np.full(n, -np.inf),
+            'valid_until': np.full(n, np.inf),
+        }
+
+        # Group rows by symbol once (hash factorize + stable sort of the codes),
+        # then slice each group
+        codes, unique = pd.factorize(symbols)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(unique)))]
+        for group, symbol in enumerate(unique):
+            table = self._factor_tables.get(symbol)
+            if not table:
+                continue
+            rows = order[bounds[group]:bounds[group + 1]]
+            ts = timestamps[rows]
+            for kind, (times, cumulative) in table.items():
+                applied = np.searchsorted(times, ts, side='right')  # actions at or before ts
+                if kind == 'split':
+                    result['price_scale'][rows] /= cumulative[applied]
+                    result['volume_scale'][rows] *= cumulative[applied]
+                else:
+                    result['price_offset'][rows] -= cumulative[applied]
+                bounded = np.r_[-np.inf, times, np.inf]
+                result['valid_from'][rows] = np.maximum(result['valid_from'][rows], bounded[applied])
+                result['valid_until'][rows] = np.minimum(result['valid_until'][rows], bounded[applied + 1])
+        return result
+
 # Singleton instance for reuse
 corporate_actions_manager = CorporateActionsManager()
\ No newline at end of file
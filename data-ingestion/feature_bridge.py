@@ -0,0 +1,169 @@
+"""
+Feature Bridge Server
+
+Serves CorporateActionsManager and MarketRegimeClassifier to the Node services
+over a local Unix socket (client: shared/feature-bridge.js), replacing the
+per-update python-bridge round trip that shipped whole windows as DataFrames.
+
+- Requests are batched across symbols by the client: one frame, one response
+- Corporate actions come back as per-row factors (price scale/offset, volume
+  scale) with the interval they stay valid for, never as adjusted frames
+- Frames are a JSON header plus float64 columns (layout documented in
+  feature-bridge.js), read without copies via np.frombuffer
+
+Usage:
+    python data-ingestion/feature_bridge.py --symbols AAPL,MSFT --start 2020-01-01
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import pickle
+import struct
+import sys
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_SOCKET = os.getenv('FEATURE_BRIDGE_SOCKET', '/tmp/mugiwara-feature-bridge.sock')
+PREFIX = 12
+REGIME_FEATURES = ['volatility', 'volume_zscore', 'spread', 'vwap_dev']
+
+Columns = Dict[str, np.ndarray]
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def encode_frame(request_id: int, header: dict, columns: Optional[Columns] = None) -> bytes:
+    columns = columns or {}
+    names = list(columns)
+    rows = len(columns[names[0]]) if names else 0
+    payload = json.dumps({**header, 'columns': names, 'rows': rows}).encode()
+    body_offset = _align8(PREFIX + len(payload))
+    body = b''.join(np.ascontiguousarray(columns[name], dtype='<f8').tobytes() for name in names)
+    padding = b'\0' * (body_offset - PREFIX - len(payload))
+    return struct.pack('<III', body_offset + len(body) - 4, request_id, len(payload)) + payload + padding + body
+
+
+def decode_payload(payload: bytes) -> Tuple[int, dict, Columns]:
+    """Decode a frame without its leading length field"""
+    request_id, header_length = struct.unpack_from('<II', payload)
+    header = json.loads(payload[8:8 + header_length])
+    rows = header.get('rows', 0)
+    offset = _align8(PREFIX + header_length) - 4
+    names = header.get('columns', [])
+    body = np.frombuffer(payload, dtype='<f8', count=rows * len(names), offset=offset).reshape(len(names), rows)
+    return request_id, header, dict(zip(names, body))
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Tuple[int, dict, Columns]]:
+    try:
+        (length,) = struct.unpack('<I', await reader.readexactly(4))
+        return decode_payload(await reader.readexactly(length))
+    except asyncio.IncompleteReadError:
+        return None
+
+
+def load_regime_classifier(path: str):
+    """Unpickle a fitted MarketRegimeClassifier (the module name is hyphenated)"""
+    module_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'risk-management', 'regime-detector.py')
+    spec = importlib.util.spec_from_file_location('regime_detector', module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules.setdefault('regime_detector', module)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class FeatureBridgeServer:
+    def __init__(self, corporate_actions=None, regime_classifier=None):
+        self.corporate_actions = corporate_actions
+        self.regime_classifier = regime_classifier
+        self.handlers = {
+            'ping': self._ping,
+            'adjustments': self._adjustments,
+            'regime': self._regime,
+        }
+
+    def handle(self, header: dict, columns: Columns) -> Tuple[dict, Columns]:
+        handler = self.handlers.get(header.get('method'))
+        if handler is None:
+            return {'error': f"unknown method {header.get('method')!r}"}, {}
+        return handler(header, columns)
+
+    def _ping(self, header: dict, columns: Columns) -> Tuple[dict, Columns]:
+        return {}, {}
+
+    def _adjustments(self, header: dict, columns: Columns) -> Tuple[dict, Columns]:
+        if self.corporate_actions is None:
+            return {'error': 'corporate actions not loaded'}, {}
+        return {}, self.corporate_actions.adjustment_factors(header['symbols'], columns['timestamp'])
+
+    def _regime(self, header: dict, columns: Columns) -> Tuple[dict, Columns]:
+        if self.regime_classifier is None:
+            return {'error': 'regime classifier not loaded'}, {}
+        import pandas as pd  # only regime requests need DataFrames
+        features = np.column_stack([columns[name] for name in header['columns']])
+        bounds = np.r_[0, np.cumsum(header['lengths'])]
+        labels = list(dict.fromkeys([*self.regime_classifier.regime_labels.values(), 'unknown']))
+        regimes = np.empty(len(header['symbols']))
+        for i in range(len(header['symbols'])):
+            window = pd.DataFrame(features[bounds[i]:bounds[i + 1]], columns=REGIME_FEATURES)
+            regimes[i] = labels.index(self.regime_classifier.predict_regime(window)) \
+                if len(window) else np.nan
+        return {'labels': labels}, {'regime': regimes}
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                request_id, header, columns = frame
+                try:
+                    response = self.handle(header, columns)
+                except Exception as e:
+                    logging.error("Feature bridge %s failed: %s", header.get('method'), e)
+                    response = ({'error': str(e)}, {})
+                writer.write(encode_frame(request_id, *response))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, path: str = DEFAULT_SOCKET):
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self._serve_client, path=path)
+        logging.info("Feature bridge listening on %s", path)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve corporate-action factors and regimes to Node services')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--symbols', help='comma-separated symbols whose corporate actions to load')
+    parser.add_argument('--start', default='2000-01-01')
+    parser.add_argument('--end', default=date.today().isoformat())
+    parser.add_argument('--regime-model', help='pickled, fitted MarketRegimeClassifier')
+    args = parser.parse_args()
+
+    from corporate_actions import corporate_actions_manager
+    from historical_data_fetcher import configure_logging
+    configure_logging(log_file=None)
+    if args.symbols:
+        corporate_actions_manager.fetch_corporate_actions(args.symbols.split(','), args.start, args.end)
+    classifier = load_regime_classifier(args.regime_model) if args.regime_model else None
+
+    asyncio.run(FeatureBridgeServer(corporate_actions_manager, classifier).serve(args.socket))
+
+
+if __name__ == '__main__':
+    main()
@@ -28,35 +28,52 @@ Polygon.io Historical Data Fetcher
 import os
 from dotenv import load_dotenv
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
-import requests
-import pandas as pd
 from datetime import datetime, timedelta
 import time
-from multiprocessing.pool import ThreadPool
-import pytz
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import structured_logging
+from structured_logging import counters
+
+# pandas, requests and the bar builder are imported where used, so importing
+# this module (corporate_actions, the feature bridge) stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
 
-# Configure logging
 load_dotenv()
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler('data_ingestion.log'), logging.StreamHandler()]
-)
 
 # Constants
 POLYGON_API_KEY = os.getenv('POLYGON_API_KEY')
-BASE_URL = "https://api.polygon.io"
+BASE_URL = os.getenv('POLYGON_BASE_URL', "https://api.polygon.io")  # point at a local simulator for benchmarks
+PAGE_DELAY = float(os.getenv('POLYGON_PAGE_DELAY', 0.3))  # seconds between pages
 MAX_THREADS = 8
+TRADE_BARS = {"second": "1s", "minute": "1min"}  # built from trades instead of requested
 TRADING_DAYS = set()  # Populated during initialization
 
+def configure_logging(log_file: Optional[str] = 'data_ingestion.log', level: int = logging.INFO, rate: float = 10.0):
+    """JSON lines to stderr and optionally a file, written off-thread and
+    rate-limited per message (structured_logging); called by entry points,
+    never on import"""
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    structured_logging.configure(handlers, level=level, rate=rate)
+
+def _fetched(kind: str, ticker: str, records: int, start_time: float, date: Optional[str] = None):
+    """One structured line per fetch call; per-page detail goes to counters"""
+    seconds = time.time() - start_time
+    counters.increment(f"fetch.{kind.replace(' ', '_')}", records)
+    logging.info("Fetched %d %s for %s in %.2fs", records, kind, ticker, seconds,
+                 extra={"ticker": ticker, "date": date, "records": records, "seconds": round(seconds, 3)})
+
 def is_trading_day(date: datetime) -> bool:
     """Check if a date is a trading day."""
     return date.strftime('%Y-%m-%d') in TRADING_DAYS
 
 def fetch_paginated_data(url: str, params: Dict = None) -> List[Dict]:
     """Handle Polygon pagination with loop prevention"""
+    import requests
+
     results = []
     next_url = url
     retries = 0
@@ -67,8 +84,8 @@ def fetch_paginated_data(url: str, params: Dict = None) -> List[Dict]:
     seen_cursors = set()
     original_params = params.copy() if params else {}
 
-    logging.info(f"Starting pagination for {next_url}")
-    
+    logging.debug("Starting pagination for %s", next_url)
+
     while next_url and pages_fetched < max_pages:
         try:
             parsed = urlparse(next_url)
@@ -89,7 +106,7 @@ def fetch_paginated_data(url: str, params: Dict = None) -> List[Dict]:
             # Extract cursor for loop detection
             cursor = query.get('cursor', [None])[0]
             if cursor in seen_cursors:
-                logging.warning(f"Detected duplicate cursor {cursor}, stopping pagination")
+                logging.warning("Detected duplicate cursor %s, stopping pagination", cursor)
                 break
             seen_cursors.add(cursor)
             
@@ -97,7 +114,6 @@ def fetch_paginated_data(url: str, params: Dict = None) -> List[Dict]:
             query['apiKey'] = POLYGON_API_KEY
             next_url = urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
             
-            logging.info(f"Fetching page {pages_fetched + 1}")
             response = requests.get(next_url, timeout=timeout)
             response.raise_for_status()
             data = response.json()
@@ -105,27 +121,29 @@ def fetch_paginated_data(url: str, params: Dict = None) -> List[Dict]:
             # Check for empty results
             records = data.get('results', data.get('ticks', data.get('tickers', [])))
             if not records:
-                logging.info("No more records found")
                 break
-                
+
             results.extend(records)
             pages_fetched += 1
-            logging.info(f"Received {len(records)} records (total: {len(results)})")
+            counters.increment("fetch.pages")
+            counters.increment("fetch.page_records", len(records))
             
             # Update next URL
             next_url = data.get('next_url')
-            time.sleep(0.3)
+            time.sleep(PAGE_DELAY)
 
         except Exception as e:
             if retries >= max_retries:
-                logging.error(f"Aborting after {max_retries} retries: {str(e)}")
+                counters.increment("fetch.aborted")
+                logging.error("Aborting after %d retries: %s", max_retries, e)
                 break
             retries += 1
             sleep_time = min(2 ** retries, 10)
-            logging.warning(f"Retry {retries}/{max_retries} in {sleep_time}s: {str(e)}")
+            counters.increment("fetch.retries")
+            logging.warning("Retry %d/%d in %ds: %s", retries, max_retries, sleep_time, e)
             time.sleep(sleep_time)
     
-    logging.info(f"Completed pagination after {pages_fetched} pages")
+    logging.debug("Completed pagination after %d pages", pages_fetched)
     return results
 
 
@@ -135,8 +153,10 @@ def fetch_aggregates(
     end: datetime,
     multiplier: int = 1,
     timespan: str = "minute"
-) -> pd.DataFrame:
+) -> 'pd.DataFrame':
     """Fetch OHLCV + VWAP data."""
+    import pandas as pd
+
     start_utc = pd.Timestamp(start).tz_localize('UTC')
     end_utc = pd.Timestamp(end).tz_localize('UTC')
 
@@ -147,7 +167,7 @@ def fetch_aggregates(
         "limit": 50000
     }
     
-    logging.info(f"Fetching {timespan} aggregates from {start_utc} to {end_utc}")
+    start_time = time.time()
     data = fetch_paginated_data(url, params)
     
     if not data:
@@ -155,7 +175,7 @@ def fetch_aggregates(
         
     df = pd.DataFrame(data)
     df["t"] = pd.to_datetime(df["t"], unit="ms", utc=True)
-    logging.info(f"Fetched {len(df)} {timespan} aggregates for {ticker}")
+    _fetched(f"{timespan} aggregates", ticker, len(df), start_time)
 
     df = df.rename(columns={
         "t": "timestamp",
@@ -170,15 +190,16 @@ def fetch_aggregates(
     # Filter to exact date range (API sometimes returns extra)
     mask = (df.index >= start_utc) & (df.index <= end_utc)
     filtered_df = df[mask]
-    logging.info(f"Filtered to {len(filtered_df)}/{len(df)} records in range")
+    logging.debug("Filtered to %d/%d records in range", len(filtered_df), len(df))
     return filtered_df
 
 
-def fetch_splits(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+def fetch_splits(ticker: str, start_date: str, end_date: str) -> 'pd.DataFrame':
     """Fetch splits with optimized parameters"""
+    import pandas as pd
+
     start_time = time.time()
-    logging.info(f"🔄 Starting splits fetch for {ticker}")
-    
+
     try:
         url = f"{BASE_URL}/v3/reference/splits"
         params = {
@@ -190,23 +211,24 @@ def fetch_splits(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
         
         data = fetch_paginated_data(url, params)
         if not data:
-            logging.info(f"✅ No splits found for {ticker}")
+            _fetched("splits", ticker, 0, start_time)
             return pd.DataFrame()
             
         df = pd.DataFrame(data)
         df["execution_date"] = pd.to_datetime(df["execution_date"])
-        logging.info(f"⏱️ Fetched {len(data)} splits in {time.time()-start_time:.2f}s")
+        _fetched("splits", ticker, len(data), start_time)
         return df[["execution_date", "split_from", "split_to"]]
         
     except Exception as e:
-        logging.error(f"❌ Split fetch failed after {time.time()-start_time:.2f}s: {str(e)}")
+        logging.error("Splits fetch failed for %s after %.2fs: %s", ticker, time.time() - start_time, e)
         return pd.DataFrame()
 
-def fetch_dividends(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+def fetch_dividends(ticker: str, start_date: str, end_date: str) -> 'pd.DataFrame':
     """Fetch dividends with proper URL format"""
+    import pandas as pd
+
     start_time = time.time()
-    logging.info(f"🔄 Starting dividends fetch for {ticker}")
-    
+
     try:
         url = f"{BASE_URL}/v3/reference/dividends"
         params = {
@@ -220,20 +242,21 @@ def fetch_dividends(ticker: str, start_date: str, end_date: str) -> pd.DataFrame
         if not data:
             return pd.DataFrame()
         
-        logging.info(f"⏱️ Fetched {len(data)} dividends in {time.time()-start_time:.2f}s")
+        _fetched("dividends", ticker, len(data), start_time)
         df = pd.DataFrame(data)
         df["ex_dividend_date"] = pd.to_datetime(df["ex_dividend_date"])
         return df[["ex_dividend_date", "cash_amount", "declaration_date"]]
         
     except Exception as e:
-        logging.error(f"❌ Dividends fetch failed after {time.time()-start_time:.2f}s: {str(e)}")
+        logging.error("Dividends fetch failed for %s after %.2fs: %s", ticker, time.time() - start_time, e)
         return pd.DataFrame()
     
-def fetch_trades(ticker: str, date: str) -> pd.DataFrame:
+def fetch_trades(ticker: str, date: str) -> 'pd.DataFrame':
     """Fetch trades with proper URL format"""
+    import pandas as pd
+
     start_time = time.time()
-    logging.info(f"🔄 Starting trades fetch for {ticker} on {date}")
-    
+
     try:
         url = f"{BASE_URL}/v3/trades/{ticker}"
         params = {
@@ -247,10 +270,9 @@ def fetch_trades(ticker: str, date: str) -> pd.DataFrame:
         data = fetch_paginated_data(url, params)
         
         if not data:
-            logging.info(f"✅ No trades found for {ticker} on {date}")
+            _fetched("trades", ticker, 0, start_time, date)
             return pd.DataFrame()
         
-        logging.info(f"⏱️ Fetched {len(data)} trades in {time.time()-start_time:.2f}s")
         df = pd.DataFrame(data)
         
         # Validate required columns
@@ -267,19 +289,20 @@ def fetch_trades(ticker: str, date: str) -> pd.DataFrame:
                 keep_columns.append(col)
         
         df["timestamp"] = pd.to_datetime(df["sip_timestamp"], utc=True)
-        logging.info(f"⏱️ Fetched {len(df)} trades in {time.time()-start_time:.2f}s")
+        _fetched("trades", ticker, len(df), start_time, date)
         return df[keep_columns]
         
     except Exception as e:
-        logging.error(f"❌ Trades fetch failed after {time.time()-start_time:.2f}s: {str(e)}")
+        logging.error("Trades fetch failed for %s on %s after %.2fs: %s", ticker, date, time.time() - start_time, e)
         return pd.DataFrame()
 
 
-def fetch_quotes(ticker: str, date: str) -> pd.DataFrame:
+def fetch_quotes(ticker: str, date: str) -> 'pd.DataFrame':
     """Fetch quotes with proper URL format"""
+    import pandas as pd
+
     start_time = time.time()
-    logging.info(f"🔄 Starting quotes fetch for {ticker} on {date}")
-    
+
     try:
         url = f"{BASE_URL}/v3/quotes/{ticker}"
         params = {
@@ -293,10 +316,9 @@ def fetch_quotes(ticker: str, date: str) -> pd.DataFrame:
         data = fetch_paginated_data(url, params)
         
         if not data:
-            logging.info(f"✅ No quotes found for {ticker} on {date}")
+            _fetched("quotes", ticker, 0, start_time, date)
             return pd.DataFrame()
         
-        logging.info(f"⏱️ Fetched {len(data)} quotes in {time.time()-start_time:.2f}s")
         df = pd.DataFrame(data)
         
         # Handle missing columns
@@ -316,17 +338,20 @@ def fetch_quotes(ticker: str, date: str) -> pd.DataFrame:
         df["timestamp"] = pd.to_datetime(df["sip_timestamp"], utc=True)
         keep_columns = [col for col in expected_columns if col in df.columns]
         
-        logging.info(f"⏱️ Fetched {len(df)} quotes in {time.time()-start_time:.2f}s")
+        _fetched("quotes", ticker, len(df), start_time, date)
         return df[keep_columns]
         
     except Exception as e:
-        logging.error(f"❌ Quotes fetch failed after {time.time()-start_time:.2f}s: {str(e)}")
+        logging.error("Quotes fetch failed for %s on %s after %.2fs: %s", ticker, date, time.time() - start_time, e)
         return pd.DataFrame()
 
 
 
 def initialize_trading_days():
     """Initialize trading calendar."""
+    import pandas as pd
+    import requests
+
     global TRADING_DAYS
     TRADING_DAYS = set()
     
@@ -365,25 +390,31 @@ def initialize_trading_days():
             if date.date() not in holidays
         }
         
-        logging.info(f"Initialized {len(TRADING_DAYS)} trading days from {start_date} to {end_date}")
+        logging.info("Initialized %d trading days from %s to %s", len(TRADING_DAYS), start_date, end_date)
         
     except Exception as e:
-        logging.error(f"Failed to initialize trading calendar: {str(e)}")
+        logging.error("Failed to initialize trading calendar: %s", e)
         # Fallback to weekdays if API fails
         start_date = datetime(2000, 1, 1)
         end_date = datetime.now()
         all_dates = pd.date_range(start_date, end_date, freq='B')
         TRADING_DAYS = {date.date().isoformat() for date in all_dates}
-        logging.warning(f"Using fallback calendar with {len(TRADING_DAYS)} weekdays")
+        logging.warning("Using fallback calendar with %d weekdays", len(TRADING_DAYS))
+
+def fetch_all_data(ticker: str, start_date: str, end_date: str, bars_from_trades: bool = True) -> Dict[str, str]:
+    """Fetch all data for a ticker. Second and minute bars are built from the
+    downloaded trades unless bars_from_trades is False."""
+    from multiprocessing.pool import ThreadPool
+    import pandas as pd
+    from bar_builder import split_adjust, time_bars
 
-def fetch_all_data(ticker: str, start_date: str, end_date: str) -> Dict[str, str]:
-    """Fetch all data for a ticker."""
     os.makedirs(f"data/historical/{ticker}", exist_ok=True)
     results = {}
     
     try:
         # Aggregates
-        for res in [("second", 1), ("minute", 1), ("day", 1)]:
+        resolutions = [("day", 1)] if bars_from_trades else [("second", 1), ("minute", 1), ("day", 1)]
+        for res in resolutions:
             df = fetch_aggregates(
                 ticker,
                 datetime.strptime(start_date, "%Y-%m-%d"),
@@ -395,8 +426,11 @@ def fetch_all_data(ticker: str, start_date: str, end_date: str) -> Dict[str, str
                 df.to_parquet(path)
                 results[f"aggregates_{res[0]}"] = path
 
-        # Corporate Actions (Splits and Dividends)
-        splits = fetch_splits(ticker, start_date, end_date)
+        # Corporate Actions (Splits and Dividends). Splits up to today also
+        # split-adjust the trade-built bars, as adjusted=true does
+        today = datetime.now().strftime("%Y-%m-%d")
+        all_splits = fetch_splits(ticker, start_date, today if bars_from_trades else end_date)
+        splits = all_splits[all_splits["execution_date"] <= pd.Timestamp(end_date)] if not all_splits.empty else all_splits
         dividends = fetch_dividends(ticker, start_date, end_date)
         
         if not splits.empty or not dividends.empty:
@@ -412,7 +446,7 @@ def fetch_all_data(ticker: str, start_date: str, end_date: str) -> Dict[str, str
         def process_date(date: datetime):
             date_str = date.strftime("%Y-%m-%d")
             if not is_trading_day(date):
-                logging.info(f"Skipping {date_str} (non-trading day)")
+                logging.debug("Skipping %s (non-trading day)", date_str)
                 return (date_str, pd.DataFrame(), pd.DataFrame())
             return (
                 date_str,
@@ -420,27 +454,43 @@ def fetch_all_data(ticker: str, start_date: str, end_date: str) -> Dict[str, str
                 fetch_quotes(ticker, date_str)
             )
 
+        trade_bars = {timespan: [] for timespan in TRADE_BARS}
         with ThreadPool(MAX_THREADS) as pool:
             for date_str, trades, quotes in pool.imap(process_date, dates):
                 if not trades.empty:
                     path = f"data/historical/{ticker}/trades_{date_str}.parquet"
                     trades.to_parquet(path)
                     results.setdefault("trades", []).append(path)
-                    logging.info(f"Saved trades for {ticker} on {date_str} to {path}")
+                    logging.debug("Saved trades for %s on %s to %s", ticker, date_str, path)
+                    if bars_from_trades:
+                        for timespan, freq in TRADE_BARS.items():
+                            trade_bars[timespan].append(time_bars(trades, freq))
                 if not quotes.empty:
                     path = f"data/historical/{ticker}/quotes_{date_str}.parquet"
                     quotes.to_parquet(path)
                     results.setdefault("quotes", []).append(path)
-                    logging.info(f"Saved quotes for {ticker} on {date_str} to {path}")
+                    logging.debug("Saved quotes for %s on %s to %s", ticker, date_str, path)
+
+        for timespan, frames in trade_bars.items():
+            frames = [frame for frame in frames if not frame.empty]
+            if frames:
+                df = split_adjust(pd.concat(frames).sort_index(), all_splits)
+                path = f"data/historical/{ticker}/aggregates_{timespan}.parquet"
+                df.to_parquet(path)
+                results[f"aggregates_{timespan}"] = path
+                logging.info("Built %d %s bars for %s from trades", len(df), timespan, ticker)
                     
     except Exception as e:
-        logging.error(f"Critical error processing {ticker}: {str(e)}")
+        logging.error("Critical error processing %s: %s", ticker, e)
         
     return results
 
 if __name__ == "__main__":
     from corporate_actions import CorporateActionsManager
+    from multiprocessing.pool import ThreadPool
     import argparse
+
+    configure_logging()
     
     parser = argparse.ArgumentParser(description="Fetch Polygon.io historical data")
     parser.add_argument("--init-only", action="store_true", 
@@ -449,13 +499,15 @@ if __name__ == "__main__":
     parser.add_argument("--start", help="Start date YYYY-MM-DD")
     parser.add_argument("--end", default=datetime.now().strftime("%Y-%m-%d"))
     parser.add_argument("--threads", type=int, default=MAX_THREADS)
+    parser.add_argument("--api-aggregates", action="store_true",
+                       help="Request second/minute aggregates instead of building them from trades")
 
 
     args = parser.parse_args()
     
     if args.init_only:
         initialize_trading_days()
-        logging.info(f"Initialized {len(TRADING_DAYS)} trading days")
+        logging.info("Initialized %d trading days", len(TRADING_DAYS))
         exit(0)
         
     if not args.tickers or not args.start:
@@ -466,11 +518,11 @@ if __name__ == "__main__":
         initialize_trading_days()
     
     def process_ticker(ticker: str):
-        logging.info(f"Starting {ticker}")
+        logging.info("Starting %s", ticker)
         try:
-            return fetch_all_data(ticker, args.start, args.end)
+            return fetch_all_data(ticker, args.start, args.end, bars_from_trades=not args.api_aggregates)
         except Exception as e:
-            logging.error(f"Failed {ticker}: {str(e)}")
+            logging.error("Failed %s: %s", ticker, e)
             return None
 
     with ThreadPool(min(args.threads, len(args.tickers))) as pool:
@@ -480,4 +532,4 @@ if __name__ == "__main__":
     ca_manager.fetch_corporate_actions(args.tickers, args.start, args.end)
     
     success_count = sum(1 for r in results if r)
-    logging.info(f"Completed with {success_count}/{len(args.tickers)} successful tickers")
\ No newline at end of file
+    logging.info("Completed with %d/%d successful tickers", success_count, len(args.tickers))
\ No newline at end of file
@@ -0,0 +1,235 @@
+// data-ingestion/ingest-pipeline.js
+// Micro-batched websocket ingest. Frames are parsed once and routed into
+// per-type batches; a timer (or a full batch) flushes everything with a single
+// Redis pipeline, so the socket handler never awaits Redis. Routed messages
+// are also published, in arrival order, to `polygon:stream` as
+// `{ symbol, data, trace? }` for RealTimePipeline; a sampled frame's trace is
+// injected into each of its messages, stamped at publish time.
+import { performance } from 'perf_hooks';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+import { tracer as sharedTracer } from '../shared/tracing.js';
+import { log as sharedLog } from '../shared/structured-log.js';
+import { orderBooks as sharedOrderBooks } from './orderbook-cache.js';
+import { OrderFlowTracker, orderFlow as sharedOrderFlow } from './order-flow.js';
+
+const RAW_STREAM = 'market-data:raw';
+const RAW_STREAM_MAXLEN = 100000;
+const STREAM_CHANNEL = 'polygon:stream';
+const WINDOW_SIZE = 60;
+
+export class IngestPipeline {
+  constructor(redisClient, {
+    tickStore = null,
+    orderBooks = sharedOrderBooks,
+    orderFlow = orderBooks === sharedOrderBooks ? sharedOrderFlow : new OrderFlowTracker({ orderBooks }),
+    flushInterval = 10,  // ms
+    maxBatch = 5000,     // messages; reaching it flushes immediately
+    streamChannel = STREAM_CHANNEL, // null: do not publish routed messages
+    now = () => performance.now(),
+    tracer = sharedTracer,
+    log = sharedLog
+  } = {}) {
+    this.redis = redisClient;
+    this.tickStore = tickStore;
+    this.orderBooks = orderBooks;
+    this.orderFlow = orderFlow;
+    this.flushInterval = flushInterval;
+    this.maxBatch = maxBatch;
+    this.streamChannel = streamChannel;
+    this.now = now;
+    this.tracer = tracer;
+    this.log = log;
+    this.timer = null;
+    this.inflight = null;
+    this.flushQueued = false;
+    this._resetBatch();
+
+    this.latency = new LatencyHistogram(); // frame received -> pipeline acked
+    this.metrics = {
+      frames: 0,
+      messages: 0,
+      parseErrors: 0,
+      flushes: 0,
+      flushErrors: 0,
+      commandErrors: 0,
+      maxQueueDepth: 0
+    };
+  }
+
+  _resetBatch() {
+    this.frames = [];              // raw frame strings
+    this.receivedAt = [];          // per frame
+    this.traces = [];              // per frame; null unless sampled
+    this.quotes = new Map();       // symbol -> latest quote (coalesced)
+    this.trades = [];
+    this.aggregates = [];
+    this.routed = [];              // A/Q/T messages in arrival order, uncoalesced
+    this.routedFrame = [];         // per routed message: index into frames
+    this.depth = 0;
+  }
+
+  start() {
+    if (this.timer) return;
+    this.timer = setInterval(() => this.flush(), this.flushInterval);
+    this.timer.unref?.();
+  }
+
+  async stop() {
+    clearInterval(this.timer);
+    this.timer = null;
+    await this.flush();
+  }
+
+  // Synchronous: parse, route, return. Never touches Redis.
+  push(data) {
+    const receivedAt = this.now();
+    const trace = this.tracer.start();
+    let messages;
+    try {
+      messages = JSON.parse(data);
+    } catch (err) {
+      this.metrics.parseErrors++;
+      this.log.warn('ingest.parse', 'Unparseable frame', { error: err.message, bytes: data.length });
+      return 0;
+    }
+    if (!Array.isArray(messages)) messages = [messages];
+
+    this.frames.push(data);
+    this.receivedAt.push(receivedAt);
+    this.traces.push(trace);
+    const frame = this.frames.length - 1;
+    for (const msg of messages) {
+      switch (msg.ev) {
+        case 'A': // Aggregate (minute bar)
+          this.aggregates.push(msg);
+          break;
+        case 'Q': // Quote: the in-process book is updated immediately
+          this.orderBooks.applyQuote(msg);
+          this.quotes.set(msg.sym, msg);
+          break;
+        case 'T': // Trade: classified once against the current NBBO
+          this.orderFlow.applyTrade(msg);
+          this.orderBooks.applyTrade(msg);
+          this.trades.push(msg);
+          break;
+        default:
+          // Status and other control messages are kept in the raw stream only
+          continue;
+      }
+      this.routed.push(msg);
+      this.routedFrame.push(frame);
+    }
+
+    this.metrics.frames++;
+    this.metrics.messages += messages.length;
+    this.depth += messages.length;
+    if (this.depth > this.metrics.maxQueueDepth) this.metrics.maxQueueDepth = this.depth;
+    if (this.depth >= this.maxBatch) this.flush();
+    return messages.length;
+  }
+
+  // At most one pipeline in flight; pushes during a flush go to the next one
+  flush() {
+    if (this.inflight) {
+      this.flushQueued = true;
+      return this.inflight;
+    }
+    // Idle ticks still write book snapshots that came due after the last frame
+    if (this.frames.length === 0 && !this.orderBooks.snapshotDue()) return Promise.resolve();
+
+    const { frames, receivedAt, traces, quotes, trades, aggregates, routed, routedFrame } = this;
+    this._resetBatch();
+
+    this.inflight = this._write(frames, receivedAt, traces, quotes, trades, aggregates, routed, routedFrame)
+      .finally(() => {
+        this.inflight = null;
+        if (this.flushQueued) {
+          this.flushQueued = false;
+          if (this.frames.length > 0) this.flush();
+        }
+      });
+    return this.inflight;
+  }
+
+  async _write(frames, receivedAt, traces, quotes, trades, aggregates, routed, routedFrame) {
+    const batch = this.redis.pipeline();
+
+    frames.forEach((frame, i) => {
+      if (traces[i]) {
+        batch.xadd(RAW_STREAM, 'MAXLEN', '~', RAW_STREAM_MAXLEN, '*', 'frame', frame,
+          'trace', this.tracer.inject(traces[i]));
+      } else {
+        batch.xadd(RAW_STREAM, 'MAXLEN', '~', RAW_STREAM_MAXLEN, '*', 'frame', frame);
+      }
+    });
+
+    for (const [symbol, quote] of quotes) {
+      const timestamp = quote.t || Date.now();
+      batch.hset(`quote:${symbol}`, {
+        bid: quote.bp,
+        ask: quote.ap,
+        bidSize: quote.bs,
+        askSize: quote.as,
+        timestamp
+      });
+    }
+    // Book snapshots are throttled per symbol
+    this.orderBooks.snapshotInto(batch);
+
+    for (const trade of trades) {
+      batch.xadd(`trades:${trade.sym}`, '*', 'trade', JSON.stringify(trade));
+      this.tickStore?.bufferTick(trade.sym, {
+        timestamp: trade.t,
+        price: trade.p,
+        size: trade.s,
+        conditions: trade.c
+      });
+    }
+
+    const windows = new Set();
+    for (const agg of aggregates) {
+      batch.lpush(`rollingWindow:${agg.sym}`, JSON.stringify(agg));
+      windows.add(agg.sym);
+      this.tickStore?.bufferTick(agg.sym, {
+        timestamp: agg.e,
+        close: agg.c,
+        volume: agg.v
+      });
+    }
+    for (const symbol of windows) batch.ltrim(`rollingWindow:${symbol}`, 0, WINDOW_SIZE - 1);
+
+    // Each frame's trace leaves with `last` at publish time, so the feature
+    // pipeline's 'transport' span measures pub/sub delivery alone
+    if (this.streamChannel) {
+      const injected = traces.map(trace => trace ? this.tracer.inject({ ...trace, last: this.tracer.now() }) : undefined);
+      routed.forEach((msg, i) => {
+        batch.publish(this.streamChannel, JSON.stringify({ symbol: msg.sym, data: msg, trace: injected[routedFrame[i]] }));
+      });
+    }
+
+    const ticks = this.tickStore?.flushInto(batch);
+
+    try {
+      const results = await batch.exec();
+      for (const [err] of results || []) if (err) this.metrics.commandErrors++;
+      ticks?.commit();
+      this.metrics.flushes++;
+      const ackedAt = this.now();
+      for (const t of receivedAt) this.latency.record(ackedAt - t);
+      for (const trace of traces) this.tracer.mark(trace, 'ingest');
+    } catch (err) {
+      ticks?.rollback(); // re-sent with the next flush
+      this.metrics.flushErrors++;
+      this.log.error('ingest.flush', 'Error flushing ingest batch', { error: err, frames: frames.length });
+    }
+  }
+
+  getMetrics() {
+    return {
+      ...this.metrics,
+      queueDepth: this.depth,
+      flushInFlight: this.inflight !== null,
+      latency: this.latency.snapshot()
+    };
+  }
+}
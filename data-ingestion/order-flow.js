@@ -0,0 +1,152 @@
+// data-ingestion/order-flow.js
+// Trades are classified once at ingest (quote rule against the current NBBO,
+// tick rule at the midpoint or without a quote) and folded into per-symbol
+// running totals, so order-flow imbalance over the last N trades is an O(1)
+// read. data-ingestion/trade_classification.py is the offline equivalent.
+import { orderBooks as sharedOrderBooks } from './orderbook-cache.js';
+
+export const BUY = 1;
+export const SELL = -1;
+export const UNKNOWN = 0;
+
+const DEFAULT_CAPACITY = 1000; // longest window that can be queried
+
+// Sign of the most recent non-zero price change (zero ticks keep the previous one)
+export function tickRule(price, prevPrice, prevTickSign = UNKNOWN) {
+  if (!(prevPrice > 0) || price === prevPrice) return prevTickSign;
+  return price > prevPrice ? BUY : SELL;
+}
+
+// Lee-Ready: above the NBBO midpoint is a buy, below is a sell; trades at the
+// midpoint or without a valid quote fall back to the tick rule
+export function classifyTrade(price, bid, ask, tickSign = UNKNOWN) {
+  if (bid > 0 && ask >= bid) {
+    const mid = (bid + ask) / 2;
+    if (price > mid) return BUY;
+    if (price < mid) return SELL;
+  }
+  return tickSign;
+}
+
+// Cumulative buy/sell counts and volumes recorded after every trade in a ring
+// of capacity + 1 slots; a window is the difference of two slots
+export class OrderFlowWindow {
+  constructor(capacity = DEFAULT_CAPACITY) {
+    this.capacity = capacity;
+    this.slots = capacity + 1;
+    this.buyCount = new Float64Array(this.slots);
+    this.sellCount = new Float64Array(this.slots);
+    this.buyVolume = new Float64Array(this.slots);
+    this.sellVolume = new Float64Array(this.slots);
+    this.total = 0; // trades ever pushed
+  }
+
+  push(sign, size) {
+    const prev = this.total % this.slots;
+    const next = (this.total + 1) % this.slots;
+    this.buyCount[next] = this.buyCount[prev] + (sign === BUY ? 1 : 0);
+    this.sellCount[next] = this.sellCount[prev] + (sign === SELL ? 1 : 0);
+    this.buyVolume[next] = this.buyVolume[prev] + (sign === BUY ? size : 0);
+    this.sellVolume[next] = this.sellVolume[prev] + (sign === SELL ? size : 0);
+    this.total++;
+  }
+
+  get count() {
+    return Math.min(this.total, this.capacity);
+  }
+
+  // { trades, buys, sells, buyVolume, sellVolume } over the last n trades
+  window(n = this.capacity) {
+    const trades = Math.min(n, this.count);
+    const end = this.total % this.slots;
+    const start = (this.total - trades) % this.slots;
+    return {
+      trades,
+      buys: this.buyCount[end] - this.buyCount[start],
+      sells: this.sellCount[end] - this.sellCount[start],
+      buyVolume: this.buyVolume[end] - this.buyVolume[start],
+      sellVolume: this.sellVolume[end] - this.sellVolume[start]
+    };
+  }
+
+  // (buys - sells) / trades; unclassified trades count toward the denominator
+  imbalance(n = this.capacity) {
+    const trades = Math.min(n, this.count);
+    if (trades === 0) return 0;
+    const end = this.total % this.slots;
+    const start = (this.total - trades) % this.slots;
+    const buys = this.buyCount[end] - this.buyCount[start];
+    const sells = this.sellCount[end] - this.sellCount[start];
+    return (buys - sells) / trades;
+  }
+
+  // (buy volume - sell volume) / (buy volume + sell volume)
+  volumeImbalance(n = this.capacity) {
+    const trades = Math.min(n, this.count);
+    const end = this.total % this.slots;
+    const start = (this.total - trades) % this.slots;
+    const buys = this.buyVolume[end] - this.buyVolume[start];
+    const sells = this.sellVolume[end] - this.sellVolume[start];
+    return (buys - sells) / (buys + sells || 1);
+  }
+}
+
+class SymbolFlow {
+  constructor(capacity) {
+    this.lastPrice = NaN;
+    this.tickSign = UNKNOWN;
+    this.lastSign = UNKNOWN;
+    this.window = new OrderFlowWindow(capacity);
+  }
+}
+
+export class OrderFlowTracker {
+  constructor({ capacity = DEFAULT_CAPACITY, orderBooks = sharedOrderBooks } = {}) {
+    this.capacity = capacity;
+    this.orderBooks = orderBooks;
+    this.flows = new Map();
+  }
+
+  _flow(symbol) {
+    let flow = this.flows.get(symbol);
+    if (!flow) {
+      flow = new SymbolFlow(this.capacity);
+      this.flows.set(symbol, flow);
+    }
+    return flow;
+  }
+
+  // Polygon trade ({ sym, p, s }); classified against the book as of now.
+  // Returns the sign (1 buy, -1 sell, 0 unknown).
+  applyTrade(trade) {
+    const flow = this._flow(trade.sym);
+    const book = this.orderBooks.get(trade.sym);
+    flow.tickSign = tickRule(trade.p, flow.lastPrice, flow.tickSign);
+    flow.lastPrice = trade.p;
+    flow.lastSign = classifyTrade(trade.p, book.bestBid, book.bestAsk, flow.tickSign);
+    flow.window.push(flow.lastSign, trade.s || 0);
+    return flow.lastSign;
+  }
+
+  imbalance(symbol, n) {
+    const flow = this.flows.get(symbol);
+    return flow ? flow.window.imbalance(n) : 0;
+  }
+
+  volumeImbalance(symbol, n) {
+    const flow = this.flows.get(symbol);
+    return flow ? flow.window.volumeImbalance(n) : 0;
+  }
+
+  window(symbol, n) {
+    return this._flow(symbol).window.window(n);
+  }
+
+  count(symbol) {
+    const flow = this.flows.get(symbol);
+    return flow ? flow.window.count : 0;
+  }
+}
+
+// Process-wide tracker fed by IngestPipeline
+export const orderFlow = new OrderFlowTracker();
@@ -0,0 +1,178 @@
+// data-ingestion/orderbook-cache.js
+// Long-lived in-process order books, one per symbol, held in typed arrays and
+// updated in place. Reads (best bid/ask, depth imbalance) are synchronous;
+// Redis only receives throttled snapshots for other processes.
+const DEFAULT_LEVELS = 10;
+const SNAPSHOT_INTERVAL = 1000; // ms between Redis snapshots per book
+const ORDERBOOK_TTL = 60;       // seconds
+
+export class OrderBook {
+  constructor(symbol, maxLevels = DEFAULT_LEVELS) {
+    this.symbol = symbol;
+    this.maxLevels = maxLevels;
+    this.bidPrice = new Float64Array(maxLevels);
+    this.bidSize = new Float64Array(maxLevels);
+    this.askPrice = new Float64Array(maxLevels);
+    this.askSize = new Float64Array(maxLevels);
+    this.bidLevels = 0;
+    this.askLevels = 0;
+    this.timestamp = 0;
+    this.lastPrice = NaN;
+    this.lastSize = 0;
+    this.lastTradeAt = 0;
+    this.version = 0;         // bumped on every update
+    this.snapshotVersion = 0; // version last written to Redis
+    this.snapshotAt = -Infinity;
+  }
+
+  // Polygon NBBO quote ({ bp, bs, ap, as, t }) replaces the top of book
+  applyQuote(quote) {
+    this.bidPrice[0] = quote.bp || 0;
+    this.bidSize[0] = quote.bs || 0;
+    this.askPrice[0] = quote.ap || 0;
+    this.askSize[0] = quote.as || 0;
+    this.bidLevels = quote.bp ? 1 : 0;
+    this.askLevels = quote.ap ? 1 : 0;
+    this.timestamp = quote.t || Date.now();
+    this.version++;
+    return this;
+  }
+
+  // Last trade is kept alongside the book for routing; not part of snapshots
+  applyTrade(trade) {
+    this.lastPrice = trade.p;
+    this.lastSize = trade.s || 0;
+    this.lastTradeAt = trade.t || Date.now();
+    return this;
+  }
+
+  // Depth snapshot ({ bids: [[price, size]], asks, timestamp }); duplicate
+  // prices are aggregated and levels sorted best-first
+  applySnapshot({ bids = [], asks = [], timestamp }) {
+    this.bidLevels = this._writeSide(bids, this.bidPrice, this.bidSize, true);
+    this.askLevels = this._writeSide(asks, this.askPrice, this.askSize, false);
+    this.timestamp = timestamp || Date.now();
+    this.version++;
+    return this;
+  }
+
+  _writeSide(levels, prices, sizes, descending) {
+    const merged = new Map();
+    for (const [price, size] of levels) merged.set(price, (merged.get(price) || 0) + size);
+    const sorted = [...merged].sort((a, b) => descending ? b[0] - a[0] : a[0] - b[0]);
+    const n = Math.min(sorted.length, this.maxLevels);
+    for (let i = 0; i < n; i++) {
+      prices[i] = sorted[i][0];
+      sizes[i] = sorted[i][1];
+    }
+    return n;
+  }
+
+  get bestBid() {
+    return this.bidLevels > 0 ? this.bidPrice[0] : NaN;
+  }
+
+  get bestAsk() {
+    return this.askLevels > 0 ? this.askPrice[0] : NaN;
+  }
+
+  get mid() {
+    return (this.bestBid + this.bestAsk) / 2;
+  }
+
+  get spread() {
+    return this.bestAsk - this.bestBid;
+  }
+
+  get isEmpty() {
+    return this.bidLevels === 0 && this.askLevels === 0;
+  }
+
+  // (bid depth - ask depth) / total over the top `levels` levels
+  depthImbalance(levels = this.maxLevels) {
+    let bidDepth = 0;
+    let askDepth = 0;
+    for (let i = 0; i < Math.min(levels, this.bidLevels); i++) bidDepth += this.bidSize[i];
+    for (let i = 0; i < Math.min(levels, this.askLevels); i++) askDepth += this.askSize[i];
+    return (bidDepth - askDepth) / (bidDepth + askDepth || 1);
+  }
+
+  levels(side) {
+    const [prices, sizes, n] = side === 'bids'
+      ? [this.bidPrice, this.bidSize, this.bidLevels]
+      : [this.askPrice, this.askSize, this.askLevels];
+    return Array.from({ length: n }, (_, i) => [prices[i], sizes[i]]);
+  }
+
+  toSnapshot() {
+    return {
+      bestBid: this.bidLevels > 0 ? this.bidPrice[0] : 0,
+      bestBidSize: this.bidLevels > 0 ? this.bidSize[0] : 0,
+      bestAsk: this.askLevels > 0 ? this.askPrice[0] : 0,
+      bestAskSize: this.askLevels > 0 ? this.askSize[0] : 0,
+      bids: JSON.stringify(this.levels('bids')),
+      asks: JSON.stringify(this.levels('asks')),
+      timestamp: this.timestamp
+    };
+  }
+}
+
+export class OrderBookCache {
+  constructor({ maxLevels = DEFAULT_LEVELS, snapshotInterval = SNAPSHOT_INTERVAL, now = Date.now } = {}) {
+    this.maxLevels = maxLevels;
+    this.snapshotInterval = snapshotInterval;
+    this.now = now;
+    this.books = new Map();
+  }
+
+  get(symbol) {
+    let book = this.books.get(symbol);
+    if (!book) {
+      book = new OrderBook(symbol, this.maxLevels);
+      this.books.set(symbol, book);
+    }
+    return book;
+  }
+
+  has(symbol) {
+    return this.books.has(symbol) && !this.books.get(symbol).isEmpty;
+  }
+
+  applyQuote(quote) {
+    return this.get(quote.sym).applyQuote(quote);
+  }
+
+  applyTrade(trade) {
+    return this.get(trade.sym).applyTrade(trade);
+  }
+
+  // True when some changed book is due for a snapshot
+  snapshotDue() {
+    const now = this.now();
+    for (const book of this.books.values()) {
+      if (book.version !== book.snapshotVersion && now - book.snapshotAt >= this.snapshotInterval) return true;
+    }
+    return false;
+  }
+
+  // Queue HSET/EXPIRE for books that changed and whose last snapshot is older
+  // than `snapshotInterval`; returns the number of books written
+  snapshotInto(batch, { force = false } = {}) {
+    const now = this.now();
+    let written = 0;
+    for (const book of this.books.values()) {
+      if (book.version === book.snapshotVersion) continue;
+      if (!force && now - book.snapshotAt < this.snapshotInterval) continue;
+      const key = `orderbook:${book.symbol}`;
+      batch.hset(key, book.toSnapshot());
+      batch.expire(key, ORDERBOOK_TTL);
+      book.snapshotVersion = book.version;
+      book.snapshotAt = now;
+      written++;
+    }
+    return written;
+  }
+}
+
+// Process-wide cache shared by ingest, routing and feature calculation
+export const orderBooks = new OrderBookCache();
@@ -0,0 +1,622 @@
+// data-ingestion/polygon-simulator.js
+// Local stand-in for Polygon's REST and stocks websocket APIs, for offline
+// load and throughput benchmarks. REST serves /v2/aggs, /v3/trades,
+// /v3/quotes, /v3/reference/{tickers,splits,dividends}, /v2/last/{trade,nbbo} and
+// /v1/marketstatus/upcoming from a deterministic synthetic market, paginated
+// through opaque `cursor` next_urls like the real API, with injectable latency,
+// errors and a token-bucket rate limit. The websocket (`/stocks`) speaks the
+// auth/subscribe protocol and streams T/Q/A frames at a configured message
+// rate, synthetic or replayed from a frames JSONL file.
+//
+// Times are UTC; the session is 14:30-21:00 (09:30-16:00 EST, DST ignored)
+// on weekdays.
+import fs from 'fs';
+import http from 'http';
+import { randomUUID } from 'crypto';
+import { WebSocketServer } from 'ws';
+import { TokenBucket } from '../execution/rate-limiter.js';
+import { LRUCache } from '../shared/lru-cache.js';
+
+const DAY_MS = 86400000;
+const SESSION_OPEN_MS = (14 * 60 + 30) * 60000;
+const SESSION_MS = 390 * 60000;
+const TIMESPANS = { second: 1000, minute: 60000, hour: 3600000, day: SESSION_MS };
+const DEFAULT_TICKERS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'AMD', 'NFLX', 'SPY'];
+
+// Deterministic PRNG (mulberry32) seeded by a string hash (FNV-1a)
+export function seededRandom(...parts) {
+  let seed = 0x811c9dc5;
+  for (const char of parts.join('|')) {
+    seed ^= char.charCodeAt(0);
+    seed = Math.imul(seed, 0x01000193);
+  }
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+const gaussian = random => Math.sqrt(-2 * Math.log(random() || 1e-12)) * Math.cos(2 * Math.PI * random());
+const round = (value, digits = 2) => Math.round(value * 10 ** digits) / 10 ** digits;
+const isTradingDay = day => {
+  const weekday = new Date(day * DAY_MS).getUTCDay();
+  return weekday !== 0 && weekday !== 6;
+};
+const dayOf = ms => Math.floor(ms / DAY_MS);
+
+// Date, ISO timestamp, ms or ns -> ms
+export function parseTime(value) {
+  if (value === undefined || value === null || value === '') return null;
+  if (/^\d+$/.test(value)) {
+    const n = Number(value);
+    return n > 1e14 ? n / 1e6 : n; // nanoseconds or milliseconds
+  }
+  const ms = Date.parse(value);
+  return Number.isNaN(ms) ? null : ms;
+}
+
+// Deterministic per (ticker, day): regenerating a page returns the same data
+export class SyntheticMarket {
+  constructor({ seed = 'polygon-sim', tickers = DEFAULT_TICKERS, tradesPerDay = 20000, quotesPerDay = 60000 } = {}) {
+    this.seed = seed;
+    this.tickers = tickers;
+    this.tradesPerDay = tradesPerDay;
+    this.quotesPerDay = quotesPerDay;
+    this.days = new LRUCache({ maxSize: 32 }); // `${kind}:${ticker}:${day}` -> records
+  }
+
+  basePrice(ticker, day) {
+    const random = seededRandom(this.seed, ticker);
+    const base = 20 + random() * 480;
+    return base * (1 + 0.25 * Math.sin(day / 60 + random() * 6));
+  }
+
+  // Intraday bars of `stepMs` (TIMESPANS.day: one bar per trading day)
+  bars(ticker, day, stepMs) {
+    const key = `bars${stepMs}:${ticker}:${day}`;
+    let bars = this.days.get(key);
+    if (bars) return bars;
+    const random = seededRandom(this.seed, ticker, day, 'bars');
+    const count = Math.max(1, Math.floor(SESSION_MS / stepMs));
+    const sigma = 0.02 * Math.sqrt(Math.min(stepMs, SESSION_MS) / SESSION_MS);
+    const start = stepMs >= SESSION_MS ? day * DAY_MS + 5 * 3600000 : day * DAY_MS + SESSION_OPEN_MS;
+    let close = this.basePrice(ticker, day);
+    bars = new Array(count);
+    for (let i = 0; i < count; i++) {
+      const open = close;
+      close = Math.max(0.01, open * (1 + sigma * gaussian(random)));
+      const high = Math.max(open, close) * (1 + Math.abs(gaussian(random)) * sigma / 2);
+      const low = Math.min(open, close) * (1 - Math.abs(gaussian(random)) * sigma / 2);
+      const trades = 1 + Math.floor(random() * 50 * Math.max(1, stepMs / 60000));
+      bars[i] = {
+        v: trades * (1 + Math.floor(random() * 200)),
+        vw: round((open + high + low + close) / 4, 4),
+        o: round(open),
+        c: round(close),
+        h: round(high),
+        l: round(low),
+        t: start + i * stepMs,
+        n: trades
+      };
+    }
+    this.days.set(key, bars);
+    return bars;
+  }
+
+  // Sorted by sip_timestamp; ns timestamps come from whole microseconds
+  trades(ticker, day) {
+    const key = `trades:${ticker}:${day}`;
+    let trades = this.days.get(key);
+    if (trades) return trades;
+    const random = seededRandom(this.seed, ticker, day, 'trades');
+    const n = this.tradesPerDay;
+    const gap = SESSION_MS * 1000 / n; // mean gap in us
+    let us = (day * DAY_MS + SESSION_OPEN_MS) * 1000;
+    let price = this.basePrice(ticker, day);
+    trades = new Array(n);
+    for (let i = 0; i < n; i++) {
+      us += Math.max(1, Math.round(-Math.log(random() || 1e-12) * gap));
+      price = Math.max(0.01, price * (1 + 0.0004 * gaussian(random)));
+      const sip = us * 1000;
+      trades[i] = {
+        conditions: random() < 0.8 ? [0] : [12, 37],
+        exchange: 1 + Math.floor(random() * 20),
+        id: String(i + 1),
+        participant_timestamp: sip - 1000 * (1 + Math.floor(random() * 500)),
+        price: round(price, 4),
+        sequence_number: i + 1,
+        sip_timestamp: sip,
+        size: random() < 0.7 ? 100 : 1 + Math.floor(random() * 1000),
+        tape: 3
+      };
+    }
+    this.days.set(key, trades);
+    return trades;
+  }
+
+  quotes(ticker, day) {
+    const key = `quotes:${ticker}:${day}`;
+    let quotes = this.days.get(key);
+    if (quotes) return quotes;
+    const random = seededRandom(this.seed, ticker, day, 'quotes');
+    const n = this.quotesPerDay;
+    const gap = SESSION_MS * 1000 / n;
+    let us = (day * DAY_MS + SESSION_OPEN_MS) * 1000;
+    let mid = this.basePrice(ticker, day);
+    quotes = new Array(n);
+    for (let i = 0; i < n; i++) {
+      us += Math.max(1, Math.round(-Math.log(random() || 1e-12) * gap));
+      mid = Math.max(0.02, mid * (1 + 0.0002 * gaussian(random)));
+      const half = Math.max(0.005, mid * 0.0001 * (1 + random() * 4));
+      const sip = us * 1000;
+      quotes[i] = {
+        ask_exchange: 1 + Math.floor(random() * 20),
+        ask_price: round(mid + half),
+        ask_size: 1 + Math.floor(random() * 20),
+        bid_exchange: 1 + Math.floor(random() * 20),
+        bid_price: round(mid - half),
+        bid_size: 1 + Math.floor(random() * 20),
+        indicators: [],
+        participant_timestamp: sip - 1000 * (1 + Math.floor(random() * 500)),
+        sequence_number: i + 1,
+        sip_timestamp: sip,
+        tape: 3
+      };
+    }
+    this.days.set(key, quotes);
+    return quotes;
+  }
+
+  // A 2:1 or 4:1 split every few years, for roughly half the tickers
+  splits(ticker) {
+    const random = seededRandom(this.seed, ticker, 'splits');
+    if (random() < 0.5) return [];
+    const splits = [];
+    for (let year = 2000 + Math.floor(random() * 6); year <= 2025; year += 4 + Math.floor(random() * 6)) {
+      const date = `${year}-${String(1 + Math.floor(random() * 12)).padStart(2, '0')}-${String(1 + Math.floor(random() * 28)).padStart(2, '0')}`;
+      const to = random() < 0.7 ? 2 : 4;
+      splits.push({ execution_date: date, id: `E${ticker}${year}`, split_from: 1, split_to: to, ticker });
+    }
+    return splits;
+  }
+
+  // Quarterly dividends for roughly half the tickers
+  dividends(ticker) {
+    const random = seededRandom(this.seed, ticker, 'dividends');
+    if (random() < 0.5) return [];
+    let cash = round(0.05 + random() * 0.8, 4);
+    const dividends = [];
+    for (let year = 2000; year <= 2025; year++) {
+      for (const month of [2, 5, 8, 11]) {
+        const exDate = `${year}-${String(month).padStart(2, '0')}-10`;
+        dividends.push({
+          cash_amount: cash,
+          declaration_date: `${year}-${String(month - 1).padStart(2, '0')}-25`,
+          dividend_type: 'CD',
+          ex_dividend_date: exDate,
+          frequency: 4,
+          id: `E${ticker}${year}${month}`,
+          pay_date: `${year}-${String(month).padStart(2, '0')}-28`,
+          record_date: `${year}-${String(month).padStart(2, '0')}-11`,
+          ticker
+        });
+      }
+      cash = round(cash * (1 + random() * 0.08), 4);
+    }
+    return dividends;
+  }
+
+  tickerDetails() {
+    return this.tickers.map(ticker => ({
+      active: true,
+      currency_name: 'usd',
+      locale: 'us',
+      market: 'stocks',
+      name: `${ticker} Synthetic Inc.`,
+      primary_exchange: 'XNAS',
+      ticker,
+      type: 'CS'
+    }));
+  }
+}
+
+// Records of consecutive trading days from a (day, index) position
+function* walkDays(from, to, records, descending = false) {
+  for (let day = descending ? to : from; descending ? day >= from : day <= to; day += descending ? -1 : 1) {
+    if (!isTradingDay(day)) continue;
+    yield [day, records(day)];
+  }
+}
+
+const encodeCursor = value => Buffer.from(JSON.stringify(value)).toString('base64url');
+const decodeCursor = cursor => JSON.parse(Buffer.from(cursor, 'base64url').toString());
+
+export class PolygonSimulator {
+  constructor({
+    market = new SyntheticMarket(),
+    latency = 0,           // ms added to every REST response
+    jitter = 0,            // +/- ms
+    errorRate = 0,         // fraction of REST requests failing
+    errorStatuses = [500, 502, 503],
+    rateLimit = null,      // { capacity, refillPerSecond } per API key; 429 when empty
+    apiKey = null,         // required key, if any
+    wsRate = 1000,         // websocket messages/s per client
+    frameInterval = 5,     // ms between websocket frames
+    framesFile = null,     // replay frames (one JSON array per line) instead of synthetic
+    maxBuffered = 8 * 2 ** 20, // bytes; frames for slower clients are dropped
+    seed = 'polygon-sim'
+  } = {}) {
+    this.market = market;
+    this.latency = latency;
+    this.jitter = jitter;
+    this.errorRate = errorRate;
+    this.errorStatuses = errorStatuses;
+    this.rateLimit = rateLimit;
+    this.apiKey = apiKey;
+    this.wsRate = wsRate;
+    this.frameInterval = frameInterval;
+    this.maxBuffered = maxBuffered;
+    this.random = seededRandom(seed, 'faults');
+    this.buckets = new Map();
+    this.recorded = framesFile ? this._loadFrames(framesFile) : null;
+    this.server = null;
+    this.wss = null;
+    this.timer = null;
+    this.clients = new Set();
+    this.stats = {
+      requests: 0,
+      errors: 0,
+      rateLimited: 0,
+      notFound: 0,
+      records: 0,
+      ws: { connections: 0, frames: 0, messages: 0, dropped: 0 }
+    };
+  }
+
+  async listen(port = 0, host = '127.0.0.1') {
+    this.server = http.createServer((req, res) => {
+      this._handle(req, res).catch(error => {
+        this.stats.errors++;
+        this._send(res, 500, { status: 'ERROR', error: error.message });
+      });
+    });
+    this.wss = new WebSocketServer({ server: this.server, path: '/stocks' });
+    this.wss.on('connection', socket => this._connect(socket));
+    await new Promise(resolve => this.server.listen(port, host, resolve));
+    const address = this.server.address();
+    this.baseUrl = `http://${host}:${address.port}`;
+    this.wsUrl = `ws://${host}:${address.port}/stocks`;
+    this.timer = setInterval(() => this._stream(), this.frameInterval);
+    this.timer.unref?.();
+    return { baseUrl: this.baseUrl, wsUrl: this.wsUrl, port: address.port };
+  }
+
+  async close() {
+    clearInterval(this.timer);
+    for (const client of this.clients) client.socket.terminate();
+    this.clients.clear();
+    await new Promise(resolve => this.wss.close(resolve));
+    await new Promise(resolve => this.server.close(resolve));
+  }
+
+  // REST
+
+  async _handle(req, res) {
+    this.stats.requests++;
+    const url = new URL(req.url, this.baseUrl);
+    const query = Object.fromEntries(url.searchParams);
+    const delay = this.latency + (this.jitter ? (this.random() * 2 - 1) * this.jitter : 0);
+    if (delay > 0) await new Promise(resolve => setTimeout(resolve, delay));
+
+    if (this.apiKey && query.apiKey !== this.apiKey) {
+      return this._send(res, 401, { status: 'ERROR', error: 'Unknown API Key' });
+    }
+    if (this.rateLimit && !this._take(query.apiKey ?? '')) {
+      this.stats.rateLimited++;
+      return this._send(res, 429, {
+        status: 'ERROR',
+        error: "You've exceeded the maximum requests per minute, please wait or upgrade your subscription"
+      });
+    }
+    if (this.errorRate > 0 && this.random() < this.errorRate) {
+      this.stats.errors++;
+      const status = this.errorStatuses[Math.floor(this.random() * this.errorStatuses.length)];
+      return this._send(res, status, { status: 'ERROR', error: 'Injected failure' });
+    }
+
+    // A cursor carries the original query; explicit parameters still win
+    let position = null;
+    let params = query;
+    if (query.cursor) {
+      const cursor = decodeCursor(query.cursor);
+      position = cursor.p;
+      params = { ...cursor.q, ...query };
+    }
+    delete params.cursor;
+    delete params.apiKey;
+
+    const route = url.pathname.split('/').filter(Boolean);
+    const page = this._route(route, params, position);
+    if (!page) {
+      this.stats.notFound++;
+      return this._send(res, 404, { status: 'NOT_FOUND', message: 'Route not found' });
+    }
+    this.stats.records += Array.isArray(page.results) ? page.results.length : 1;
+    const body = { ...page.extra, status: 'OK', request_id: randomUUID().replace(/-/g, ''), results: page.results };
+    if (page.next) body.next_url = `${this.baseUrl}${url.pathname}?cursor=${encodeCursor({ q: params, p: page.next })}`;
+    this._send(res, 200, body);
+  }
+
+  _take(key) {
+    const now = Date.now();
+    let bucket = this.buckets.get(key);
+    if (!bucket) {
+      bucket = new TokenBucket(this.rateLimit, now);
+      this.buckets.set(key, bucket);
+    }
+    if (bucket.waitTime(now) > 0) return false;
+    bucket.available -= 1;
+    return true;
+  }
+
+  _send(res, status, body) {
+    const payload = JSON.stringify(body);
+    res.writeHead(status, { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(payload) });
+    res.end(payload);
+  }
+
+  _route(route, params, position) {
+    const [version, kind, ...rest] = route;
+    if (version === 'v2' && kind === 'aggs' && rest[0] === 'ticker' && rest[2] === 'range') {
+      const [, ticker, , multiplier, timespan, from, to] = rest;
+      return this._aggregates(ticker, Number(multiplier) || 1, timespan, from, to, params, position);
+    }
+    if (version === 'v3' && (kind === 'trades' || kind === 'quotes') && rest.length === 1) {
+      return this._ticks(kind, rest[0], params, position);
+    }
+    if (version === 'v3' && kind === 'reference') {
+      const limit = Math.min(Number(params.limit) || 10, 1000);
+      switch (rest[0]) {
+        case 'tickers': {
+          const tickers = this.market.tickerDetails().filter(t => !params.ticker || t.ticker === params.ticker);
+          return this._slice(tickers, position, Math.min(Number(params.limit) || 100, 1000));
+        }
+        case 'splits':
+          return this._slice(this._reference('splits', 'execution_date', params), position, limit);
+        case 'dividends':
+          return this._slice(this._reference('dividends', 'ex_dividend_date', params), position, limit);
+        default:
+          return null;
+      }
+    }
+    if (version === 'v2' && kind === 'last' && rest.length === 2) {
+      return this._last(rest[0], rest[1]);
+    }
+    if (version === 'v1' && kind === 'marketstatus' && rest[0] === 'upcoming') {
+      return { results: [] };
+    }
+    return null;
+  }
+
+  // Last trade / NBBO of the most recent session, in the v2 single-result shape
+  _last(kind, ticker) {
+    let day = dayOf(Date.now()) - 1;
+    while (!isTradingDay(day)) day--;
+    if (kind === 'trade') {
+      const trades = this.market.trades(ticker, day);
+      const t = trades[trades.length - 1];
+      return {
+        results: { T: ticker, c: t.conditions, i: t.id, p: t.price, q: t.sequence_number, s: t.size, t: t.sip_timestamp, x: t.exchange, y: t.participant_timestamp, z: t.tape }
+      };
+    }
+    if (kind === 'nbbo') {
+      const quotes = this.market.quotes(ticker, day);
+      const q = quotes[quotes.length - 1];
+      return {
+        results: { T: ticker, P: q.ask_price, S: q.ask_size, X: q.ask_exchange, p: q.bid_price, s: q.bid_size, x: q.bid_exchange, i: q.indicators, q: q.sequence_number, t: q.sip_timestamp, y: q.participant_timestamp, z: q.tape }
+      };
+    }
+    return null;
+  }
+
+  _reference(kind, dateField, params) {
+    const tickers = params.ticker ? [params.ticker] : this.market.tickers;
+    return tickers.flatMap(ticker => this.market[kind](ticker)).filter(record => {
+      const date = record[dateField];
+      return (!params[`${dateField}.gte`] || date >= params[`${dateField}.gte`]) &&
+        (!params[`${dateField}.lte`] || date <= params[`${dateField}.lte`]) &&
+        (!params[dateField] || date === params[dateField]);
+    });
+  }
+
+  _slice(items, position, limit) {
+    const offset = position ?? 0;
+    const results = items.slice(offset, offset + limit);
+    return { results, next: offset + limit < items.length ? offset + limit : null };
+  }
+
+  // Day-by-day page: position is [day, index] of the next record
+  _page(fromDay, toDay, records, keep, limit, descending, position) {
+    const results = [];
+    for (const [day, items] of walkDays(fromDay, toDay, records, descending)) {
+      if (position && (descending ? day > position[0] : day < position[0])) continue;
+      const start = position && day === position[0] ? position[1] : 0;
+      for (let n = start; n < items.length; n++) {
+        const item = items[descending ? items.length - 1 - n : n];
+        if (!keep(item)) continue;
+        if (results.length === limit) return { results, next: [day, n] };
+        results.push(item);
+      }
+    }
+    return { results, next: null };
+  }
+
+  _aggregates(ticker, multiplier, timespan, from, to, params, position) {
+    const span = TIMESPANS[timespan];
+    const fromMs = parseTime(from);
+    const toMs = parseTime(to);
+    if (!span || fromMs === null || toMs === null) return null;
+    const stepMs = span >= SESSION_MS ? span : span * multiplier;
+    const endMs = /^\d{4}-\d{2}-\d{2}$/.test(to) ? toMs + DAY_MS - 1 : toMs;
+    const limit = Math.min(Number(params.limit) || 5000, 50000);
+    const descending = params.sort === 'desc';
+    const page = this._page(
+      dayOf(fromMs), dayOf(endMs), day => this.market.bars(ticker, day, stepMs),
+      bar => bar.t >= fromMs && bar.t <= endMs, limit, descending, position
+    );
+    return {
+      ...page,
+      extra: {
+        ticker,
+        adjusted: params.adjusted !== 'false',
+        queryCount: page.results.length,
+        resultsCount: page.results.length
+      }
+    };
+  }
+
+  _ticks(kind, ticker, params, position) {
+    let gte = parseTime(params['timestamp.gte']) ?? (params['timestamp.gt'] ? parseTime(params['timestamp.gt']) + 1e-6 : null);
+    let lte = parseTime(params['timestamp.lte']) ?? (params['timestamp.lt'] ? parseTime(params['timestamp.lt']) - 1e-6 : null);
+    if (params.timestamp) {
+      const at = parseTime(params.timestamp);
+      gte = at;
+      lte = /^\d{4}-\d{2}-\d{2}$/.test(params.timestamp) ? at + DAY_MS - 1e-6 : at;
+    }
+    // Unbounded queries default to the most recent trading day
+    if (gte === null && lte === null) {
+      let day = dayOf(Date.now()) - 1;
+      while (!isTradingDay(day)) day--;
+      gte = day * DAY_MS;
+      lte = gte + DAY_MS - 1e-6;
+    }
+    gte ??= lte - DAY_MS;
+    lte ??= gte + DAY_MS;
+    const limit = Math.min(Number(params.limit) || 1000, 50000);
+    const descending = params.order === 'desc';
+    const gteNs = gte * 1e6;
+    const lteNs = lte * 1e6;
+    return this._page(
+      dayOf(gte), dayOf(lte), day => this.market[kind](ticker, day),
+      record => record.sip_timestamp >= gteNs && record.sip_timestamp <= lteNs, limit, descending, position
+    );
+  }
+
+  // Websocket
+
+  _connect(socket) {
+    const client = { socket, authenticated: false, channels: new Set(), all: new Set(), pairs: null, budget: 0 };
+    this.clients.add(client);
+    this.stats.ws.connections++;
+    const status = (status, message) => socket.send(JSON.stringify([{ ev: 'status', status, message }]));
+    status('connected', 'Connected Successfully');
+
+    socket.on('message', data => {
+      let request;
+      try {
+        request = JSON.parse(data);
+      } catch (error) {
+        return status('error', 'Invalid JSON');
+      }
+      if (request.action === 'auth') {
+        client.authenticated = !this.apiKey || request.params === this.apiKey;
+        return status(client.authenticated ? 'auth_success' : 'auth_failed',
+          client.authenticated ? 'authenticated' : 'authentication failed');
+      }
+      if (!client.authenticated) return status('error', 'not authorized');
+      const params = String(request.params || '').split(',').map(p => p.trim()).filter(Boolean);
+      for (const param of params) {
+        const [ev, sym] = param.split('.');
+        const set = sym === '*' ? client.all : client.channels;
+        const key = sym === '*' ? ev : param;
+        if (request.action === 'subscribe') set.add(key);
+        else if (request.action === 'unsubscribe') set.delete(key);
+      }
+      client.pairs = null;
+      status('success', `${request.action}d to: ${params.join(',')}`);
+    });
+    socket.on('close', () => this.clients.delete(client));
+    socket.on('error', () => this.clients.delete(client));
+  }
+
+  // Empty frames are skipped: replay consumes the send budget by messages
+  _loadFrames(file) {
+    const frames = fs.readFileSync(file, 'utf8').split('\n').filter(Boolean)
+      .map(line => ({ line, messages: JSON.parse(line).length }))
+      .filter(frame => frame.messages > 0);
+    if (frames.length === 0) throw new Error(`No messages in recorded frames ${file}`);
+    return frames;
+  }
+
+  // Subscribed [ev, sym] pairs; `*` expands to the market's tickers
+  _subscriptions(client) {
+    const pairs = [];
+    for (const channel of client.channels) pairs.push(channel.split('.'));
+    for (const ev of client.all) for (const sym of this.market.tickers) pairs.push([ev, sym]);
+    return pairs;
+  }
+
+  _stream() {
+    for (const client of this.clients) {
+      if (!client.authenticated) continue;
+      client.budget += this.wsRate * this.frameInterval / 1000;
+      if (client.budget < 1) continue;
+      if (client.socket.bufferedAmount > this.maxBuffered) {
+        // Polygon disconnects slow consumers; count instead
+        this.stats.ws.dropped += Math.floor(client.budget);
+        client.budget -= Math.floor(client.budget);
+        continue;
+      }
+      const frame = this.recorded ? this._recordedFrame(client) : this._syntheticFrame(client);
+      if (!frame) continue;
+      client.socket.send(frame.payload);
+      this.stats.ws.frames++;
+      this.stats.ws.messages += frame.messages;
+    }
+  }
+
+  _recordedFrame(client) {
+    const lines = [];
+    let messages = 0;
+    client.cursor ??= 0;
+    while (client.budget >= 1) {
+      const frame = this.recorded[client.cursor];
+      client.cursor = (client.cursor + 1) % this.recorded.length;
+      // Send the recorded frame's messages as one batch
+      lines.push(frame.line.slice(1, -1));
+      messages += frame.messages;
+      client.budget -= frame.messages;
+    }
+    return { payload: `[${lines.join(',')}]`, messages };
+  }
+
+  _syntheticFrame(client) {
+    client.pairs ??= this._subscriptions(client);
+    const pairs = client.pairs;
+    if (pairs.length === 0) return null;
+    const count = Math.floor(client.budget);
+    client.budget -= count;
+    client.state ??= new Map();
+    const t = Date.now();
+    const events = new Array(count);
+    for (let i = 0; i < count; i++) {
+      const [ev, sym] = pairs[Math.floor(this.random() * pairs.length)];
+      let state = client.state.get(sym);
+      if (!state) {
+        state = { price: this.market.basePrice(sym, dayOf(t)), q: 0 };
+        client.state.set(sym, state);
+      }
+      state.price = Math.max(0.01, state.price * (1 + 0.0003 * gaussian(this.random)));
+      const p = round(state.price);
+      const q = ++state.q;
+      events[i] = ev === 'T'
+        ? `{"ev":"T","sym":"${sym}","x":4,"i":"${q}","z":3,"p":${p},"s":${100 * (1 + (q % 5))},"c":[0],"t":${t},"q":${q}}`
+        : ev === 'Q'
+          ? `{"ev":"Q","sym":"${sym}","bx":4,"bp":${round(p - 0.01)},"bs":${1 + (q % 9)},"ax":7,"ap":${round(p + 0.01)},"as":${1 + (q % 7)},"c":0,"z":3,"t":${t},"q":${q}}`
+          : `{"ev":"${ev}","sym":"${sym}","v":${100 * (1 + (q % 20))},"av":${q * 100},"op":${p},"vw":${p},"o":${p},"c":${p},"h":${round(p * 1.001)},"l":${round(p * 0.999)},"a":${p},"z":100,"s":${t - 1000},"e":${t}}`;
+    }
+    return { payload: `[${events.join(',')}]`, messages: count };
+  }
+}
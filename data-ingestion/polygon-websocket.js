@@ -3,8 +3,10 @@ import WebSocket from 'websocket';
 import Redis from 'ioredis';
 import dotenv from 'dotenv';
 import debug from 'debug';
-import { OrderBookManager } from './orderbook-manager.js';
 import { TickStore } from './tick-persistence.js';
+import { IngestPipeline } from './ingest-pipeline.js';
+import { tracer } from '../shared/tracing.js';
+import { log as sharedLog } from '../shared/structured-log.js';
 
 const log = debug('polygon:ws');
 dotenv.config();
@@ -20,6 +22,7 @@ class PolygonClient {
   constructor() {
     this.redis = null;
     this.tickStore = null;
+    this.pipeline = null;
     this.activeSocket = null;
     this.initialSymbols = process.env.INITIAL_SYMBOLS?.split(',') || ['AAPL'];
     this.keepAliveInterval = null;
@@ -29,7 +32,14 @@ class PolygonClient {
     if (!this.redis) {
       this.redis = new Redis(process.env.REDIS_URL);
       this.tickStore = new TickStore(this.redis);
+      this.pipeline = new IngestPipeline(this.redis, {
+        tickStore: this.tickStore,
+        flushInterval: Number(process.env.INGEST_FLUSH_MS) || 10
+      });
     }
+    this.pipeline.start();
+    tracer.startExport();
+    sharedLog.start();
   }
 
   connect() {
@@ -51,90 +61,30 @@ class PolygonClient {
   }
 
   createSocket() {
-    const ws = new WebSocket.w3cwebsocket('wss://socket.polygon.io/stocks');
+    const ws = new WebSocket.w3cwebsocket(process.env.POLYGON_WS_URL || 'wss://socket.polygon.io/stocks');
 
     ws.onopen = () => {
-      console.log('✅ WebSocket Connected');
+      sharedLog.info('ws.connection', 'WebSocket connected');
       ws.send(JSON.stringify({"action":"auth","params":process.env.POLYGON_API_KEY}));
        // Delay initial subscription after auth
       setTimeout(() => {
-        client.subscribe(this.initialSymbols);
+        this.subscribe(this.initialSymbols);
       }, 500); // Allow auth to complete
     };
 
     // ... rest of the socket handlers (onclose, onerror, onmessage) ...
     ws.onclose = (event) => {
-      console.log(`❌ Connection closed: ${event.code} ${event.reason}`);
+      sharedLog.warn('ws.connection', 'Connection closed', { code: event.code, reason: event.reason });
     };
   
     ws.onerror = (error) => {
-      console.error('⚠️ WebSocket Error:', error);
+      sharedLog.error('ws.error', 'WebSocket error', { error });
     };
   
-    ws.onmessage = async (message) => {
-      console.log('📨 Message received:', message.data);
+    // Parse and batch only; the pipeline flushes to Redis on its own timer
+    ws.onmessage = (message) => {
       if (typeof message.data === 'string') {
-        const messages = JSON.parse(message.data);
-        for (const msg of messages) {
-          console.log('Processing message type:', msg.ev);
-          
-          // Store raw data in Redis stream
-          await this.redis.xadd('market-data:raw', '*', 'msg', JSON.stringify(msg));
-  
-          // Handle different message types
-          switch (msg.ev) {
-            case 'A': // Aggregate (minute bar)
-              console.log('Processing aggregate:', msg);
-              await updateRollingWindow(msg);
-              // Persist aggregate tick
-              await tickStore.saveTick(msg.sym, {
-                timestamp: msg.e,
-                open: msg.o,
-                high: msg.h,
-                low: msg.l,
-                close: msg.c,
-                volume: msg.v
-              });
-              break;
-              
-            case 'Q': // Quote
-            console.log('Processing quote:', msg);
-            await processQuote(msg);
-            try {
-              const obm = new OrderBookManager(msg.sym, redis);
-              await obm.updateOrderBook(msg); // Pass the entire quote message
-            
-              // Verify update
-              console.log(`📊 Updated order book for ${msg.sym}:`, {
-                bid: msg.bp,
-                ask: msg.ap,
-                timestamp: new Date(msg.t).toISOString()
-              });
-              const bestBid = await obm.getBestBid();
-              console.log(`Updated ${msg.sym} order book. Best bid:`, bestBid);
-            } catch (err) {
-              console.error('Error processing quote:', err);
-            }
-  
-            case 'T': // Trade
-            console.log('Processing trade:', msg);
-            await processTrade(msg);
-            try {
-              await tickStore.saveTick(msg.sym, {
-                timestamp: msg.t,
-                price: msg.p,
-                size: msg.s,
-                conditions: msg.c,
-                vwap: msg.vw
-              });
-            } catch (err) {
-              console.error('Error processing trade:', err);
-            }
-  
-              // Handle other message types if needed
-              break;
-          }
-        }
+        this.pipeline.push(message.data);
       }
     };
 
@@ -143,7 +93,7 @@ class PolygonClient {
 
   subscribe(symbols) {
     if (!this.activeSocket) {
-      console.log('⚠️ No active socket - connect first');
+      sharedLog.warn('ws.subscribe', 'No active socket - connect first');
       return;
     }
 
@@ -156,50 +106,25 @@ class PolygonClient {
       params: subscriptions.join(',')
     }));
     
-    console.log(`✅ Subscribed to: ${subscriptions.join(', ')}`);
+    sharedLog.info('ws.subscribe', 'Subscribed', { subscriptions });
+  }
+
+  getMetrics() {
+    return this.pipeline?.getMetrics();
   }
 
   async shutdown() {
     this.disconnect();
+    if (this.pipeline) {
+      await this.pipeline.stop();
+    }
+    await tracer.stopExport();
+    await sharedLog.stop();
     if (this.redis) {
       await this.redis.quit();
     }
   }
 }
-async function updateRollingWindow(agg) {
-  try {
-    const key = `rollingWindow:${agg.sym}`;
-    await redis.lpush(key, JSON.stringify(agg));
-    await redis.ltrim(key, 0, 59);
-    console.log(`Updated rolling window for ${agg.sym}`);
-    
-    // Verify storage
-    const length = await redis.llen(key);
-    console.log(`Current window size for ${agg.sym}: ${length}`);
-  } catch (err) {
-    console.error('Error updating rolling window:', err);
-  }
-}
-
-async function processQuote(quote) {
-  // Store quote data
-  const key = `quote:${quote.sym}`;
-  await redis.hset(key, {
-    bid: quote.bp,
-    ask: quote.ap,
-    bidSize: quote.bs,
-    askSize: quote.as,
-    timestamp: quote.t
-  });
-  console.log(`Updated quote for ${quote.sym}`);
-}
-
-async function processTrade(trade) {
-  // Store trade data
-  await redis.xadd(`trades:${trade.sym}`, '*', 'trade', JSON.stringify(trade));
-  console.log(`Stored trade for ${trade.sym}`);
-}
-
 // Export singleton instance but don't auto-connect
 export const client = new PolygonClient();
 
@@ -1,23 +1,22 @@
 // data-ingestion/rolling-window-manager.js
 import Redis from 'ioredis';
 // import { technicalIndicators } from 'technicalindicators';
-import { python } from 'python-bridge';
-
-const py = python();
+import { BarWindow, toBar } from '../feature-engine/bar-window.js';
+import { featureBridge } from '../shared/feature-bridge.js';
 
 const redis = new Redis(process.env.REDIS_URL);
 const WINDOW_SIZE = 60; // 60-minute window
 
 export class RollingWindowManager {
-  constructor(symbol, redisClient) {
+  constructor(symbol, redisClient, { bridge = featureBridge } = {}) {
     this.symbol = symbol;
     this.redis = redisClient;
     this.key = `rollingWindow:${symbol}`;
-    // Initialize Python corporate actions once
-    py.ex`
-      from corporate_actions import corporate_actions_manager
-      ca_manager = corporate_actions_manager
-    `;
+    // In-process window is the source of truth; Redis holds the recovery snapshot
+    this.bars = new BarWindow({ capacity: WINDOW_SIZE });
+    // Corporate-action factors come from the shared Python bridge, cached
+    // until the next action, so most bars never leave the process
+    this.bridge = bridge;
   }
 
   async updateWindow(timestamp, data) {
@@ -25,38 +24,49 @@ export class RollingWindowManager {
       timestamp: typeof timestamp === 'number' ? timestamp : Date.now(),
       data
     };
-    
-      // Apply corporate actions
-      this.window = await this._applyCorporateActions();
-
-    await redis.zadd(
-      this.key,
-      entry.timestamp,
-      JSON.stringify(entry)
-    );
-    
-    // Trim old data
+
+    this.bars.push(await this._adjusted(toBar(data), entry.timestamp));
+
+    // Snapshot for recovery: one pipelined round-trip per bar
     const cutoff = Date.now() - (WINDOW_SIZE * 60000);
-    await redis.zremrangebyscore(this.key, '-inf', cutoff);
+    await redis.pipeline()
+      .zadd(this.key, entry.timestamp, JSON.stringify(entry))
+      .zremrangebyscore(this.key, '-inf', cutoff)
+      .exec();
   }
 
-  async getWindow() {
+  // Rebuild the in-process window from the Redis snapshot (startup/recovery)
+  async restore() {
     const data = await redis.zrange(this.key, 0, -1);
-    return data.map(JSON.parse).sort((a, b) => a.timestamp - b.timestamp);
+    this.bars.reset();
+    const entries = data.map(JSON.parse).sort((a, b) => a.timestamp - b.timestamp);
+    // Factor requests for the whole snapshot share one bridge frame
+    const bars = await Promise.all(entries.map(entry => this._adjusted(toBar(entry.data), entry.timestamp)));
+    bars.forEach(bar => this.bars.push(bar));
+    return this.bars.length;
+  }
+
+  async getWindow() {
+    return this.bars.toArray();
   }
 
   async getCurrentBar() {
-    const window = await this.getWindow();
-    return window[window.length - 1];
+    return this.bars.latest();
   }
 
-  async _applyCorporateActions() {
-    return py`
-      ca_manager.apply_adjustments(
-        ${this.window.to_df()},  # Assume DataFrame-like structure
-        ${this.symbol}
-      ).to_dict('records')
-    `;
+  // Raw bars are snapshotted; adjustments are applied on the way in
+  async _adjusted(bar, timestamp) {
+    const factors = this.bridge.cachedFactors(this.symbol, timestamp)
+      ?? await this.bridge.adjustmentFactors(this.symbol, timestamp);
+    const { priceScale, priceOffset, volumeScale } = factors;
+    return {
+      timestamp,
+      open: bar.open * priceScale + priceOffset,
+      high: bar.high * priceScale + priceOffset,
+      low: bar.low * priceScale + priceOffset,
+      close: bar.close * priceScale + priceOffset,
+      volume: bar.volume * volumeScale,
+      vwap: bar.vwap * priceScale + priceOffset
+    };
   }
-  
-}
\ No newline at end of file
+}
@@ -0,0 +1,247 @@
+"""
+Structured Logging
+
+Logging setup for the fetch and ingest entry points, built on the stdlib
+logging.handlers queue pair so hot loops never block on file or console I/O:
+
+- Callers log through a QueueHandler; formatting and writing happen on the
+  QueueListener thread. The queue is bounded and drops (and counts) records
+  rather than stalling the caller when the writer falls behind
+- RateLimitFilter runs on the caller side, before anything is queued: per
+  category (record.category, else logger name + message template) it keeps
+  1 in `sample_every` DEBUG/INFO records and caps each category with a token
+  bucket. WARNING and above are never sampled and have their own, larger
+  bucket; a passing record carries the number suppressed since the last one
+- Counters aggregate per-event counts (pages, records, retries) in the hot
+  loop and emit them as a single record per interval, so volume does not
+  scale with message rate
+- JsonFormatter writes one JSON object per line with `extra=` fields kept
+
+Usage:
+    configure(handlers=[logging.StreamHandler()])
+    counters.increment('fetch.pages')
+    logging.info('Fetched %d trades for %s', n, ticker, extra={'ticker': ticker})
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# LogRecord attributes that are not user-supplied `extra` fields
+RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+STATS_LOGGER = 'stats'
+MAX_CATEGORIES = 4096
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'updated', 'seen', 'suppressed')
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.seen = 0
+        self.suppressed = 0
+
+
+class RateLimitFilter(logging.Filter):
+    """Per-category sampling and token-bucket rate limiting"""
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        sample_every: int = 1,
+        error_rate: float = 100.0,
+        error_burst: int = 200,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__()
+        self.rate, self.burst = rate, burst
+        self.error_rate, self.error_burst = error_rate, error_burst
+        self.sample_every = max(1, sample_every)
+        self.clock = clock
+        self.buckets: Dict[str, _Bucket] = {}
+        self.lock = threading.Lock()
+
+    def category(self, record: logging.LogRecord) -> str:
+        category = getattr(record, 'category', None)
+        if category:
+            return category
+        if len(self.buckets) >= MAX_CATEGORIES:  # f-string messages: one category per logger
+            return f'{record.name}:{record.levelname}'
+        return f'{record.name}:{record.msg}'
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.name == STATS_LOGGER:
+            return True
+        important = record.levelno >= logging.WARNING
+        rate, burst = (self.error_rate, self.error_burst) if important else (self.rate, self.burst)
+        now = self.clock()
+        with self.lock:
+            key = self.category(record)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = _Bucket(burst, now)
+            else:
+                bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+            bucket.seen += 1
+            sampled_out = not important and (bucket.seen - 1) % self.sample_every
+            if sampled_out or bucket.tokens < 1:
+                bucket.suppressed += 1
+                return False
+            bucket.tokens -= 1
+            if bucket.suppressed:
+                record.suppressed = bucket.suppressed
+                bucket.suppressed = 0
+        return True
+
+    def drain(self) -> Dict[str, int]:
+        """Suppressed counts not yet reported on a passing record"""
+        with self.lock:
+            pending = {key: bucket.suppressed for key, bucket in self.buckets.items() if bucket.suppressed}
+            for key in pending:
+                self.buckets[key].suppressed = 0
+        return pending
+
+
+class Counters:
+    """Hot-loop event counts, logged as one record at most once per interval"""
+
+    def __init__(self, interval: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.counts: Dict[str, float] = {}
+        self.totals: Dict[str, float] = {}
+        self.limiter: Optional[RateLimitFilter] = None
+        self.dropped: Callable[[], int] = lambda: 0
+        self.logger = logging.getLogger(STATS_LOGGER)
+        self.lock = threading.Lock()
+        self.flushed = clock()
+
+    def increment(self, name: str, value: float = 1):
+        now = self.clock()
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+            due = now - self.flushed >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, {}
+            self.flushed = self.clock()
+            for name, value in counts.items():
+                self.totals[name] = self.totals.get(name, 0) + value
+        suppressed = self.limiter.drain() if self.limiter else {}
+        dropped = self.dropped()
+        if counts or suppressed or dropped:
+            extra = {'counters': counts}
+            if suppressed:
+                extra['suppressed'] = suppressed
+            if dropped:
+                extra['dropped'] = dropped
+            self.logger.info('counters', extra=extra)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records on a full queue instead of blocking"""
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same thread-safe snapshot as the stdlib, minus formatting: the
+        # listener formats, and exc_info survives for JsonFormatter
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+counters = Counters()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure(
+    handlers: List[logging.Handler],
+    level: int = logging.INFO,
+    rate: float = 10.0,
+    sample_every: int = 1,
+    interval: float = 1.0,
+    max_queue: int = 10000,
+    formatter: Optional[logging.Formatter] = None
+) -> logging.handlers.QueueListener:
+    """Route the root logger through a rate-limited queue to `handlers`"""
+    global _listener
+    shutdown()
+    formatter = formatter or JsonFormatter()
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.Queue(max_queue)
+    queue_handler = DroppingQueueHandler(records)
+    limiter = RateLimitFilter(rate=rate, burst=max(1, int(rate * 2)), sample_every=sample_every)
+    queue_handler.addFilter(limiter)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    counters.interval = interval
+    counters.limiter = limiter
+    counters.dropped = queue_handler.take_dropped
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown():
+    """Report outstanding counters and drain the queue; registered at exit"""
+    global _listener
+    if _listener is None:
+        return
+    counters.flush()
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.flush()
+    _listener = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,83 @@
+// data-ingestion/tick-codec.js
+// Fixed-width binary tick records (32 bytes, little-endian):
+//   0  float64  timestamp (ms since epoch)
+//   8  float64  price
+//  16  uint32   size
+//  20  uint32   reserved
+//  24  uint32   condition bitmask, codes 0-31
+//  28  uint32   condition bitmask, codes 32-63
+export const TICK_RECORD_SIZE = 32;
+
+export function conditionsToMask(conditions) {
+  let lo = 0;
+  let hi = 0;
+  if (Array.isArray(conditions)) {
+    for (const code of conditions) {
+      // Polygon SIP condition codes are small integers; anything else is dropped
+      if (!Number.isInteger(code) || code < 0 || code > 63) continue;
+      if (code < 32) lo |= 1 << code;
+      else hi |= 1 << (code - 32);
+    }
+  }
+  return [lo >>> 0, hi >>> 0];
+}
+
+export function maskToConditions(lo, hi) {
+  const codes = [];
+  for (let bit = 0; bit < 32; bit++) if (lo & (1 << bit)) codes.push(bit);
+  for (let bit = 0; bit < 32; bit++) if (hi & (1 << bit)) codes.push(bit + 32);
+  return codes;
+}
+
+// Write one tick at byte `offset` of `buffer`; returns the next offset
+export function encodeTick(buffer, offset, { timestamp, price, size, conditions }) {
+  const [lo, hi] = conditionsToMask(conditions);
+  buffer.writeDoubleLE(timestamp, offset);
+  buffer.writeDoubleLE(price ?? 0, offset + 8);
+  buffer.writeUInt32LE(Math.max(0, Math.min(size ?? 0, 0xffffffff)) >>> 0, offset + 16);
+  buffer.writeUInt32LE(0, offset + 20);
+  buffer.writeUInt32LE(lo, offset + 24);
+  buffer.writeUInt32LE(hi, offset + 28);
+  return offset + TICK_RECORD_SIZE;
+}
+
+// Columnar decode of the records whose timestamp is in [start, end]
+export function decodeTicks(buffer, start = -Infinity, end = Infinity) {
+  const count = Math.floor(buffer.length / TICK_RECORD_SIZE);
+  const timestamp = new Float64Array(count);
+  const price = new Float64Array(count);
+  const size = new Uint32Array(count);
+  const conditionsLo = new Uint32Array(count);
+  const conditionsHi = new Uint32Array(count);
+
+  let n = 0;
+  for (let offset = 0; offset + TICK_RECORD_SIZE <= buffer.length; offset += TICK_RECORD_SIZE) {
+    const ts = buffer.readDoubleLE(offset);
+    if (ts < start || ts > end) continue;
+    timestamp[n] = ts;
+    price[n] = buffer.readDoubleLE(offset + 8);
+    size[n] = buffer.readUInt32LE(offset + 16);
+    conditionsLo[n] = buffer.readUInt32LE(offset + 24);
+    conditionsHi[n] = buffer.readUInt32LE(offset + 28);
+    n++;
+  }
+
+  return {
+    length: n,
+    timestamp: timestamp.subarray(0, n),
+    price: price.subarray(0, n),
+    size: size.subarray(0, n),
+    conditionsLo: conditionsLo.subarray(0, n),
+    conditionsHi: conditionsHi.subarray(0, n)
+  };
+}
+
+// Row view of decoded columns, for callers that want tick objects
+export function columnsToTicks(columns) {
+  return Array.from({ length: columns.length }, (_, i) => ({
+    timestamp: columns.timestamp[i],
+    price: columns.price[i],
+    size: columns.size[i],
+    conditions: maskToConditions(columns.conditionsLo[i], columns.conditionsHi[i])
+  }));
+}
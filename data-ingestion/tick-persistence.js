@@ -1,80 +1,144 @@
 // data-ingestion/tick-persistence.js
-import Redis from 'ioredis';
-import { format } from 'date-fns';
+import { TICK_RECORD_SIZE, encodeTick, decodeTicks, columnsToTicks } from './tick-codec.js';
+import { log } from '../shared/structured-log.js';
+
+const TICK_TTL = 604800; // 7 days
+const MINUTE = 60000;
+const INITIAL_CHUNK_TICKS = 256;
+
+// Ticks are appended as fixed-width binary records to one blob per symbol
+// per minute: `ticks:{symbol}:{epochMinute}`.
+export function tickKey(symbol, timestamp) {
+  return `ticks:${symbol}:${Math.floor(timestamp / MINUTE)}`;
+}
 
 export class TickStore {
   constructor(redisClient) {
     this.redis = redisClient;
-    this.batch = this.redis.pipeline();
+    this.pending = new Map(); // key -> { buffer, offset }
     this.batchSize = 0;
     this.MAX_BATCH_SIZE = 100; // Adjust based on performance testing
+    this.ttlKeys = new Set();  // keys whose TTL has already been set
   }
 
   async saveTick(symbol, tickData) {
     try {
-      const dateKey = format(new Date(tickData.timestamp), 'yyyyMMdd');
-      const key = `ticks:${symbol}:${dateKey}`;
-      
-      // Add to sorted set with timestamp as score
-      this.batch.zadd(
-        key,
-        tickData.timestamp,
-        JSON.stringify({
-          ...tickData,
-          symbol,
-          processedAt: Date.now()
-        })
-      );
-      
-      // Set expiration (7 days)
-      this.batch.expire(key, 604800);
-      
-      this.batchSize++;
-      
+      this.bufferTick(symbol, tickData);
       if(this.batchSize >= this.MAX_BATCH_SIZE) {
         await this.flush();
       }
     } catch (err) {
-      console.error('Error saving tick:', err);
+      log.error('ticks.save', 'Error saving tick', { symbol, error: err });
       throw err;
     }
   }
 
+  // Encode into the pending chunk without touching Redis
+  bufferTick(symbol, tickData) {
+    const key = tickKey(symbol, tickData.timestamp);
+    let chunk = this.pending.get(key);
+    if (!chunk) {
+      chunk = { buffer: Buffer.allocUnsafe(INITIAL_CHUNK_TICKS * TICK_RECORD_SIZE), offset: 0 };
+      this.pending.set(key, chunk);
+    } else if (chunk.offset + TICK_RECORD_SIZE > chunk.buffer.length) {
+      const grown = Buffer.allocUnsafe(chunk.buffer.length * 2);
+      chunk.buffer.copy(grown, 0, 0, chunk.offset);
+      chunk.buffer = grown;
+    }
+
+    // Aggregates are stored as close/volume records
+    chunk.offset = encodeTick(chunk.buffer, chunk.offset, {
+      timestamp: tickData.timestamp,
+      price: tickData.price ?? tickData.close,
+      size: tickData.size ?? tickData.volume,
+      conditions: tickData.conditions
+    });
+    this.batchSize++;
+  }
+
   async flush() {
     if(this.batchSize > 0) {
+      const batch = this.redis.pipeline();
+      const { commit, rollback } = this.flushInto(batch);
       try {
-        await this.batch.exec();
-        this.batch = this.redis.pipeline();
-        this.batchSize = 0;
-        console.log('Successfully flushed tick batch');
+        await batch.exec();
+        commit();
       } catch (err) {
-        console.error('Error flushing tick batch:', err);
+        rollback();
+        log.error('ticks.flush', 'Error flushing tick batch', { error: err });
         throw err;
       }
     }
   }
 
-  async getTicks(symbol, startTime, endTime) {
-    const dateKey = format(new Date(startTime), 'yyyyMMdd');
-    const key = `ticks:${symbol}:${dateKey}`;
-    
+  // Queue pending appends on a caller-owned pipeline. One APPEND per key per
+  // flush; EXPIRE only the first time a key is seen. Call `commit` once the
+  // pipeline has executed successfully, or `rollback` if it failed, which
+  // puts the chunks back ahead of anything buffered since.
+  flushInto(batch) {
+    const pending = this.pending;
+    this.pending = new Map();
+    this.batchSize = 0;
+
+    const newKeys = [];
+    for (const [key, { buffer, offset }] of pending) {
+      batch.append(key, buffer.subarray(0, offset));
+      if (!this.ttlKeys.has(key)) {
+        batch.expire(key, TICK_TTL);
+        newKeys.push(key);
+      }
+    }
+
+    return {
+      commit: () => {
+        newKeys.forEach(key => this.ttlKeys.add(key));
+        this._pruneTtlKeys();
+      },
+      rollback: () => {
+        for (const [key, chunk] of pending) {
+          const later = this.pending.get(key);
+          if (later) {
+            const buffer = Buffer.concat([chunk.buffer.subarray(0, chunk.offset), later.buffer.subarray(0, later.offset)]);
+            this.pending.set(key, { buffer, offset: buffer.length });
+          } else {
+            this.pending.set(key, chunk);
+          }
+          this.batchSize += chunk.offset / TICK_RECORD_SIZE;
+        }
+      }
+    };
+  }
+
+  // Columnar typed arrays for [startTime, endTime]; no JSON involved
+  async getTickColumns(symbol, startTime, endTime) {
+    const keys = [];
+    for (let minute = Math.floor(startTime / MINUTE); minute <= Math.floor(endTime / MINUTE); minute++) {
+      keys.push(`ticks:${symbol}:${minute}`);
+    }
+
     try {
-      const data = await this.redis.zrangebyscore(
-        key,
-        startTime,
-        endTime,
-        'WITHSCORES'
-      );
-      
-      return data.map(([json, score]) => ({
-        ...JSON.parse(json),
-        timestamp: Number(score)
-      }));
+      const blobs = keys.length > 0 ? await this.redis.mgetBuffer(...keys) : [];
+      const data = Buffer.concat(blobs.filter(Boolean));
+      return decodeTicks(data, startTime, endTime);
     } catch (err) {
-      console.error('Error retrieving ticks:', err);
+      log.error('ticks.read', 'Error retrieving ticks', { symbol, error: err });
       throw err;
     }
   }
+
+  async getTicks(symbol, startTime, endTime) {
+    const columns = await this.getTickColumns(symbol, startTime, endTime);
+    return columnsToTicks(columns).map(tick => ({ ...tick, symbol }));
+  }
+
+  // Keys older than a few minutes no longer receive appends
+  _pruneTtlKeys() {
+    if (this.ttlKeys.size < 1000) return;
+    const cutoff = Math.floor(Date.now() / MINUTE) - 5;
+    for (const key of this.ttlKeys) {
+      if (Number(key.slice(key.lastIndexOf(':') + 1)) < cutoff) this.ttlKeys.delete(key);
+    }
+  }
 }
 
 // Process cleanup handling
@@ -86,10 +150,10 @@ const cleanupHandler = async (store) => {
 
 export function initializeTickPersistence(redisClient) {
   const store = new TickStore(redisClient);
-  
+
   process.on('SIGINT', () => cleanupHandler(store));
   process.on('SIGTERM', () => cleanupHandler(store));
   process.on('beforeExit', () => store.flush());
 
   return store;
-}
\ No newline at end of file
+}
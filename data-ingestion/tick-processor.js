@@ -1,56 +1,29 @@
 // data-ingestion/tick-processor.js
-import Redis from 'ioredis';
-import { RollingWindowManager } from './rolling-window-manager.js';
-
-const redis = new Redis(process.env.REDIS_URL);
+// Per-symbol view over the shared order-flow tracker: each tick is classified
+// once on arrival and imbalance reads are O(1) over the last N trades.
+import { orderFlow } from './order-flow.js';
 
 export class TickProcessor {
-  constructor(symbol) {
+  constructor(symbol, tracker = orderFlow) {
     this.symbol = symbol;
-    this.windowManager = new RollingWindowManager(`${symbol}:ticks`);
+    this.tracker = tracker;
     this.tickWindowSize = 1000; // Last 1000 ticks
   }
 
-  async processTick(tick) {
-    // Use rolling window manager for tick storage
-    await this.windowManager.updateWindow(tick.timestamp, tick);
-    
-    // Trim using count-based window (different from time-based)
-    const currentCount = await this.windowManager.getCount();
-    if(currentCount > this.tickWindowSize) {
-      await this.windowManager.trimWindow(currentCount - this.tickWindowSize);
-    }
+  // Returns the trade sign (1 buy, -1 sell, 0 unknown)
+  processTick(tick) {
+    return this.tracker.applyTrade({ sym: this.symbol, p: tick.price, s: tick.size, t: tick.timestamp });
   }
 
-  async getOrderFlowImbalance() {
-    const ticks = await this.windowManager.getWindow();
-    if(ticks.length === 0) return 0;
-    
-    const buyTicks = ticks.filter(t => this._isBuyTick(t)).length;
-    const sellTicks = ticks.length - buyTicks;
-    
-    return (buyTicks - sellTicks) / ticks.length;
+  getOrderFlowImbalance(n = this.tickWindowSize) {
+    return this.tracker.imbalance(this.symbol, n);
   }
 
-  _isBuyTick(tick) {
-    return tick.conditions?.includes('B') || tick.price > tick.vwap;
+  getVolumeImbalance(n = this.tickWindowSize) {
+    return this.tracker.volumeImbalance(this.symbol, n);
   }
 
-  async getOrderFlowImbalance() {
-    const ticks = await redis.zrange(`ticks:${this.symbol}`, -100, -1);
-    const parsed = ticks.map(JSON.parse);
-    
-    const buyTicks = parsed.filter(t => t.size > 0).length;
-    const sellTicks = parsed.length - buyTicks;
-    
-    return (buyTicks - sellTicks) / parsed.length;
+  getCount() {
+    return Math.min(this.tracker.count(this.symbol), this.tickWindowSize);
   }
-}  
-// Add count-based trimming to RollingWindowManager
-RollingWindowManager.prototype.trimWindow = async function(count) {
-    await redis.zremrangebyrank(this.key, 0, count - 1);
-  };
-  
-  RollingWindowManager.prototype.getCount = async function() {
-    return redis.zcard(this.key);
-  }; 
\ No newline at end of file
+}
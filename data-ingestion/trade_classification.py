@@ -0,0 +1,134 @@
+"""
+Trade Classification
+
+Offline counterpart of data-ingestion/order-flow.js, so order-flow features
+used in training match what the live feature engine computes.
+
+- Quote rule: a trade above the prevailing NBBO midpoint is a buy, below is a
+  sell (quotes with bid <= 0 or ask < bid are ignored)
+- Tick rule at the midpoint or without a quote: the sign of the most recent
+  non-zero price change for the symbol (0 until the first change)
+- The prevailing quote is the latest one at or before the trade timestamp,
+  matching the live path where a quote earlier in the stream is already applied
+- Imbalances are over the last `window` trades: (buys - sells) / trades and
+  (buy volume - sell volume) / classified volume
+"""
+
+import argparse
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+BUY, SELL, UNKNOWN = 1, -1, 0
+DEFAULT_WINDOW = 1000
+
+
+def _timestamp_column(frame: pd.DataFrame) -> str:
+    """historical_data_fetcher keeps sip_timestamp for trades, timestamp for quotes"""
+    return 'timestamp' if 'timestamp' in frame else 'sip_timestamp'
+
+
+def tick_rule(prices: np.ndarray, groups: Optional[np.ndarray] = None) -> np.ndarray:
+    """Sign of the most recent non-zero price change, per group"""
+    prices = pd.Series(np.asarray(prices, dtype=float))
+    keys = pd.Series(np.zeros(len(prices)) if groups is None else np.asarray(groups))
+    change = np.sign(prices.groupby(keys).diff())
+    signs = change.replace(0, np.nan).groupby(keys).ffill()
+    return signs.fillna(UNKNOWN).to_numpy(dtype=np.int8)
+
+
+def quote_rule(prices: np.ndarray, bids: np.ndarray, asks: np.ndarray) -> np.ndarray:
+    """+1 above the midpoint, -1 below, 0 at the midpoint or without a valid quote"""
+    prices, bids, asks = (np.asarray(a, dtype=float) for a in (prices, bids, asks))
+    valid = (bids > 0) & (asks >= bids)
+    with np.errstate(invalid='ignore'):
+        sign = np.sign(prices - (bids + asks) / 2)
+    return np.where(valid, np.nan_to_num(sign), UNKNOWN).astype(np.int8)
+
+
+def classify_trades(trades: pd.DataFrame, quotes: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """
+    Lee-Ready side per trade, in the order of `trades`.
+    trades: timestamp|sip_timestamp, price, [symbol]
+    quotes: timestamp|sip_timestamp, bid_price, ask_price, [symbol]
+    """
+    ts = _timestamp_column(trades)
+    by = 'symbol' if 'symbol' in trades and quotes is not None and 'symbol' in quotes else None
+    ordered = trades.reset_index(drop=True).rename_axis('_row').reset_index()
+    ordered = ordered.sort_values(ts, kind='stable')
+
+    if quotes is not None and len(quotes):
+        qts = _timestamp_column(quotes)
+        columns = [qts, 'bid_price', 'ask_price'] + ([by] if by else [])
+        book = quotes[columns].rename(columns={qts: ts}).sort_values(ts, kind='stable')
+        ordered = pd.merge_asof(ordered, book, on=ts, by=by, direction='backward', allow_exact_matches=True)
+        quoted = quote_rule(ordered['price'], ordered['bid_price'].fillna(0), ordered['ask_price'].fillna(0))
+    else:
+        quoted = np.zeros(len(ordered), dtype=np.int8)
+
+    groups = ordered['symbol'].to_numpy() if 'symbol' in ordered else None
+    ticked = tick_rule(ordered['price'].to_numpy(), groups)
+
+    sides = np.empty(len(ordered), dtype=np.int8)
+    sides[ordered['_row'].to_numpy()] = np.where(quoted != UNKNOWN, quoted, ticked)
+    return sides
+
+
+def order_flow_imbalance(
+    sides: np.ndarray,
+    sizes: Optional[np.ndarray] = None,
+    window: int = DEFAULT_WINDOW,
+    groups: Optional[np.ndarray] = None
+) -> pd.DataFrame:
+    """Trailing count and volume imbalance after each trade (OrderFlowWindow semantics)"""
+    sides = pd.Series(np.asarray(sides, dtype=float))
+    sizes = pd.Series(np.ones(len(sides)) if sizes is None else np.asarray(sizes, dtype=float))
+    keys = pd.Series(np.zeros(len(sides)) if groups is None else np.asarray(groups))
+
+    def rolling_sum(values: pd.Series) -> np.ndarray:
+        return values.groupby(keys).rolling(window, min_periods=1).sum().reset_index(level=0, drop=True).sort_index().to_numpy()
+
+    def rolling_count(values: pd.Series) -> np.ndarray:
+        return values.groupby(keys).rolling(window, min_periods=1).count().reset_index(level=0, drop=True).sort_index().to_numpy()
+
+    signed_volume = rolling_sum(sides * sizes)
+    classified_volume = rolling_sum(sides.abs() * sizes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_imbalance = np.where(classified_volume > 0, signed_volume / classified_volume, 0.0)
+    return pd.DataFrame({
+        'order_flow_imbalance': rolling_sum(sides) / rolling_count(sides),
+        'volume_imbalance': volume_imbalance,
+    })
+
+
+def add_order_flow_features(
+    trades: pd.DataFrame,
+    quotes: Optional[pd.DataFrame] = None,
+    window: int = DEFAULT_WINDOW
+) -> pd.DataFrame:
+    """trades with side, order_flow_imbalance and volume_imbalance columns"""
+    result = trades.reset_index(drop=True).copy()
+    result['side'] = classify_trades(result, quotes)
+    ts = _timestamp_column(result)
+    ordered = result.sort_values(ts, kind='stable')
+    groups = ordered['symbol'].to_numpy() if 'symbol' in ordered else None
+    features = order_flow_imbalance(ordered['side'].to_numpy(), ordered['size'].to_numpy(), window, groups)
+    features.index = ordered.index
+    return result.join(features)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Classify trades and compute order-flow imbalance')
+    parser.add_argument('trades', help='trades parquet (historical_data_fetcher output)')
+    parser.add_argument('--quotes', help='quotes parquet for the same day')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--out', required=True, help='output parquet')
+    args = parser.parse_args()
+
+    quotes = pd.read_parquet(args.quotes) if args.quotes else None
+    add_order_flow_features(pd.read_parquet(args.trades), quotes, args.window).to_parquet(args.out)
+
+
+if __name__ == '__main__':
+    main()
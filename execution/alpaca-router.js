@@ -2,7 +2,8 @@
 import { TradingEngine } from './trading-engine.js';
 import config from '../shared/config.js';
 
-// Initialize shared instance
+// Initialize shared instance; order updates are started by the execution
+// entry point (scripts/start-execution.js), not on import
 export const tradingEngine = new TradingEngine();
 
 // Modified executeOrder function
@@ -25,8 +26,8 @@ export async function executeOrder(signal) {
       throw new Error('Order validation failed');
     }
 
-    // Execute through trading engine
-    const response = await tradingEngine.placeOrder(order);
+    // Execute through trading engine; the trace rides along to placeOrder
+    const response = await tradingEngine.placeOrder({ ...order, trace: signal.trace });
     return response;
   } catch (error) {
     console.error('Order Error:', error.response?.data || error.message);
@@ -0,0 +1,122 @@
+// execution/market-session.js
+// Locally cached NYSE session calendar. Status is computed from the clock
+// against today's cached open/close times; holidays and early closes come from
+// Polygon's upcoming-status endpoint, refreshed in the background.
+import axios from 'axios';
+
+const POLYGON_API = process.env.POLYGON_API_KEY;
+const POLYGON_BASE_URL = process.env.POLYGON_BASE_URL || 'https://api.polygon.io';
+const DAY = 86400000;
+const OPEN_OFFSET = (9 * 60 + 30) * 60000; // 09:30 ET
+const CLOSE_OFFSET = 16 * 3600000;         // 16:00 ET
+const REFRESH_INTERVAL = 6 * 3600000;
+
+const etFormatter = new Intl.DateTimeFormat('en-US', {
+  timeZone: 'America/New_York',
+  timeZoneName: 'shortOffset',
+  weekday: 'short',
+  year: 'numeric',
+  month: '2-digit',
+  day: '2-digit'
+});
+
+export async function fetchPolygonCalendar() {
+  const { data } = await axios.get(`${POLYGON_BASE_URL}/v1/marketstatus/upcoming`, {
+    params: { apiKey: POLYGON_API }
+  });
+  return data;
+}
+
+export class MarketSession {
+  constructor({ fetchCalendar = fetchPolygonCalendar, refreshInterval = REFRESH_INTERVAL } = {}) {
+    this.fetchCalendar = fetchCalendar;
+    this.refreshInterval = refreshInterval;
+    this.holidays = new Map(); // 'YYYY-MM-DD' -> { status, close }
+    this.refreshedAt = -Infinity;
+    this.refreshing = null;
+    this.session = null;       // cached { dayStart, dayEnd, open, close }
+  }
+
+  // Synchronous; kicks off a background calendar refresh when stale
+  status(now = Date.now()) {
+    if (now - this.refreshedAt > this.refreshInterval && !this.refreshing) this.refresh();
+    const session = this.sessionFor(now);
+    return session.open !== null && now >= session.open && now < session.close ? 'open' : 'closed';
+  }
+
+  // Next open/close boundary after `now`, or null when the day has none left
+  nextChange(now = Date.now()) {
+    const { open, close } = this.sessionFor(now);
+    if (open === null || now >= close) return null;
+    return now < open ? open : close;
+  }
+
+  // First session open after `now`, looking ahead over weekends and holidays
+  nextOpen(now = Date.now()) {
+    let t = now;
+    for (let day = 0; day < 10; day++) {
+      const { open, dayStart } = this.sessionFor(t);
+      if (open !== null && open > now) return open;
+      t = dayStart + DAY + DAY / 2; // midday of the next ET day, DST or not
+    }
+    return null;
+  }
+
+  sessionFor(now) {
+    const cached = this.session;
+    if (cached && now >= cached.dayStart && now < cached.dayEnd) return cached;
+
+    const parts = {};
+    for (const { type, value } of etFormatter.formatToParts(new Date(now))) parts[type] = value;
+    const offset = parseOffset(parts.timeZoneName);
+    const date = `${parts.year}-${parts.month}-${parts.day}`;
+    const dayStart = Date.UTC(+parts.year, parts.month - 1, +parts.day) - offset;
+    const holiday = this.holidays.get(date);
+    const closed = parts.weekday === 'Sat' || parts.weekday === 'Sun' || holiday?.status === 'closed';
+
+    // DST days are 23/25h long; the boundary drift falls outside trading hours
+    this.session = {
+      date,
+      dayStart,
+      dayEnd: dayStart + DAY,
+      open: closed ? null : dayStart + OPEN_OFFSET,
+      close: closed ? null : (holiday?.close ?? dayStart + CLOSE_OFFSET)
+    };
+    return this.session;
+  }
+
+  refresh() {
+    if (this.refreshing) return this.refreshing;
+    this.refreshing = (async () => {
+      try {
+        const days = await this.fetchCalendar();
+        const holidays = new Map();
+        for (const day of days || []) {
+          if (day.exchange && day.exchange !== 'NYSE') continue;
+          holidays.set(day.date, {
+            status: day.status,
+            close: day.status === 'early-close' && day.close ? Date.parse(day.close) : undefined
+          });
+        }
+        this.holidays = holidays;
+        this.session = null;
+        this.refreshedAt = Date.now();
+      } catch (error) {
+        console.error('Market calendar refresh failed:', error.message);
+        // Retry after a short back-off rather than on every call
+        this.refreshedAt = Date.now() - this.refreshInterval + 60000;
+      } finally {
+        this.refreshing = null;
+      }
+    })();
+    return this.refreshing;
+  }
+}
+
+// 'GMT-4' / 'GMT-05:00' / 'GMT' -> offset in ms
+function parseOffset(name) {
+  const match = /GMT([+-])(\d{1,2})(?::(\d{2}))?/.exec(name);
+  if (!match) return 0;
+  const minutes = Number(match[2]) * 60 + Number(match[3] || 0);
+  return (match[1] === '-' ? -1 : 1) * minutes * 60000;
+}
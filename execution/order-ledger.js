@@ -0,0 +1,176 @@
+// execution/order-ledger.js
+// In-process ledger of our own submits, cancels and fills. Per-symbol counts
+// over a sliding window are kept in time buckets, so spoofing and self-cross
+// checks are local O(1) lookups instead of broker API round-trips.
+
+const WINDOW_MS = 5000;
+const BUCKET_MS = 250;
+const MAX_CANCELS = 3; // more than 3 cancels in the window looks like spoofing
+const CLOSED_EVENTS = new Set(['fill', 'canceled', 'expired', 'rejected', 'done_for_day']);
+
+// Ring of fixed-width time buckets with a running total. The window covers
+// the current bucket plus the previous (n - 1), i.e. WINDOW_MS - BUCKET_MS to
+// WINDOW_MS of history.
+export class WindowedCounter {
+  constructor(windowMs = WINDOW_MS, bucketMs = BUCKET_MS) {
+    this.bucketMs = bucketMs;
+    this.buckets = new Uint32Array(Math.max(1, Math.ceil(windowMs / bucketMs)));
+    this.total = 0;
+    this.epoch = null; // absolute index of the current bucket
+  }
+
+  _advance(now) {
+    const index = Math.floor(now / this.bucketMs);
+    if (this.epoch === null || index - this.epoch >= this.buckets.length) {
+      this.buckets.fill(0);
+      this.total = 0;
+      this.epoch = index;
+    } else if (index > this.epoch) {
+      for (let i = this.epoch + 1; i <= index; i++) {
+        const slot = i % this.buckets.length;
+        this.total -= this.buckets[slot];
+        this.buckets[slot] = 0;
+      }
+      this.epoch = index;
+    }
+  }
+
+  add(now, n = 1) {
+    this._advance(now);
+    this.buckets[this.epoch % this.buckets.length] += n;
+    this.total += n;
+  }
+
+  count(now) {
+    this._advance(now);
+    return this.total;
+  }
+}
+
+class SymbolActivity {
+  constructor(windowMs, bucketMs) {
+    this.submits = new WindowedCounter(windowMs, bucketMs);
+    this.cancels = new WindowedCounter(windowMs, bucketMs);
+    this.fills = new WindowedCounter(windowMs, bucketMs);
+    this.open = { buy: new Map(), sell: new Map() }; // key -> limit price
+    this.bestBuy = -Infinity; // highest resting buy
+    this.bestSell = Infinity; // lowest resting sell
+  }
+
+  addOpen(key, side, price) {
+    this.open[side].set(key, price);
+    if (side === 'buy') this.bestBuy = Math.max(this.bestBuy, price);
+    else this.bestSell = Math.min(this.bestSell, price);
+  }
+
+  removeOpen(key, side) {
+    const price = this.open[side].get(key);
+    if (price === undefined) return;
+    this.open[side].delete(key);
+    // Only a removed best level forces a rescan of the (few) resting orders
+    if (side === 'buy' && price === this.bestBuy) {
+      this.bestBuy = Math.max(-Infinity, ...this.open.buy.values());
+    } else if (side === 'sell' && price === this.bestSell) {
+      this.bestSell = Math.min(Infinity, ...this.open.sell.values());
+    }
+  }
+}
+
+export class OrderLedger {
+  constructor({ windowMs = WINDOW_MS, bucketMs = BUCKET_MS, maxCancels = MAX_CANCELS, now = Date.now } = {}) {
+    this.windowMs = windowMs;
+    this.bucketMs = bucketMs;
+    this.maxCancels = maxCancels;
+    this.now = now;
+    this.symbols = new Map();
+    this.orders = new Map(); // key -> { symbol, side, price }
+  }
+
+  _activity(symbol) {
+    let activity = this.symbols.get(symbol);
+    if (!activity) {
+      activity = new SymbolActivity(this.windowMs, this.bucketMs);
+      this.symbols.set(symbol, activity);
+    }
+    return activity;
+  }
+
+  recordSubmit(order) {
+    const key = orderKey(order);
+    if (this.orders.has(key)) return;
+    const price = Number(order.limit_price);
+    this.orders.set(key, { symbol: order.symbol, side: order.side, price });
+    const activity = this._activity(order.symbol);
+    activity.submits.add(this.now());
+    if (Number.isFinite(price)) activity.addOpen(key, order.side, price);
+  }
+
+  recordCancel(order) {
+    this._activity(order.symbol).cancels.add(this.now());
+    this._close(order);
+  }
+
+  recordFill(order, final = true) {
+    this._activity(order.symbol).fills.add(this.now());
+    if (final) this._close(order);
+  }
+
+  // Alpaca trade_updates payload: { event, order }
+  recordUpdate({ event, order }) {
+    switch (event) {
+      case 'new':
+        this.recordSubmit(order);
+        break;
+      case 'partial_fill':
+        this.recordFill(order, false);
+        break;
+      case 'fill':
+        this.recordFill(order);
+        break;
+      case 'canceled':
+        this.recordCancel(order);
+        break;
+      default:
+        if (CLOSED_EVENTS.has(event)) this._close(order);
+    }
+  }
+
+  _close(order) {
+    const key = orderKey(order);
+    const entry = this.orders.get(key);
+    if (!entry) return;
+    this.orders.delete(key);
+    this.symbols.get(entry.symbol)?.removeOpen(key, entry.side);
+  }
+
+  submitCount(symbol) {
+    return this.symbols.get(symbol)?.submits.count(this.now()) ?? 0;
+  }
+
+  cancelCount(symbol) {
+    return this.symbols.get(symbol)?.cancels.count(this.now()) ?? 0;
+  }
+
+  fillCount(symbol) {
+    return this.symbols.get(symbol)?.fills.count(this.now()) ?? 0;
+  }
+
+  isSpoofPattern(symbol) {
+    return this.cancelCount(symbol) > this.maxCancels;
+  }
+
+  // Would `order` trade against one of our own resting orders?
+  wouldSelfCross(order) {
+    const activity = this.symbols.get(order.symbol);
+    if (!activity) return false;
+    const price = Number(order.limit_price);
+    return order.side === 'buy' ? price >= activity.bestSell : price <= activity.bestBuy;
+  }
+}
+
+function orderKey(order) {
+  return order.client_order_id ?? order.id;
+}
+
+// Process-wide ledger fed by TradingEngine and read by OrderValidator
+export const orderLedger = new OrderLedger();
@@ -0,0 +1,223 @@
+// execution/rate-limiter.js
+// Shared token-bucket rate limiting for broker calls. A request draws one
+// token from the global bucket, its endpoint bucket and (optionally) its
+// symbol bucket, atomically. Requests that cannot be served immediately wait
+// in a priority queue; a blocked bucket only holds back requests that need
+// it, so one busy symbol never stalls the others.
+import config from '../shared/config.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+
+export const PRIORITY = {
+  RISK: 10,   // stops, cancels, flattening
+  NORMAL: 0
+};
+
+export class RateLimitError extends Error {}
+
+export class TokenBucket {
+  constructor({ capacity, refillPerSecond }, now) {
+    this.capacity = capacity;
+    this.refillPerMs = refillPerSecond / 1000;
+    this.available = capacity;
+    this.updatedAt = now;
+  }
+
+  refill(now) {
+    if (now > this.updatedAt) {
+      this.available = Math.min(this.capacity, this.available + (now - this.updatedAt) * this.refillPerMs);
+      this.updatedAt = now;
+    }
+    return this.available;
+  }
+
+  // ms until `n` tokens are available (0 if already)
+  waitTime(now, n = 1) {
+    const deficit = n - this.refill(now);
+    return deficit <= 0 ? 0 : Math.ceil(deficit / this.refillPerMs);
+  }
+}
+
+export class RateLimiter {
+  constructor({
+    global,
+    perSymbol,
+    endpoints = {},
+    now = Date.now,
+    setTimer = setTimeout,
+    clearTimer = clearTimeout
+  } = config.rateLimits) {
+    this.now = now;
+    this.setTimer = setTimer;
+    this.clearTimer = clearTimer;
+    this.symbolLimit = perSymbol;
+    this.global = new TokenBucket(global, now());
+    this.endpoints = new Map(
+      Object.entries(endpoints).map(([name, limit]) => [name, new TokenBucket(limit, now())])
+    );
+    this.symbols = new Map();
+    this.queue = [];  // sorted: priority desc, then arrival
+    this.seq = 0;
+    this.timer = null;
+    this.waits = new LatencyHistogram();
+  }
+
+  _buckets(symbol, endpoint) {
+    const buckets = [this.global];
+    const endpointBucket = this.endpoints.get(endpoint);
+    if (!endpointBucket && endpoint) throw new Error(`Unknown rate-limited endpoint: ${endpoint}`);
+    if (endpointBucket) buckets.push(endpointBucket);
+    if (symbol && this.symbolLimit) {
+      let bucket = this.symbols.get(symbol);
+      if (!bucket) {
+        bucket = new TokenBucket(this.symbolLimit, this.now());
+        this.symbols.set(symbol, bucket);
+      }
+      buckets.push(bucket);
+    }
+    return buckets;
+  }
+
+  // True if a request could be served right now (consumes nothing)
+  canAcquire({ symbol, endpoint = 'orders' } = {}) {
+    const buckets = this._buckets(symbol, endpoint);
+    const now = this.now();
+    return buckets.every(bucket => bucket.refill(now) >= 1) && !this._blockedByQueue(buckets);
+  }
+
+  // Remaining per-symbol budget; symbols without a bucket have full capacity
+  symbolTokens(symbol) {
+    const bucket = this.symbols.get(symbol);
+    if (!bucket) return this.symbolLimit ? this.symbolLimit.capacity : Infinity;
+    return bucket.refill(this.now());
+  }
+
+  // Take tokens immediately or return false; never queues
+  tryAcquire({ symbol, endpoint = 'orders' } = {}) {
+    const buckets = this._buckets(symbol, endpoint);
+    if (this.queue.length > 0) this.drain(); // queued requests that are ready go first
+    if (this._blockedByQueue(buckets)) return false;
+    return this._take(buckets, this.now());
+  }
+
+  // Resolves with the queued wait (ms) once tokens are reserved
+  acquire({ symbol, endpoint = 'orders', priority = PRIORITY.NORMAL, timeout = Infinity } = {}) {
+    const buckets = this._buckets(symbol, endpoint);
+    const now = this.now();
+    if (this.queue.length > 0) this.drain(); // queued requests that are ready go first
+    if (!this._blockedByQueue(buckets) && this._take(buckets, now)) {
+      this.waits.record(0);
+      return Promise.resolve(0);
+    }
+
+    return new Promise((resolve, reject) => {
+      const request = { buckets, priority, seq: this.seq++, enqueuedAt: now, resolve, reject };
+      if (Number.isFinite(timeout)) request.deadline = now + timeout;
+      this._enqueue(request);
+      this._schedule();
+    });
+  }
+
+  _take(buckets, now) {
+    for (const bucket of buckets) if (bucket.refill(now) < 1) return false;
+    for (const bucket of buckets) bucket.available -= 1;
+    return true;
+  }
+
+  // Queued requests have precedence on every bucket they are waiting for
+  _blockedByQueue(buckets) {
+    const now = this.now();
+    for (const request of this.queue) {
+      for (const bucket of request.buckets) {
+        if (bucket.refill(now) < 1 && buckets.includes(bucket)) return true;
+      }
+    }
+    return false;
+  }
+
+  _enqueue(request) {
+    let lo = 0;
+    let hi = this.queue.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      const other = this.queue[mid];
+      if (other.priority > request.priority || (other.priority === request.priority && other.seq < request.seq)) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    this.queue.splice(lo, 0, request);
+  }
+
+  // Serve queued requests in priority order; a request that cannot be served
+  // blocks its exhausted buckets for everything queued behind it
+  drain() {
+    if (this.timer !== null) {
+      this.clearTimer(this.timer);
+      this.timer = null;
+    }
+    const now = this.now();
+    const blocked = new Set();
+    const remaining = [];
+
+    for (const request of this.queue) {
+      if (request.deadline !== undefined && now >= request.deadline) {
+        request.reject(new RateLimitError(`Rate limit wait exceeded ${request.deadline - request.enqueuedAt}ms`));
+        continue;
+      }
+      const free = request.buckets.every(bucket => !blocked.has(bucket) && bucket.refill(now) >= 1);
+      if (free) {
+        for (const bucket of request.buckets) bucket.available -= 1;
+        const waited = now - request.enqueuedAt;
+        this.waits.record(waited);
+        request.resolve(waited);
+      } else {
+        for (const bucket of request.buckets) if (bucket.refill(now) < 1) blocked.add(bucket);
+        remaining.push(request);
+      }
+    }
+
+    this.queue = remaining;
+    this._schedule();
+  }
+
+  _schedule() {
+    if (this.timer !== null || this.queue.length === 0) return;
+    const now = this.now();
+    let delay = Infinity;
+    for (const request of this.queue) {
+      let wait = 0;
+      for (const bucket of request.buckets) wait = Math.max(wait, bucket.waitTime(now));
+      if (request.deadline !== undefined) wait = Math.min(wait, request.deadline - now);
+      delay = Math.min(delay, wait);
+    }
+    this.timer = this.setTimer(() => this.drain(), Math.max(0, delay));
+    this.timer?.unref?.();
+  }
+
+  // Current tokens per bucket, queue depth and queued-wait percentiles (ms)
+  getStats() {
+    const now = this.now();
+    const tokens = bucket => bucket.refill(now);
+    return {
+      global: tokens(this.global),
+      endpoints: Object.fromEntries([...this.endpoints].map(([name, bucket]) => [name, tokens(bucket)])),
+      symbols: Object.fromEntries([...this.symbols].map(([symbol, bucket]) => [symbol, tokens(bucket)])),
+      queueDepth: this.queue.length,
+      oldestWait: this.queue.reduce((max, request) => Math.max(max, now - request.enqueuedAt), 0),
+      waits: this.waits.snapshot()
+    };
+  }
+
+  // Drop symbol buckets that are full and not referenced by the queue
+  prune() {
+    const now = this.now();
+    const queued = new Set(this.queue.flatMap(request => request.buckets));
+    for (const [symbol, bucket] of this.symbols) {
+      if (!queued.has(bucket) && bucket.refill(now) >= bucket.capacity) this.symbols.delete(symbol);
+    }
+  }
+}
+
+// Process-wide limiter shared by the trading engine and order validation
+export const rateLimiter = new RateLimiter();
@@ -1,68 +1,68 @@
 // execution/smart-router.js
 import { executeOrder } from './alpaca-router.js';
-import { OrderBookManager } from '../data-ingestion/orderbook-manager.js';
+import { MarketSession } from './market-session.js';
+import { orderBooks } from '../data-ingestion/orderbook-cache.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+import { tracer } from '../shared/tracing.js';
 import { Redis } from 'ioredis';
+import { performance } from 'perf_hooks';
 import axios from 'axios';
 
 const redis = new Redis(process.env.REDIS_URL);
 const POLYGON_API = process.env.POLYGON_API_KEY;
+const POLYGON_BASE_URL = process.env.POLYGON_BASE_URL || 'https://api.polygon.io';
+const STAGES = ['status', 'marketData', 'build', 'submit', 'total'];
 
 export class SmartRouter {
-  constructor() {
+  constructor({ session = new MarketSession(), submit = executeOrder, now = () => performance.now() } = {}) {
     this.redis = redis;
+    this.session = session;
+    this.submit = submit;
+    this.now = now;
     this.marketStatus = { 
       market: 'stocks',
       status: 'unknown',
       nextHours: 'regular',
       changeAt: new Date()
     };
-    this.lastCheck = 0;
+    this.latency = Object.fromEntries(STAGES.map(stage => [stage, new LatencyHistogram()]));
   }
 
   async executeSignal(signal) {
-    await this._checkMarketStatus();
+    const t0 = this.now();
+    this._checkMarketStatus();
+    const t1 = this.now();
     const marketData = await this._getMarketData(signal.symbol);
-    
-    console.log(`📊 ${this.marketStatus.market} Market Status:`, {
-      status: this.marketStatus.status,
-      dataSource: marketData.source,
-      timestamp: marketData.timestamp
-    });
-
+    const t2 = this.now();
     const orderParams = this._buildOrder(signal, marketData);
-    return executeOrder(orderParams); // Use existing alpaca-router.js
+    const t3 = this.now();
+    tracer.mark(signal.trace, 'route');
+    const result = await this.submit(orderParams); // Use existing alpaca-router.js
+    const t4 = this.now();
+    tracer.mark(signal.trace, 'submit');
+
+    this.latency.status.record(t1 - t0);
+    this.latency.marketData.record(t2 - t1);
+    this.latency.build.record(t3 - t2);
+    this.latency.submit.record(t4 - t3);
+    this.latency.total.record(t4 - t0);
+    return result;
   }
 
-  async _checkMarketStatus() {
-    try {
-      const { data } = await axios.get(
-        'https://api.polygon.io/v1/marketstatus/now',
-        { params: { apiKey: POLYGON_API } }
-      );
-      
-      this.marketStatus = {
-        market: data.market || 'stocks',
-        status: this._normalizeStatus(data.market),
-        nextHours: data.exchanges?.nyse || 'regular',
-        changeAt: new Date(data.serverTime)
-      };
-      
-    } catch (error) {
-      console.error('Market status check failed:', error);
-      this.marketStatus.status = 'unknown';
-    }
+  // Synchronous: the calendar is cached locally and refreshed in the background
+  _checkMarketStatus(now = Date.now()) {
+    this.marketStatus.status = this.session.status(now);
+    return this.marketStatus.status;
+  }
+
+  // Per-stage latency percentiles (ms)
+  getLatencyStats() {
+    return Object.fromEntries(STAGES.map(stage => [stage, this.latency[stage].snapshot()]));
   }
 
-  _normalizeStatus(status) {
-  const statusMap = {
-    'open': 'open',
-    'closed': 'closed',
-    'extended-hours': 'open',  // Treat extended hours as open
-    'pre-market': 'closed',
-    'after-hours': 'closed'
-  };
-  return statusMap[status?.toLowerCase()] || 'unknown';
-}
+  resetLatencyStats() {
+    for (const stage of STAGES) this.latency[stage].reset();
+  }
 
   async _getMarketData(symbol) {
     // Handle initial null state
@@ -71,31 +71,39 @@ export class SmartRouter {
       return this._getCachedData(symbol);
     }
     
-    if(this.marketStatus.status.toLowerCase() === 'open') {
+    if(this.marketStatus.status === 'open') {
       return this._getRealtimeData(symbol);
     }
     return this._getHistoricalData(symbol);
   }
 
   async _getRealtimeData(symbol) {
-    const obm = new OrderBookManager(symbol, this.redis);
-    return {
-      source: 'realtime',
-      timestamp: Date.now(),
-      bestBid: await obm.getBestBid(),
-      bestAsk: await obm.getBestAsk(),
-      lastTrade: await redis.get(`trades:${symbol}:last`),
-      vwap: await redis.get(`rollingWindow:${symbol}:vwap`)
-    };
+    if (orderBooks.has(symbol)) {
+      // Book and last trade maintained in-process by the ingest pipeline
+      const book = orderBooks.get(symbol);
+      return {
+        source: 'realtime',
+        timestamp: book.timestamp,
+        bestBid: book.bestBid,
+        bestAsk: book.bestAsk,
+        lastTrade: book.lastPrice
+      };
+    }
+
+    // Ingest runs in another process: read its throttled snapshot
+    const [bestBid, bestAsk, timestamp] = (
+      await this.redis.hmget(`orderbook:${symbol}`, 'bestBid', 'bestAsk', 'timestamp')
+    ).map(parseFloat);
+    return { source: 'realtime', timestamp, bestBid, bestAsk, lastTrade: NaN };
   }
 
   async _getHistoricalData(symbol) {
     try {
       const [quote, trade] = await Promise.all([
-        axios.get(`https://api.polygon.io/v2/last/nbbo/${symbol}`, {
+        axios.get(`${POLYGON_BASE_URL}/v2/last/nbbo/${symbol}`, {
           params: { apiKey: POLYGON_API }
         }),
-        axios.get(`https://api.polygon.io/v2/last/trade/${symbol}`, {
+        axios.get(`${POLYGON_BASE_URL}/v2/last/trade/${symbol}`, {
           params: { apiKey: POLYGON_API }
         })
       ]);
@@ -116,47 +124,40 @@ export class SmartRouter {
 
   async _getCachedData(symbol) {
     console.log('🔄 Using cached data as fallback');
-    return {
-      source: 'cached',
-      timestamp: await redis.get(`market:${symbol}:lastUpdated`),
-      bestBid: await redis.get(`market:${symbol}:lastBid`),
-      bestAsk: await redis.get(`market:${symbol}:lastAsk`),
-      lastTrade: await redis.get(`market:${symbol}:lastTrade`),
-      vwap: await redis.get(`rollingWindow:${symbol}:vwap`)
-    };
+    const [timestamp, bestBid, bestAsk, lastTrade, vwap] = await this.redis.mget(
+      `market:${symbol}:lastUpdated`,
+      `market:${symbol}:lastBid`,
+      `market:${symbol}:lastAsk`,
+      `market:${symbol}:lastTrade`,
+      `rollingWindow:${symbol}:vwap`
+    );
+    return { source: 'cached', timestamp, bestBid, bestAsk, lastTrade, vwap };
   }
 
   _buildOrder(signal, marketData) {
-    const price = this._calculateLimitPrice(
-      signal.direction,
-      marketData
-    );
-
-    console.log(`🎯 Order Details:`, {
-      symbol: signal.symbol,
-      direction: signal.direction,
-      priceSource: marketData.source,
-      limitPrice: price,
-      marketStatus: this.marketStatus.status
-    });
-
     // Validate order parameters
     if (!Number.isInteger(signal.size)) {
       throw new Error(`Invalid order size: ${signal.size}`);
     }
 
+    const price = this._calculateLimitPrice(signal.direction, marketData);
+    if (!Number.isFinite(price)) {
+      throw new Error(`No ${marketData.source} quote for ${signal.symbol}`);
+    }
+
     return {
-        symbol: signal.symbol,
-        quantity: signal.size.toString(), // Convert to string for Alpaca v3
-        direction: signal.direction,
-        type: 'limit',
-        limit_price: price.toFixed(2),
-        time_in_force: 'ioc',
-        order_class: 'bracket',
-        stop_loss: {
-          stop_price: signal.stopPrice.toFixed(2),
-          limit_price: (signal.stopPrice * 0.995).toFixed(2)
-      }
+      symbol: signal.symbol,
+      quantity: String(signal.size), // String for Alpaca v3
+      direction: signal.direction,
+      type: 'limit',
+      limit_price: price.toFixed(2),
+      time_in_force: 'ioc',
+      order_class: 'bracket',
+      stop_loss: {
+        stop_price: signal.stopPrice.toFixed(2),
+        limit_price: (signal.stopPrice * 0.995).toFixed(2)
+      },
+      trace: signal.trace // for placeOrder; never sent to the broker
     };
   }
 
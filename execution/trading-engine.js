@@ -2,6 +2,9 @@
 import Alpaca from '@alpacahq/alpaca-trade-api';
 import config from '../shared/config.js';
 import { logger } from '../shared/logger.js';
+import { rateLimiter, PRIORITY } from './rate-limiter.js';
+import { orderLedger } from './order-ledger.js';
+import { tracer } from '../shared/tracing.js';
 //import { TechnicalAnalysis } from '../feature-engine/technical-analysis.js';
 
 export class TradingEngine {
@@ -18,7 +21,10 @@ export class TradingEngine {
     this.positionSizeMultiplier = 1.0;
     this.tradingSuspended = false;
     this.orderCounter = 0;
-    this.lastOrderTimestamp = 0;
+    this.rateLimiter = rateLimiter;
+    this.ledger = orderLedger;
+    this.orderUpdates = null; // broker trade_updates stream, once started
+    this.maxQueueWait = 1000; // ms; stale signals are dropped rather than sent late
   }
 
   /**
@@ -30,8 +36,18 @@ export class TradingEngine {
       return null;
     }
 
-    // Rate limiting: max 5 orders/second
-    await this.enforceRateLimit(5, 1000);
+    // Global, endpoint and per-symbol buckets; only this symbol's excess queues
+    try {
+      await this.rateLimiter.acquire({
+        symbol: signal.symbol,
+        endpoint: 'orders',
+        priority: signal.priority ?? PRIORITY.NORMAL,
+        timeout: this.maxQueueWait
+      });
+    } catch (error) {
+      logger.warn('Order rejected - rate limit wait exceeded', { symbol: signal.symbol });
+      return null;
+    }
     
     const orderDetails = this.createOrderObject(signal);
     
@@ -43,6 +59,7 @@ export class TradingEngine {
     
     try {
       const order = await this.alpaca.createOrder(orderDetails);
+      tracer.mark(signal.trace, 'placeOrder');
       this.trackOrder(order);
       logger.info(`Order placed: ${order.id}`, order);
       console.log('✅ Order executed successfully:', order.id);
@@ -81,16 +98,6 @@ export class TradingEngine {
       : signal.price * (1 + config.PRICE_IMPROVEMENT);
   }
 
-  async enforceRateLimit(maxRequests, interval) {
-    const now = Date.now();
-    if(now - this.lastOrderTimestamp < interval/1000) {
-      await new Promise(resolve => 
-        setTimeout(resolve, interval - (now - this.lastOrderTimestamp))
-      );
-    }
-    this.lastOrderTimestamp = Date.now();
-  }
-
   validateOrder(order) {
     return order.qty > 0 &&
            order.limit_price > 0 &&
@@ -103,6 +110,30 @@ export class TradingEngine {
       ...order,
       timestamp: Date.now()
     });
+    this.ledger.recordSubmit(order);
+  }
+
+  // Broker order updates keep the ledger and active orders current
+  handleOrderUpdate(update) {
+    this.ledger.recordUpdate(update);
+    if (['fill', 'canceled', 'expired', 'rejected'].includes(update.event)) {
+      this.activeOrders.delete(update.order.client_order_id);
+    }
+  }
+
+  // Idempotent; called by the execution entry point
+  startOrderUpdates() {
+    if (this.orderUpdates) return this.orderUpdates;
+    const stream = this.orderUpdates = this.alpaca.trade_ws;
+    stream.onConnect(() => stream.subscribe(['trade_updates']));
+    stream.onOrderUpdate(update => this.handleOrderUpdate(update));
+    stream.connect();
+    return stream;
+  }
+
+  stopOrderUpdates() {
+    this.orderUpdates?.disconnect();
+    this.orderUpdates = null;
   }
 
   handleOrderError(error, order) {
@@ -120,6 +151,7 @@ export class TradingEngine {
   // Risk protocol implementations
   async cancelAllOrders() {
     try {
+      await this.rateLimiter.acquire({ endpoint: 'cancels', priority: PRIORITY.RISK });
       await this.alpaca.cancelAllOrders();
       this.activeOrders.clear();
       logger.info('All orders cancelled');
@@ -130,6 +162,8 @@ export class TradingEngine {
 
   async closePosition(symbol, percentage = 100) {
     try {
+      // Exits jump the queue and are not subject to the per-symbol entry limit
+      await this.rateLimiter.acquire({ endpoint: 'orders', priority: PRIORITY.RISK });
       const position = await this.alpaca.getPosition(symbol);
       const qty = Math.floor(position.qty * (percentage/100));
       
@@ -0,0 +1,176 @@
+// feature-engine/bar-window.js
+// Fixed-capacity typed-array ring buffer of bars with incremental indicators.
+// Every push updates ATR (Wilder), RSI (Wilder), the VWAP SMA and the volume
+// mean/std in O(1), so feature reads never rescan the window.
+
+const FIELDS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'vwap'];
+
+// Accepts our bar shape or a raw Polygon aggregate ({ o, h, l, c, v, vw, s })
+export function toBar(data) {
+  return {
+    timestamp: data.timestamp ?? data.s ?? data.t ?? Date.now(),
+    open: data.open ?? data.o,
+    high: data.high ?? data.h,
+    low: data.low ?? data.l,
+    close: data.close ?? data.c,
+    volume: data.volume ?? data.v ?? 0,
+    vwap: data.vwap ?? data.vw ?? data.close ?? data.c
+  };
+}
+
+export class BarWindow {
+  constructor({
+    capacity = 60,
+    atrPeriod = 5,
+    rsiPeriod = 3,
+    smaPeriod = 5,
+    volumePeriod = 20
+  } = {}) {
+    if (Math.max(smaPeriod, volumePeriod + 1) > capacity) {
+      throw new Error('Indicator periods exceed window capacity');
+    }
+    this.capacity = capacity;
+    this.atrPeriod = atrPeriod;
+    this.rsiPeriod = rsiPeriod;
+    this.smaPeriod = smaPeriod;
+    this.volumePeriod = volumePeriod;
+    for (const field of FIELDS) this[field] = new Float64Array(capacity);
+    this.reset();
+  }
+
+  reset() {
+    this.head = 0;   // next write slot
+    this.length = 0;
+    this.count = 0;  // bars seen since reset (indicator warm-up)
+    // ATR state
+    this.trSum = 0;
+    this.atr = NaN;
+    // RSI state
+    this.gainSum = 0;
+    this.lossSum = 0;
+    this.avgGain = NaN;
+    this.avgLoss = NaN;
+    // Rolling sums
+    this.vwapSum = 0;
+    this.volumeSum = 0;
+    this.volumeSqSum = 0;
+  }
+
+  // Value of `field` `ago` bars back (0 = latest)
+  at(field, ago = 0) {
+    return this[field][(this.head - 1 - ago + this.capacity) % this.capacity];
+  }
+
+  push(input) {
+    const bar = toBar(input);
+    const hasPrev = this.length > 0;
+    const prevClose = hasPrev ? this.at('close') : NaN;
+
+    // Values leaving the rolling sums (read before the slot is overwritten)
+    const vwapOut = this.length >= this.smaPeriod ? this.at('vwap', this.smaPeriod - 1) : 0;
+    const volumeOut = this.length > this.volumePeriod ? this.at('volume', this.volumePeriod) : 0;
+
+    // Volume stats cover the `volumePeriod` bars *before* the newest one, so
+    // roll the previous latest bar in before writing the new one
+    if (hasPrev) {
+      const prevVolume = this.at('volume');
+      this.volumeSum += prevVolume - volumeOut;
+      this.volumeSqSum += prevVolume * prevVolume - volumeOut * volumeOut;
+    }
+
+    const slot = this.head;
+    for (const field of FIELDS) this[field][slot] = bar[field];
+    this.head = (this.head + 1) % this.capacity;
+    this.length = Math.min(this.length + 1, this.capacity);
+    this.count++;
+
+    this.vwapSum += bar.vwap - vwapOut;
+    if (hasPrev) {
+      this._updateATR(bar, prevClose);
+      this._updateRSI(bar.close - prevClose);
+    }
+    return this;
+  }
+
+  _updateATR(bar, prevClose) {
+    const tr = Math.max(
+      bar.high - bar.low,
+      Math.abs(bar.high - prevClose),
+      Math.abs(bar.low - prevClose)
+    );
+    const n = this.count - 1; // number of true ranges so far
+    if (n <= this.atrPeriod) {
+      // Seed with the simple mean of the first `atrPeriod` true ranges
+      this.trSum += tr;
+      if (n === this.atrPeriod) this.atr = this.trSum / this.atrPeriod;
+    } else {
+      this.atr = (this.atr * (this.atrPeriod - 1) + tr) / this.atrPeriod;
+    }
+  }
+
+  _updateRSI(change) {
+    const gain = Math.max(change, 0);
+    const loss = Math.max(-change, 0);
+    const n = this.count - 1; // number of changes so far
+    if (n <= this.rsiPeriod) {
+      this.gainSum += gain;
+      this.lossSum += loss;
+      if (n === this.rsiPeriod) {
+        this.avgGain = this.gainSum / this.rsiPeriod;
+        this.avgLoss = this.lossSum / this.rsiPeriod;
+      }
+    } else {
+      this.avgGain = (this.avgGain * (this.rsiPeriod - 1) + gain) / this.rsiPeriod;
+      this.avgLoss = (this.avgLoss * (this.rsiPeriod - 1) + loss) / this.rsiPeriod;
+    }
+  }
+
+  get rsi() {
+    if (Number.isNaN(this.avgGain)) return NaN;
+    if (this.avgLoss === 0) return 100;
+    return 100 - 100 / (1 + this.avgGain / this.avgLoss);
+  }
+
+  get vwapSMA() {
+    return this.length >= this.smaPeriod ? this.vwapSum / this.smaPeriod : NaN;
+  }
+
+  get vwapDeviation() {
+    const sma = this.vwapSMA;
+    return (this.at('close') - sma) / sma;
+  }
+
+  // Mean/std of the `volumePeriod` bars preceding the latest one
+  get volumeStats() {
+    const n = Math.min(this.length - 1, this.volumePeriod);
+    if (n <= 0) return { mean: NaN, std: NaN };
+    const mean = this.volumeSum / n;
+    const variance = Math.max(0, this.volumeSqSum / n - mean * mean);
+    return { mean, std: Math.sqrt(variance) };
+  }
+
+  volumeZScore() {
+    const { mean, std } = this.volumeStats;
+    return (this.at('volume') - mean) / (std || 1);
+  }
+
+  isVolumeSpike(threshold = 3) {
+    return this.volumeZScore() > threshold;
+  }
+
+  latest() {
+    return this.length > 0 ? this.get(this.length - 1) : undefined;
+  }
+
+  // Bar by chronological index (0 = oldest)
+  get(index) {
+    const slot = (this.head - this.length + index + this.capacity) % this.capacity;
+    const bar = {};
+    for (const field of FIELDS) bar[field] = this[field][slot];
+    return bar;
+  }
+
+  toArray() {
+    return Array.from({ length: this.length }, (_, i) => this.get(i));
+  }
+}
@@ -10,6 +10,31 @@ export class FeatureNormalizer {
     };
   }
 
+  // Write one normalized row into `out` at `offset` in getFeatureOrder() order
+  static normalizeInto(features, out, offset = 0) {
+    out[offset] = this._normalizeATR(features.atr5);
+    out[offset + 1] = this._normalizeImbalance(features.orderBookImbalance);
+    out[offset + 2] = this._normalizeRSI(features.rsi3);
+    out[offset + 3] = this._normalizeVWAP(features.vwapDeviation);
+    out[offset + 4] = features.volumeSpike ? 1 : 0;
+    out[offset + 5] = this._normalizeFlow(features.orderFlowImbalance);
+    return out;
+  }
+
+  // Normalize flat raw rows (same feature order, e.g. FeatureWindow.values)
+  // into `out` in one pass; `out` may be `rows` itself
+  static normalizeRows(rows, out = rows) {
+    for (let i = 0; i < rows.length; i += 6) {
+      out[i] = this._normalizeATR(rows[i]);
+      out[i + 1] = this._normalizeImbalance(rows[i + 1]);
+      out[i + 2] = this._normalizeRSI(rows[i + 2]);
+      out[i + 3] = this._normalizeVWAP(rows[i + 3]);
+      out[i + 4] = rows[i + 4] ? 1 : 0;
+      out[i + 5] = this._normalizeFlow(rows[i + 5]);
+    }
+    return out;
+  }
+
   static _normalizeATR(value) {
     return Math.log(Math.max(0.0001, value) + 1) / 10;
   }
@@ -0,0 +1,24 @@
+// feature-engine/feature-vector.js
+// The model input vector, computed from in-process state only (bar window
+// indicators, order book, order-flow imbalance). Shared by FeatureEngine and
+// the sharded pipeline workers so both produce identical features.
+export const FEATURE_NAMES = [
+  'atr5',
+  'orderBookImbalance',
+  'rsi3',
+  'vwapDeviation',
+  'volumeSpike',
+  'orderFlowImbalance'
+];
+
+export function computeFeatures(bars, orderBook, orderFlowImbalance, { atrPeriod = 5, orderBookDepth = 5 } = {}) {
+  if (bars.length <= atrPeriod) return null; // ATR needs atrPeriod ranges
+  return {
+    atr5: bars.atr,
+    orderBookImbalance: orderBook.depthImbalance(orderBookDepth),
+    rsi3: bars.rsi,
+    vwapDeviation: bars.vwapDeviation,
+    volumeSpike: bars.isVolumeSpike(3),
+    orderFlowImbalance
+  };
+}
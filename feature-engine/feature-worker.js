@@ -0,0 +1,163 @@
+// feature-engine/feature-worker.js
+// One pipeline shard: drains bar/quote/trade records for its symbols from a
+// shared input ring, keeps per-symbol bar windows, books and order flow, and
+// writes one feature vector per touched symbol per batch to the output ring.
+// Record layouts are shared with the coordinator (realtime-pipeline.js).
+import { isMainThread, parentPort, workerData } from 'worker_threads';
+import { performance } from 'perf_hooks';
+import { clock } from '../shared/tracing.js';
+import { BarWindow } from './bar-window.js';
+import { FEATURE_NAMES, computeFeatures } from './feature-vector.js';
+import { SharedRing } from './shared-ring.js';
+import { OrderBookCache } from '../data-ingestion/orderbook-cache.js';
+import { OrderFlowTracker } from '../data-ingestion/order-flow.js';
+
+// Input record: [kind, symbolId, timestamp, v0..v5, receivedAt, traceId, traceOrigin]
+// (traceId 0: not traced)
+export const KIND = { BAR: 0, QUOTE: 1, TRADE: 2, UNSUBSCRIBE: 3 };
+export const IN = { KIND: 0, SYMBOL: 1, TIMESTAMP: 2, VALUES: 3, RECEIVED: 9, TRACE_ID: 10, TRACE_ORIGIN: 11 };
+export const INPUT_WIDTH = 12;
+
+// Output record: [symbolId, timestamp, ...features, receivedAt, computedAt, traceId, traceOrigin]
+const FEATURE_COUNT = FEATURE_NAMES.length;
+export const OUT = {
+  SYMBOL: 0,
+  TIMESTAMP: 1,
+  FEATURES: 2,
+  RECEIVED: 2 + FEATURE_COUNT,
+  COMPUTED: 3 + FEATURE_COUNT,
+  TRACE_ID: 4 + FEATURE_COUNT,
+  TRACE_ORIGIN: 5 + FEATURE_COUNT
+};
+export const OUTPUT_WIDTH = 6 + FEATURE_COUNT;
+
+// Shard counters, written by the worker only
+export const STATS = { MESSAGES: 0, FEATURES: 1, OUTPUT_DROPPED: 2, BUSY_MS: 3 };
+export const STATS_FIELDS = 4;
+
+const MAX_BATCH = 1024; // records per batch before yielding to the event loop
+
+// Wall-clock ms comparable across threads
+export { clock };
+
+export function startShard({ input, output, wake, stats, options = {} }) {
+  const { barCapacity = 60, tickWindowSize = 100, atrPeriod = 5, orderBookDepth = 5 } = options;
+  const inRing = new SharedRing(input);
+  const outRing = new SharedRing(output);
+  const wakeCounter = new Int32Array(wake);
+  const counters = new Float64Array(stats);
+
+  const books = new OrderBookCache();
+  const flow = new OrderFlowTracker({ capacity: tickWindowSize, orderBooks: books });
+  const symbols = new Map(); // id -> { bars, timestamp, receivedAt }
+  const dirty = new Set();
+  const record = new Float64Array(INPUT_WIDTH);
+  const out = new Float64Array(OUTPUT_WIDTH);
+  let running = true;
+
+  parentPort?.on('message', message => {
+    if (message.type === 'stop') {
+      running = false;
+      inRing.notify();
+    }
+  });
+
+  function state(id) {
+    let entry = symbols.get(id);
+    if (!entry) {
+      entry = { bars: new BarWindow({ capacity: barCapacity }), timestamp: 0, receivedAt: 0, traceId: 0, traceOrigin: 0 };
+      symbols.set(id, entry);
+    }
+    return entry;
+  }
+
+  function apply(rec) {
+    const id = rec[IN.SYMBOL];
+    const v = IN.VALUES;
+    switch (rec[IN.KIND]) {
+      case KIND.BAR:
+        state(id).bars.push({
+          timestamp: rec[IN.TIMESTAMP],
+          open: rec[v], high: rec[v + 1], low: rec[v + 2], close: rec[v + 3], volume: rec[v + 4], vwap: rec[v + 5]
+        });
+        break;
+      case KIND.QUOTE:
+        books.get(id).applyQuote({ bp: rec[v], bs: rec[v + 1], ap: rec[v + 2], as: rec[v + 3], t: rec[IN.TIMESTAMP] });
+        break;
+      case KIND.TRADE:
+        flow.applyTrade({ sym: id, p: rec[v], s: rec[v + 1], t: rec[IN.TIMESTAMP] });
+        break;
+      case KIND.UNSUBSCRIBE: // ordered behind the symbol's last records
+        symbols.delete(id);
+        books.books.delete(id);
+        flow.flows.delete(id);
+        dirty.delete(id);
+        return;
+      default:
+        return;
+    }
+    const entry = state(id);
+    // Lag is measured from the oldest record folded into the next vector; the
+    // vector carries the first trace among those records
+    if (!dirty.has(id)) {
+      entry.receivedAt = rec[IN.RECEIVED];
+      entry.traceId = 0;
+    }
+    if (entry.traceId === 0 && rec[IN.TRACE_ID] !== 0) {
+      entry.traceId = rec[IN.TRACE_ID];
+      entry.traceOrigin = rec[IN.TRACE_ORIGIN];
+    }
+    entry.timestamp = rec[IN.TIMESTAMP];
+    dirty.add(id);
+  }
+
+  function emit(id) {
+    const entry = symbols.get(id);
+    const features = computeFeatures(entry.bars, books.get(id), flow.imbalance(id, tickWindowSize), {
+      atrPeriod,
+      orderBookDepth
+    });
+    if (!features) return;
+    out[OUT.SYMBOL] = id;
+    out[OUT.TIMESTAMP] = entry.timestamp;
+    FEATURE_NAMES.forEach((name, i) => { out[OUT.FEATURES + i] = Number(features[name]); });
+    out[OUT.RECEIVED] = entry.receivedAt;
+    out[OUT.COMPUTED] = clock();
+    out[OUT.TRACE_ID] = entry.traceId;
+    out[OUT.TRACE_ORIGIN] = entry.traceOrigin;
+    if (outRing.push(out)) counters[STATS.FEATURES]++;
+    else counters[STATS.OUTPUT_DROPPED]++;
+  }
+
+  async function loop() {
+    while (running) {
+      const start = performance.now();
+      let n = 0;
+      while (n < MAX_BATCH && inRing.pop(record)) {
+        apply(record);
+        n++;
+      }
+      if (n === 0) {
+        await inRing.waitAsync(100);
+        continue;
+      }
+      for (const id of dirty) emit(id);
+      dirty.clear();
+      counters[STATS.MESSAGES] += n;
+      counters[STATS.BUSY_MS] += performance.now() - start;
+      Atomics.add(wakeCounter, 0, 1);
+      Atomics.notify(wakeCounter, 0);
+      // Let control messages through under sustained load
+      if (n === MAX_BATCH) await new Promise(setImmediate);
+    }
+  }
+
+  return loop();
+}
+
+if (!isMainThread && workerData?.role === 'feature-shard') {
+  startShard(workerData).catch(error => {
+    console.error('Feature shard failed:', error);
+    process.exit(1);
+  });
+}
@@ -0,0 +1,152 @@
+// feature-engine/news-ingester.js
+// Background news ingestion shared by all symbols. Each source is polled on
+// its own schedule, new articles are scored exactly once and folded into an
+// exponentially decayed score per symbol, so reads are O(1).
+import { LRUCache } from '../shared/lru-cache.js';
+
+const POLL_INTERVALS = {
+  NewsAPI: 60000,       // symbol query, 1 call for all watched symbols
+  Benzinga: 30000,      // movers channel, market-wide
+  AlphaVantage: 300000  // free tier is heavily rate limited
+};
+const HALF_LIFE = 1800000;       // 30 minutes
+const MAX_ARTICLE_AGE = 3600000; // ignore stories older than 1 hour
+const SEEN_CACHE_SIZE = 20000;
+const MARKET_BUCKET = '*';       // articles not tagged with any symbol
+
+export class NewsIngester {
+  constructor(analyzer, {
+    symbols = [],
+    intervals = POLL_INTERVALS,
+    halfLife = HALF_LIFE,
+    maxArticleAge = MAX_ARTICLE_AGE,
+    now = Date.now
+  } = {}) {
+    this.analyzer = analyzer;
+    this.symbols = new Set(symbols);
+    this.intervals = { ...POLL_INTERVALS, ...intervals };
+    this.decayRate = Math.LN2 / halfLife;
+    this.maxArticleAge = maxArticleAge;
+    this.now = now;
+    this.buckets = new Map(); // symbol -> { sum, weight, updatedAt }
+    this.seen = new LRUCache({ maxSize: SEEN_CACHE_SIZE, ttl: 24 * 3600000, now });
+    this.timers = new Map();
+    this.polling = new Set();
+    this.stats = { polls: 0, articles: 0, scored: 0, errors: 0 };
+  }
+
+  start() {
+    for (const name of Object.keys(this.intervals)) {
+      if (this.analyzer.sources[name]) this._schedule(name, 0);
+    }
+    return this;
+  }
+
+  stop() {
+    for (const timer of this.timers.values()) clearTimeout(timer);
+    this.timers.clear();
+  }
+
+  watch(symbol) {
+    this.symbols.add(symbol);
+  }
+
+  // O(1): decayed score for the symbol plus untagged market-wide news
+  getScore(symbol) {
+    if (!this.symbols.has(symbol)) this.watch(symbol);
+    const now = this.now();
+    const own = this._decayed(this.buckets.get(symbol), now);
+    const market = this._decayed(this.buckets.get(MARKET_BUCKET), now);
+    const weight = own.weight + market.weight;
+    // Below one fresh article's worth of weight the score fades toward 0
+    return (own.sum + market.sum) / Math.max(weight, 1);
+  }
+
+  async poll(name) {
+    if (this.polling.has(name)) return 0;
+    this.polling.add(name);
+    try {
+      this.stats.polls++;
+      const articles = await this._fetch(name);
+      return await this.ingest(articles);
+    } catch (error) {
+      this.stats.errors++;
+      console.error(`News poll failed (${name}):`, error);
+      return 0;
+    } finally {
+      this.polling.delete(name);
+    }
+  }
+
+  async ingest(articles) {
+    const now = this.now();
+    const fresh = new Map(); // cacheKey -> article, deduped across sources
+    for (const article of articles) {
+      if (!article.text || article.text.length <= 50) continue;
+      // An unparseable timestamp would pass the age check and poison buckets
+      if (!Number.isFinite(article.timestamp) || now - article.timestamp > this.maxArticleAge) continue;
+      const key = this.analyzer.cacheKey(article.text);
+      if (!this.seen.has(key) && !fresh.has(key)) fresh.set(key, article);
+    }
+    this.stats.articles += articles.length;
+    if (fresh.size === 0) return 0;
+
+    const batch = [...fresh.values()];
+    const scores = await this.analyzer.scoreArticles(batch);
+    // Only mark as seen once scored, so a failed batch is retried next poll
+    for (const key of fresh.keys()) this.seen.set(key, true);
+    this.stats.scored += fresh.size;
+
+    batch.forEach((article, i) => {
+      const weight = Math.exp(-this.decayRate * Math.max(0, now - article.timestamp));
+      if (!Number.isFinite(weight) || !Number.isFinite(scores[i])) return;
+      const symbols = article.symbols?.length ? article.symbols : [MARKET_BUCKET];
+      for (const symbol of symbols) {
+        this._add(symbol, scores[i], weight, now);
+      }
+    });
+    return fresh.size;
+  }
+
+  _fetch(name) {
+    const source = this.analyzer.sources[name];
+    switch (name) {
+      case 'NewsAPI':
+        if (this.symbols.size === 0) return [];
+        return source.getCompanyNews([...this.symbols], { from: this.now() - this.maxArticleAge });
+      case 'Benzinga':
+        return source.getMoversNews();
+      case 'AlphaVantage':
+        return source.sectorSentiment();
+      default:
+        throw new Error(`Unknown news source: ${name}`);
+    }
+  }
+
+  _schedule(name, delay) {
+    const timer = setTimeout(async () => {
+      await this.poll(name);
+      if (this.timers.has(name)) this._schedule(name, this.intervals[name]);
+    }, delay);
+    timer.unref?.();
+    this.timers.set(name, timer);
+  }
+
+  _add(symbol, score, weight, now) {
+    const bucket = this.buckets.get(symbol);
+    if (!bucket) {
+      this.buckets.set(symbol, { sum: score * weight, weight, updatedAt: now });
+      return;
+    }
+    const decay = Math.exp(-this.decayRate * (now - bucket.updatedAt));
+    bucket.sum = bucket.sum * decay + score * weight;
+    bucket.weight = bucket.weight * decay + weight;
+    bucket.updatedAt = now;
+  }
+
+  _decayed(bucket, now) {
+    if (!bucket) return { sum: 0, weight: 0 };
+    const decay = Math.exp(-this.decayRate * (now - bucket.updatedAt));
+    return { sum: bucket.sum * decay, weight: bucket.weight * decay };
+  }
+}
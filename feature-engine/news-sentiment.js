@@ -1,30 +1,66 @@
-import { WordTokenizer, PorterStemmer } from 'natural';
+import { WordTokenizer } from 'natural';
 import * as tf from '@tensorflow/tfjs-node';
 import { readFileSync } from 'fs';
 import fetch from 'node-fetch';
+import { LRUCache } from '../shared/lru-cache.js';
+import { NewsIngester } from './news-ingester.js';
+import { parseAlphaVantageTime, mentionsSymbol } from './news-text.js';
 
 const SEQ_LENGTH = 100;
-const VOCAB_PATH = './config/sentiment-vocab.json';
+// Exported by ml-core/sentiment_model.py (sentiment_corpus.export_vocabulary)
+// with each trained model; not checked in, since its token IDs must match the
+// model's embedding
+const VOCAB_PATH = './shared/sentiment-vocab.json';
 const CACHE_TTL = 300000; // 5 minutes
+const SCORE_CACHE_SIZE = 5000; // articles
 const SENTIMENT_THRESHOLD = 0.7
+const VALIDATOR_CACHE_SIZE = 256; // feeds per client
+
+// GET with ETag / Last-Modified revalidation. Returns null on 304 so pollers
+// skip unchanged feeds without re-downloading or re-scoring them. `key`
+// identifies the feed when the URL carries parameters that move every poll.
+async function conditionalFetch(validators, url, key = url) {
+  const headers = {};
+  const cached = validators.get(key);
+  if (cached?.etag) headers['If-None-Match'] = cached.etag;
+  if (cached?.lastModified) headers['If-Modified-Since'] = cached.lastModified;
+
+  const response = await fetch(url, { headers });
+  if (response.status === 304) return null;
+
+  const etag = response.headers.get('etag');
+  const lastModified = response.headers.get('last-modified');
+  if (etag || lastModified) validators.set(key, { etag, lastModified });
+  return response.json();
+}
 
 class NewsAPIClient {
   constructor(apiKey) {
     this.apiKey = apiKey;
     this.baseUrl = 'https://newsapi.org/v2/everything';
+    this.validators = new LRUCache({ maxSize: VALIDATOR_CACHE_SIZE });
   }
 
-  async getCompanyNews(symbol, { from }) {
+  // Accepts one symbol or a list; a list is fetched in a single OR query
+  async getCompanyNews(symbols, { from }) {
+    const list = [].concat(symbols);
     try {
-      const response = await fetch(
-        `${this.baseUrl}?q=${symbol}&from=${new Date(from).toISOString()}&sortBy=publishedAt&apiKey=${this.apiKey}`
-      );
-      const data = await response.json();
-      return data.articles.map(article => ({
-        source: 'NewsAPI',
-        text: `${article.title}. ${article.description}`,
-        timestamp: new Date(article.publishedAt).getTime()
-      }));
+      const query = encodeURIComponent(list.join(' OR '));
+      // `from` slides with every poll; the feed is the query
+      const feed = `${this.baseUrl}?q=${query}&sortBy=publishedAt&apiKey=${this.apiKey}`;
+      const data = await conditionalFetch(this.validators, `${feed}&from=${new Date(from).toISOString()}`, feed);
+      if (!data) return [];
+      return data.articles.map(article => {
+        const text = `${article.title}. ${article.description}`;
+        return {
+          source: 'NewsAPI',
+          text,
+          timestamp: new Date(article.publishedAt).getTime(),
+          symbols: list.length === 1
+            ? list
+            : list.filter(symbol => mentionsSymbol(text, symbol))
+        };
+      });
     } catch (error) {
       console.error('NewsAPI Error:', error);
       return [];
@@ -36,16 +72,21 @@ class BenzingaClient {
   constructor(apiKey) {
     this.apiKey = apiKey;
     this.baseUrl = 'https://api.benzinga.com/api/v2/news';
+    this.validators = new LRUCache({ maxSize: VALIDATOR_CACHE_SIZE });
   }
 
   async getMoversNews() {
     try {
-      const response = await fetch(`${this.baseUrl}?apikey=${this.apiKey}&parameters[channels]=movers`);
-      const data = await response.json();
+      const data = await conditionalFetch(
+        this.validators,
+        `${this.baseUrl}?apikey=${this.apiKey}&parameters[channels]=movers`
+      );
+      if (!data) return [];
       return data.map(article => ({
         source: 'Benzinga',
         text: `${article.title}. ${article.teaser}`,
-        timestamp: new Date(article.created).getTime()
+        timestamp: new Date(article.created).getTime(),
+        symbols: (article.stocks || []).map(stock => stock.name)
       }));
     } catch (error) {
       console.error('Benzinga Error:', error);
@@ -58,18 +99,21 @@ class AlphaVantageClient {
   constructor(apiKey) {
     this.apiKey = apiKey;
     this.baseUrl = 'https://www.alphavantage.co/query';
+    this.validators = new LRUCache({ maxSize: VALIDATOR_CACHE_SIZE });
   }
 
   async sectorSentiment() {
     try {
-      const response = await fetch(
+      const data = await conditionalFetch(
+        this.validators,
         `${this.baseUrl}?function=NEWS_SENTIMENT&apikey=${this.apiKey}`
       );
-      const data = await response.json();
+      if (!data) return [];
       return data.feed.map(article => ({
         source: 'AlphaVantage',
         text: `${article.title}. ${article.summary}`,
-        timestamp: new Date(article.time_published).getTime()
+        timestamp: parseAlphaVantageTime(article.time_published),
+        symbols: (article.ticker_sentiment || []).map(t => t.ticker)
       }));
     } catch (error) {
       console.error('AlphaVantage Error:', error);
@@ -78,45 +122,82 @@ class AlphaVantageClient {
   }
 }
 
+function loadVocabulary(path = VOCAB_PATH) {
+  try {
+    return JSON.parse(readFileSync(path));
+  } catch (error) {
+    throw new Error(`Cannot read sentiment vocabulary ${path} (train with ml-core/sentiment_model.py to export it): ${error.message}`);
+  }
+}
+
 export class NewsSentimentAnalyzer {
   constructor(model) {
     this.tokenizer = new WordTokenizer();
-    this.stemmer = PorterStemmer;
     this.tfModel = model;
-    this.vocabulary = JSON.parse(readFileSync(VOCAB_PATH));
+    this.vocabulary = loadVocabulary();
+    this.unkIndex = this.vocabulary['<UNK>'] ?? 1;
     this.negativeWords = new Set(['downgrade', 'bankrupt', 'fraud', 'sell', 'cut', 'warning', 'drop']);
     this.positiveWords = new Set(['upgrade', 'buy', 'strong', 'beat', 'raise', 'growth', 'surge']);
-    this.memoCache = new Map();
+    // Per-article scores (plain numbers, never tensors). Keyed on article text
+    // so the same Benzinga/AlphaVantage story is scored once for all symbols.
+    this.cacheKeyBytes = 0;
+    this.scoreCache = new LRUCache({
+      maxSize: SCORE_CACHE_SIZE,
+      ttl: CACHE_TTL,
+      onEvict: (key) => { this.cacheKeyBytes -= key.length * 2; }
+    });
+    this.inflight = new Map(); // cacheKey -> Promise<score>
     this.sources = {
       NewsAPI: new NewsAPIClient(process.env.NEWSAPI_KEY),
       Benzinga: new BenzingaClient(process.env.BENZINGA_KEY),
       AlphaVantage: new AlphaVantageClient(process.env.ALPHAVANTAGE_KEY)
     };
 
-    // Cache cleanup every minute
-    setInterval(() => {
-      const now = Date.now();
-      for (const [key, { expiry }] of this.memoCache) {
-        if (now > expiry) this.memoCache.delete(key);
-      }
-    }, 60000);
+    // Expired-score cleanup every minute
+    this.pruneInterval = setInterval(() => this.scoreCache.prune(), 60000);
+    this.pruneInterval.unref?.();
   }
 
-  static async init() {
+  static async init({ symbols = [], ingest = true } = {}) {
     const model = await tf.loadLayersModel('file://./models/sentiment-model/model.json');
-    return new NewsSentimentAnalyzer(model);
+    const analyzer = new NewsSentimentAnalyzer(model);
+    if (ingest) analyzer.startIngestion(symbols);
+    return analyzer;
+  }
+
+  // Poll all sources in the background; composite reads become O(1)
+  startIngestion(symbols = []) {
+    this.ingester = new NewsIngester(this, { symbols }).start();
+    return this.ingester;
   }
 
   async getCompositeSentiment(symbol) {
+    if (this.ingester) return this.ingester.getScore(symbol);
     try {
       const articles = await this._fetchRecentArticles(symbol);
-      return articles.length > 0 ? this._analyzeArticles(articles) : 0;
+      return articles.length > 0 ? await this._analyzeArticles(articles) : 0;
     } catch (error) {
       console.error('Sentiment Analysis Error:', error);
       return 0;
     }
   }
 
+  getCacheStats() {
+    const tfMemory = tf.memory();
+    return {
+      ...this.scoreCache.stats(),
+      keyBytes: this.cacheKeyBytes,
+      numTensors: tfMemory.numTensors,
+      tensorBytes: tfMemory.numBytes
+    };
+  }
+
+  dispose() {
+    this.ingester?.stop();
+    clearInterval(this.pruneInterval);
+    this.scoreCache.clear();
+  }
+
   async _fetchRecentArticles(symbol) {
     const [newsAPI, benzinga, alphaVantage] = await Promise.allSettled([
       this.sources.NewsAPI.getCompanyNews(symbol, { from: Date.now() - 3600000 }),
@@ -135,51 +216,90 @@ export class NewsSentimentAnalyzer {
     return result.status === 'fulfilled' ? result.value : [];
   }
 
-  _textToTensor(text) {
-    // Preprocessing Optimization with caching
-    const cacheKey = text.substring(0, 500).toLowerCase();
-    if (this.memoCache.has(cacheKey)) {
-      return this.memoCache.get(cacheKey).tensor;
-    }
-    // 1. Clean and normalize text
+  // Dedup key for an article; NewsIngester uses it to skip already-seen text
+  cacheKey(text) {
+    return text.substring(0, 500).toLowerCase();
+  }
+
+  // Write the padded token IDs for one article into row `row` of `out`
+  _encodeText(text, out, row) {
+    // 1. Clean and normalize text (mirrors sentiment_corpus.preprocess_corpus)
     const cleanText = text.toLowerCase()
-      .replace(/[^a-z\s]/g, '')
-      .replace(/\s+/g, ' ')
-      .trim()
-      .substring(0, 500);
-    
-    // 2. Tokenize and stem
-    const tokens = this.tokenizer.tokenize(cleanText)
-      .map(token => this.stemmer.stem(token))
-      .filter(token => token.length > 2);
-
-    // 3. Convert to numerical indices
-    const indices = tokens.map(token => 
-      this.vocabulary[token] || this.vocabulary['<UNK>']
-    );
-
-    // 4. Pad/truncate sequence
-    const padded = Array(SEQ_LENGTH).fill(0);
-    indices.slice(0, SEQ_LENGTH).forEach((val, idx) => padded[idx] = val);
-
-    const tensor = tf.tensor2d([padded], [1, SEQ_LENGTH]);
-    this.memoCache.set(cacheKey, {
-      tensor,
-      expiry: Date.now() + CACHE_TTL
-    });
+      .replace(/[\r\n]+/g, ' ')
+      .replace(/[^a-z\s]+/g, '')
+      .trim();
+    if (!cleanText) return;
 
-    return tensor;
+    // 2. Whitespace tokenize, same as the training vocabulary
+    const tokens = cleanText.split(/\s+/);
+
+    // 3. Convert to numerical indices; the rest of the row stays zero-padded
+    const offset = row * SEQ_LENGTH;
+    const length = Math.min(tokens.length, SEQ_LENGTH);
+    for (let i = 0; i < length; i++) {
+      out[offset + i] = this.vocabulary[tokens[i]] ?? this.unkIndex;
+    }
   }
 
-  _analyzeArticles(articles) {
-    const scores = articles.map(article => {
-      const tensor = this._textToTensor(article.text);
-      const tfScore = this.tfModel.predict(tensor).dataSync()[0];
-      const ruleScore = this._ruleBasedScore(article.text);
-      return (0.7 * tfScore) + (0.3 * ruleScore);
+  async _scoreArticles(texts) {
+    // One [N, SEQ_LENGTH] predict for every uncached article
+    const ids = new Int32Array(texts.length * SEQ_LENGTH);
+    texts.forEach((text, row) => this._encodeText(text, ids, row));
+
+    const input = tf.tensor2d(ids, [texts.length, SEQ_LENGTH], 'int32');
+    let output;
+    try {
+      output = this.tfModel.predict(input);
+      return await output.data();
+    } finally {
+      tf.dispose([input, output]);
+    }
+  }
+
+  // Scores aligned with `articles`; each distinct text is predicted at most once
+  async scoreArticles(articles) {
+    const scores = new Array(articles.length);
+    const toScore = new Map(); // cacheKey -> { text, rows }
+
+    articles.forEach((article, row) => {
+      const key = this.cacheKey(article.text);
+      const cached = this.scoreCache.get(key);
+      if (cached !== undefined) {
+        scores[row] = cached;
+      } else if (this.inflight.has(key)) {
+        // Already being scored for another symbol
+        scores[row] = this.inflight.get(key);
+      } else if (toScore.has(key)) {
+        toScore.get(key).rows.push(row);
+      } else {
+        toScore.set(key, { text: article.text, rows: [row] });
+      }
     });
 
-    return scores.length > 0 
+    if (toScore.size > 0) {
+      const pending = [...toScore];
+      const batch = this._scoreArticles(pending.map(([, { text }]) => text));
+
+      pending.forEach(([key, { text, rows }], i) => {
+        const score = batch
+          .then(tfScores => {
+            const combined = (0.7 * tfScores[i]) + (0.3 * this._ruleBasedScore(text));
+            this.scoreCache.set(key, combined);
+            this.cacheKeyBytes += key.length * 2;
+            return combined;
+          })
+          .finally(() => this.inflight.delete(key));
+        this.inflight.set(key, score);
+        rows.forEach(row => { scores[row] = score; });
+      });
+    }
+
+    return Promise.all(scores);
+  }
+
+  async _analyzeArticles(articles) {
+    const scores = await this.scoreArticles(articles);
+    return scores.length > 0
       ? scores.reduce((sum, score) => sum + score, 0) / scores.length
       : 0;
   }
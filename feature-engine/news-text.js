@@ -0,0 +1,20 @@
+// feature-engine/news-text.js
+// Dependency-free parsing helpers for the news source clients, kept apart from
+// news-sentiment.js so they load without tfjs or the tokenizer.
+
+// AlphaVantage time_published is compact ISO, "20231115T201500" (UTC), which
+// Date does not parse; NaN for anything else
+export function parseAlphaVantageTime(value) {
+  const match = /^(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})?$/.exec(value ?? '');
+  if (!match) return NaN;
+  const [, year, month, day, hour, minute, second = '0'] = match;
+  return Date.UTC(+year, +month - 1, +day, +hour, +minute, +second);
+}
+
+const escapeRegExp = value => value.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+
+// Whole-symbol match: "BRK.B" is literal and "BRK" does not match inside it,
+// while a sentence-ending period after the symbol still counts
+export function mentionsSymbol(text, symbol) {
+  return new RegExp(`(?<![\\w.])${escapeRegExp(symbol)}(?!\\.?\\w)`).test(text);
+}
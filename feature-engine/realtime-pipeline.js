@@ -1,45 +1,380 @@
 // feature-engine/realtime-pipeline.js
+// Coordinator for the sharded feature pipeline. Symbols are spread across
+// worker_threads (feature-worker.js); each message is encoded into the owning
+// shard's SharedArrayBuffer ring without awaiting anything, workers compute
+// features off the main thread, and the coordinator drains their output rings
+// into one Redis pipeline per batch. Symbols can be added or removed at
+// runtime, directly or via the `pipeline:control` channel. Stream messages
+// are `{ symbol, data, trace? }`; traces ride the rings to model:input.
+import { Worker } from 'worker_threads';
 import Redis from 'ioredis';
-import { FeatureEngine } from './realtime-features.js';
+import { toBar } from './bar-window.js';
+import { FEATURE_NAMES } from './feature-vector.js';
+import {
+  IN, INPUT_WIDTH, KIND, OUT, OUTPUT_WIDTH, STATS, STATS_FIELDS, clock
+} from './feature-worker.js';
+import { SharedRing } from './shared-ring.js';
+import config from '../shared/config.js';
+import { featureBridge } from '../shared/feature-bridge.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+import { tracer as sharedTracer } from '../shared/tracing.js';
+import { log } from '../shared/structured-log.js';
 
-const redis = new Redis(process.env.REDIS_URL);
-const SYMBOLS = ['AAPL', 'MSFT', 'GOOGL']; // Add your symbols
+const STREAM_CHANNEL = 'polygon:stream';
+const CONTROL_CHANNEL = 'pipeline:control';
+const WINDOW_MINUTES = 60; // bar snapshot retention, as in RollingWindowManager
 
 export class RealTimePipeline {
-  constructor() {
-    this.engines = new Map(
-      SYMBOLS.map(symbol => [symbol, new FeatureEngine(symbol)])
-    );
+  constructor({
+    symbols = config.pipeline.symbols,
+    shards = config.pipeline.shards,
+    ringCapacity = config.pipeline.ringCapacity,
+    redisClient = null,
+    subscriber = null,
+    bridge = featureBridge,
+    workerOptions = {},
+    drainInterval = 50, // ms; upper bound on idle waits
+    tracer = sharedTracer
+  } = {}) {
+    this.initialSymbols = symbols;
+    this.shardCount = Math.max(1, shards);
+    this.ringCapacity = ringCapacity;
+    this.redis = redisClient;
+    this.subscriber = subscriber;
+    this.bridge = bridge;
+    this.workerOptions = workerOptions;
+    this.drainInterval = drainInterval;
+    this.tracer = tracer;
+
+    this.shards = [];
+    this.symbols = new Map(); // symbol -> { symbol, id, shard, pending }
+    this.ids = new Map();     // id -> entry; ids are never reused
+    this.subscribing = new Map(); // symbol -> pending subscribe()
+    this.nextId = 1;
+    this.snapshots = [];      // raw bars awaiting the next Redis batch
+    this.wake = new Int32Array(new SharedArrayBuffer(4)); // bumped by workers
+    this.record = new Float64Array(INPUT_WIDTH);
+    this.outRecord = new Float64Array(OUTPUT_WIDTH);
+    this.running = false;
+    this.metrics = { unrouted: 0, parseErrors: 0, published: 0, publishErrors: 0 };
   }
 
   async start() {
-    // Subscribe to Polygon stream
-    redis.subscribe('polygon:stream', (err) => {
-      if (err) throw err;
+    this.redis ??= new Redis(config.REDIS_URL);
+    this.subscriber ??= this.redis.duplicate();
+    this.shards = Array.from({ length: this.shardCount }, (_, index) => this._spawnShard(index));
+    this.running = true;
+
+    // Rebuild in-process bar windows from their Redis snapshots
+    await Promise.all(this.initialSymbols.map(symbol => this.subscribe(symbol)));
+
+    this.subscriber.on('message', (channel, message) => {
+      if (channel === CONTROL_CHANNEL) this._control(message);
+      else this.handleMessage(message);
     });
+    await this.subscriber.subscribe(STREAM_CHANNEL, CONTROL_CHANNEL);
+    this.drainLoop = this._drainLoop();
+  }
 
-    redis.on('message', async (channel, message) => {
-      const { symbol, data } = JSON.parse(message);
-      const engine = this.engines.get(symbol);
-      
-      // Update rolling window
-      await engine.windowManager.updateWindow(
-        Date.now(),
-        data
-      );
-      
-      // Calculate features
-      const features = await engine.calculateFeatures();
-      
-      // Publish to model queue
-      if(features) {
-        await redis.xadd(
-          `model:input:${symbol}`,
-          '*',
-          'features',
-          JSON.stringify(features)
-        );
+  async stop() {
+    this.running = false;
+    Atomics.notify(this.wake, 0);
+    await this.drainLoop;
+    this.drain();
+    await Promise.all(this.shards.map(shard => shard.worker.terminate()));
+    await this.subscriber?.unsubscribe?.(STREAM_CHANNEL, CONTROL_CHANNEL);
+  }
+
+  _spawnShard(index) {
+    const input = new SharedRing({ capacity: this.ringCapacity, width: INPUT_WIDTH });
+    const output = new SharedRing({ capacity: this.ringCapacity, width: OUTPUT_WIDTH });
+    const stats = new Float64Array(new SharedArrayBuffer(STATS_FIELDS * 8));
+    const worker = new Worker(new URL('./feature-worker.js', import.meta.url), {
+      workerData: {
+        role: 'feature-shard',
+        input: input.describe(),
+        output: output.describe(),
+        wake: this.wake.buffer,
+        stats: stats.buffer,
+        options: this.workerOptions
       }
     });
+    worker.on('error', error => log.error('pipeline.shard', 'Feature shard failed', { shard: index, error }));
+    return {
+      index,
+      worker,
+      input,
+      output,
+      stats,
+      symbols: new Set(),
+      lag: new LatencyHistogram(), // message received -> features drained
+      routed: 0,
+      dropped: 0,
+      published: 0,
+      notifyQueued: false,
+      sample: { at: clock(), messages: 0 }
+    };
+  }
+
+  // Least-loaded shard; restored bars are routed before live messages
+  subscribe(symbol) {
+    if (this.subscribing.has(symbol)) return this.subscribing.get(symbol);
+    if (this.symbols.has(symbol)) return Promise.resolve(this.symbols.get(symbol));
+    this.subscribing.set(symbol, this._subscribe(symbol).finally(() => this.subscribing.delete(symbol)));
+    return this.subscribing.get(symbol);
+  }
+
+  // The entry is routable at once; live messages that arrive while its
+  // snapshot is restored are buffered and replayed after the restored bars
+  async _subscribe(symbol) {
+    const shard = this.shards.reduce((best, s) => (s.symbols.size < best.symbols.size ? s : best));
+    const entry = { symbol, id: this.nextId++, shard, pending: [] };
+    shard.symbols.add(symbol);
+    this.symbols.set(symbol, entry);
+    this.ids.set(entry.id, entry);
+    try {
+      await this._restore(entry);
+    } catch (error) {
+      log.warn('pipeline.restore', 'Bar window restore failed', { symbol, error });
+    }
+    const { pending } = entry;
+    entry.pending = null;
+    if (this.symbols.get(symbol) === entry) {
+      for (const [data, receivedAt, trace] of pending) this._route(entry, data, receivedAt, trace);
+    }
+    return entry;
+  }
+
+  unsubscribe(symbol) {
+    const entry = this.symbols.get(symbol);
+    if (!entry) return false;
+    this.symbols.delete(symbol);
+    this.ids.delete(entry.id);
+    entry.shard.symbols.delete(symbol);
+    entry.pending = null;
+    // In-band, so the worker drops state after the symbol's last records
+    this.record.fill(0);
+    this.record[IN.KIND] = KIND.UNSUBSCRIBE;
+    this.record[IN.SYMBOL] = entry.id;
+    this._push(entry.shard, this.record);
+    return true;
+  }
+
+  // { action: 'subscribe' | 'unsubscribe', symbol }
+  _control(message) {
+    try {
+      const { action, symbol } = JSON.parse(message);
+      if (action === 'subscribe') this.subscribe(symbol);
+      else if (action === 'unsubscribe') this.unsubscribe(symbol);
+    } catch (error) {
+      this.metrics.parseErrors++;
+    }
+  }
+
+  async _restore(entry) {
+    const data = await this.redis.zrange(`rollingWindow:${entry.symbol}`, 0, -1);
+    const bars = data.map(JSON.parse).sort((a, b) => a.timestamp - b.timestamp);
+    // Factor requests for the whole snapshot share one bridge frame
+    const factors = await Promise.all(bars.map(({ timestamp }) => this._factors(entry.symbol, timestamp)));
+    if (this.symbols.get(entry.symbol) !== entry) return; // unsubscribed meanwhile
+    bars.forEach(({ timestamp, data: raw }, i) => this._pushBar(entry, toBar(raw), timestamp, factors[i], clock()));
+  }
+
+  _factors(symbol, timestamp) {
+    return this.bridge.cachedFactors(symbol, timestamp) ?? this.bridge.adjustmentFactors(symbol, timestamp);
+  }
+
+  // Synchronous for quotes, trades and bars with cached adjustment factors
+  handleMessage(message) {
+    const receivedAt = clock();
+    let parsed;
+    try {
+      parsed = JSON.parse(message);
+    } catch (error) {
+      this.metrics.parseErrors++;
+      return;
+    }
+    const { symbol, data } = parsed;
+    const entry = this.symbols.get(symbol);
+    if (!entry || !data) {
+      this.metrics.unrouted++;
+      return;
+    }
+    const trace = parsed.trace ? this.tracer.mark(this.tracer.extract(parsed.trace), 'transport', receivedAt) : null;
+    if (entry.pending) {
+      if (entry.pending.length < this.ringCapacity) entry.pending.push([data, receivedAt, trace]);
+      else entry.shard.dropped++;
+      return;
+    }
+    this._route(entry, data, receivedAt, trace);
+  }
+
+  _route(entry, data, receivedAt, trace) {
+    const { symbol } = entry;
+    const record = this.record;
+    record.fill(0);
+    record[IN.SYMBOL] = entry.id;
+    record[IN.TIMESTAMP] = data.t || Date.now();
+    record[IN.RECEIVED] = receivedAt;
+    if (trace) {
+      record[IN.TRACE_ID] = trace.id;
+      record[IN.TRACE_ORIGIN] = trace.origin;
+    }
+    switch (data.ev) {
+      case 'Q':
+        record[IN.KIND] = KIND.QUOTE;
+        record[IN.VALUES] = data.bp || 0;
+        record[IN.VALUES + 1] = data.bs || 0;
+        record[IN.VALUES + 2] = data.ap || 0;
+        record[IN.VALUES + 3] = data.as || 0;
+        this._push(entry.shard, record);
+        return;
+      case 'T':
+        record[IN.KIND] = KIND.TRADE;
+        record[IN.VALUES] = data.p;
+        record[IN.VALUES + 1] = data.s || 0;
+        this._push(entry.shard, record);
+        return;
+      default: { // Aggregate bar
+        const bar = toBar(data);
+        this.snapshots.push([symbol, { timestamp: bar.timestamp, data }]);
+        const factors = this._factors(symbol, bar.timestamp);
+        if (!(factors instanceof Promise)) {
+          this._pushBar(entry, bar, bar.timestamp, factors, receivedAt, trace);
+          return;
+        }
+        factors.then(resolved => {
+          if (this.symbols.get(symbol) === entry) this._pushBar(entry, bar, bar.timestamp, resolved, receivedAt, trace);
+        });
+      }
+    }
+  }
+
+  _pushBar(entry, bar, timestamp, { priceScale, priceOffset, volumeScale }, receivedAt, trace = null) {
+    const record = this.record;
+    record[IN.KIND] = KIND.BAR;
+    record[IN.SYMBOL] = entry.id;
+    record[IN.TIMESTAMP] = timestamp;
+    record[IN.VALUES] = bar.open * priceScale + priceOffset;
+    record[IN.VALUES + 1] = bar.high * priceScale + priceOffset;
+    record[IN.VALUES + 2] = bar.low * priceScale + priceOffset;
+    record[IN.VALUES + 3] = bar.close * priceScale + priceOffset;
+    record[IN.VALUES + 4] = bar.volume * volumeScale;
+    record[IN.VALUES + 5] = bar.vwap * priceScale + priceOffset;
+    record[IN.RECEIVED] = receivedAt;
+    record[IN.TRACE_ID] = trace ? trace.id : 0;
+    record[IN.TRACE_ORIGIN] = trace ? trace.origin : 0;
+    this._push(entry.shard, record);
+  }
+
+  // One notify per shard per turn, however many records were pushed
+  _push(shard, record) {
+    if (!shard.input.push(record)) {
+      shard.dropped++;
+      return;
+    }
+    shard.routed++;
+    if (!shard.notifyQueued) {
+      shard.notifyQueued = true;
+      queueMicrotask(() => {
+        shard.notifyQueued = false;
+        shard.input.notify();
+      });
+    }
+  }
+
+  async _drainLoop() {
+    while (this.running) {
+      const seq = Atomics.load(this.wake, 0);
+      if (this.drain() > 0) {
+        await new Promise(setImmediate); // let socket reads in between batches
+        continue;
+      }
+      const wait = Atomics.waitAsync(this.wake, 0, seq, this.drainInterval);
+      if (wait.async) await wait.value;
+    }
+  }
+
+  // Publish every computed vector and pending bar snapshot in one pipeline
+  drain() {
+    if (!this.redis) return 0;
+    const batch = this.redis.pipeline();
+    const now = clock();
+    const rec = this.outRecord;
+    let published = 0;
+
+    for (const shard of this.shards) {
+      while (shard.output.pop(rec)) {
+        const entry = this.ids.get(rec[OUT.SYMBOL]);
+        if (!entry) continue; // unsubscribed while in flight
+        const features = {};
+        FEATURE_NAMES.forEach((name, i) => { features[name] = rec[OUT.FEATURES + i]; });
+        features.volumeSpike = features.volumeSpike === 1;
+        const fields = ['features', JSON.stringify(features)];
+        if (rec[OUT.TRACE_ID] !== 0) {
+          const trace = { id: rec[OUT.TRACE_ID], origin: rec[OUT.TRACE_ORIGIN], last: rec[OUT.RECEIVED] };
+          this.tracer.mark(trace, 'features', rec[OUT.COMPUTED]);
+          this.tracer.mark(trace, 'drain', now);
+          fields.push('trace', this.tracer.inject(trace));
+        }
+        batch.xadd(
+          `${config.modelInput.prefix}:${entry.symbol}`,
+          'MAXLEN', '~', config.modelInput.maxLen,
+          '*', ...fields
+        );
+        shard.lag.record(now - rec[OUT.RECEIVED]);
+        shard.published++;
+        published++;
+      }
+    }
+
+    const snapshots = this.snapshots;
+    if (snapshots.length) {
+      this.snapshots = [];
+      const cutoff = Date.now() - WINDOW_MINUTES * 60000;
+      for (const [symbol, entry] of snapshots) {
+        batch.zadd(`rollingWindow:${symbol}`, entry.timestamp, JSON.stringify(entry));
+        batch.zremrangebyscore(`rollingWindow:${symbol}`, '-inf', cutoff);
+      }
+    }
+
+    if (published > 0 || snapshots.length > 0) {
+      batch.exec().catch(error => {
+        this.metrics.publishErrors++;
+        log.error('pipeline.publish', 'Feature publish failed', { error, published });
+      });
+    }
+    this.metrics.published += published;
+    return published;
+  }
+
+  // Per-shard throughput (messages/s since the previous call), queue depth,
+  // drops and received -> published lag
+  getMetrics() {
+    const now = clock();
+    return {
+      symbols: this.symbols.size,
+      ...this.metrics,
+      shards: this.shards.map(shard => {
+        const messages = shard.stats[STATS.MESSAGES];
+        const elapsed = (now - shard.sample.at) / 1000;
+        const throughput = elapsed > 0 ? (messages - shard.sample.messages) / elapsed : 0;
+        shard.sample = { at: now, messages };
+        return {
+          shard: shard.index,
+          symbols: [...shard.symbols],
+          routed: shard.routed,
+          processed: messages,
+          features: shard.stats[STATS.FEATURES],
+          published: shard.published,
+          dropped: shard.dropped,
+          outputDropped: shard.stats[STATS.OUTPUT_DROPPED],
+          queueDepth: shard.input.size,
+          busyMs: shard.stats[STATS.BUSY_MS],
+          throughput,
+          lag: shard.lag.snapshot()
+        };
+      })
+    };
   }
-}
\ No newline at end of file
+}
@@ -0,0 +1,69 @@
+// feature-engine/shared-ring.js
+// Single-producer/single-consumer ring of fixed-width float64 records in a
+// SharedArrayBuffer, shared between the pipeline coordinator and a worker.
+// head/tail are free-running int32 counters (capacity is a power of two, so
+// slot = counter & mask survives wrap-around); the producer publishes a
+// record with an Atomics.store of head after writing it.
+const HEAD = 0;
+const TAIL = 1;
+const SIGNAL = 2;    // bumped by notify(); consumers wait on it
+const HEADER_BYTES = 16;
+
+export class SharedRing {
+  static bytesFor(capacity, width) {
+    return HEADER_BYTES + capacity * width * 8;
+  }
+
+  constructor({ capacity = 4096, width, buffer = null }) {
+    if (capacity & (capacity - 1)) throw new Error('Ring capacity must be a power of two');
+    this.capacity = capacity;
+    this.width = width;
+    this.mask = capacity - 1;
+    this.buffer = buffer || new SharedArrayBuffer(SharedRing.bytesFor(capacity, width));
+    this.header = new Int32Array(this.buffer, 0, 4);
+    this.data = new Float64Array(this.buffer, HEADER_BYTES, capacity * width);
+  }
+
+  // Plain description that can be posted to a worker and reopened there
+  describe() {
+    return { capacity: this.capacity, width: this.width, buffer: this.buffer };
+  }
+
+  get size() {
+    return (Atomics.load(this.header, HEAD) - Atomics.load(this.header, TAIL)) | 0;
+  }
+
+  // Producer side; returns false (record dropped) when the ring is full
+  push(record) {
+    const head = Atomics.load(this.header, HEAD);
+    if (((head - Atomics.load(this.header, TAIL)) | 0) >= this.capacity) return false;
+    const offset = (head & this.mask) * this.width;
+    for (let i = 0; i < this.width; i++) this.data[offset + i] = record[i] ?? 0;
+    Atomics.store(this.header, HEAD, (head + 1) | 0);
+    return true;
+  }
+
+  // Consumer side; copies the oldest record into `out`
+  pop(out) {
+    const tail = Atomics.load(this.header, TAIL);
+    if (tail === Atomics.load(this.header, HEAD)) return false;
+    const offset = (tail & this.mask) * this.width;
+    for (let i = 0; i < this.width; i++) out[i] = this.data[offset + i];
+    Atomics.store(this.header, TAIL, (tail + 1) | 0);
+    return true;
+  }
+
+  // Wake a consumer parked in waitAsync(); call once per pushed batch
+  notify() {
+    Atomics.add(this.header, SIGNAL, 1);
+    Atomics.notify(this.header, SIGNAL);
+  }
+
+  // Resolves when records are available, notify() is called or `timeout` ms pass
+  waitAsync(timeout = Infinity) {
+    const seq = Atomics.load(this.header, SIGNAL);
+    if (this.size > 0) return Promise.resolve('ok');
+    const result = Atomics.waitAsync(this.header, SIGNAL, seq, timeout);
+    return result.async ? result.value : Promise.resolve(result.value);
+  }
+}
@@ -0,0 +1,280 @@
+"""
+Feature Attribution
+
+Gradient-based SHAP approximations for the hybrid model's outputs
+(create_hybrid_model: [60, 6] windows -> direction, volatility, position),
+computed in large batches on CPU and reduced to per-feature and
+per-timestep weights:
+
+- 'gradient': gradient x input, one backward pass per output
+- 'integrated': integrated gradients from a fixed baseline (the background
+  mean, else zeros) with `steps` midpoint-rule points per window
+- 'expected': expected gradients, the estimator behind SHAP's
+  GradientExplainer: per window, `steps` (background window, alpha) draws;
+  attributions sum to f(x) - E[f(background)] in expectation
+- All three outputs are explained from one forward pass per batch (a
+  persistent tape); windows stream through in fixed-size batches and only
+  running sums are kept, so memory does not grow with the number of windows
+- Results are cached by model version (a hash of the weights), data slice
+  (a caller key or a hash of the windows), method and parameters
+
+Usage:
+    python ml-core/feature_attribution.py --model ml-core/hybrid_model.h5 --windows windows.npy
+        [--slice AAPL:2024H1] [--method expected] [--steps 16] [--batch-size 256]
+        [--background 1024] [--cache-dir ml-core/attributions]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Model input columns, in feature-engine/feature-vector.js FEATURE_NAMES order
+FEATURES = ['atr5', 'orderBookImbalance', 'rsi3', 'vwapDeviation', 'volumeSpike', 'orderFlowImbalance']
+METHODS = ('gradient', 'integrated', 'expected')
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'attributions')
+
+# batch (windows, timesteps, features) -> attributions (outputs, windows, timesteps, features)
+Explainer = Callable[[np.ndarray], np.ndarray]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Attribution:
+    method: str
+    model_version: str
+    slice_key: str
+    outputs: List[str]
+    features: List[str]
+    samples: int
+    mean: np.ndarray      # (outputs, timesteps, features), signed
+    mean_abs: np.ndarray  # (outputs, timesteps, features), mean |attribution|
+    params: Dict[str, object] = field(default_factory=dict)
+    seconds: float = 0.0
+    values: Optional[np.ndarray] = None  # per window, only with keep=True; never cached
+
+    @property
+    def per_feature(self) -> np.ndarray:
+        """(outputs, features): mean |attribution| summed over timesteps"""
+        return self.mean_abs.sum(axis=1)
+
+    @property
+    def per_timestep(self) -> np.ndarray:
+        """(outputs, timesteps): mean |attribution| summed over features"""
+        return self.mean_abs.sum(axis=2)
+
+    def weights(self, output: str = 'direction') -> Dict[str, float]:
+        """Feature shares of the output's total |attribution|, summing to 1"""
+        totals = self.per_feature[self.outputs.index(output)]
+        total = totals.sum()
+        shares = totals / total if total > 0 else np.full_like(totals, 1 / len(totals))
+        return dict(zip(self.features, shares.tolist()))
+
+
+def model_version(model) -> str:
+    """Content hash of the model's weights"""
+    digest = hashlib.blake2b(digest_size=8)
+    for weights in model.get_weights():
+        digest.update(str(weights.shape).encode())
+        digest.update(np.ascontiguousarray(weights).tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint(windows: np.ndarray, chunk: int = 65536) -> str:
+    """Content hash of a window array (memory-mapped arrays are hashed in chunks)"""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f'{windows.shape}{windows.dtype}'.encode())
+    for start in range(0, len(windows), chunk):
+        digest.update(np.ascontiguousarray(windows[start:start + chunk]).tobytes())
+    return digest.hexdigest()
+
+
+def make_explainer(model, method: str = 'expected', background: Optional[np.ndarray] = None,
+                   steps: int = 16, seed: int = 0) -> Explainer:
+    """Batched attribution function for a Keras model (TensorFlow loaded here)"""
+    import tensorflow as tf
+
+    if method not in METHODS:
+        raise ValueError(f"Unknown attribution method {method!r}, expected one of {METHODS}")
+    if method == 'expected' and background is None:
+        raise ValueError("Expected gradients need background windows")
+
+    @tf.function(reduce_retracing=True)
+    def gradients(points):
+        with tf.GradientTape(persistent=True) as tape:
+            tape.watch(points)
+            outputs = model(points, training=False)
+            outputs = outputs if isinstance(outputs, (list, tuple)) else [outputs]
+        # Windows are independent (no batch statistics), so the gradient of
+        # the batch sum is the per-window gradient
+        return tf.stack([tape.gradient(output, points) for output in outputs])
+
+    def run(points: np.ndarray) -> np.ndarray:
+        return gradients(tf.convert_to_tensor(points, dtype=tf.float32)).numpy()
+
+    if method == 'gradient':
+        return lambda batch: run(batch) * batch
+
+    rng = np.random.default_rng(seed)
+    if method == 'integrated':
+        reference = (background.mean(axis=0) if background is not None
+                     else np.zeros(model.input_shape[1:])).astype(np.float32)
+        alphas = ((np.arange(steps) + 0.5) / steps).astype(np.float32)
+
+        def integrated(batch):
+            delta = batch - reference
+            points = reference + alphas[:, None, None, None] * delta  # (steps, windows, T, F)
+            grads = run(points.reshape(-1, *batch.shape[1:]))
+            return grads.reshape(grads.shape[0], steps, *batch.shape).mean(axis=1) * delta
+
+        return integrated
+
+    background = np.asarray(background, dtype=np.float32)
+
+    def expected(batch):
+        references = background[rng.integers(0, len(background), (steps, len(batch)))]
+        alphas = rng.random((steps, len(batch), 1, 1), dtype=np.float32)
+        delta = batch - references  # (steps, windows, T, F)
+        grads = run((references + alphas * delta).reshape(-1, *batch.shape[1:]))
+        return (grads.reshape(grads.shape[0], steps, *batch.shape) * delta).mean(axis=1)
+
+    return expected
+
+
+def accumulate(explain: Explainer, windows: np.ndarray, batch_size: int = 256, keep: bool = False):
+    """Stream windows through `explain`; returns (count, mean, mean_abs, values)"""
+    total = total_abs = None
+    kept = []
+    for start in range(0, len(windows), batch_size):
+        batch = np.ascontiguousarray(windows[start:start + batch_size], dtype=np.float32)
+        values = explain(batch)
+        if total is None:
+            total = np.zeros((values.shape[0], *values.shape[2:]))
+            total_abs = np.zeros_like(total)
+        total += values.sum(axis=1)
+        total_abs += np.abs(values).sum(axis=1)
+        if keep:
+            kept.append(values)
+    count = len(windows)
+    if count == 0:
+        raise ValueError("No windows to attribute")
+    return count, total / count, total_abs / count, np.concatenate(kept, axis=1) if keep else None
+
+
+class AttributionCache:
+    """Attribution summaries on disk, one .npz per (model version, slice, method, params)"""
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def key(model_version: str, slice_key: str, method: str, params: Dict[str, object]) -> str:
+        spec = json.dumps([model_version, slice_key, method, params], sort_keys=True)
+        return hashlib.blake2b(spec.encode(), digest_size=12).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key: str) -> Optional[Attribution]:
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as stored:
+            meta = json.loads(str(stored['meta']))
+            return Attribution(mean=stored['mean'], mean_abs=stored['mean_abs'], **meta)
+
+    def put(self, key: str, attribution: Attribution):
+        os.makedirs(self.directory, exist_ok=True)
+        meta = {name: getattr(attribution, name) for name in
+                ('method', 'model_version', 'slice_key', 'outputs', 'features', 'samples', 'params', 'seconds')}
+        # Write then rename, so concurrent readers never see a partial file
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.npz')
+        with os.fdopen(handle, 'wb') as target:
+            np.savez(target, mean=attribution.mean, mean_abs=attribution.mean_abs, meta=json.dumps(meta))
+        os.replace(temporary, self.path(key))
+
+
+def explain(
+    model,
+    windows: np.ndarray,
+    method: str = 'expected',
+    slice_key: Optional[str] = None,
+    background: Optional[np.ndarray] = None,
+    steps: int = 16,
+    batch_size: int = 256,
+    seed: int = 0,
+    cache: Optional[AttributionCache] = None,
+    keep: bool = False,
+    version: Optional[str] = None,
+    explainer: Optional[Explainer] = None,
+    features: List[str] = FEATURES
+) -> Attribution:
+    """Attributions for `windows` (N, timesteps, features), from the cache when possible.
+
+    `batch_size` is windows per call; the model sees batch_size * steps
+    points per call for 'integrated' and 'expected'. The background is part
+    of the cache key through its fingerprint.
+    """
+    version = version or model_version(model)
+    slice_key = slice_key or fingerprint(windows)
+    params = {'steps': steps if method != 'gradient' else None, 'seed': seed,
+              'background': fingerprint(background) if background is not None else None}
+    key = AttributionCache.key(version, slice_key, method, params)
+    if cache is not None and not keep:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info("Attribution cache hit for %s on %s (%s)", version, slice_key, method)
+            return cached
+
+    explainer = explainer or make_explainer(model, method, background, steps, seed)
+    start = time.perf_counter()
+    count, mean, mean_abs, values = accumulate(explainer, windows, batch_size, keep)
+    seconds = time.perf_counter() - start
+    outputs = list(getattr(model, 'output_names', None) or [f'output_{i}' for i in range(mean.shape[0])])
+    attribution = Attribution(method, version, slice_key, outputs, list(features), count, mean, mean_abs,
+                              params, seconds, values)
+    logger.info("Attributed %d windows in %.1fs (%.0f windows/s)", count, seconds, count / max(seconds, 1e-9))
+    if cache is not None:
+        cache.put(key, attribution)
+    return attribution
+
+
+if __name__ == "__main__":
+    import tensorflow as tf
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Batched feature attributions for the hybrid model")
+    parser.add_argument("--model", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "hybrid_model.h5"))
+    parser.add_argument("--windows", required=True, help=".npy array of (N, timesteps, features) windows")
+    parser.add_argument("--slice", help="cache key for these windows (default: hash of the data)")
+    parser.add_argument("--method", choices=METHODS, default="expected")
+    parser.add_argument("--steps", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--background", type=int, default=1024, help="background windows sampled from the data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    model = tf.keras.models.load_model(args.model, compile=False)
+    windows = np.load(args.windows, mmap_mode='r')
+    rng = np.random.default_rng(args.seed)
+    background = None
+    if args.method != 'gradient':
+        background = np.asarray(windows[np.sort(rng.choice(len(windows), min(args.background, len(windows)), replace=False))])
+
+    result = explain(model, windows, args.method, args.slice, background, args.steps, args.batch_size,
+                     args.seed, AttributionCache(args.cache_dir))
+    print(json.dumps({
+        'model_version': result.model_version,
+        'slice': result.slice_key,
+        'samples': result.samples,
+        'weights': {output: result.weights(output) for output in result.outputs},
+    }, indent=2))
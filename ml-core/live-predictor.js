@@ -1,47 +1,64 @@
 // ml-core/live-predictor.js
 import * as tf from '@tensorflow/tfjs-node';
 import { Redis } from 'ioredis';
+import { ModelInputStream } from './model-input-stream.js';
+import { ModelRegistry } from './model-registry.js';
+import { tracer } from '../shared/tracing.js';
 
-const redis = new Redis(process.env.REDIS_URL);
 const MODEL_PATH = 'file://./ml-core/models/hybrid-model';
 
 export class LivePredictor {
-  constructor() {
-    this.model = null;
-    this.classes = ['LONG', 'SHORT'];
+  constructor({ redisClient = new Redis(process.env.REDIS_URL), registry = new ModelRegistry() } = {}) {
+    this.redis = redisClient;
+    this.registry = registry;
+    this.inputs = null;
   }
 
-  async loadModel() {
-    this.model = await tf.loadLayersModel(MODEL_PATH);
-    this.warmup();
+  get model() {
+    return this.registry.active?.model ?? null;
   }
 
-  async warmup() {
-    // Initial inference to load weights
-    const dummyInput = tf.zeros([1, 60, 12]);
-    this.model.predict(dummyInput);
+  // Loaded and warmed by the registry before it serves. Swapped versions must
+  // keep the input shape (checked by the registry), so windows stay valid.
+  async loadModel(url = MODEL_PATH, options) {
+    const { inputShape } = await this.registry.load(url, options);
+    if (!this.inputs) {
+      // Windows are sized from the model: [batch, timesteps, features]
+      const [, timesteps, width] = inputShape;
+      this.inputs = new ModelInputStream(this.redis, { length: timesteps, width });
+    }
   }
 
+  // Reads only the entries added since the previous poll; null until the
+  // symbol's window has a full history
   async predict(symbol) {
-    const features = await redis.xread(
-      'BLOCK', '0-0', 'COUNT', 60, 'STREAMS', `model:input:${symbol}`, '0'
-    );
-    
-    const tensor = this._preprocess(features);
-    const [direction, volatility, position] = this.model.predict(tensor);
-    
-    return {
-      direction: this.classes[tf.argMax(direction).dataSync()[0]],
-      volatility: volatility.dataSync()[0],
-      positionSize: position.dataSync()[0]
-    };
+    await this.inputs.track(symbol);
+    await this.inputs.poll();
+    const window = this.inputs.window(symbol);
+    if (!window.ready) return null;
+    const trace = this.inputs.takeTrace(symbol);
+
+    // One [1, 3] result (direction, volatility, position heads) read with a
+    // single data() call; decoded as in HybridModel
+    return this.registry.run(async model => {
+      const output = tf.tidy(() => tf.concat(model.predict(this._preprocess(window)), 1));
+      try {
+        const [direction, volatility, position] = await output.data();
+        // The trace travels on with the signal to routing and placeOrder
+        return {
+          direction: direction > 0.5 ? 'LONG' : 'SHORT',
+          volatility,
+          positionSize: position,
+          trace: tracer.mark(trace, 'predict')
+        };
+      } finally {
+        output.dispose();
+      }
+    });
   }
 
-  _preprocess(features) {
-    // Convert Redis data to tensor
-    return tf.tensor3d(
-      features.map(f => Object.values(f)),
-      [1, 60, 12] // [batch, timesteps, features]
-    );
+  _preprocess(window) {
+    // Window rows are already in timestep order
+    return tf.tensor3d(window.values, [1, window.length, window.width]); // [batch, timesteps, features]
   }
-}
\ No newline at end of file
+}
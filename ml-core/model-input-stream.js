@@ -0,0 +1,158 @@
+// ml-core/model-input-stream.js
+// Feature -> model handoff. RealTimePipeline appends to capped
+// `model:input:{symbol}` streams; this reader tails them with XREAD from the
+// last id it consumed, so each poll returns only entries added since the last
+// one, and folds them into preallocated per-symbol [length, width]
+// Float32Array windows. A window is seeded once from the newest `length`
+// entries when a symbol is first tracked. Every predictor process reads every
+// entry: no consumer group splits a stream's rows between processes, and no
+// shared read position is moved by another process starting up.
+import config from '../shared/config.js';
+import { FEATURE_NAMES } from '../feature-engine/feature-vector.js';
+import { tracer as sharedTracer } from '../shared/tracing.js';
+
+// Fixed [length, width] window, oldest row first, updated in place
+export class FeatureWindow {
+  constructor(length = 60, width = FEATURE_NAMES.length) {
+    this.length = length;
+    this.width = width;
+    this.values = new Float32Array(length * width);
+    this.count = 0;
+  }
+
+  get ready() {
+    return this.count >= this.length;
+  }
+
+  // Shift one row out and write `row` (indexable, numbers) as the newest
+  push(row) {
+    const { values, width } = this;
+    values.copyWithin(0, width);
+    const offset = values.length - width;
+    for (let i = 0; i < width; i++) values[offset + i] = row[i] ?? 0;
+    this.count++;
+  }
+
+  reset() {
+    this.values.fill(0);
+    this.count = 0;
+  }
+}
+
+// Redis stream entry fields ([k, v, ...]) -> feature row in FEATURE_NAMES order
+export function entryToRow(fields, row) {
+  if (!fields) return false; // entry trimmed or deleted after delivery
+  for (let i = 0; i < fields.length; i += 2) {
+    if (fields[i] !== 'features') continue;
+    const features = JSON.parse(fields[i + 1]);
+    for (let j = 0; j < row.length; j++) {
+      const value = features[FEATURE_NAMES[j]];
+      row[j] = typeof value === 'boolean' ? Number(value) : Number.isFinite(value) ? value : 0;
+    }
+    return true;
+  }
+  return false;
+}
+
+export class ModelInputStream {
+  constructor(redisClient, {
+    prefix = config.modelInput.prefix,
+    length = config.modelInput.window,
+    width = FEATURE_NAMES.length,
+    count = config.modelInput.readCount,   // max entries per stream per poll
+    tracer = sharedTracer
+  } = {}) {
+    this.redis = redisClient;
+    this.prefix = prefix;
+    this.length = length;
+    this.width = width;
+    this.count = count;
+    this.windows = new Map(); // symbol -> FeatureWindow
+    this.lastIds = new Map(); // symbol -> last consumed entry id
+    this.tracking = new Map(); // symbol -> pending track()
+    this.traces = new Map();   // symbol -> newest trace polled, until taken
+    this.tracer = tracer;
+    this.row = new Float64Array(width);
+    this.stats = { polls: 0, entries: 0, malformed: 0 };
+  }
+
+  key(symbol) {
+    return `${this.prefix}:${symbol}`;
+  }
+
+  window(symbol) {
+    return this.windows.get(symbol);
+  }
+
+  track(symbol) {
+    if (this.windows.has(symbol)) return Promise.resolve(this.windows.get(symbol));
+    if (!this.tracking.has(symbol)) {
+      this.tracking.set(symbol, this._track(symbol).finally(() => this.tracking.delete(symbol)));
+    }
+    return this.tracking.get(symbol);
+  }
+
+  async _track(symbol) {
+    const key = this.key(symbol);
+    const window = new FeatureWindow(this.length, this.width);
+    const recent = await this.redis.xrevrange(key, '+', '-', 'COUNT', this.length);
+    for (let i = recent.length - 1; i >= 0; i--) this._apply(window, recent[i][1]);
+    // Tail right after the seeded entries
+    this.lastIds.set(symbol, recent.length ? recent[0][0] : '0-0');
+    this.windows.set(symbol, window);
+    return window;
+  }
+
+  // Trace of the newest traced entry folded into the symbol's window, once
+  takeTrace(symbol) {
+    const trace = this.traces.get(symbol) ?? null;
+    if (trace) this.traces.delete(symbol);
+    return trace;
+  }
+
+  _apply(window, fields) {
+    if (entryToRow(fields, this.row)) window.push(this.row);
+    else this.stats.malformed++;
+  }
+
+  // One XREAD across every tracked stream, repeated for streams that returned
+  // a full `count` until their backlog is drained, so a window is never
+  // reported ready while entries are still waiting. Returns updated symbols.
+  async poll({ block = null } = {}) {
+    const updated = new Set();
+    let symbols = await this._read([...this.windows.keys()], block, updated);
+    while (symbols.length > 0) symbols = await this._read(symbols, null, updated);
+    return [...updated];
+  }
+
+  // Returns the symbols whose read was truncated at `count`
+  async _read(symbols, block, updated) {
+    const args = ['COUNT', this.count];
+    if (block !== null) args.push('BLOCK', block);
+    args.push('STREAMS', ...symbols.map(symbol => this.key(symbol)), ...symbols.map(symbol => this.lastIds.get(symbol)));
+
+    const reply = await this.redis.xread(...args);
+    this.stats.polls++;
+    if (!reply) return [];
+
+    const full = [];
+    for (const [key, entries] of reply) {
+      const symbol = key.slice(this.prefix.length + 1);
+      const window = this.windows.get(symbol);
+      if (!window || entries.length === 0) continue;
+      for (const [, fields] of entries) {
+        this._apply(window, fields);
+        // Only traced entries carry more than the features field
+        if (fields && fields.length > 2) {
+          const trace = this.tracer.fromFields(fields);
+          if (trace) this.traces.set(symbol, this.tracer.mark(trace, 'stream'));
+        }
+      }
+      this.lastIds.set(symbol, entries[entries.length - 1][0]);
+      this.stats.entries += entries.length;
+      updated.add(symbol);
+      if (entries.length >= this.count) full.push(symbol);
+    }
+    return full;
+  }
+}
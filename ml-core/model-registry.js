@@ -0,0 +1,195 @@
+// ml-core/model-registry.js
+// Double-buffered model serving. One active version serves predictions while
+// load() brings the next one up in the background: load, warm on the batch
+// sizes predict uses, check output parity against the active version, then
+// swap the serving pointer in a single assignment. A replaced version is
+// disposed when its last in-flight prediction releases it. Swaps can be
+// requested on the `model:control` channel.
+import * as tf from '@tensorflow/tfjs-node';
+import config from '../shared/config.js';
+
+const PROBE_SEED = 42;
+
+const asArray = outputs => (Array.isArray(outputs) ? outputs : [outputs]);
+
+export class ModelVersion {
+  constructor(version, model) {
+    this.version = version;
+    this.model = model;
+    this.inflight = 0;
+    this.retired = false;
+    this.disposed = false;
+    this.loadedAt = Date.now();
+  }
+
+  get inputShape() {
+    return this.model.inputs[0].shape;
+  }
+
+  _disposeIfIdle() {
+    if (!this.retired || this.inflight > 0 || this.disposed) return;
+    this.disposed = true;
+    this.model.dispose();
+  }
+}
+
+export class ModelRegistry {
+  constructor({
+    loader = url => tf.loadLayersModel(url),
+    warmupBatchSizes = config.models.warmupBatchSizes,
+    warmupRuns = config.models.warmupRuns,
+    probeBatch = config.models.probeBatch,
+    maxOutputDrift = config.models.maxOutputDrift // null disables the drift check
+  } = {}) {
+    this.loader = loader;
+    this.warmupBatchSizes = warmupBatchSizes;
+    this.warmupRuns = warmupRuns;
+    this.probeBatch = probeBatch;
+    this.maxOutputDrift = maxOutputDrift;
+    this.active = null;
+    this.loading = Promise.resolve(); // loads run one at a time
+    this.subscriber = null;
+  }
+
+  get version() {
+    return this.active?.version ?? null;
+  }
+
+  // Resolves with the new ModelVersion once it is serving; rejects (and keeps
+  // the active version) if it fails to load, warm or validate
+  load(url, { version = url } = {}) {
+    const next = this.loading.then(() => this._load(url, version));
+    this.loading = next.catch(() => {});
+    return next;
+  }
+
+  async _load(url, version) {
+    const candidate = new ModelVersion(version, await this.loader(url));
+    try {
+      await this._warm(candidate.model);
+      if (this.active) await this._validate(candidate, this.active);
+    } catch (error) {
+      candidate.model.dispose();
+      throw error;
+    }
+
+    const previous = this.active;
+    this.active = candidate;
+    if (previous) {
+      previous.retired = true;
+      previous._disposeIfIdle();
+    }
+    console.log(`Model ${version} serving${previous ? ` (replaced ${previous.version})` : ''}`);
+    return candidate;
+  }
+
+  // Pins the active version until release(); predictions started before a
+  // swap finish on the model they began with
+  acquire() {
+    if (!this.active) throw new Error('No model loaded');
+    this.active.inflight++;
+    return this.active;
+  }
+
+  release(entry) {
+    entry.inflight--;
+    entry._disposeIfIdle();
+  }
+
+  async run(fn) {
+    const entry = this.acquire();
+    try {
+      return await fn(entry.model, entry);
+    } finally {
+      this.release(entry);
+    }
+  }
+
+  // Compile kernels for every batch size predict uses, so the first real
+  // prediction after a swap costs the same as any other
+  async _warm(model) {
+    const [, ...shape] = model.inputs[0].shape;
+    for (const batch of this.warmupBatchSizes) {
+      for (let i = 0; i < this.warmupRuns; i++) {
+        const output = tf.tidy(() => tf.concat(
+          asArray(model.predict(tf.randomNormal([batch, ...shape], 0, 1, 'float32', PROBE_SEED + i)))
+            .map(t => t.reshape([batch, -1])),
+          1
+        ));
+        try {
+          await output.data();
+        } finally {
+          output.dispose();
+        }
+      }
+    }
+  }
+
+  // Same input and output shapes as the active version, finite outputs, and
+  // mean absolute output difference on a fixed probe batch within maxOutputDrift
+  async _validate(candidate, active) {
+    const fail = reason => new Error(`Model ${candidate.version} failed validation: ${reason}`);
+    const [, ...shape] = candidate.inputShape;
+    if (String(shape) !== String(active.inputShape.slice(1))) {
+      throw fail(`input shape [${shape}] != [${active.inputShape.slice(1)}]`);
+    }
+
+    const probe = tf.randomNormal([this.probeBatch, ...shape], 0, 1, 'float32', PROBE_SEED);
+    const entry = this.acquire(); // keep the active model alive while probing
+    let candidateOut;
+    let activeOut;
+    try {
+      candidateOut = asArray(candidate.model.predict(probe));
+      activeOut = asArray(entry.model.predict(probe));
+      const shapes = outputs => outputs.map(t => `[${t.shape}]`).join(',');
+      if (shapes(candidateOut) !== shapes(activeOut)) {
+        throw fail(`output shapes ${shapes(candidateOut)} != ${shapes(activeOut)}`);
+      }
+
+      const [a, b] = await Promise.all([candidateOut, activeOut].map(outputs =>
+        Promise.all(outputs.map(t => t.data()))
+      ));
+      let drift = 0;
+      let n = 0;
+      for (let o = 0; o < a.length; o++) {
+        for (let i = 0; i < a[o].length; i++) {
+          if (!Number.isFinite(a[o][i])) throw fail('non-finite output');
+          drift += Math.abs(a[o][i] - b[o][i]);
+          n++;
+        }
+      }
+      drift /= n;
+      if (this.maxOutputDrift != null && drift > this.maxOutputDrift) {
+        throw fail(`mean output drift ${drift.toFixed(4)} > ${this.maxOutputDrift}`);
+      }
+    } finally {
+      tf.dispose([probe, candidateOut, activeOut]);
+      this.release(entry);
+    }
+  }
+
+  // `{"action":"load","url":"file://...","version":"..."}` on the control channel
+  async listen(subscriber, channel = config.models.controlChannel) {
+    this.subscriber = subscriber;
+    subscriber.on('message', (ch, message) => {
+      if (ch !== channel) return;
+      try {
+        const { action, url, version } = JSON.parse(message);
+        if (action !== 'load' || !url) return;
+        this.load(url, { version }).catch(error => console.error('Model swap failed:', error.message));
+      } catch (error) {
+        console.error('Invalid model control message:', error.message);
+      }
+    });
+    await subscriber.subscribe(channel);
+  }
+
+  async dispose() {
+    await this.loading;
+    if (this.active) {
+      this.active.retired = true;
+      this.active._disposeIfIdle();
+      this.active = null;
+    }
+  }
+}
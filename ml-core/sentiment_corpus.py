@@ -0,0 +1,149 @@
+"""
+Sentiment Corpus Preprocessing & Token Cache
+
+- Cleans the whole corpus in one compiled-regex pass (no per-character loops)
+- Builds the vocabulary once and tokenizes into int32 arrays
+- Persists vocabulary + memory-mapped token IDs keyed by corpus version,
+  so retraining on an unchanged corpus skips preprocessing entirely
+- Exports the vocabulary for feature-engine/news-sentiment.js
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_TOKENS = 10000
+SEQ_LENGTH = 100
+MAX_WORDS = 500
+PAD_TOKEN = '<PAD>'
+UNK_TOKEN = '<UNK>'
+
+CACHE_DIR = os.path.join('data', 'sentiment')
+VOCAB_EXPORT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'shared', 'sentiment-vocab.json'
+)
+
+# Documents are joined with a newline so the corpus is cleaned in one pass;
+# newlines inside a document are flattened to spaces beforehand.
+_DOC_SEPARATOR = '\n'
+_NON_ALPHA_RE = re.compile(r'[^a-z\s]+')
+_INNER_NEWLINE_RE = re.compile(r'[\r\n]+')
+
+
+def preprocess_corpus(texts: Sequence[str], max_words: int = MAX_WORDS) -> List[str]:
+    """Lowercase, strip non-letters and truncate every document in one pass"""
+    if not texts:
+        return []
+    joined = _DOC_SEPARATOR.join(_INNER_NEWLINE_RE.sub(' ', text) for text in texts)
+    cleaned = _NON_ALPHA_RE.sub('', joined.lower())
+    return [' '.join(doc.split()[:max_words]) for doc in cleaned.split(_DOC_SEPARATOR)]
+
+
+def build_vocabulary(documents: Sequence[str], max_tokens: int = MAX_TOKENS) -> Dict[str, int]:
+    """Frequency-ranked vocabulary with <PAD>=0 and <UNK>=1 (same layout as sentiment-vocab.json)"""
+    counts = Counter()
+    for doc in documents:
+        counts.update(doc.split())
+
+    vocab = {PAD_TOKEN: 0, UNK_TOKEN: 1}
+    # Sort by (-count, token) so ties are deterministic across runs
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    for token, _ in ranked[:max_tokens - len(vocab)]:
+        vocab[token] = len(vocab)
+    return vocab
+
+
+def tokenize_corpus(
+    documents: Sequence[str],
+    vocab: Dict[str, int],
+    seq_length: int = SEQ_LENGTH,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Map documents to a zero-padded [N, seq_length] int32 matrix"""
+    if out is None:
+        out = np.zeros((len(documents), seq_length), dtype=np.int32)
+    unk = vocab[UNK_TOKEN]
+    for row, doc in enumerate(documents):
+        ids = [vocab.get(token, unk) for token in doc.split()[:seq_length]]
+        out[row, :len(ids)] = ids
+    return out
+
+
+def corpus_version(
+    texts: Sequence[str],
+    labels: Sequence,
+    max_tokens: int = MAX_TOKENS,
+    seq_length: int = SEQ_LENGTH
+) -> str:
+    """Content hash of the raw corpus and tokenizer settings"""
+    digest = hashlib.sha256(f"{max_tokens}:{seq_length}".encode())
+    for text, label in zip(texts, labels):
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(str(label).encode())
+        digest.update(b'\x01')
+    return digest.hexdigest()[:16]
+
+
+def load_or_build_corpus(
+    texts: Sequence[str],
+    labels: Sequence,
+    cache_dir: str = CACHE_DIR,
+    max_tokens: int = MAX_TOKENS,
+    seq_length: int = SEQ_LENGTH
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, int], str]:
+    """Return (token_ids, labels, vocab, version), reusing the on-disk cache when present.
+
+    Token IDs are returned as a read-only memory map so large corpora are
+    paged in lazily instead of being loaded into RAM.
+    """
+    version = corpus_version(texts, labels, max_tokens, seq_length)
+    version_dir = os.path.join(cache_dir, version)
+    tokens_path = os.path.join(version_dir, 'tokens.npy')
+    labels_path = os.path.join(version_dir, 'labels.npy')
+    vocab_path = os.path.join(version_dir, 'vocab.json')
+
+    if all(os.path.exists(p) for p in (tokens_path, labels_path, vocab_path)):
+        logging.info(f"Using cached sentiment corpus {version}")
+        with open(vocab_path) as f:
+            vocab = json.load(f)
+        return (
+            np.load(tokens_path, mmap_mode='r'),
+            np.load(labels_path),
+            vocab,
+            version
+        )
+
+    logging.info(f"Preprocessing {len(texts)} documents for corpus {version}")
+    documents = preprocess_corpus(texts)
+    vocab = build_vocabulary(documents, max_tokens)
+
+    os.makedirs(version_dir, exist_ok=True)
+    tokens = np.lib.format.open_memmap(
+        tokens_path, mode='w+', dtype=np.int32, shape=(len(documents), seq_length)
+    )
+    tokenize_corpus(documents, vocab, seq_length, out=tokens)
+    tokens.flush()
+    del tokens
+
+    label_array = np.asarray(labels, dtype=np.float32)
+    np.save(labels_path, label_array)
+    with open(vocab_path, 'w') as f:
+        json.dump(vocab, f)
+
+    logging.info(f"Cached {len(documents)} documents ({len(vocab)} tokens) to {version_dir}")
+    return np.load(tokens_path, mmap_mode='r'), label_array, vocab, version
+
+
+def export_vocabulary(vocab: Dict[str, int], path: str = VOCAB_EXPORT_PATH) -> str:
+    """Write the vocabulary where the Node sentiment analyzer reads it"""
+    with open(path, 'w') as f:
+        json.dump(vocab, f, indent=2)
+    logging.info(f"Exported {len(vocab)}-token vocabulary to {path}")
+    return path
@@ -4,21 +4,18 @@ Robust Sentiment Model Training with Alpha Vantage News & Polygon Data
 
 import os
 from dotenv import load_dotenv
-import requests
 import numpy as np
-import tensorflow as tf
 from datetime import datetime, timedelta
 import time
 import logging
 from retrying import retry
 from urllib.parse import urlencode, urlparse, urlunparse, parse_qs
-from sklearn.model_selection import train_test_split
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler('sentiment_training.log'), logging.StreamHandler()]
+from sentiment_corpus import (
+    MAX_TOKENS,
+    SEQ_LENGTH,
+    preprocess_corpus,
+    load_or_build_corpus,
+    export_vocabulary
 )
 
 # API Configuration
@@ -30,11 +27,15 @@ RETRY_DELAY = 2  # seconds
 
 def retry_if_api_error(exception):
     """Retry on API-related errors"""
+    import requests
+
     return isinstance(exception, (requests.exceptions.RequestException, KeyError))
 
 @retry(retry_on_exception=retry_if_api_error, stop_max_attempt_number=MAX_RETRIES, wait_fixed=RETRY_DELAY*1000)
 def fetch_financial_news(symbol="SPY", days=30):
     """Fetch historical news with sentiment scores using Alpha Vantage"""
+    import requests
+
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
     
@@ -96,6 +97,9 @@ def fetch_financial_news(symbol="SPY", days=30):
 def get_market_reaction(symbol, event_time):
     """Get percentage price change using Polygon.io aggregates"""
     try:
+        import pytz
+        import requests
+
         # Convert to US Eastern Time
         eastern = pytz.timezone('US/Eastern')
         event_time_eastern = event_time.astimezone(eastern)
@@ -157,34 +161,27 @@ def validate_training_data(news_data):
     return news_data
 
 def preprocess_text(text):
-    """Enhanced text cleaning"""
-    text = text.lower().replace('\n', ' ')
-    text = ''.join([c for c in text if c.isalpha() or c.isspace()])
-    return ' '.join(text.split()[:500])  # Truncate long texts
+    """Enhanced text cleaning (single document; use preprocess_corpus for batches)"""
+    return preprocess_corpus([text])[0]
 
-def train_model(news_data):
-    """Train TF model on processed news data"""
-    try:
-        texts, labels, _ = zip(*news_data)
-    except ValueError:
+def train_model(token_ids, labels, vocab_size=MAX_TOKENS):
+    """Train TF model on cached token IDs"""
+    # TensorFlow and scikit-learn load only for training, not data collection
+    import tensorflow as tf
+    from sklearn.model_selection import train_test_split
+
+    if len(token_ids) == 0:
         raise ValueError("No valid training data available")
     
     # Train/Test split
     X_train, X_test, y_train, y_test = train_test_split(
-        texts, labels, test_size=0.2, random_state=42
-    )
-    
-    # Vectorize text
-    vectorizer = tf.keras.layers.TextVectorization(
-        max_tokens=10000,
-        output_sequence_length=100
+        np.asarray(token_ids), np.asarray(labels), test_size=0.2, random_state=42
     )
-    vectorizer.adapt(X_train)
     
-    # Build model
+    # Build model (inputs are pre-tokenized IDs from sentiment_corpus)
     model = tf.keras.Sequential([
-        vectorizer,
-        tf.keras.layers.Embedding(10000, 128),
+        tf.keras.layers.Input(shape=(SEQ_LENGTH,), dtype='int32'),
+        tf.keras.layers.Embedding(vocab_size, 128),
         tf.keras.layers.Bidirectional(tf.keras.layers.LSTM(64)),
         tf.keras.layers.Dense(64, activation='relu'),
         tf.keras.layers.Dense(1, activation='tanh')
@@ -207,6 +204,12 @@ def train_model(news_data):
     return model
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler('sentiment_training.log'), logging.StreamHandler()]
+    )
+
     try:
         # Step 1: Fetch labeled training data
         logging.info("Starting data collection...")
@@ -215,16 +218,15 @@ if __name__ == "__main__":
         # Step 2: Validate data
         validated_data = validate_training_data(news_data)
         
-        # Step 3: Preprocess
+        # Step 3: Preprocess (cached by corpus version)
         logging.info("Preprocessing data...")
-        processed_data = [
-            (preprocess_text(text), label)
-            for text, label, _ in validated_data
-        ]
+        texts, labels, _ = zip(*validated_data)
+        token_ids, label_array, vocab, version = load_or_build_corpus(texts, labels)
+        export_vocabulary(vocab)
         
         # Step 4: Train
-        logging.info("Training model...")
-        model = train_model(processed_data)
+        logging.info(f"Training model on corpus {version}...")
+        model = train_model(token_ids, label_array, vocab_size=len(vocab))
         
         # Step 5: Export
         model.save("sentiment_model.keras")
@@ -1,43 +1,71 @@
 import * as tf from '@tensorflow/tfjs-node';
 import { FeatureNormalizer } from '../feature-engine/feature-normalization.js';
+import { ModelRegistry } from './model-registry.js';
 
 const FEATURE_ORDER = FeatureNormalizer.getFeatureOrder();
+const MODEL_URL = 'file://./ml-core/models/hybrid_model/model.json';
 
 export class HybridModel {
-  constructor() {
-    this.model = null;
+  constructor({ registry = new ModelRegistry() } = {}) {
+    this.registry = registry;
+    this.loading = null;
     this.inputShape = [60, FEATURE_ORDER.length]; // 60 timesteps, 6 features
+    // Normalized input, reused by every predict
+    this.input = new Float32Array(this.inputShape[0] * this.inputShape[1]);
   }
 
-  async loadModel() {
-    this.model = await tf.loadLayersModel('file://./ml-core/models/hybrid_model/model.json');
+  // The serving model; replaced by registry swaps
+  get model() {
+    return this.registry.active?.model ?? null;
+  }
+
+  // Loads and warms the model; later versions go through registry.load()
+  async loadModel(url = MODEL_URL, options) {
+    await this.registry.load(url, options);
     console.log('Model loaded successfully');
   }
 
+  // `featureWindow` is 60 raw feature sets, or flat raw rows in feature order
+  // (a [60 * 6] typed array such as FeatureWindow.values)
   async predict(featureWindow) {
-    if (!this.model) await this.loadModel();
-    if (!Array.isArray(featureWindow) || featureWindow.length !== 60) {
-      throw new Error('Input must be array of 60 normalized feature sets');
+    if (!this.registry.active) {
+      this.loading ??= this.loadModel().finally(() => { this.loading = null; });
+      await this.loading;
     }
+    const [timesteps, width] = this.inputShape;
 
-    // Normalize and structure features
-    const tensorData = featureWindow.map(featureSet => {
-      const normalized = FeatureNormalizer.normalize(featureSet);
-      return FEATURE_ORDER.map(k => normalized[k]);
-    });
-
-    // Create tensor with shape [1, 60, 6]
-    const tensor = tf.tensor3d([tensorData], [1, 60, 6]);
-    
-    try {
-      const outputs = this.model.predict(tensor);
-      return {
-        direction: outputs[0].dataSync()[0] > 0.5 ? 'LONG' : 'SHORT',
-        volatility: outputs[1].dataSync()[0],
-        position: Math.min(1, Math.max(0.1, outputs[2].dataSync()[0]))
-      };
-    } finally {
-      tf.dispose(tensor);
+    if (ArrayBuffer.isView(featureWindow)) {
+      if (featureWindow.length !== this.input.length) {
+        throw new Error(`Input must be ${timesteps}x${width} feature rows`);
+      }
+      FeatureNormalizer.normalizeRows(featureWindow, this.input);
+    } else {
+      if (!Array.isArray(featureWindow) || featureWindow.length !== timesteps) {
+        throw new Error('Input must be array of 60 normalized feature sets');
+      }
+      for (let t = 0; t < timesteps; t++) {
+        FeatureNormalizer.normalizeInto(featureWindow[t], this.input, t * width);
+      }
     }
+
+    // Everything up to the concat runs synchronously inside tidy, so the
+    // shared input buffer is consumed before another predict can refill it
+    // and only the [1, 3] result survives. The version is pinned until the
+    // result is read, so a swap never disposes a model mid-prediction.
+    return this.registry.run(async model => {
+      const output = tf.tidy(() =>
+        tf.concat(model.predict(tf.tensor3d(this.input, [1, timesteps, width])), 1)
+      );
+      try {
+        const [direction, volatility, position] = await output.data();
+        return {
+          direction: direction > 0.5 ? 'LONG' : 'SHORT',
+          volatility,
+          position: Math.min(1, Math.max(0.1, position))
+        };
+      } finally {
+        output.dispose();
+      }
+    });
   }
-}
\ No newline at end of file
+}
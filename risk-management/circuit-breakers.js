@@ -1,70 +1,134 @@
 // risk-management/circuit-breakers.js
 import { RiskProtocols } from './risk-protocols.js';
+import { StreamingMetrics } from './streaming-metrics.js';
+import { MarketSession } from '../execution/market-session.js';
 import config from '../shared/config.js';
 
+// Metrics are maintained locally per fill; breaker checks are synchronous
+// comparisons and only a tripped breaker awaits protocol actions. Daily
+// metrics restart at every session open (null `session`: never).
 export class PerformanceMonitor {
-  constructor(tradingEngine) {
+  constructor(tradingEngine, {
+    startingEquity = config.PORTFOLIO_VALUE,
+    risk = config.risk,
+    session = new MarketSession()
+  } = {}) {
+    this.tradingEngine = tradingEngine;
     this.riskProtocols = new RiskProtocols(tradingEngine);
-    this.dailyMetrics = {
-      grossProfit: 0,
-      grossLoss: 0,
-      maxDrawdown: 0,
-      volatility: 0
-    };
+    this.risk = risk;
+    this.metrics = new StreamingMetrics({ startingEquity });
+    this.session = session;
+    this.dayTimer = null;
+    if (session) this.scheduleDailyReset();
+  }
+
+  // The daily loss limit and drawdown are measured from this equity, and
+  // breakers tripped on the previous day can act again
+  resetDay() {
+    this.metrics.resetDay();
+    this.riskProtocols.resetDay();
+  }
+
+  // Timer for the next session open; re-arms itself after each reset
+  scheduleDailyReset(now = Date.now()) {
+    clearTimeout(this.dayTimer);
+    const open = this.session.nextOpen(now);
+    if (open === null) return null;
+    this.dayTimer = setTimeout(() => {
+      this.resetDay();
+      this.scheduleDailyReset();
+    }, open - now);
+    this.dayTimer.unref?.();
+    return open;
   }
 
-  async update(tradeResult) {
-    // Update metrics
-    tradeResult.profit > 0 
-      ? this.dailyMetrics.grossProfit += tradeResult.profit
-      : this.dailyMetrics.grossLoss += Math.abs(tradeResult.profit);
+  stopDailyReset() {
+    clearTimeout(this.dayTimer);
+    this.dayTimer = null;
+  }
 
-    // Check all circuit breakers
-    await this.checkDailyLossLimit();
-    await this.checkProfitFactor();
-    await this.checkVolatilitySpike();
+  // Accepts a fill ({ symbol, side, qty, price }) or a closed-trade result ({ profit })
+  update(tradeResult) {
+    if (tradeResult.profit !== undefined) {
+      this.metrics.recordTrade(tradeResult.profit);
+    } else {
+      this.metrics.applyFill(tradeResult);
+    }
+    return this._trip(this.checkBreakers());
   }
 
-  async checkDailyLossLimit() {
-    const portfolioValue = await this.tradingEngine.getPortfolioValue();
-    const currentReturn = (this.dailyMetrics.grossProfit - this.dailyMetrics.grossLoss) / portfolioValue;
-    
-    if (currentReturn < config.risk.dailyLossLimit) {
-      await this.riskProtocols.triggerProtocol('DAILY_LOSS_LIMIT', {
+  // Market data marks move equity (and so drawdown and the daily loss check)
+  mark(symbol, price) {
+    this.metrics.mark(symbol, price);
+    return this._trip(this.checkBreakers());
+  }
+
+  // Alpaca trade_updates fill events
+  handleOrderUpdate({ event, price, qty, order }) {
+    if (event !== 'fill' && event !== 'partial_fill') return Promise.resolve([]);
+    return this.update({ symbol: order.symbol, side: order.side, qty: Number(qty), price: Number(price) });
+  }
+
+  checkBreakers() {
+    return [
+      this.checkDailyLossLimit(),
+      this.checkProfitFactor(),
+      this.checkVolatilitySpike()
+    ].filter(Boolean);
+  }
+
+  checkDailyLossLimit() {
+    const currentReturn = this.metrics.dailyReturn;
+    if (currentReturn < this.risk.dailyLossLimit) {
+      return ['DAILY_LOSS_LIMIT', {
         currentReturn,
-        threshold: config.risk.dailyLossLimit,
-        lossAmount: this.dailyMetrics.grossLoss
-      });
+        threshold: this.risk.dailyLossLimit,
+        lossAmount: this.metrics.grossLoss
+      }];
     }
+    return null;
   }
 
-  async checkProfitFactor() {
-    const profitFactor = this.dailyMetrics.grossProfit / (this.dailyMetrics.grossLoss || 1);
-    
-    if (profitFactor < config.risk.profitFactorThreshold) {
-      await this.riskProtocols.triggerProtocol('PROFIT_FACTOR_DECLINE', {
+  checkProfitFactor() {
+    const profitFactor = this.metrics.profitFactor;
+    if (profitFactor < this.risk.profitFactorThreshold) {
+      return ['PROFIT_FACTOR_DECLINE', {
         currentFactor: profitFactor,
-        threshold: config.risk.profitFactorThreshold,
+        threshold: this.risk.profitFactorThreshold,
         winRate: this.winRate
-      });
+      }];
     }
+    return null;
   }
 
-  async checkVolatilitySpike() {
-    const { volatility } = await this.tradingEngine.getMarketConditions();
-    
-    if (volatility > config.risk.volatilityThreshold) {
-      await this.riskProtocols.triggerProtocol('VOLATILITY_SPIKE', {
+  checkVolatilitySpike() {
+    const volatility = this.metrics.volatilityRatio;
+    if (volatility > this.risk.volatilityThreshold) {
+      return ['VOLATILITY_SPIKE', {
         volatility,
-        threshold: config.risk.volatilityThreshold
-      });
+        threshold: this.risk.volatilityThreshold
+      }];
     }
+    return null;
+  }
+
+  async _trip(breaches) {
+    for (const [reason, metadata] of breaches) {
+      await this.riskProtocols.triggerProtocol(reason, metadata);
+    }
+    return breaches.map(([reason]) => reason);
+  }
+
+  get dailyMetrics() {
+    return {
+      grossProfit: this.metrics.grossProfit,
+      grossLoss: this.metrics.grossLoss,
+      maxDrawdown: this.metrics.maxDrawdown,
+      volatility: this.metrics.volatility
+    };
   }
 
   get winRate() {
-    const totalTrades = this.dailyMetrics.grossProfit + this.dailyMetrics.grossLoss;
-    return totalTrades > 0 
-      ? this.dailyMetrics.grossProfit / totalTrades
-      : 0;
+    return this.metrics.winRate;
   }
-}
\ No newline at end of file
+}
@@ -10,6 +10,11 @@ export class RiskProtocols {
     this.lastTriggered = new Map();
   }
 
+  // Each protocol acts once per trading day; called at the session open
+  resetDay() {
+    this.protocolsTriggered.clear();
+  }
+
   /**
    * Main risk protocol handler with circuit breaker pattern
    * @param {string} reason - Protocol trigger reason
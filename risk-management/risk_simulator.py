@@ -0,0 +1,273 @@
+"""
+Risk Threshold Simulator
+
+Replays historical fills and marks and evaluates grids of circuit-breaker
+thresholds (daily loss limit, profit-factor threshold, volatility threshold)
+against vectorized NumPy equity curves, reporting PnL, max drawdown and
+trigger counts per combination so config.risk can be tuned from data.
+
+- Baseline signals (equity, realized PnL, profit factor, volatility ratio) are
+  computed once, with the same semantics as streaming-metrics.js
+- Each protocol trip scales every later equity change that day by its action
+  multiplier (positions closed / exposure cut), following risk-protocols.js
+- Breakers latch once per trading day and re-arm at the next day's open, as
+  CircuitBreakers.resetDay does live at each session open
+- Differences from the live protocols: positions are treated as equally sized
+  when the daily loss limit closes half of ceil(n/2) of them; the 15-minute
+  trading suspension is not modelled (fills in that window are still replayed,
+  at the reduced size); stop tightening and the strategy switch are ignored
+- Profit-factor and volatility breakers are evaluated on the baseline signals
+  (both are roughly invariant to sizing); the daily loss limit is evaluated on
+  each combination's own protected equity
+- Combinations are evaluated in batches of [combos, events] arrays
+"""
+
+import argparse
+import itertools
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Equity multipliers applied after a trip (see risk-protocols.js); every
+# protocol ends with reduceMarketExposure's 25% cut:
+# daily loss also closes part of the book (see daily_loss_closed_fraction);
+# profit-factor decline also scales size by pf/threshold;
+# volatility spike only cuts exposure (stop tightening is not modelled)
+ACTIONS = {
+    'DAILY_LOSS_LIMIT': 0.75,
+    'PROFIT_FACTOR_DECLINE': 0.75,
+    'VOLATILITY_SPIKE': 0.75,
+}
+
+# handleDailyLossLimit closes this share of each of the first ceil(n/2) positions
+DAILY_LOSS_CLOSE_SHARE = 0.5
+
+VOLATILITY_WINDOW = 20
+BASELINE_WINDOW = 200
+TIMEZONE = 'America/New_York'
+MAX_BATCH_CELLS = 20_000_000  # combos x events per batch
+
+
+def load_events(path: str) -> pd.DataFrame:
+    """Read fills/marks from parquet or csv"""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def daily_loss_closed_fraction(open_positions: np.ndarray) -> np.ndarray:
+    """Share of exposure closed by the daily loss limit with n open positions, assuming equal sizes"""
+    n = np.asarray(open_positions, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(n > 0, DAILY_LOSS_CLOSE_SHARE * np.ceil(n / 2) / n, 0.0)
+
+
+def realized_pnl(symbols: np.ndarray, signed_qty: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """Average-cost realized PnL per event (PositionLedger.applyFill semantics)"""
+    realized = np.zeros(len(prices))
+    qty: Dict[str, float] = {}
+    avg: Dict[str, float] = {}
+    for i in np.flatnonzero(signed_qty):
+        symbol, signed, price = symbols[i], signed_qty[i], prices[i]
+        position = qty.get(symbol, 0.0)
+        cost = avg.get(symbol, 0.0)
+        if position != 0 and np.sign(signed) != np.sign(position):
+            closing = min(abs(signed), abs(position))
+            realized[i] = closing * (price - cost) * np.sign(position)
+        new_qty = position + signed
+        if new_qty == 0:
+            cost = 0.0
+        elif np.sign(new_qty) != np.sign(position):
+            cost = price
+        elif abs(new_qty) > abs(position):
+            cost = (cost * position + price * signed) / new_qty
+        qty[symbol], avg[symbol] = new_qty, cost
+    return realized
+
+
+def baseline_signals(
+    events: pd.DataFrame,
+    starting_equity: float,
+    volatility_window: int = VOLATILITY_WINDOW,
+    baseline_window: int = BASELINE_WINDOW
+) -> Dict[str, np.ndarray]:
+    """
+    Unprotected equity path and breaker inputs for an event frame with columns
+    timestamp (ms or datetime), symbol, type ('fill'|'mark'), side, qty, price, [fee]
+    """
+    events = events.sort_values('timestamp', kind='stable').reset_index(drop=True)
+    is_fill = (events['type'] == 'fill').to_numpy()
+    side = np.where(events['side'].to_numpy() == 'sell', -1.0, 1.0)
+    signed_qty = np.where(is_fill, side * events['qty'].fillna(0).to_numpy(dtype=float), 0.0)
+    prices = events['price'].to_numpy(dtype=float)
+    fees = events['fee'].fillna(0).to_numpy(dtype=float) if 'fee' in events else np.zeros(len(events))
+    symbols = events['symbol'].to_numpy()
+
+    # Market value moves only for the event's symbol: per-symbol q*p deltas
+    position = pd.Series(signed_qty).groupby(symbols).cumsum().to_numpy()
+    is_open = pd.Series(position != 0)
+    was_open = is_open.groupby(symbols).shift(fill_value=False).to_numpy(dtype=bool)
+    open_positions = np.cumsum(is_open.to_numpy(dtype=int) - was_open)
+    value = position * prices
+    value_delta = pd.Series(value).groupby(symbols).diff().fillna(pd.Series(value)).to_numpy()
+    cash = -np.cumsum(signed_qty * prices + np.where(is_fill, fees, 0.0))
+    equity = starting_equity + cash + np.cumsum(value_delta)
+
+    realized = realized_pnl(symbols, signed_qty, prices) - np.where(is_fill, fees, 0.0)
+
+    # Trading days in exchange time
+    timestamps = events['timestamp']
+    if np.issubdtype(timestamps.dtype, np.number):
+        timestamps = pd.to_datetime(timestamps, unit='ms', utc=True)
+    else:
+        timestamps = pd.to_datetime(timestamps, utc=True)
+    days = timestamps.dt.tz_convert(TIMEZONE).dt.date.to_numpy()
+    day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    day_of_event = np.cumsum(np.r_[True, days[1:] != days[:-1]]) - 1
+
+    # Intraday profit factor from realized wins/losses (inf while no losses)
+    gross_profit = _cumsum_by_day(np.where(realized > 0, realized, 0.0), day_starts, day_of_event)
+    gross_loss = _cumsum_by_day(np.where(realized < 0, -realized, 0.0), day_starts, day_of_event)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_factor = np.where(gross_loss > 0, gross_profit / gross_loss, np.inf)
+
+    # Rolling std of log equity returns, sampled when equity changes
+    previous = np.r_[starting_equity, equity[:-1]]
+    changed = (equity != previous) & (equity > 0) & (previous > 0)
+    returns = pd.Series(np.log(equity[changed] / previous[changed]))
+    short_std = returns.rolling(volatility_window, min_periods=2).std().fillna(0.0)
+    baseline_std = returns.rolling(baseline_window, min_periods=2).std()
+    ratio = (short_std / baseline_std.replace(0, np.nan)).to_numpy(copy=True)
+    ratio[np.arange(len(returns)) + 1 < volatility_window] = np.nan
+    volatility_ratio = np.full(len(equity), np.nan)
+    volatility_ratio[changed] = ratio
+    volatility_ratio = pd.Series(volatility_ratio).ffill().to_numpy()
+
+    return {
+        'equity': equity,
+        'equity_delta': np.diff(equity, prepend=starting_equity),
+        'open_positions': open_positions,
+        'realized': realized,
+        'profit_factor': profit_factor,
+        'volatility_ratio': volatility_ratio,
+        'day_starts': day_starts,
+        'day_of_event': day_of_event,
+    }
+
+
+def _cumsum_by_day(values: np.ndarray, day_starts: np.ndarray, day_of_event: np.ndarray) -> np.ndarray:
+    """Cumulative sum that restarts at every day boundary (last axis)"""
+    total = np.cumsum(values, axis=-1)
+    offsets = np.zeros(values.shape[:-1] + (len(day_starts),))
+    offsets[..., 1:] = total[..., day_starts[1:] - 1]
+    return total - offsets[..., day_of_event]
+
+
+def _first_trip(mask: np.ndarray, day_starts: np.ndarray) -> np.ndarray:
+    """Index of the first True per day for each row of [K, T] (T if never)"""
+    n = mask.shape[-1]
+    index = np.where(mask, np.arange(n), n)
+    return np.minimum.reduceat(index, day_starts, axis=-1)
+
+
+def _tripped_after(first: np.ndarray, day_of_event: np.ndarray) -> np.ndarray:
+    """True for events strictly after that day's trip"""
+    return np.arange(len(day_of_event)) > first[..., day_of_event]
+
+
+def simulate(
+    events: pd.DataFrame,
+    daily_loss_limits: Sequence[float],
+    profit_factor_thresholds: Sequence[float],
+    volatility_thresholds: Sequence[float],
+    starting_equity: float = 100000.0,
+    actions: Optional[Dict[str, float]] = None,
+    batch_size: Optional[int] = None
+) -> pd.DataFrame:
+    """Evaluate every threshold combination; one row per combination"""
+    actions = {**ACTIONS, **(actions or {})}
+    signals = baseline_signals(events, starting_equity)
+    delta = signals['equity_delta']
+    open_positions = signals['open_positions']
+    day_starts, day_of_event = signals['day_starts'], signals['day_of_event']
+    n_events = len(delta)
+
+    loss_limits = np.asarray(daily_loss_limits, dtype=float)
+    pf_levels = np.asarray(profit_factor_thresholds, dtype=float)
+    vol_levels = np.asarray(volatility_thresholds, dtype=float)
+
+    # Breakers on baseline signals: one row per distinct threshold
+    pf = signals['profit_factor']
+    pf_first = _first_trip(pf[None, :] < pf_levels[:, None], day_starts)
+    pf_at_trip = np.where(pf_first < n_events, pf[np.minimum(pf_first, n_events - 1)], np.inf)
+    pf_scale = actions['PROFIT_FACTOR_DECLINE'] * np.minimum(1.0, pf_at_trip / pf_levels[:, None])
+    pf_multiplier = np.where(
+        _tripped_after(pf_first, day_of_event), pf_scale[:, day_of_event], 1.0
+    )
+
+    vol = np.nan_to_num(signals['volatility_ratio'], nan=-np.inf)
+    vol_first = _first_trip(vol[None, :] > vol_levels[:, None], day_starts)
+    vol_multiplier = np.where(_tripped_after(vol_first, day_of_event), actions['VOLATILITY_SPIKE'], 1.0)
+
+    grid = np.array(list(itertools.product(range(len(loss_limits)), range(len(pf_levels)), range(len(vol_levels)))))
+    batch_size = batch_size or max(1, MAX_BATCH_CELLS // max(n_events, 1))
+    rows = []
+
+    for start in range(0, len(grid), batch_size):
+        li, pi, vi = grid[start:start + batch_size].T
+        multiplier = pf_multiplier[pi] * vol_multiplier[vi]
+
+        # Daily loss limit on the combination's own equity
+        protected = starting_equity + np.cumsum(delta * multiplier, axis=1)
+        day_open = np.full((len(li), len(day_starts)), float(starting_equity))
+        day_open[:, 1:] = protected[:, day_starts[1:] - 1]
+        daily_return = protected / day_open[:, day_of_event] - 1.0
+        dll_first = _first_trip(daily_return < loss_limits[li, None], day_starts)
+        closed = daily_loss_closed_fraction(open_positions[np.minimum(dll_first, n_events - 1)])
+        dll_scale = actions['DAILY_LOSS_LIMIT'] * (1.0 - closed)
+        multiplier = multiplier * np.where(
+            _tripped_after(dll_first, day_of_event), dll_scale[:, day_of_event], 1.0
+        )
+
+        equity = starting_equity + np.cumsum(delta * multiplier, axis=1)
+        peak = np.maximum.accumulate(np.maximum(equity, starting_equity), axis=1)
+        drawdown = ((peak - equity) / peak).max(axis=1)
+
+        rows.append(pd.DataFrame({
+            'daily_loss_limit': loss_limits[li],
+            'profit_factor_threshold': pf_levels[pi],
+            'volatility_threshold': vol_levels[vi],
+            'pnl': equity[:, -1] - starting_equity,
+            'max_drawdown': drawdown,
+            'daily_loss_triggers': (dll_first < n_events).sum(axis=1),
+            'profit_factor_triggers': (pf_first[pi] < n_events).sum(axis=1),
+            'volatility_triggers': (vol_first[vi] < n_events).sum(axis=1),
+        }))
+
+    return pd.concat(rows, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate circuit-breaker thresholds on historical fills/marks')
+    parser.add_argument('events', help='parquet/csv with timestamp, symbol, type, side, qty, price[, fee]')
+    parser.add_argument('--equity', type=float, default=100000.0)
+    parser.add_argument('--out', help='write the full grid to this csv')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    results = simulate(
+        load_events(args.events),
+        daily_loss_limits=np.linspace(-0.06, -0.01, 11),
+        profit_factor_thresholds=np.linspace(1.0, 2.5, 16),
+        volatility_thresholds=np.linspace(1.5, 4.0, 11),
+        starting_equity=args.equity
+    )
+    if args.out:
+        results.to_csv(args.out, index=False)
+    ranked = results.assign(pnl_per_drawdown=results['pnl'] / results['max_drawdown'].clip(lower=1e-9))
+    print(ranked.sort_values('pnl_per_drawdown', ascending=False).head(args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
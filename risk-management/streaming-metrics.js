@@ -0,0 +1,217 @@
+// risk-management/streaming-metrics.js
+// O(1)-per-event performance metrics over a local position/cash ledger:
+// equity, peak-to-trough drawdown, win/loss counts, profit factor and rolling
+// realized volatility. Nothing here touches the broker or the network.
+
+// Rolling mean/std over the last `size` samples (ring buffer + running sums)
+export class RollingStats {
+  constructor(size) {
+    this.values = new Float64Array(size);
+    this.head = 0;
+    this.length = 0;
+    this.sum = 0;
+    this.sumSq = 0;
+  }
+
+  push(value) {
+    if (this.length === this.values.length) {
+      const out = this.values[this.head];
+      this.sum -= out;
+      this.sumSq -= out * out;
+    } else {
+      this.length++;
+    }
+    this.values[this.head] = value;
+    this.head = (this.head + 1) % this.values.length;
+    this.sum += value;
+    this.sumSq += value * value;
+  }
+
+  get mean() {
+    return this.length > 0 ? this.sum / this.length : 0;
+  }
+
+  // Sample standard deviation
+  get std() {
+    if (this.length < 2) return 0;
+    const variance = (this.sumSq - (this.sum * this.sum) / this.length) / (this.length - 1);
+    return Math.sqrt(Math.max(0, variance));
+  }
+}
+
+// Average-cost positions plus cash; market value is kept incrementally so
+// equity is O(1) after every fill or mark
+export class PositionLedger {
+  constructor(cash = 0) {
+    this.cash = cash;
+    this.positions = new Map(); // symbol -> { qty, avgPrice, mark }
+    this.marketValue = 0;
+    this.realizedPnL = 0;
+  }
+
+  get equity() {
+    return this.cash + this.marketValue;
+  }
+
+  _position(symbol) {
+    let position = this.positions.get(symbol);
+    if (!position) {
+      position = { qty: 0, avgPrice: 0, mark: 0 };
+      this.positions.set(symbol, position);
+    }
+    return position;
+  }
+
+  // Returns the PnL realized by this fill (0 when it only opens/adds)
+  applyFill({ symbol, side, qty, price, fee = 0 }) {
+    const position = this._position(symbol);
+    const signed = side === 'buy' ? qty : -qty;
+    let realized = 0;
+
+    // Portion of the fill that reduces an existing position
+    if (position.qty !== 0 && Math.sign(signed) !== Math.sign(position.qty)) {
+      const closing = Math.min(Math.abs(signed), Math.abs(position.qty));
+      realized = closing * (price - position.avgPrice) * Math.sign(position.qty);
+    }
+
+    const newQty = position.qty + signed;
+    if (newQty === 0) {
+      position.avgPrice = 0;
+    } else if (Math.sign(newQty) !== Math.sign(position.qty)) {
+      position.avgPrice = price; // flipped or opened
+    } else if (Math.abs(newQty) > Math.abs(position.qty)) {
+      position.avgPrice = (position.avgPrice * position.qty + price * signed) / newQty;
+    }
+
+    this.cash -= signed * price + fee;
+    this.marketValue += newQty * price - position.qty * position.mark;
+    position.qty = newQty;
+    position.mark = price;
+
+    realized -= fee;
+    this.realizedPnL += realized;
+    return realized;
+  }
+
+  mark(symbol, price) {
+    const position = this.positions.get(symbol);
+    if (!position || position.qty === 0) {
+      if (position) position.mark = price;
+      return;
+    }
+    this.marketValue += position.qty * (price - position.mark);
+    position.mark = price;
+  }
+}
+
+export class StreamingMetrics {
+  constructor({ startingEquity = 0, volatilityWindow = 20, baselineWindow = 200 } = {}) {
+    this.ledger = new PositionLedger(startingEquity);
+    this.shortReturns = new RollingStats(volatilityWindow);
+    this.baselineReturns = new RollingStats(baselineWindow);
+    this.resetDay();
+  }
+
+  resetDay() {
+    this.dayStartEquity = this.ledger.equity;
+    this.peakEquity = this.ledger.equity;
+    this.lastEquity = this.ledger.equity;
+    this.drawdown = 0;
+    this.maxDrawdown = 0;
+    this.wins = 0;
+    this.losses = 0;
+    this.grossProfit = 0;
+    this.grossLoss = 0;
+  }
+
+  applyFill(fill) {
+    const realized = this.ledger.applyFill(fill);
+    if (realized !== 0) this._recordRealized(realized);
+    this._updateEquity();
+    return realized;
+  }
+
+  // A closed trade reported only by its PnL (no fills available)
+  recordTrade(profit) {
+    this.ledger.cash += profit;
+    this.ledger.realizedPnL += profit;
+    this._recordRealized(profit);
+    this._updateEquity();
+  }
+
+  mark(symbol, price) {
+    this.ledger.mark(symbol, price);
+    this._updateEquity();
+  }
+
+  _recordRealized(pnl) {
+    if (pnl > 0) {
+      this.wins++;
+      this.grossProfit += pnl;
+    } else {
+      this.losses++;
+      this.grossLoss -= pnl;
+    }
+  }
+
+  _updateEquity() {
+    const equity = this.ledger.equity;
+    if (this.lastEquity > 0 && equity > 0 && equity !== this.lastEquity) {
+      const r = Math.log(equity / this.lastEquity);
+      this.shortReturns.push(r);
+      this.baselineReturns.push(r);
+    }
+    this.lastEquity = equity;
+    if (equity > this.peakEquity) this.peakEquity = equity;
+    this.drawdown = this.peakEquity > 0 ? (this.peakEquity - equity) / this.peakEquity : 0;
+    if (this.drawdown > this.maxDrawdown) this.maxDrawdown = this.drawdown;
+  }
+
+  get equity() {
+    return this.ledger.equity;
+  }
+
+  get dailyReturn() {
+    return this.dayStartEquity > 0 ? (this.equity - this.dayStartEquity) / this.dayStartEquity : 0;
+  }
+
+  get trades() {
+    return this.wins + this.losses;
+  }
+
+  get winRate() {
+    return this.trades > 0 ? this.wins / this.trades : 0;
+  }
+
+  get profitFactor() {
+    return this.grossLoss > 0 ? this.grossProfit / this.grossLoss : Infinity;
+  }
+
+  get volatility() {
+    return this.shortReturns.std;
+  }
+
+  // Short-window volatility relative to the longer baseline (NaN until warm)
+  get volatilityRatio() {
+    if (this.baselineReturns.length < this.shortReturns.values.length) return NaN;
+    const baseline = this.baselineReturns.std;
+    return baseline > 0 ? this.shortReturns.std / baseline : NaN;
+  }
+
+  snapshot() {
+    return {
+      equity: this.equity,
+      dailyReturn: this.dailyReturn,
+      drawdown: this.drawdown,
+      maxDrawdown: this.maxDrawdown,
+      trades: this.trades,
+      wins: this.wins,
+      winRate: this.winRate,
+      grossProfit: this.grossProfit,
+      grossLoss: this.grossLoss,
+      profitFactor: this.profitFactor,
+      volatility: this.volatility,
+      volatilityRatio: this.volatilityRatio
+    };
+  }
+}
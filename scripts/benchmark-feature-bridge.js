@@ -0,0 +1,148 @@
+// scripts/benchmark-feature-bridge.js
+// Corporate-action adjustment latency: per-bar window round trip vs the
+// batched feature bridge.
+//   node scripts/benchmark-feature-bridge.js [minutes] [--symbols N] [--python BIN]
+// The "window" path reproduces the previous RollingWindowManager, which sent
+// the whole 60-bar window as JSON over python-bridge's stdio pipe on every
+// bar and got adjusted records back (DataFrame + apply_adjustments + to_dict).
+// The bridge path asks for factors for every symbol's bar in one frame, first
+// uncached (every minute a cache miss) and then with the factor cache.
+import { spawn } from 'child_process';
+import { once } from 'events';
+import os from 'os';
+import path from 'path';
+import readline from 'readline';
+import { fileURLToPath } from 'url';
+import { performance } from 'perf_hooks';
+import { FeatureBridge } from '../shared/feature-bridge.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(name);
+  return index >= 0 ? args[index + 1] : fallback;
+};
+const MINUTES = Number(args.find(a => /^\d+$/.test(a))) || 200;
+const SYMBOL_COUNT = Number(option('--symbols', 20));
+const PYTHON = option('--python', 'python3');
+const WINDOW = 60;
+
+const ROOT = path.dirname(path.dirname(fileURLToPath(import.meta.url)));
+const SOCKET = path.join(os.tmpdir(), `feature-bridge-bench-${process.pid}.sock`);
+const SYMBOLS = Array.from({ length: SYMBOL_COUNT }, (_, i) => `SYM${i}`);
+const START = Date.UTC(2024, 5, 3, 13, 30);
+
+// Every symbol gets a split and a dividend inside the replayed range
+const SETUP = `
+import sys, logging
+sys.path.insert(0, ${JSON.stringify(path.join(ROOT, 'data-ingestion'))})
+import pandas as pd
+from corporate_actions import CorporateActionsManager
+logging.disable(logging.CRITICAL)
+symbols = ${JSON.stringify(SYMBOLS)}
+manager = CorporateActionsManager()
+manager.splits = pd.DataFrame({'symbol': symbols, 'execution_date': '2024-06-03 14:00',
+                               'split_from': 1, 'split_to': 2})
+manager.dividends = pd.DataFrame({'symbol': symbols, 'ex_dividend_date': '2024-06-03 15:00',
+                                  'cash_amount': 0.25})
+manager._create_adjustment_maps()
+`;
+
+const WINDOW_SERVER = `${SETUP}
+import json
+for line in sys.stdin:
+    request = json.loads(line)
+    frame = pd.DataFrame(request['window'])
+    frame.index = pd.to_datetime(frame.pop('timestamp'), unit='ms')
+    adjusted = manager.apply_adjustments(frame, request['symbol'])
+    sys.stdout.write(json.dumps(adjusted.reset_index(drop=True).to_dict('records')) + '\\n')
+    sys.stdout.flush()
+`;
+
+const BRIDGE_SERVER = `${SETUP}
+import asyncio
+from feature_bridge import FeatureBridgeServer
+asyncio.run(FeatureBridgeServer(manager).serve(${JSON.stringify(SOCKET)}))
+`;
+
+function bar(symbol, minute) {
+  const close = 150 + Math.sin(minute / 10) + symbol.length;
+  return {
+    timestamp: START + minute * 60000,
+    open: close - 0.1, high: close + 0.2, low: close - 0.2, close, volume: 1000 + minute, vwap: close
+  };
+}
+
+function report(label, histogram, total, count) {
+  const { p50, p99, max } = histogram.snapshot();
+  console.log(`${label.padEnd(24)} p50 ${p50.toFixed(4).padStart(9)} ms  p99 ${p99.toFixed(4).padStart(9)} ms  max ${max.toFixed(3).padStart(8)} ms  (${(total / count * 1000).toFixed(1)} us/bar)`);
+}
+
+async function benchWindowPath() {
+  const child = spawn(PYTHON, ['-c', WINDOW_SERVER], { stdio: ['pipe', 'pipe', 'inherit'] });
+  const lines = readline.createInterface({ input: child.stdout })[Symbol.asyncIterator]();
+  const windows = new Map(SYMBOLS.map(symbol => [symbol, []]));
+  const histogram = new LatencyHistogram();
+  const minutes = Math.min(MINUTES, 50); // sequential and slow; sample fewer
+  child.stdin.write(JSON.stringify({ symbol: SYMBOLS[0], window: [bar(SYMBOLS[0], 0)] }) + '\n');
+  await lines.next(); // interpreter warm-up
+  const t0 = performance.now();
+  for (let minute = 0; minute < minutes; minute++) {
+    for (const symbol of SYMBOLS) {
+      const window = windows.get(symbol);
+      window.push(bar(symbol, minute));
+      if (window.length > WINDOW) window.shift();
+      const start = performance.now();
+      child.stdin.write(JSON.stringify({ symbol, window }) + '\n');
+      await lines.next();
+      histogram.record(performance.now() - start);
+    }
+  }
+  report('window round trip', histogram, performance.now() - t0, minutes * SYMBOLS.length);
+  child.stdin.end();
+  await once(child, 'exit');
+}
+
+async function connectBridge() {
+  const bridge = new FeatureBridge({ socketPath: SOCKET, timeout: 5000 });
+  for (let attempt = 0; attempt < 100; attempt++) {
+    try {
+      await bridge.request({ method: 'ping' });
+      return bridge;
+    } catch {
+      bridge.close();
+      await new Promise(resolve => setTimeout(resolve, 100));
+    }
+  }
+  throw new Error('Feature bridge did not start');
+}
+
+async function benchBridge(bridge, label, { cached }) {
+  const histogram = new LatencyHistogram();
+  const t0 = performance.now();
+  for (let minute = 0; minute < MINUTES; minute++) {
+    if (!cached) bridge.factors.clear();
+    // One bar per symbol arrives in the same minute: one frame for all of them
+    const start = performance.now();
+    await Promise.all(SYMBOLS.map(symbol => {
+      const timestamp = START + minute * 60000;
+      return bridge.cachedFactors(symbol, timestamp) ?? bridge.adjustmentFactors(symbol, timestamp);
+    }));
+    histogram.record((performance.now() - start) / SYMBOLS.length);
+  }
+  report(label, histogram, performance.now() - t0, MINUTES * SYMBOLS.length);
+}
+
+console.log(`Corporate-action adjustment latency per bar (${SYMBOL_COUNT} symbols, ${WINDOW}-bar window)`);
+await benchWindowPath();
+
+const server = spawn(PYTHON, ['-c', BRIDGE_SERVER], { stdio: ['ignore', 'inherit', 'inherit'] });
+try {
+  const bridge = await connectBridge();
+  await benchBridge(bridge, 'bridge, batched', { cached: false });
+  await benchBridge(bridge, 'bridge, factor cache', { cached: true });
+  console.log(`bridge frames: ${bridge.stats.frames}, cache hits: ${bridge.stats.cacheHits}`);
+  bridge.close();
+} finally {
+  server.kill();
+}
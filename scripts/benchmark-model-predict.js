@@ -0,0 +1,115 @@
+// scripts/benchmark-model-predict.js
+// HybridModel.predict leak and latency check.
+//   node --expose-gc scripts/benchmark-model-predict.js [iterations] [--legacy]
+// Runs predict on a moving feature window and reports tf.memory() tensors and
+// bytes, JS heap and latency at checkpoints; both tensor columns should stay
+// flat. --legacy also runs the previous path (per-timestep normalize objects,
+// nested arrays, three dataSync() calls, outputs never disposed) for contrast.
+import * as tf from '@tensorflow/tfjs-node';
+import { performance } from 'perf_hooks';
+import { HybridModel } from '../ml-core/tfjs-model.js';
+import { FeatureNormalizer } from '../feature-engine/feature-normalization.js';
+import { FeatureWindow } from '../ml-core/model-input-stream.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+
+const args = process.argv.slice(2);
+const ITERATIONS = Number(args.find(a => /^\d+$/.test(a))) || 20000;
+const CHECKPOINTS = 5;
+const FEATURE_ORDER = FeatureNormalizer.getFeatureOrder();
+
+const featureSet = i => ({
+  atr5: 0.2 + 0.05 * Math.sin(i / 30),
+  orderBookImbalance: Math.sin(i / 7),
+  rsi3: 50 + 30 * Math.sin(i / 11),
+  vwapDeviation: 0.005 * Math.cos(i / 13),
+  volumeSpike: i % 17 === 0,
+  orderFlowImbalance: Math.cos(i / 5) / 2
+});
+
+// The pre-change HybridModel.predict body
+async function legacyPredict(model, featureWindow) {
+  const tensorData = featureWindow.map(featureSet => {
+    const normalized = FeatureNormalizer.normalize(featureSet);
+    return FEATURE_ORDER.map(k => normalized[k]);
+  });
+  const tensor = tf.tensor3d([tensorData], [1, 60, 6]);
+  try {
+    const outputs = model.model.predict(tensor);
+    return {
+      direction: outputs[0].dataSync()[0] > 0.5 ? 'LONG' : 'SHORT',
+      volatility: outputs[1].dataSync()[0],
+      position: Math.min(1, Math.max(0.1, outputs[2].dataSync()[0]))
+    };
+  } finally {
+    tf.dispose(tensor);
+  }
+}
+
+const modes = {
+  legacy(model) {
+    const sets = Array.from({ length: 60 }, (_, i) => featureSet(i));
+    return i => {
+      sets.shift();
+      sets.push(featureSet(i));
+      return legacyPredict(model, sets);
+    };
+  },
+  objects(model) {
+    const sets = Array.from({ length: 60 }, (_, i) => featureSet(i));
+    return i => {
+      sets.shift();
+      sets.push(featureSet(i));
+      return model.predict(sets);
+    };
+  },
+  rows(model) {
+    const window = new FeatureWindow(60, FEATURE_ORDER.length);
+    const row = new Float32Array(FEATURE_ORDER.length);
+    const push = i => {
+      const set = featureSet(i);
+      FEATURE_ORDER.forEach((name, j) => { row[j] = Number(set[name]); });
+      window.push(row);
+    };
+    for (let i = 0; i < 60; i++) push(i);
+    return i => {
+      push(i);
+      return model.predict(window.values);
+    };
+  }
+};
+
+const heapMb = () => {
+  global.gc?.();
+  return process.memoryUsage().heapUsed / 2 ** 20;
+};
+
+async function run(name, model) {
+  const predict = modes[name](model);
+  for (let i = 0; i < 50; i++) await predict(i); // warm up kernels
+  const every = Math.ceil(ITERATIONS / CHECKPOINTS);
+  const latency = new LatencyHistogram();
+  const start = tf.memory();
+  const heap = heapMb();
+
+  console.log(`\n${name}`);
+  console.log('  iteration   tensors   tensor MB   heap +MB   p50 ms   p99 ms');
+  for (let i = 1; i <= ITERATIONS; i++) {
+    const t0 = performance.now();
+    await predict(60 + i);
+    latency.record(performance.now() - t0);
+    if (i % every === 0 || i === ITERATIONS) {
+      const { numTensors, numBytes } = tf.memory();
+      const { p50, p99 } = latency.snapshot();
+      console.log(`  ${String(i).padStart(9)}  ${String(numTensors - start.numTensors).padStart(8)}` +
+        `  ${((numBytes - start.numBytes) / 2 ** 20).toFixed(2).padStart(10)}  ${(heapMb() - heap).toFixed(2).padStart(9)}` +
+        `  ${p50.toFixed(3).padStart(7)}  ${p99.toFixed(3).padStart(7)}`);
+      latency.reset();
+    }
+  }
+}
+
+const model = new HybridModel();
+await model.loadModel();
+console.log(`HybridModel.predict: ${ITERATIONS} iterations per mode, backend ${tf.getBackend()}` +
+  `${global.gc ? '' : ' (run with --expose-gc for stable heap figures)'}`);
+for (const name of [...(args.includes('--legacy') ? ['legacy'] : []), 'objects', 'rows']) await run(name, model);
@@ -0,0 +1,63 @@
+// scripts/benchmark-model-swap.js
+// First-prediction latency after a hot swap vs steady state.
+//   node scripts/benchmark-model-swap.js [swaps] [--url file://.../model.json]
+// Each round swaps in the model (as a new version) while predictions keep
+// running, then times the first prediction on the new version. `cold` is the
+// previous behaviour: a freshly loaded, unwarmed model's first prediction.
+import * as tf from '@tensorflow/tfjs-node';
+import { performance } from 'perf_hooks';
+import { HybridModel } from '../ml-core/tfjs-model.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(name);
+  return index >= 0 ? args[index + 1] : fallback;
+};
+const SWAPS = Number(args.find(a => /^\d+$/.test(a))) || 5;
+const URL = option('--url', 'file://./ml-core/models/hybrid_model/model.json');
+
+const rows = new Float32Array(60 * 6).map((_, i) => Math.sin(i));
+const timed = async fn => {
+  const start = performance.now();
+  await fn();
+  return performance.now() - start;
+};
+const fmt = ({ p50, p99, max }) => `p50 ${p50.toFixed(3)} ms  p99 ${p99.toFixed(3)} ms  max ${max.toFixed(3)} ms`;
+
+const model = new HybridModel();
+await model.loadModel(URL, { version: 'v0' });
+
+const steady = new LatencyHistogram();
+for (let i = 0; i < 500; i++) steady.record(await timed(() => model.predict(rows)));
+
+const cold = new LatencyHistogram();
+const afterSwap = new LatencyHistogram();
+const during = new LatencyHistogram();
+for (let swap = 1; swap <= SWAPS; swap++) {
+  const unwarmed = await tf.loadLayersModel(URL);
+  const input = tf.tensor3d(rows, [1, 60, 6]);
+  cold.record(await timed(async () => {
+    const outputs = unwarmed.predict(input);
+    await Promise.all(outputs.map(t => t.data()));
+    tf.dispose(outputs);
+  }));
+  tf.dispose(input);
+  unwarmed.dispose();
+
+  // Keep serving while the next version loads, warms and validates
+  let swapping = true;
+  const loading = model.registry.load(URL, { version: `v${swap}` }).finally(() => { swapping = false; });
+  while (swapping) {
+    during.record(await timed(() => model.predict(rows)));
+    await new Promise(setImmediate);
+  }
+  await loading;
+  afterSwap.record(await timed(() => model.predict(rows)));
+}
+
+console.log(`Model swap: ${SWAPS} swaps, backend ${tf.getBackend()}, ${tf.memory().numTensors} live tensors at exit`);
+console.log(`  steady state          ${fmt(steady.snapshot())}`);
+console.log(`  first after cold load ${fmt(cold.snapshot())}`);
+console.log(`  first after swap      ${fmt(afterSwap.snapshot())}`);
+console.log(`  during swap (${String(during.count).padStart(4)})   ${fmt(during.snapshot())}`);
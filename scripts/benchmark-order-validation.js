@@ -0,0 +1,67 @@
+// scripts/benchmark-order-validation.js
+// Order validation latency: broker-query spoof check vs local ledger lookup.
+//   node scripts/benchmark-order-validation.js [orders] [--rtt MS]
+// The "remote" path reproduces the previous detectSpoofingPattern, which
+// awaited alpaca.getOrders({ status: 'canceled' }) per order; the broker is
+// stubbed with a fixed round-trip time (default 40 ms, override with --rtt).
+import { performance } from 'perf_hooks';
+import { OrderValidator } from '../execution/anti-gaming.js';
+import { OrderLedger } from '../execution/order-ledger.js';
+import { RateLimiter } from '../execution/rate-limiter.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+
+const args = process.argv.slice(2);
+const N = Number(args.find(a => /^\d+$/.test(a))) || 2000;
+const rttIndex = args.indexOf('--rtt');
+const RTT = rttIndex >= 0 ? Number(args[rttIndex + 1]) : 40;
+const SYMBOLS = ['AAPL', 'MSFT', 'NVDA', 'TSLA', 'AMZN'];
+
+const orders = Array.from({ length: N }, (_, i) => ({
+  symbol: SYMBOLS[i % SYMBOLS.length],
+  side: i % 2 ? 'sell' : 'buy',
+  qty: 100,
+  limit_price: 150
+}));
+
+// Unlimited budget so only the spoof/wash checks are measured
+const limiter = new RateLimiter({
+  global: { capacity: Infinity, refillPerSecond: 0 },
+  endpoints: { orders: { capacity: Infinity, refillPerSecond: 0 } }
+});
+
+const ledger = new OrderLedger();
+for (let i = 0; i < 500; i++) {
+  const order = { client_order_id: `seed_${i}`, ...orders[i % orders.length], limit_price: 140 + (i % 20) };
+  ledger.recordSubmit(order);
+  if (i % 3 === 0) ledger.recordCancel(order);
+}
+
+class RemoteSpoofValidator extends OrderValidator {
+  async detectSpoofingPattern() {
+    const cancellations = await new Promise(resolve => setTimeout(() => resolve([]), RTT));
+    return cancellations.length > 3;
+  }
+
+  async validateOrder(order) {
+    const spoofing = await this.detectSpoofingPattern(order);
+    return { valid: !spoofing && this.isValidQuantity(order) && this.isValidPrice(order), reason: null };
+  }
+}
+
+async function run(label, validator, count) {
+  const histogram = new LatencyHistogram();
+  const t0 = performance.now();
+  for (let i = 0; i < count; i++) {
+    const start = performance.now();
+    await validator.validateOrder(orders[i]);
+    histogram.record(performance.now() - start);
+  }
+  const total = performance.now() - t0;
+  const { p50, p99, max } = histogram.snapshot();
+  console.log(`${label.padEnd(22)} p50 ${p50.toFixed(4).padStart(9)} ms  p99 ${p99.toFixed(4).padStart(9)} ms  max ${max.toFixed(3).padStart(8)} ms  (${count} orders, ${total.toFixed(0)} ms)`);
+}
+
+console.log(`Order validation latency (remote RTT ${RTT} ms)`);
+// The remote path is sequential and slow; sample fewer orders
+await run('remote spoof check', new RemoteSpoofValidator(limiter, ledger), Math.min(N, 50));
+await run('local ledger', new OrderValidator(limiter, ledger), N);
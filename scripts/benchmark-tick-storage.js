@@ -0,0 +1,95 @@
+// scripts/benchmark-tick-storage.js
+// JSON-in-ZSET vs binary blob tick storage: encode/decode throughput and size.
+//   node scripts/benchmark-tick-storage.js [ticks] [--redis]
+// With --redis, both formats are also written to REDIS_URL and compared with
+// MEMORY USAGE (keys are deleted afterwards).
+import { TICK_RECORD_SIZE, encodeTick, decodeTicks } from '../data-ingestion/tick-codec.js';
+
+const args = process.argv.slice(2);
+const N = Number(args.find(a => /^\d+$/.test(a))) || 200000;
+const useRedis = args.includes('--redis');
+const SYMBOL = 'BENCH';
+
+function syntheticTicks(n) {
+  const start = Date.now();
+  let price = 150;
+  return Array.from({ length: n }, (_, i) => {
+    price += (Math.random() - 0.5) * 0.02;
+    return {
+      timestamp: start + i,
+      price: Math.round(price * 100) / 100,
+      size: 1 + Math.floor(Math.random() * 500),
+      conditions: Math.random() < 0.2 ? [12, 37] : []
+    };
+  });
+}
+
+function time(fn) {
+  const t0 = process.hrtime.bigint();
+  const result = fn();
+  return { result, ms: Number(process.hrtime.bigint() - t0) / 1e6 };
+}
+
+function report(label, ms, bytes) {
+  const rate = Math.round(N / (ms / 1000)).toLocaleString();
+  const size = bytes !== undefined ? `  ${(bytes / N).toFixed(1)} B/tick` : '';
+  console.log(`${label.padEnd(18)} ${ms.toFixed(1).padStart(9)} ms  ${rate.padStart(12)} ticks/s${size}`);
+}
+
+const ticks = syntheticTicks(N);
+
+// Previous format: one JSON member per tick
+const jsonEncode = time(() => ticks.map(t => JSON.stringify({ ...t, symbol: SYMBOL, processedAt: Date.now() })));
+const jsonBytes = jsonEncode.result.reduce((sum, s) => sum + Buffer.byteLength(s), 0);
+const jsonDecode = time(() => jsonEncode.result.map(s => JSON.parse(s)));
+
+// Binary format: fixed-width records in one buffer
+const binaryEncode = time(() => {
+  const buffer = Buffer.allocUnsafe(N * TICK_RECORD_SIZE);
+  let offset = 0;
+  for (const tick of ticks) offset = encodeTick(buffer, offset, tick);
+  return buffer;
+});
+const binaryDecode = time(() => decodeTicks(binaryEncode.result));
+
+console.log(`Tick storage benchmark (${N.toLocaleString()} ticks)`);
+report('json encode', jsonEncode.ms, jsonBytes);
+report('json decode', jsonDecode.ms);
+report('binary encode', binaryEncode.ms, binaryEncode.result.length);
+report('binary decode', binaryDecode.ms);
+
+if (useRedis) {
+  const { default: Redis } = await import('ioredis');
+  const redis = new Redis(process.env.REDIS_URL);
+  const jsonKey = `bench:ticks:json:${SYMBOL}`;
+  const binaryKey = `bench:ticks:binary:${SYMBOL}`;
+  await redis.del(jsonKey, binaryKey);
+
+  const CHUNK = 1000;
+  const t0 = process.hrtime.bigint();
+  for (let i = 0; i < N; i += CHUNK) {
+    const pipeline = redis.pipeline();
+    for (let j = i; j < Math.min(i + CHUNK, N); j++) {
+      pipeline.zadd(jsonKey, ticks[j].timestamp, jsonEncode.result[j]);
+      pipeline.expire(jsonKey, 604800);
+    }
+    await pipeline.exec();
+  }
+  const jsonWriteMs = Number(process.hrtime.bigint() - t0) / 1e6;
+
+  const t1 = process.hrtime.bigint();
+  for (let i = 0; i < N; i += CHUNK) {
+    const end = Math.min(i + CHUNK, N) * TICK_RECORD_SIZE;
+    await redis.append(binaryKey, binaryEncode.result.subarray(i * TICK_RECORD_SIZE, end));
+  }
+  await redis.expire(binaryKey, 604800);
+  const binaryWriteMs = Number(process.hrtime.bigint() - t1) / 1e6;
+
+  const jsonMemory = await redis.memory('USAGE', jsonKey);
+  const binaryMemory = await redis.memory('USAGE', binaryKey);
+  report('redis json write', jsonWriteMs, jsonMemory);
+  report('redis bin write', binaryWriteMs, binaryMemory);
+
+  await redis.del(jsonKey, binaryKey);
+  await redis.quit();
+}
@@ -0,0 +1,88 @@
+// scripts/replay-ingest.js
+// Replays websocket frames through IngestPipeline and reports throughput,
+// queue depth and frame-to-persist latency.
+//   node scripts/replay-ingest.js [frames.jsonl] [--frames N] [--rtt MS] [--redis]
+// Without a file, synthetic T/Q/A bursts are generated. Without --redis, a
+// stub pipeline that acks after --rtt ms stands in for Redis.
+import fs from 'fs';
+import { IngestPipeline } from '../data-ingestion/ingest-pipeline.js';
+import { TickStore } from '../data-ingestion/tick-persistence.js';
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const i = args.indexOf(name);
+  return i >= 0 ? Number(args[i + 1]) : fallback;
+};
+const file = args.find(a => a.endsWith('.jsonl'));
+const FRAMES = option('--frames', 20000);
+const RTT = option('--rtt', 1);
+const useRedis = args.includes('--redis');
+const SYMBOLS = ['AAPL', 'MSFT', 'NVDA', 'TSLA', 'AMZN'];
+
+function syntheticFrames(n) {
+  const start = Date.now();
+  const frames = [];
+  for (let i = 0; i < n; i++) {
+    const sym = SYMBOLS[i % SYMBOLS.length];
+    const t = start + i;
+    const price = 100 + (i % 500) / 100;
+    frames.push(JSON.stringify([
+      { ev: 'T', sym, t, p: price, s: 100, c: [12] },
+      { ev: 'Q', sym, t, bp: price - 0.01, ap: price + 0.01, bs: 3, as: 4 },
+      ...(i % 100 === 0 ? [{ ev: 'A', sym, s: t, e: t + 1000, o: price, h: price, l: price, c: price, v: 1000 }] : [])
+    ]));
+  }
+  return frames;
+}
+
+function stubRedis() {
+  let commands = 0;
+  const pipeline = () => {
+    let queued = 0;
+    const batch = new Proxy({}, {
+      get: (_, prop) => prop === 'exec'
+        ? () => new Promise(resolve => setTimeout(() => {
+          commands += queued;
+          resolve(Array.from({ length: queued }, () => [null, 'OK']));
+        }, RTT))
+        : () => { queued++; return batch; }
+    });
+    return batch;
+  };
+  return { pipeline, get commands() { return commands; } };
+}
+
+const frames = file
+  ? fs.readFileSync(file, 'utf8').split('\n').filter(Boolean)
+  : syntheticFrames(FRAMES);
+
+let redis;
+if (useRedis) {
+  const { default: Redis } = await import('ioredis');
+  redis = new Redis(process.env.REDIS_URL);
+} else {
+  redis = stubRedis();
+}
+
+const pipeline = new IngestPipeline(redis, { tickStore: new TickStore(redis) });
+pipeline.start();
+
+// Deliver frames in bursts, yielding to the event loop between them like a socket would
+const BURST = 500;
+const t0 = process.hrtime.bigint();
+for (let i = 0; i < frames.length; i += BURST) {
+  for (let j = i; j < Math.min(i + BURST, frames.length); j++) pipeline.push(frames[j]);
+  await new Promise(resolve => setImmediate(resolve));
+}
+await pipeline.stop();
+const ms = Number(process.hrtime.bigint() - t0) / 1e6;
+
+const metrics = pipeline.getMetrics();
+const { latency } = metrics;
+console.log(`Replayed ${metrics.frames.toLocaleString()} frames / ${metrics.messages.toLocaleString()} messages in ${ms.toFixed(1)} ms`);
+console.log(`  throughput      ${Math.round(metrics.messages / (ms / 1000)).toLocaleString()} msg/s`);
+console.log(`  flushes         ${metrics.flushes} (errors ${metrics.flushErrors}, command errors ${metrics.commandErrors})`);
+console.log(`  max queue depth ${metrics.maxQueueDepth}`);
+console.log(`  latency ms      p50 ${latency.p50.toFixed(2)}  p99 ${latency.p99.toFixed(2)}  max ${latency.max.toFixed(2)}`);
+
+if (useRedis) await redis.quit();
@@ -0,0 +1,183 @@
+// scripts/soak-model-input.js
+// Model input soak: simulates a trading session of feature vectors flowing
+// into model:input:{symbol} streams and one predictor read per vector, and
+// reports stream size, heap and read cost at checkpoints.
+//   node --expose-gc scripts/soak-model-input.js [minutes] [--symbols N] [--rate PER_SEC] [--redis]
+// `unbounded` is the previous handoff (plain XADD, XREAD COUNT 60 from 0 into
+// fresh arrays); `capped` is MAXLEN ~ plus ModelInputStream. Streams live in
+// an in-memory store (so they count towards heap) unless --redis is given,
+// in which case XLEN and MEMORY USAGE come from REDIS_URL.
+import { performance } from 'perf_hooks';
+import config from '../shared/config.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+import { FEATURE_NAMES } from '../feature-engine/feature-vector.js';
+import { ModelInputStream } from '../ml-core/model-input-stream.js';
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(name);
+  return index >= 0 ? args[index + 1] : fallback;
+};
+const MINUTES = Number(args.find(a => /^\d+$/.test(a))) || 390;
+const SYMBOL_COUNT = Number(option('--symbols', 8));
+const RATE = Number(option('--rate', 1));          // vectors per symbol per simulated second
+const CHECKPOINTS = 6;
+const SYMBOLS = Array.from({ length: SYMBOL_COUNT }, (_, i) => `SYM${i}`);
+const WINDOW = config.modelInput.window;
+
+const sequence = id => Number(id.split('-')[1]);
+
+// In-memory Redis streams; MAXLEN ~ trims in whole 100-entry nodes like Redis
+class MemoryStreams {
+  constructor() {
+    this.streams = new Map();
+    this.seq = 0;
+  }
+
+  _stream(key) {
+    if (!this.streams.has(key)) this.streams.set(key, { entries: [] });
+    return this.streams.get(key);
+  }
+
+  async xadd(key, ...args) {
+    let maxLen = Infinity;
+    if (args[0] === 'MAXLEN') {
+      maxLen = Number(args[2]);
+      args = args.slice(3);
+    }
+    const stream = this._stream(key);
+    const id = `${Date.now()}-${++this.seq}`;
+    stream.entries.push([id, args.slice(1)]);
+    const excess = stream.entries.length - maxLen;
+    if (excess >= 100) stream.entries.splice(0, excess - (excess % 100));
+    return id;
+  }
+
+  async xrevrange(key, end, start, _, count) {
+    return this._stream(key).entries.slice(-count).reverse();
+  }
+
+  // Entries after each stream's id ('0' reads from the start)
+  async xread(...args) {
+    const count = Number(args[args.indexOf('COUNT') + 1]);
+    const streams = args.slice(args.indexOf('STREAMS') + 1);
+    const keys = streams.slice(0, streams.length / 2);
+    const reply = [];
+    keys.forEach((key, i) => {
+      const id = streams[keys.length + i];
+      const after = id.includes('-') ? sequence(id) : 0;
+      const { entries } = this._stream(key);
+      let from = entries.length;
+      while (from > 0 && sequence(entries[from - 1][0]) > after) from--;
+      if (from < entries.length) reply.push([key, entries.slice(from, from + count)]);
+    });
+    return reply.length ? reply : null;
+  }
+
+  async usage() {
+    let length = 0;
+    for (const stream of this.streams.values()) length += stream.entries.length;
+    return { length, bytes: null };
+  }
+
+  async reset() {
+    this.streams.clear();
+  }
+}
+
+async function redisStreams() {
+  const { Redis } = await import('ioredis');
+  const client = new Redis(process.env.REDIS_URL);
+  const keys = SYMBOLS.map(symbol => `${config.modelInput.prefix}:soak:${symbol}`);
+  client.usage = async () => {
+    let length = 0;
+    let bytes = 0;
+    for (const key of keys) {
+      length += await client.xlen(key);
+      bytes += (await client.memory('USAGE', key)) || 0;
+    }
+    return { length, bytes };
+  };
+  client.reset = async () => { await client.del(...keys); };
+  return client;
+}
+
+const vector = (s, i) => JSON.stringify(Object.fromEntries(FEATURE_NAMES.map((name, j) =>
+  [name, name === 'volumeSpike' ? i % 7 === 0 : Math.sin(i / 100 + s + j)])));
+
+const modes = {
+  // Previous handoff: the stream grows all session, each read starts at 0
+  unbounded(redis, prefix) {
+    return {
+      publish: (symbol, fields) => redis.xadd(`${prefix}:${symbol}`, '*', ...fields),
+      async read(symbol) {
+        const reply = await redis.xread('COUNT', WINDOW, 'STREAMS', `${prefix}:${symbol}`, '0');
+        const entries = reply ? reply[0][1] : [];
+        const rows = entries.map(([, fields]) => Object.values(JSON.parse(fields[1])).map(Number));
+        return rows.length;
+      }
+    };
+  },
+  capped(redis, prefix) {
+    const inputs = new ModelInputStream(redis, { prefix });
+    let delivered = 0;
+    return {
+      setup: () => Promise.all(SYMBOLS.map(symbol => inputs.track(symbol))),
+      publish: (symbol, fields) =>
+        redis.xadd(`${prefix}:${symbol}`, 'MAXLEN', '~', config.modelInput.maxLen, '*', ...fields),
+      async read() {
+        const before = inputs.stats.entries;
+        await inputs.poll();
+        delivered = inputs.stats.entries - before;
+        return delivered;
+      }
+    };
+  }
+};
+
+const heapMb = () => {
+  global.gc?.();
+  return process.memoryUsage().heapUsed / 2 ** 20;
+};
+
+async function soak(name, redis) {
+  await redis.reset();
+  const prefix = `${config.modelInput.prefix}:soak`;
+  const mode = modes[name](redis, prefix);
+  await mode.setup?.();
+  const steps = MINUTES * 60 * RATE;
+  const every = Math.ceil(steps / CHECKPOINTS);
+  const latency = new LatencyHistogram();
+  let read = 0;
+  let reads = 0;
+  const baseline = heapMb();
+
+  console.log(`\n${name}`);
+  console.log('  minute   entries   stream MB   heap +MB   entries/read   read p50 ms   read p99 ms');
+  for (let step = 1; step <= steps; step++) {
+    for (let s = 0; s < SYMBOLS.length; s++) {
+      await mode.publish(SYMBOLS[s], ['features', vector(s, step)]);
+      const start = performance.now();
+      read += await mode.read(SYMBOLS[s]);
+      latency.record(performance.now() - start);
+      reads++;
+    }
+    if (step % every === 0 || step === steps) {
+      const { length, bytes } = await redis.usage();
+      const { p50, p99 } = latency.snapshot();
+      console.log(`  ${String(Math.round(step / RATE / 60)).padStart(6)}  ${String(length).padStart(8)}` +
+        `  ${(bytes === null ? '-' : (bytes / 2 ** 20).toFixed(2)).padStart(10)}  ${(heapMb() - baseline).toFixed(2).padStart(9)}` +
+        `  ${(read / reads).toFixed(1).padStart(13)}  ${p50.toFixed(4).padStart(12)}  ${p99.toFixed(4).padStart(12)}`);
+      latency.reset();
+      read = 0;
+      reads = 0;
+    }
+  }
+  await redis.reset();
+}
+
+const redis = args.includes('--redis') ? await redisStreams() : new MemoryStreams();
+console.log(`Model input soak: ${MINUTES} min, ${SYMBOL_COUNT} symbols, ${RATE} vector/s each, ` +
+  `${args.includes('--redis') ? 'redis' : 'in-memory streams'}${global.gc ? '' : ' (run with --expose-gc for stable heap figures)'}`);
+for (const name of ['unbounded', 'capped']) await soak(name, redis);
+redis.disconnect?.();
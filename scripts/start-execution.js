@@ -0,0 +1,24 @@
+// scripts/start-execution.js
+import dotenv from 'dotenv';
+import { tradingEngine } from '../execution/alpaca-router.js';
+import { tracer } from '../shared/tracing.js';
+
+dotenv.config();
+
+// Broker trade_updates keep the order ledger's cancels and fills current
+tradingEngine.startOrderUpdates();
+// stream/predict/route/submit/placeOrder spans are recorded in this process
+tracer.startExport();
+
+// Handle shutdown signals
+const shutdown = async () => {
+  console.log('\n🚨 Shutting down execution...');
+  tradingEngine.stopOrderUpdates();
+  await tracer.stopExport();
+  process.exit(0);
+};
+
+process.on('SIGINT', shutdown);
+process.on('SIGTERM', shutdown);
+
+console.log('🚀 Execution started (order updates connected)');
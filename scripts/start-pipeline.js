@@ -0,0 +1,34 @@
+// scripts/start-pipeline.js
+import dotenv from 'dotenv';
+import { RealTimePipeline } from '../feature-engine/realtime-pipeline.js';
+import { tracer } from '../shared/tracing.js';
+import { log } from '../shared/structured-log.js';
+
+dotenv.config();
+
+const pipeline = new RealTimePipeline();
+await pipeline.start();
+tracer.startExport();
+log.start();
+
+// Handle shutdown signals
+const shutdown = async () => {
+  console.log('\n🚨 Shutting down feature pipeline...');
+  await pipeline.stop();
+  await tracer.stopExport();
+  await log.stop();
+  process.exit(0);
+};
+
+process.on('SIGINT', shutdown);
+process.on('SIGTERM', shutdown);
+
+// Periodic per-shard throughput and lag
+setInterval(() => {
+  for (const shard of pipeline.getMetrics().shards) {
+    console.log(`shard ${shard.shard} [${shard.symbols.join(',')}] ${shard.throughput.toFixed(0)} msg/s, ` +
+      `queue ${shard.queueDepth}, dropped ${shard.dropped}, lag p50 ${shard.lag.p50.toFixed(2)} ms p99 ${shard.lag.p99.toFixed(2)} ms`);
+  }
+}, 60000);
+
+console.log(`🚀 Feature pipeline started (${pipeline.shards.length} shards, ${pipeline.symbols.size} symbols)`);
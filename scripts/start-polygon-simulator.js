@@ -0,0 +1,58 @@
+// scripts/start-polygon-simulator.js
+// Runs the local Polygon stand-in for benchmarks and load tests.
+//   node scripts/start-polygon-simulator.js [--port 8765] [--latency MS] [--jitter MS]
+//     [--error-rate 0.01] [--rate-limit PER_MIN] [--ws-rate MSGS_PER_S]
+//     [--frame-interval MS] [--frames frames.jsonl] [--tickers AAPL,MSFT]
+//     [--trades-per-day N] [--api-key KEY] [--stats-interval MS]
+// Point the clients at it with
+//   POLYGON_BASE_URL=<base url> POLYGON_WS_URL=<ws url> POLYGON_PAGE_DELAY=0
+import { PolygonSimulator, SyntheticMarket } from '../data-ingestion/polygon-simulator.js';
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(name);
+  return index >= 0 ? args[index + 1] : fallback;
+};
+const number = (name, fallback) => Number(option(name, fallback));
+
+const perMinute = number('--rate-limit', 0);
+const tickers = option('--tickers');
+const simulator = new PolygonSimulator({
+  market: new SyntheticMarket({
+    ...(tickers && { tickers: tickers.split(',') }),
+    tradesPerDay: number('--trades-per-day', 20000)
+  }),
+  latency: number('--latency', 0),
+  jitter: number('--jitter', 0),
+  errorRate: number('--error-rate', 0),
+  rateLimit: perMinute > 0 ? { capacity: perMinute, refillPerSecond: perMinute / 60 } : null,
+  apiKey: option('--api-key', null),
+  wsRate: number('--ws-rate', 1000),
+  frameInterval: number('--frame-interval', 5),
+  framesFile: option('--frames', null)
+});
+
+const { baseUrl, wsUrl } = await simulator.listen(number('--port', 8765), option('--host', '127.0.0.1'));
+console.log(`Polygon simulator on ${baseUrl} (websocket ${wsUrl})`);
+console.log(`  POLYGON_BASE_URL=${baseUrl} POLYGON_WS_URL=${wsUrl} POLYGON_PAGE_DELAY=0`);
+
+let last = { requests: 0, messages: 0 };
+const interval = number('--stats-interval', 10000);
+const timer = setInterval(() => {
+  const { requests, errors, rateLimited, records, ws } = simulator.stats;
+  const seconds = interval / 1000;
+  console.log(
+    `REST ${((requests - last.requests) / seconds).toFixed(1)} req/s (${requests} total, ${errors} errors, ` +
+    `${rateLimited} rate limited, ${records} records) | WS ${ws.connections} connections, ` +
+    `${((ws.messages - last.messages) / seconds).toFixed(0)} msg/s, ${ws.dropped} dropped`
+  );
+  last = { requests, messages: ws.messages };
+}, interval);
+
+const shutdown = async () => {
+  clearInterval(timer);
+  await simulator.close();
+  process.exit(0);
+};
+process.on('SIGINT', shutdown);
+process.on('SIGTERM', shutdown);
@@ -1,4 +1,5 @@
 // shared/config.js
+import os from 'os';
 import dotenv from 'dotenv';
 
 dotenv.config();
@@ -22,5 +23,51 @@ export default {
     stops: {
       hardStop: 1.5,  // 1.5x ATR
       trailingStop: 0.8  // 0.8x ATR
+    },
+    rateLimits: {
+      global: { capacity: 200, refillPerSecond: 200 / 60 },  // Alpaca account limit
+      perSymbol: { capacity: 10, refillPerSecond: 10 / 60 }, // 10 orders/min/symbol
+      endpoints: {
+        orders: { capacity: 5, refillPerSecond: 5 },         // MAX_ORDER_RATE
+        cancels: { capacity: 10, refillPerSecond: 10 }
+      }
+    },
+    bridge: {
+      socketPath: process.env.FEATURE_BRIDGE_SOCKET || '/tmp/mugiwara-feature-bridge.sock',
+      timeout: 1000,               // ms per request
+      cacheTtl: 15 * 60 * 1000,    // re-check adjustment factors every 15 min
+      retryInterval: 5000          // identity factors while the bridge is down
+    },
+    pipeline: {
+      symbols: (process.env.SYMBOLS || 'AAPL,MSFT,GOOGL').split(','),
+      shards: Number(process.env.FEATURE_SHARDS) || Math.max(1, os.cpus().length - 1),
+      ringCapacity: 16384          // records per shard ring (power of two)
+    },
+    modelInput: {
+      prefix: 'model:input',       // model:input:{symbol} streams
+      maxLen: 1000,                // approximate MAXLEN per stream
+      window: 60,                  // timesteps per prediction
+      readCount: 100               // entries per stream per poll
+    },
+    models: {
+      controlChannel: 'model:control',
+      warmupBatchSizes: [1, 8],    // batch sizes predict is called with
+      warmupRuns: 3,               // predictions per batch size before serving
+      probeBatch: 32,              // parity check batch
+      maxOutputDrift: 0.25         // mean |new - active| output on the probe batch
+    },
+    tracing: {
+      sampleRate: Number(process.env.TRACE_SAMPLE_RATE) || 0,  // fraction of frames; 0 disables
+      exportPath: process.env.TRACE_EXPORT_PATH || 'logs/traces.jsonl',
+      exportInterval: 10000        // ms between histogram snapshots
+    },
+    logging: {
+      path: process.env.LOG_PATH || null,  // JSON lines; null writes to stderr
+      level: process.env.LOG_LEVEL || 'info',
+      rate: Number(process.env.LOG_RATE) || 10,  // records/s per category
+      sampleEvery: Number(process.env.LOG_SAMPLE_EVERY) || 1,  // keep 1 in N debug/info
+      errorRate: 100,              // warn/error records/s per category
+      flushInterval: 1000,         // ms between writes
+      maxQueue: 10000              // records buffered before dropping
     }
   };
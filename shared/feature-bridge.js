@@ -0,0 +1,260 @@
+// shared/feature-bridge.js
+// Client for the Python feature bridge (data-ingestion/feature_bridge.py) over
+// a local Unix socket. Requests made in the same event-loop turn are batched
+// across symbols into one frame, and corporate-action adjustments come back as
+// per-symbol factors that stay valid until the next action, so steady-state
+// bar updates never leave the process.
+//
+// Frame layout (little-endian), mirrored in feature_bridge.py:
+//   0  uint32  payload length (bytes after this field)
+//   4  uint32  request id
+//   8  uint32  header length
+//  12  utf8    JSON header { method, symbols, columns, rows, ... }
+//      pad     zeros up to a multiple of 8 from the frame start
+//      float64 columns, column-major, `rows` values each
+import net from 'net';
+import config from './config.js';
+
+const PREFIX = 12;
+const align8 = n => (n + 7) & ~7;
+
+export const IDENTITY_FACTORS = Object.freeze({
+  priceScale: 1,
+  priceOffset: 0,
+  volumeScale: 1,
+  validFrom: -Infinity,
+  validUntil: Infinity
+});
+
+export function encodeFrame(id, header, columns = {}) {
+  const names = Object.keys(columns);
+  const rows = names.length ? columns[names[0]].length : 0;
+  const json = Buffer.from(JSON.stringify({ ...header, columns: names, rows }));
+  const bodyOffset = align8(PREFIX + json.length);
+  const frame = Buffer.alloc(bodyOffset + names.length * rows * 8);
+  frame.writeUInt32LE(frame.length - 4, 0);
+  frame.writeUInt32LE(id, 4);
+  frame.writeUInt32LE(json.length, 8);
+  json.copy(frame, PREFIX);
+  let offset = bodyOffset;
+  for (const name of names) {
+    const values = columns[name];
+    if (values.length !== rows) throw new Error(`Column ${name} has ${values.length} rows, expected ${rows}`);
+    for (let i = 0; i < rows; i++, offset += 8) frame.writeDoubleLE(values[i], offset);
+  }
+  return frame;
+}
+
+export function decodeFrame(frame) {
+  const id = frame.readUInt32LE(4);
+  const headerLength = frame.readUInt32LE(8);
+  const header = JSON.parse(frame.toString('utf8', PREFIX, PREFIX + headerLength));
+  const rows = header.rows || 0;
+  const start = frame.byteOffset + align8(PREFIX + headerLength);
+  // One copy so the Float64Array views are aligned
+  const body = new Float64Array(frame.buffer.slice(start, start + (header.columns || []).length * rows * 8));
+  const columns = {};
+  (header.columns || []).forEach((name, i) => {
+    columns[name] = body.subarray(i * rows, (i + 1) * rows);
+  });
+  return { id, header, columns };
+}
+
+// Reassembles frames from socket chunks
+export class FrameDecoder {
+  constructor() {
+    this.buffer = Buffer.alloc(0);
+  }
+
+  push(chunk) {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    const frames = [];
+    while (this.buffer.length >= 4) {
+      const length = this.buffer.readUInt32LE(0) + 4;
+      if (this.buffer.length < length) break;
+      frames.push(decodeFrame(this.buffer.subarray(0, length)));
+      this.buffer = this.buffer.subarray(length);
+    }
+    return frames;
+  }
+}
+
+export class FeatureBridge {
+  constructor({
+    socketPath = config.bridge.socketPath,
+    timeout = config.bridge.timeout,
+    cacheTtl = config.bridge.cacheTtl,      // re-check factors for newly loaded actions
+    retryInterval = config.bridge.retryInterval,
+    connect = path => net.createConnection(path),
+    schedule = setImmediate,
+    now = Date.now
+  } = {}) {
+    this.socketPath = socketPath;
+    this.timeout = timeout;
+    this.cacheTtl = cacheTtl;
+    this.retryInterval = retryInterval;
+    this._connect = connect;
+    this.schedule = schedule;
+    this.now = now;
+    this.socket = null;
+    this.decoder = new FrameDecoder();
+    this.nextId = 1;
+    this.pending = new Map();  // id -> { resolve, reject, timer }
+    this.factors = new Map();  // symbol -> factors + fetchedAt
+    this.queued = { adjustments: [], regime: [] };
+    this.flushScheduled = false;
+    this.retryAt = 0;
+    this.stats = { frames: 0, requests: 0, cacheHits: 0, failures: 0 };
+  }
+
+  _socket() {
+    if (this.socket) return this.socket;
+    const socket = this._connect(this.socketPath);
+    socket.on('data', chunk => {
+      for (const frame of this.decoder.push(chunk)) this._settle(frame);
+    });
+    socket.on('error', error => this._fail(error));
+    socket.on('close', () => this._fail(new Error('Feature bridge closed')));
+    socket.unref?.();
+    this.socket = socket;
+    return socket;
+  }
+
+  _settle({ id, header, columns }) {
+    const entry = this.pending.get(id);
+    if (!entry) return;
+    this.pending.delete(id);
+    clearTimeout(entry.timer);
+    if (header.error) entry.reject(new Error(header.error));
+    else entry.resolve({ header, columns });
+  }
+
+  _fail(error) {
+    if (this.socket) this.socket.destroy();
+    this.socket = null;
+    this.decoder = new FrameDecoder();
+    for (const entry of this.pending.values()) {
+      clearTimeout(entry.timer);
+      entry.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  // One frame, one response
+  request(header, columns) {
+    const id = this.nextId;
+    this.nextId = (this.nextId % 0xffffffff) + 1;
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`Feature bridge ${header.method} timed out after ${this.timeout}ms`));
+      }, this.timeout);
+      timer.unref?.();
+      this.pending.set(id, { resolve, reject, timer });
+      this.stats.frames++;
+      this._socket().write(encodeFrame(id, header, columns));
+    });
+  }
+
+  // Factors in effect for `symbol` at `timestamp`, if cached and still valid
+  cachedFactors(symbol, timestamp) {
+    const entry = this.factors.get(symbol);
+    if (!entry || this.now() - entry.fetchedAt > this.cacheTtl) return null;
+    if (timestamp < entry.validFrom || timestamp >= entry.validUntil) return null;
+    this.stats.cacheHits++;
+    return entry;
+  }
+
+  // adjusted price = price * priceScale + priceOffset; volume * volumeScale.
+  // Falls back to identity factors while the bridge is unavailable.
+  adjustmentFactors(symbol, timestamp) {
+    const cached = this.cachedFactors(symbol, timestamp);
+    if (cached) return Promise.resolve(cached);
+    if (this.now() < this.retryAt) return Promise.resolve(IDENTITY_FACTORS);
+    return this._enqueue('adjustments', { symbol, timestamp });
+  }
+
+  // Regime label from MarketRegimeClassifier for one window of feature rows
+  // ([[volatility, volume_zscore, spread, vwap_dev], ...]); null if unavailable
+  regime(symbol, rows) {
+    if (this.now() < this.retryAt) return Promise.resolve(null);
+    return this._enqueue('regime', { symbol, rows });
+  }
+
+  _enqueue(method, item) {
+    return new Promise((resolve, reject) => {
+      this.queued[method].push({ ...item, resolve, reject });
+      this.stats.requests++;
+      if (!this.flushScheduled) {
+        this.flushScheduled = true;
+        this.schedule(() => this.flush());
+      }
+    });
+  }
+
+  flush() {
+    this.flushScheduled = false;
+    const { adjustments, regime } = this.queued;
+    this.queued = { adjustments: [], regime: [] };
+    return Promise.all([
+      adjustments.length && this._flushAdjustments(adjustments),
+      regime.length && this._flushRegime(regime)
+    ]);
+  }
+
+  async _flushAdjustments(items) {
+    try {
+      const { columns } = await this.request(
+        { method: 'adjustments', symbols: items.map(item => item.symbol) },
+        { timestamp: Float64Array.from(items, item => item.timestamp) }
+      );
+      const fetchedAt = this.now();
+      items.forEach((item, i) => {
+        const factors = {
+          priceScale: columns.price_scale[i],
+          priceOffset: columns.price_offset[i],
+          volumeScale: columns.volume_scale[i],
+          validFrom: columns.valid_from[i],
+          validUntil: columns.valid_until[i],
+          fetchedAt
+        };
+        this.factors.set(item.symbol, factors);
+        item.resolve(factors);
+      });
+    } catch (error) {
+      this._unavailable(error);
+      items.forEach(item => item.resolve(IDENTITY_FACTORS));
+    }
+  }
+
+  async _flushRegime(items) {
+    try {
+      const width = items[0].rows[0]?.length || 0;
+      const columns = Array.from({ length: width }, () => []);
+      for (const item of items) {
+        for (const row of item.rows) row.forEach((value, j) => columns[j].push(value));
+      }
+      const { header, columns: result } = await this.request(
+        { method: 'regime', symbols: items.map(item => item.symbol), lengths: items.map(item => item.rows.length) },
+        Object.fromEntries(columns.map((values, j) => [`f${j}`, Float64Array.from(values)]))
+      );
+      items.forEach((item, i) => item.resolve(header.labels[result.regime[i]] ?? null));
+    } catch (error) {
+      this._unavailable(error);
+      items.forEach(item => item.resolve(null));
+    }
+  }
+
+  _unavailable(error) {
+    this.stats.failures++;
+    this.retryAt = this.now() + this.retryInterval;
+    console.error('Feature bridge unavailable:', error.message);
+  }
+
+  close() {
+    this._fail(new Error('Feature bridge closed'));
+  }
+}
+
+// Process-wide client shared by every RollingWindowManager
+export const featureBridge = new FeatureBridge();
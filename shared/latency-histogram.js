@@ -0,0 +1,80 @@
+// shared/latency-histogram.js
+// Log-linear (HDR-style) latency histogram. Values are recorded in
+// milliseconds with microsecond resolution; each power-of-two range is split
+// into SUB_BUCKETS linear buckets, giving ~3% relative error at fixed memory.
+const SUB_BUCKETS = 32;
+const MAX_EXPONENT = 36; // 2^36 us ~ 19 hours
+
+export class LatencyHistogram {
+  constructor() {
+    this.counts = new Uint32Array((MAX_EXPONENT + 1) * SUB_BUCKETS + 1);
+    this.reset();
+  }
+
+  reset() {
+    this.counts.fill(0);
+    this.count = 0;
+    this.sum = 0;
+    this.min = Infinity;
+    this.max = 0;
+  }
+
+  record(ms) {
+    if (!(ms >= 0)) return;
+    this.counts[bucketIndex(ms * 1000)]++;
+    this.count++;
+    this.sum += ms;
+    if (ms < this.min) this.min = ms;
+    if (ms > this.max) this.max = ms;
+  }
+
+  // Upper bound (ms) of the bucket holding the p-th percentile
+  percentile(p) {
+    if (this.count === 0) return 0;
+    const target = Math.ceil((p / 100) * this.count);
+    let seen = 0;
+    for (let i = 0; i < this.counts.length; i++) {
+      seen += this.counts[i];
+      if (seen >= target) return Math.min(bucketUpperBound(i) / 1000, this.max);
+    }
+    return this.max;
+  }
+
+  merge(other) {
+    for (let i = 0; i < this.counts.length; i++) this.counts[i] += other.counts[i];
+    this.count += other.count;
+    this.sum += other.sum;
+    this.min = Math.min(this.min, other.min);
+    this.max = Math.max(this.max, other.max);
+    return this;
+  }
+
+  snapshot() {
+    return {
+      count: this.count,
+      min: this.count ? this.min : 0,
+      mean: this.count ? this.sum / this.count : 0,
+      p50: this.percentile(50),
+      p90: this.percentile(90),
+      p99: this.percentile(99),
+      p999: this.percentile(99.9),
+      max: this.max
+    };
+  }
+}
+
+function bucketIndex(us) {
+  if (us < 1) return 0;
+  const exponent = Math.min(Math.floor(Math.log2(us)), MAX_EXPONENT);
+  const base = 2 ** exponent;
+  const sub = Math.min(Math.floor(((us - base) / base) * SUB_BUCKETS), SUB_BUCKETS - 1);
+  return 1 + exponent * SUB_BUCKETS + sub;
+}
+
+function bucketUpperBound(index) {
+  if (index === 0) return 1;
+  const exponent = Math.floor((index - 1) / SUB_BUCKETS);
+  const sub = (index - 1) % SUB_BUCKETS;
+  const base = 2 ** exponent;
+  return base + ((sub + 1) * base) / SUB_BUCKETS;
+}
@@ -0,0 +1,105 @@
+// shared/lru-cache.js
+// Bounded LRU cache with per-entry TTL. Map iteration order doubles as the
+// recency list: a hit re-inserts the key at the tail, eviction takes the head.
+export class LRUCache {
+  constructor({ maxSize = 1000, ttl = 0, now = Date.now, onEvict = null } = {}) {
+    if (maxSize < 1) throw new Error('maxSize must be at least 1');
+    this.maxSize = maxSize;
+    this.ttl = ttl; // ms, 0 = no expiry
+    this.now = now;
+    this.onEvict = onEvict;
+    this.entries = new Map();
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+    this.expirations = 0;
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.misses++;
+      return undefined;
+    }
+    if (entry.expiry && this.now() > entry.expiry) {
+      this._remove(key, entry);
+      this.expirations++;
+      this.misses++;
+      return undefined;
+    }
+    // Refresh recency
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.hits++;
+    return entry.value;
+  }
+
+  has(key) {
+    const entry = this.entries.get(key);
+    return !!entry && !(entry.expiry && this.now() > entry.expiry);
+  }
+
+  set(key, value) {
+    const existing = this.entries.get(key);
+    if (existing) this._remove(key, existing);
+
+    this.entries.set(key, {
+      value,
+      expiry: this.ttl ? this.now() + this.ttl : 0
+    });
+
+    while (this.entries.size > this.maxSize) {
+      const [oldestKey, oldest] = this.entries.entries().next().value;
+      this._remove(oldestKey, oldest);
+      this.evictions++;
+    }
+    return this;
+  }
+
+  delete(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return false;
+    this._remove(key, entry);
+    return true;
+  }
+
+  // Drop expired entries; called periodically so idle caches release memory
+  prune() {
+    const now = this.now();
+    let removed = 0;
+    for (const [key, entry] of this.entries) {
+      if (entry.expiry && now > entry.expiry) {
+        this._remove(key, entry);
+        removed++;
+      }
+    }
+    this.expirations += removed;
+    return removed;
+  }
+
+  clear() {
+    for (const [key, entry] of this.entries) this._remove(key, entry);
+  }
+
+  stats() {
+    const lookups = this.hits + this.misses;
+    return {
+      size: this.entries.size,
+      maxSize: this.maxSize,
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups > 0 ? this.hits / lookups : 0,
+      evictions: this.evictions,
+      expirations: this.expirations
+    };
+  }
+
+  _remove(key, entry) {
+    this.entries.delete(key);
+    if (this.onEvict) this.onEvict(key, entry.value);
+  }
+}
@@ -0,0 +1,166 @@
+// shared/structured-log.js
+// Buffered, rate-limited JSON-lines logging for the ingest and feature hot
+// paths (the Python side is data-ingestion/structured_logging.py). Calls only
+// check a per-category token bucket and push a record onto a bounded queue;
+// a timer serializes and writes the queue in one call per interval, so the
+// socket handler never writes to the console. Per category:
+// - debug/info are sampled 1 in `sampleEvery` and capped at `rate`/s
+// - warn/error are never sampled and have a larger bucket (`errorRate`)
+// - a record that passes carries `suppressed`, the count dropped before it
+// count() aggregates hot-loop events; the totals are written as one record
+// per interval instead of one line per event.
+import fs from 'fs';
+import path from 'path';
+import config from './config.js';
+
+const LEVELS = { debug: 10, info: 20, warn: 30, error: 40 };
+
+// Error objects do not survive JSON.stringify; keep message and stack
+function serializable(value) {
+  if (value instanceof Error) return { name: value.name, message: value.message, code: value.code, stack: value.stack };
+  return value;
+}
+
+export class StructuredLog {
+  constructor({
+    path: logPath = config.logging.path,
+    level = config.logging.level,
+    rate = config.logging.rate,
+    burst = rate * 2,
+    sampleEvery = config.logging.sampleEvery,
+    errorRate = config.logging.errorRate,
+    errorBurst = errorRate * 2,
+    flushInterval = config.logging.flushInterval,
+    maxQueue = config.logging.maxQueue,
+    write = null,          // (text) => Promise; defaults to the file or stderr
+    now = Date.now
+  } = {}) {
+    this.path = logPath;
+    this.threshold = LEVELS[level] ?? LEVELS.info;
+    this.limits = {
+      normal: { rate, burst },
+      important: { rate: errorRate, burst: errorBurst }
+    };
+    this.sampleEvery = Math.max(1, sampleEvery);
+    this.flushInterval = flushInterval;
+    this.maxQueue = maxQueue;
+    this.now = now;
+    this.write = write || (logPath ? text => fs.promises.appendFile(logPath, text) : text => {
+      process.stderr.write(text);
+      return Promise.resolve();
+    });
+
+    this.buckets = new Map();  // category -> { tokens, updated, seen, suppressed }
+    this.queue = [];
+    this.counters = new Map();
+    this.dropped = 0;
+    this.timer = null;
+    this.writing = Promise.resolve();
+  }
+
+  debug(category, message, fields) { return this.log('debug', category, message, fields); }
+  info(category, message, fields) { return this.log('info', category, message, fields); }
+  warn(category, message, fields) { return this.log('warn', category, message, fields); }
+  error(category, message, fields) { return this.log('error', category, message, fields); }
+
+  // True when the record was queued. Fields are serialized at flush time,
+  // so pass values that are not mutated afterwards.
+  log(level, category, message, fields) {
+    const severity = LEVELS[level];
+    if (severity < this.threshold) return false;
+
+    const important = severity >= LEVELS.warn;
+    const { rate, burst } = important ? this.limits.important : this.limits.normal;
+    const now = this.now();
+    let bucket = this.buckets.get(category);
+    if (!bucket) {
+      bucket = { tokens: burst, updated: now, seen: 0, suppressed: 0 };
+      this.buckets.set(category, bucket);
+    } else {
+      bucket.tokens = Math.min(burst, bucket.tokens + (now - bucket.updated) * rate / 1000);
+      bucket.updated = now;
+    }
+    bucket.seen++;
+    if ((!important && (bucket.seen - 1) % this.sampleEvery !== 0) || bucket.tokens < 1) {
+      bucket.suppressed++;
+      return false;
+    }
+    bucket.tokens--;
+    if (this.queue.length >= this.maxQueue) {
+      this.dropped++;
+      return false;
+    }
+
+    const record = { time: now, level, category, message, fields };
+    if (bucket.suppressed) {
+      record.suppressed = bucket.suppressed;
+      bucket.suppressed = 0;
+    }
+    this.queue.push(record);
+    return true;
+  }
+
+  count(name, value = 1) {
+    this.counters.set(name, (this.counters.get(name) || 0) + value);
+  }
+
+  start() {
+    if (this.timer) return;
+    if (this.path) fs.mkdirSync(path.dirname(this.path), { recursive: true });
+    this.timer = setInterval(() => this.flush(), this.flushInterval);
+    this.timer.unref?.();
+  }
+
+  async stop() {
+    clearInterval(this.timer);
+    this.timer = null;
+    await this.flush();
+  }
+
+  // Serialize the queue and the interval's counters into one write; writes
+  // are chained so lines stay in order
+  flush() {
+    const stats = this._stats();
+    if (stats) this.queue.push(stats);
+    if (this.queue.length === 0) return this.writing;
+
+    const records = this.queue;
+    this.queue = [];
+    let text = '';
+    for (const { time, level, category, message, fields, suppressed } of records) {
+      const entry = { time: new Date(time).toISOString(), level, category, message };
+      if (fields) {
+        for (const key of Object.keys(fields)) entry[key] = serializable(fields[key]);
+      }
+      if (suppressed) entry.suppressed = suppressed;
+      text += JSON.stringify(entry) + '\n';
+    }
+    this.writing = this.writing.then(() => this.write(text)).catch(error => {
+      process.stderr.write(`Log write failed: ${error.message}\n`);
+    });
+    return this.writing;
+  }
+
+  // Counters plus suppressed counts not yet carried by a passing record
+  _stats() {
+    const suppressed = {};
+    let any = false;
+    for (const [category, bucket] of this.buckets) {
+      if (bucket.suppressed) {
+        suppressed[category] = bucket.suppressed;
+        bucket.suppressed = 0;
+        any = true;
+      }
+    }
+    if (this.counters.size === 0 && !any && !this.dropped) return null;
+
+    const fields = { counters: Object.fromEntries(this.counters) };
+    if (any) fields.suppressed = suppressed;
+    if (this.dropped) fields.dropped = this.dropped;
+    this.counters.clear();
+    this.dropped = 0;
+    return { time: this.now(), level: 'info', category: 'stats', message: 'counters', fields };
+  }
+}
+
+export const log = new StructuredLog();
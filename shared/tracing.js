@@ -0,0 +1,139 @@
+// shared/tracing.js
+// Sampled end-to-end latency tracing. A trace is started when a websocket
+// frame is received and carried as a compact `id:origin:last` string through
+// Redis entries and messages (numeric id/origin through the feature rings).
+// Every stage calls mark(), which records the time since the previous stage
+// and since the frame arrived into per-stage HDR histograms; snapshots are
+// appended to a local JSON-lines file. With sampling off, start() returns
+// null and every other call returns immediately.
+//
+// Histograms are per process, and each process exports its own stages:
+//   ingest                             data-ingestion/polygon-websocket.js
+//   transport, features, drain         scripts/start-pipeline.js
+//   stream, predict, route, submit,    scripts/start-execution.js
+//   placeOrder
+// The last group shares one process because LivePredictor hands its trace
+// to SmartRouter and TradingEngine in memory. A process that records stages
+// without calling startExport() keeps them only in memory.
+import fs from 'fs';
+import path from 'path';
+import { performance } from 'perf_hooks';
+import config from './config.js';
+import { LatencyHistogram } from './latency-histogram.js';
+
+// Monotonic wall-clock ms, comparable across threads and local processes
+export const clock = () => performance.timeOrigin + performance.now();
+
+export class Tracer {
+  constructor({
+    sampleRate = config.tracing.sampleRate,
+    exportPath = config.tracing.exportPath,
+    exportInterval = config.tracing.exportInterval,
+    now = clock
+  } = {}) {
+    this.sampleRate = sampleRate;
+    this.exportPath = exportPath;
+    this.exportInterval = exportInterval;
+    this.now = now;
+    this.stages = new Map(); // stage -> { span, sinceOrigin }
+    this.timer = null;
+    this.started = 0;
+  }
+
+  // A new trace, or null when not sampled. Timestamps are read only for
+  // sampled traces (no default parameters: they would run the clock anyway).
+  start(at) {
+    if (this.sampleRate <= 0 || (this.sampleRate < 1 && Math.random() >= this.sampleRate)) return null;
+    at ??= this.now();
+    this.started++;
+    return { id: Math.floor(Math.random() * Number.MAX_SAFE_INTEGER) + 1, origin: at, last: at };
+  }
+
+  // Close the span ending at `at` for `stage`; traces started upstream are
+  // recorded whatever the local sample rate
+  mark(trace, stage, at) {
+    if (!trace) return trace;
+    at ??= this.now();
+    const histograms = this._stage(stage);
+    histograms.span.record(at - trace.last);
+    histograms.sinceOrigin.record(at - trace.origin);
+    trace.last = at;
+    return trace;
+  }
+
+  // Record a span whose start is known only as a timestamp (e.g. ring records)
+  record(stage, ms) {
+    this._stage(stage).span.record(ms);
+  }
+
+  _stage(stage) {
+    let histograms = this.stages.get(stage);
+    if (!histograms) {
+      histograms = { span: new LatencyHistogram(), sinceOrigin: new LatencyHistogram() };
+      this.stages.set(stage, histograms);
+    }
+    return histograms;
+  }
+
+  inject(trace) {
+    return trace ? `${trace.id}:${trace.origin}:${trace.last}` : null;
+  }
+
+  extract(value) {
+    if (!value) return null;
+    const [id, origin, last] = String(value).split(':').map(Number);
+    return Number.isFinite(origin) ? { id, origin, last: Number.isFinite(last) ? last : origin } : null;
+  }
+
+  // Trace field from Redis stream entry fields ([k, v, ...])
+  fromFields(fields) {
+    if (!fields) return null;
+    for (let i = 0; i < fields.length; i += 2) {
+      if (fields[i] === 'trace') return this.extract(fields[i + 1]);
+    }
+    return null;
+  }
+
+  snapshot() {
+    const stages = {};
+    for (const [stage, { span, sinceOrigin }] of this.stages) {
+      stages[stage] = { ...span.snapshot(), sinceOrigin: sinceOrigin.snapshot() };
+    }
+    return { at: new Date().toISOString(), pid: process.pid, started: this.started, stages };
+  }
+
+  reset() {
+    for (const { span, sinceOrigin } of this.stages.values()) {
+      span.reset();
+      sinceOrigin.reset();
+    }
+    this.started = 0;
+  }
+
+  // Append one snapshot line per interval (only when something was recorded)
+  startExport() {
+    if (this.timer || !this.exportPath) return;
+    fs.mkdirSync(path.dirname(this.exportPath), { recursive: true });
+    this.timer = setInterval(() => this.export(), this.exportInterval);
+    this.timer.unref?.();
+  }
+
+  export() {
+    let recorded = 0;
+    for (const { span } of this.stages.values()) recorded += span.count;
+    if (recorded === 0) return Promise.resolve();
+    const line = JSON.stringify(this.snapshot()) + '\n';
+    this.reset();
+    return fs.promises.appendFile(this.exportPath, line).catch(error => {
+      console.error('Trace export failed:', error.message);
+    });
+  }
+
+  async stopExport() {
+    clearInterval(this.timer);
+    this.timer = null;
+    await this.export();
+  }
+}
+
+export const tracer = new Tracer();
@@ -0,0 +1,92 @@
+// tests/bar-window.test.js
+import { BarWindow } from '../feature-engine/bar-window.js';
+
+function makeBars(n) {
+  let close = 100;
+  return Array.from({ length: n }, (_, i) => {
+    const open = close;
+    close = open + Math.sin(i * 1.7) * 0.8;
+    return {
+      timestamp: i * 60000,
+      open,
+      high: Math.max(open, close) + 0.3,
+      low: Math.min(open, close) - 0.2,
+      close,
+      volume: 1000 + ((i * 37) % 11) * 150,
+      vwap: (open + close) / 2
+    };
+  });
+}
+
+// Full-window Wilder recomputation used as the reference
+function wilder(values, period) {
+  let avg = values.slice(0, period).reduce((a, b) => a + b, 0) / period;
+  for (const v of values.slice(period)) avg = (avg * (period - 1) + v) / period;
+  return avg;
+}
+
+function referenceATR(bars, period) {
+  const tr = bars.slice(1).map((b, i) => Math.max(
+    b.high - b.low, Math.abs(b.high - bars[i].close), Math.abs(b.low - bars[i].close)
+  ));
+  return wilder(tr, period);
+}
+
+function referenceRSI(bars, period) {
+  const changes = bars.slice(1).map((b, i) => b.close - bars[i].close);
+  const gain = wilder(changes.map(c => Math.max(c, 0)), period);
+  const loss = wilder(changes.map(c => Math.max(-c, 0)), period);
+  return loss === 0 ? 100 : 100 - 100 / (1 + gain / loss);
+}
+
+describe('BarWindow', () => {
+  const bars = makeBars(150);
+
+  test('matches full recomputation of ATR and RSI', () => {
+    const window = new BarWindow();
+    bars.forEach(bar => window.push(bar));
+    expect(window.atr).toBeCloseTo(referenceATR(bars, 5), 9);
+    expect(window.rsi).toBeCloseTo(referenceRSI(bars, 3), 9);
+  });
+
+  test('keeps only the last `capacity` bars', () => {
+    const window = new BarWindow({ capacity: 60 });
+    bars.forEach(bar => window.push(bar));
+    const kept = window.toArray();
+    expect(kept).toHaveLength(60);
+    expect(kept[0].timestamp).toBe(bars[90].timestamp);
+    expect(window.latest().close).toBe(bars[149].close);
+  });
+
+  test('tracks VWAP SMA and volume stats over the ring', () => {
+    const window = new BarWindow();
+    bars.forEach(bar => window.push(bar));
+
+    const lastVwaps = bars.slice(-5).map(b => b.vwap);
+    const sma = lastVwaps.reduce((a, b) => a + b, 0) / 5;
+    expect(window.vwapSMA).toBeCloseTo(sma, 9);
+    expect(window.vwapDeviation).toBeCloseTo((bars[149].close - sma) / sma, 9);
+
+    const prior = bars.slice(-21, -1).map(b => b.volume);
+    const mean = prior.reduce((a, b) => a + b, 0) / prior.length;
+    const std = Math.sqrt(prior.reduce((a, v) => a + (v - mean) ** 2, 0) / prior.length);
+    expect(window.volumeStats.mean).toBeCloseTo(mean, 6);
+    expect(window.volumeStats.std).toBeCloseTo(std, 6);
+  });
+
+  test('flags a 3-sigma volume spike', () => {
+    const window = new BarWindow();
+    bars.slice(0, 30).forEach(bar => window.push(bar));
+    expect(window.isVolumeSpike()).toBe(false);
+    window.push({ ...bars[30], volume: 50000 });
+    expect(window.isVolumeSpike()).toBe(true);
+  });
+
+  test('accepts raw Polygon aggregates', () => {
+    const window = new BarWindow();
+    window.push({ s: 1, o: 10, h: 11, l: 9, c: 10.5, v: 500, vw: 10.2 });
+    expect(window.latest()).toEqual({
+      timestamp: 1, open: 10, high: 11, low: 9, close: 10.5, volume: 500, vwap: 10.2
+    });
+  });
+});
@@ -0,0 +1,61 @@
+import { jest } from '@jest/globals';
+import { PerformanceMonitor } from '../risk-management/circuit-breakers.js';
+
+describe('PerformanceMonitor', () => {
+  let monitor;
+  let triggered;
+
+  beforeEach(() => {
+    // No portfolio/market-condition methods: breakers must not need the network
+    monitor = new PerformanceMonitor({}, { startingEquity: 100000 });
+    triggered = [];
+    monitor.riskProtocols = { triggerProtocol: async (reason, metadata) => triggered.push([reason, metadata]) };
+  });
+
+  test('trips the daily loss limit from local equity', async () => {
+    const reasons = await monitor.update({ profit: -4000 });
+    expect(reasons).toContain('DAILY_LOSS_LIMIT');
+    expect(triggered[0][1].currentReturn).toBeCloseTo(-0.04);
+  });
+
+  test('stays quiet while profitable', async () => {
+    expect(await monitor.update({ profit: 2000 })).toEqual([]);
+    expect(monitor.winRate).toBe(1);
+  });
+
+  test('consumes broker fill updates', async () => {
+    await monitor.handleOrderUpdate({ event: 'fill', price: '100', qty: '10', order: { symbol: 'AAPL', side: 'buy' } });
+    await monitor.handleOrderUpdate({ event: 'fill', price: '101', qty: '10', order: { symbol: 'AAPL', side: 'sell' } });
+    expect(monitor.dailyMetrics.grossProfit).toBe(10);
+    expect(monitor.metrics.equity).toBe(100010);
+  });
+
+  test('restarts the daily loss limit and re-arms its protocol at the session open', async () => {
+    const calls = [];
+    const engine = {};
+    for (const name of [
+      'cancelAllOrders', 'closePosition', 'suspendTrading', 'adjustPortfolioExposure',
+      'setPositionSizeMultiplier', 'switchStrategy', 'adjustStops', 'limitToLiquidSymbols'
+    ]) {
+      engine[name] = async (...args) => { calls.push([name, ...args]); };
+    }
+    engine.getPositions = async () => [];
+    engine.getPortfolioExposure = async () => 0;
+
+    let opens = 0;
+    const session = { nextOpen: now => (opens++ === 0 ? now + 20 : null) };
+    const daily = new PerformanceMonitor(engine, { startingEquity: 100000, session });
+    expect(await daily.update({ profit: -4000 })).toContain('DAILY_LOSS_LIMIT');
+    expect(calls.filter(([name]) => name === 'suspendTrading')).toHaveLength(1);
+    await daily.update({ profit: -100 }); // still tripped: latched for the day
+    expect(calls.filter(([name]) => name === 'suspendTrading')).toHaveLength(1);
+
+    jest.advanceTimersByTime(60);
+    expect(opens).toBe(2); // reset, then re-armed for the next open
+    expect(daily.metrics.dailyReturn).toBe(0);
+    expect(await daily.update({ profit: -1000 })).not.toContain('DAILY_LOSS_LIMIT');
+    expect(await daily.update({ profit: -3000 })).toContain('DAILY_LOSS_LIMIT');
+    expect(calls.filter(([name]) => name === 'suspendTrading')).toHaveLength(2);
+    daily.stopDailyReset();
+  });
+});
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Repo modules live in hyphenated folders, so expose them to tests directly
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('ml-core', 'data-ingestion', 'risk-management', 'benchmarks'):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,66 @@
+import { MarketSession } from '../../execution/market-session.js';
+
+const at = iso => Date.parse(iso);
+
+describe('MarketSession', () => {
+  const noCalendar = async () => [];
+
+  test('regular hours in EDT', () => {
+    const session = new MarketSession({ fetchCalendar: noCalendar });
+    expect(session.status(at('2026-10-19T13:29:00Z'))).toBe('closed');
+    expect(session.status(at('2026-10-19T13:30:00Z'))).toBe('open');
+    expect(session.status(at('2026-10-19T19:59:59Z'))).toBe('open');
+    expect(session.status(at('2026-10-19T20:00:00Z'))).toBe('closed');
+  });
+
+  test('regular hours in EST', () => {
+    const session = new MarketSession({ fetchCalendar: noCalendar });
+    expect(session.status(at('2026-12-01T14:29:00Z'))).toBe('closed');
+    expect(session.status(at('2026-12-01T14:30:00Z'))).toBe('open');
+    expect(session.nextChange(at('2026-12-01T15:00:00Z'))).toBe(at('2026-12-01T21:00:00Z'));
+  });
+
+  test('weekends are closed', () => {
+    const session = new MarketSession({ fetchCalendar: noCalendar });
+    expect(session.status(at('2026-10-17T15:00:00Z'))).toBe('closed');
+    expect(session.nextChange(at('2026-10-17T15:00:00Z'))).toBeNull();
+  });
+
+  test('next open skips the rest of the day and weekends', () => {
+    const session = new MarketSession({ fetchCalendar: noCalendar });
+    expect(session.nextOpen(at('2026-10-19T12:00:00Z'))).toBe(at('2026-10-19T13:30:00Z'));
+    expect(session.nextOpen(at('2026-10-19T15:00:00Z'))).toBe(at('2026-10-20T13:30:00Z'));
+    expect(session.nextOpen(at('2026-10-16T21:00:00Z'))).toBe(at('2026-10-19T13:30:00Z'));
+    // Across the November DST change: Friday EDT close -> Monday EST open
+    expect(session.nextOpen(at('2026-10-30T21:00:00Z'))).toBe(at('2026-11-02T14:30:00Z'));
+  });
+
+  test('holidays and early closes come from the refreshed calendar', async () => {
+    const session = new MarketSession({
+      fetchCalendar: async () => [
+        { date: '2026-11-26', exchange: 'NYSE', name: 'Thanksgiving', status: 'closed' },
+        { date: '2026-11-27', exchange: 'NYSE', name: 'Thanksgiving', status: 'early-close', close: '2026-11-27T18:00:00.000Z' },
+        { date: '2026-11-26', exchange: 'NASDAQ', name: 'Thanksgiving', status: 'closed' }
+      ]
+    });
+    expect(session.status(at('2026-11-26T15:00:00Z'))).toBe('open');
+    await session.refresh();
+    expect(session.status(at('2026-11-26T15:00:00Z'))).toBe('closed');
+    expect(session.status(at('2026-11-27T17:59:00Z'))).toBe('open');
+    expect(session.status(at('2026-11-27T18:00:00Z'))).toBe('closed');
+  });
+
+  test('refresh failures keep the previous calendar', async () => {
+    let fail = false;
+    const session = new MarketSession({
+      fetchCalendar: async () => {
+        if (fail) throw new Error('down');
+        return [{ date: '2026-12-25', exchange: 'NYSE', status: 'closed' }];
+      }
+    });
+    await session.refresh();
+    fail = true;
+    await session.refresh();
+    expect(session.status(at('2026-12-25T16:00:00Z'))).toBe('closed');
+  });
+});
@@ -0,0 +1,70 @@
+import { OrderLedger, WindowedCounter } from '../../execution/order-ledger.js';
+
+describe('WindowedCounter', () => {
+  test('expires buckets as the window slides', () => {
+    const counter = new WindowedCounter(1000, 250);
+    counter.add(0);
+    counter.add(100);
+    counter.add(600);
+    expect(counter.count(999)).toBe(3);
+    expect(counter.count(1000)).toBe(1);
+    expect(counter.count(1250)).toBe(1);
+    expect(counter.count(1500)).toBe(0);
+    counter.add(10000);
+    expect(counter.count(10000)).toBe(1);
+  });
+});
+
+describe('OrderLedger', () => {
+  let clock;
+  let ledger;
+  const order = (id, side, price, symbol = 'AAPL') => ({ client_order_id: id, symbol, side, limit_price: price, qty: 10 });
+
+  beforeEach(() => {
+    clock = 0;
+    ledger = new OrderLedger({ windowMs: 5000, bucketMs: 250, now: () => clock });
+  });
+
+  test('flags more than three cancels inside the window', () => {
+    for (let i = 0; i < 4; i++) {
+      ledger.recordSubmit(order(`o${i}`, 'buy', 100));
+      ledger.recordUpdate({ event: 'canceled', order: order(`o${i}`, 'buy', 100) });
+    }
+    expect(ledger.cancelCount('AAPL')).toBe(4);
+    expect(ledger.isSpoofPattern('AAPL')).toBe(true);
+    expect(ledger.isSpoofPattern('MSFT')).toBe(false);
+
+    clock = 5000;
+    expect(ledger.isSpoofPattern('AAPL')).toBe(false);
+  });
+
+  test('detects orders that would cross our own resting orders', () => {
+    ledger.recordSubmit(order('b1', 'buy', 100));
+    ledger.recordSubmit(order('b2', 'buy', 99.5));
+    ledger.recordSubmit(order('s1', 'sell', 101));
+
+    expect(ledger.wouldSelfCross(order('x', 'sell', 100))).toBe(true);
+    expect(ledger.wouldSelfCross(order('x', 'sell', 100.5))).toBe(false);
+    expect(ledger.wouldSelfCross(order('x', 'buy', 101))).toBe(true);
+
+    // Best resting buy fills; the next level becomes best
+    ledger.recordUpdate({ event: 'fill', order: order('b1', 'buy', 100) });
+    expect(ledger.wouldSelfCross(order('x', 'sell', 100))).toBe(false);
+    expect(ledger.wouldSelfCross(order('x', 'sell', 99.5))).toBe(true);
+    expect(ledger.fillCount('AAPL')).toBe(1);
+  });
+
+  test('partial fills keep the order resting', () => {
+    ledger.recordSubmit(order('b1', 'buy', 100));
+    ledger.recordUpdate({ event: 'partial_fill', order: order('b1', 'buy', 100) });
+    expect(ledger.wouldSelfCross(order('x', 'sell', 100))).toBe(true);
+    ledger.recordUpdate({ event: 'expired', order: order('b1', 'buy', 100) });
+    expect(ledger.wouldSelfCross(order('x', 'sell', 100))).toBe(false);
+  });
+
+  test('broker "new" events do not double count our own submits', () => {
+    ledger.recordSubmit(order('b1', 'buy', 100));
+    ledger.recordUpdate({ event: 'new', order: order('b1', 'buy', 100) });
+    expect(ledger.submitCount('AAPL')).toBe(1);
+  });
+});
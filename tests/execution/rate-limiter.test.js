@@ -0,0 +1,149 @@
+import { RateLimiter, RateLimitError, PRIORITY } from '../../execution/rate-limiter.js';
+
+// Deterministic clock: timers only fire from advance()
+function simulatedClock() {
+  let now = 0;
+  let timers = [];
+  let nextId = 0;
+  return {
+    now: () => now,
+    setTimer: (fn, ms) => {
+      timers.push({ id: ++nextId, at: now + ms, fn });
+      return nextId;
+    },
+    clearTimer: id => {
+      timers = timers.filter(timer => timer.id !== id);
+    },
+    async advance(ms) {
+      const end = now + ms;
+      for (;;) {
+        timers.sort((a, b) => a.at - b.at);
+        if (timers.length === 0 || timers[0].at > end) break;
+        const timer = timers.shift();
+        now = timer.at;
+        timer.fn();
+        await Promise.resolve();
+      }
+      now = end;
+      await Promise.resolve();
+    }
+  };
+}
+
+function limiter(clock, overrides = {}) {
+  return new RateLimiter({
+    global: { capacity: 100, refillPerSecond: 100 },
+    perSymbol: { capacity: 1, refillPerSecond: 1 },
+    endpoints: { orders: { capacity: 2, refillPerSecond: 1 }, cancels: { capacity: 1, refillPerSecond: 1 } },
+    now: clock.now,
+    setTimer: clock.setTimer,
+    clearTimer: clock.clearTimer,
+    ...overrides
+  });
+}
+
+function track(promise) {
+  const state = { settled: false };
+  promise.then(
+    value => Object.assign(state, { settled: true, value }),
+    error => Object.assign(state, { settled: true, error })
+  );
+  return state;
+}
+
+describe('RateLimiter', () => {
+  test('queues past the burst and releases on refill', async () => {
+    const clock = simulatedClock();
+    const rl = limiter(clock);
+    expect(await rl.acquire({ symbol: 'A' })).toBe(0);
+    expect(await rl.acquire({ symbol: 'B' })).toBe(0);
+
+    const third = track(rl.acquire({ symbol: 'C' }));
+    await clock.advance(999);
+    expect(third.settled).toBe(false);
+    await clock.advance(1);
+    expect(third.value).toBe(1000);
+  });
+
+  test('an exhausted symbol does not block other symbols', async () => {
+    const clock = simulatedClock();
+    const rl = limiter(clock, { endpoints: { orders: { capacity: 10, refillPerSecond: 10 } } });
+    await rl.acquire({ symbol: 'A' });
+    const secondA = track(rl.acquire({ symbol: 'A' }));
+    await clock.advance(0);
+    expect(secondA.settled).toBe(false);
+
+    expect(await rl.acquire({ symbol: 'B' })).toBe(0);
+    await clock.advance(1000);
+    expect(secondA.value).toBe(1000);
+  });
+
+  test('higher priority requests are served first', async () => {
+    const clock = simulatedClock();
+    const rl = limiter(clock);
+    await rl.acquire({ symbol: 'A' });
+    await rl.acquire({ symbol: 'B' });
+
+    const order = [];
+    rl.acquire({ symbol: 'C' }).then(() => order.push('normal'));
+    rl.acquire({ symbol: 'D', priority: PRIORITY.RISK }).then(() => order.push('risk'));
+    await clock.advance(1000);
+    expect(order).toEqual(['risk']);
+    await clock.advance(1000);
+    expect(order).toEqual(['risk', 'normal']);
+  });
+
+  test('a ready queued request beats a new arrival', async () => {
+    const clock = simulatedClock();
+    const rl = limiter(clock);
+    await rl.acquire({ symbol: 'A' });
+    await rl.acquire({ symbol: 'B' });
+    const queued = track(rl.acquire({ symbol: 'C' }));
+
+    clock.clearTimer(1); // refill happens but the drain timer has not fired yet
+    await clock.advance(1000);
+    expect(rl.tryAcquire({ symbol: 'D' })).toBe(false);
+    await Promise.resolve();
+    expect(queued.value).toBe(1000);
+  });
+
+  test('endpoints are limited independently', async () => {
+    const clock = simulatedClock();
+    const rl = limiter(clock);
+    await rl.acquire({ symbol: 'A' });
+    await rl.acquire({ symbol: 'B' });
+    expect(rl.tryAcquire({ symbol: 'C', endpoint: 'orders' })).toBe(false);
+    expect(rl.tryAcquire({ endpoint: 'cancels' })).toBe(true);
+    expect(() => rl.tryAcquire({ endpoint: 'quotes' })).toThrow('Unknown rate-limited endpoint');
+  });
+
+  test('queued requests time out', async () => {
+    const clock = simulatedClock();
+    const rl = limiter(clock);
+    await rl.acquire({ symbol: 'A' });
+    const again = track(rl.acquire({ symbol: 'A', timeout: 200 }));
+    await clock.advance(200);
+    expect(again.error instanceof RateLimitError).toBe(true);
+    expect(rl.getStats().queueDepth).toBe(0);
+  });
+
+  test('exposes tokens, queue depth and wait times', async () => {
+    const clock = simulatedClock();
+    const rl = limiter(clock);
+    await rl.acquire({ symbol: 'A' });
+    rl.acquire({ symbol: 'A' });
+    await clock.advance(500);
+
+    const stats = rl.getStats();
+    expect(stats.endpoints.orders).toBeCloseTo(1.5);
+    expect(stats.symbols.A).toBeCloseTo(0.5);
+    expect(stats.queueDepth).toBe(1);
+    expect(stats.oldestWait).toBe(500);
+    expect(rl.symbolTokens('A')).toBeCloseTo(0.5);
+    expect(rl.symbolTokens('Z')).toBe(1);
+
+    await clock.advance(500);
+    expect(rl.getStats().waits.count).toBe(2);
+    expect(rl.getStats().waits.max).toBe(1000);
+  });
+});
@@ -0,0 +1,36 @@
+import { SmartRouter } from '../../execution/smart-router.js';
+import { orderBooks } from '../../data-ingestion/orderbook-cache.js';
+
+describe('SmartRouter hot path', () => {
+  const openSession = { status: () => 'open' };
+
+  test('routes from in-process state and records per-stage latency', async () => {
+    orderBooks.applyQuote({ sym: 'ROUTE', bp: 100, bs: 5, ap: 100.1, as: 5, t: 1 });
+    const submitted = [];
+    const router = new SmartRouter({
+      session: openSession,
+      submit: async order => { submitted.push(order); return { id: 'test-order' }; }
+    });
+    router.redis = null; // the hot path must not touch Redis
+
+    const trace = { id: 3, origin: 1, last: 1 };
+    const result = await router.executeSignal({ symbol: 'ROUTE', direction: 'buy', size: 10, stopPrice: 99, trace });
+
+    expect(result).toEqual({ id: 'test-order' });
+    expect(submitted[0].trace).toBe(trace);
+    expect(submitted[0].limit_price).toBe((100.1 * 0.9995).toFixed(2));
+    expect(submitted[0].quantity).toBe('10');
+
+    const stats = router.getLatencyStats();
+    for (const stage of ['status', 'marketData', 'build', 'submit', 'total']) {
+      expect(stats[stage].count).toBe(1);
+    }
+  });
+
+  test('rejects orders without a usable quote', async () => {
+    orderBooks.applyQuote({ sym: 'NOASK', bp: 50, bs: 1, ap: 0, as: 0 });
+    const router = new SmartRouter({ session: openSession, submit: async () => ({}) });
+    await expect(router.executeSignal({ symbol: 'NOASK', direction: 'buy', size: 1, stopPrice: 49 }))
+      .rejects.toThrow('No realtime quote');
+  });
+});
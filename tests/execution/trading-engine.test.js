@@ -2,7 +2,9 @@
 import { expect } from 'chai';
 import sinon from 'sinon';
 import { TradingEngine } from '../../execution/trading-engine.js';
+import { OrderLedger } from '../../execution/order-ledger.js';
 import config from '../../shared/config.js';
+import { tracer } from '../../shared/tracing.js';
 
 describe('Trading Engine', () => {
   let engine;
@@ -84,6 +86,21 @@ describe('Trading Engine', () => {
       expect(mockAlpaca.createOrder.calledOnce).to.be.true;
     });
 
+    it('should record the placeOrder stage without sending the trace', async () => {
+      const placed = () => tracer.snapshot().stages.placeOrder?.count ?? 0;
+      const before = placed();
+      await engine.placeOrder({
+        symbol: 'TSLA',
+        qty: '10',
+        side: 'buy',
+        limit_price: '150.25',
+        trace: { id: 5, origin: tracer.now() - 2, last: tracer.now() - 1 }
+      });
+
+      expect(placed()).to.equal(before + 1);
+      expect(mockAlpaca.createOrder.firstCall.args[0]).to.not.have.property('trace');
+    });
+
     it('should reject orders when suspended', async () => {
       engine.tradingSuspended = true;
       const order = await engine.placeOrder({
@@ -96,4 +113,30 @@ describe('Trading Engine', () => {
       expect(order).to.be.null;
     });
   });
-});
\ No newline at end of file
+
+  describe('Order Updates', () => {
+    it('should feed broker cancels into the ledger once started', () => {
+      const handlers = {};
+      const stream = {
+        onConnect: fn => { handlers.connect = fn; },
+        onOrderUpdate: fn => { handlers.update = fn; },
+        subscribe: sinon.stub(),
+        connect: sinon.stub()
+      };
+      engine.alpaca.trade_ws = stream;
+      engine.ledger = new OrderLedger();
+
+      engine.startOrderUpdates();
+      engine.startOrderUpdates();
+      expect(stream.connect.calledOnce).to.be.true;
+      handlers.connect();
+      expect(stream.subscribe.calledWith(['trade_updates'])).to.be.true;
+
+      const order = { client_order_id: 'HFT_1', symbol: 'TSLA', side: 'buy', type: 'limit', limit_price: '150' };
+      engine.trackOrder(order);
+      handlers.update({ event: 'canceled', order });
+      expect(engine.ledger.cancelCount('TSLA')).to.equal(1);
+      expect(engine.activeOrders.has('HFT_1')).to.be.false;
+    });
+  });
+});
@@ -0,0 +1,92 @@
+import { EventEmitter } from 'events';
+import {
+  FeatureBridge, FrameDecoder, IDENTITY_FACTORS, decodeFrame, encodeFrame
+} from '../shared/feature-bridge.js';
+
+// jest.setup.js fakes setImmediate, so batching and replies are scheduled as
+// promise jobs: still after the current tick, without a timer
+const nextTick = fn => Promise.resolve().then(fn);
+
+// Stands in for the Python server: one response frame per request frame
+function fakeServer(respond) {
+  const server = { requests: [] };
+  server.connect = () => {
+    const socket = new EventEmitter();
+    const decoder = new FrameDecoder();
+    socket.write = chunk => {
+      for (const request of decoder.push(chunk)) {
+        server.requests.push(request);
+        const [header, columns] = respond(request);
+        const frame = encodeFrame(request.id, header, columns);
+        // Split the response to exercise reassembly
+        nextTick(() => {
+          socket.emit('data', frame.subarray(0, 5));
+          socket.emit('data', frame.subarray(5));
+        });
+      }
+    };
+    socket.destroy = () => {};
+    return socket;
+  };
+  return server;
+}
+
+function splitFactors({ header, columns }) {
+  const rows = header.rows;
+  return [{}, {
+    price_scale: new Float64Array(rows).fill(0.25),
+    price_offset: new Float64Array(rows).fill(-0.5),
+    volume_scale: new Float64Array(rows).fill(4),
+    valid_from: new Float64Array(rows).fill(1000),
+    valid_until: Float64Array.from(columns.timestamp, () => Infinity)
+  }];
+}
+
+describe('feature bridge frames', () => {
+  test('round-trip header and float64 columns', () => {
+    const frame = encodeFrame(9, { method: 'adjustments', symbols: ['AAPL'] }, { timestamp: [1.5] });
+    expect(frame.length % 8).toBe(0);
+    const { id, header, columns } = decodeFrame(frame);
+    expect(id).toBe(9);
+    expect(header).toMatchObject({ method: 'adjustments', symbols: ['AAPL'], columns: ['timestamp'], rows: 1 });
+    expect(Array.from(columns.timestamp)).toEqual([1.5]);
+  });
+});
+
+describe('FeatureBridge', () => {
+  test('batches symbols into one frame and caches factors', async () => {
+    const server = fakeServer(splitFactors);
+    const bridge = new FeatureBridge({ connect: server.connect, schedule: nextTick, now: () => 5000 });
+
+    const [aapl, msft] = await Promise.all([
+      bridge.adjustmentFactors('AAPL', 2000),
+      bridge.adjustmentFactors('MSFT', 2000)
+    ]);
+    expect(server.requests).toHaveLength(1);
+    expect(server.requests[0].header.symbols).toEqual(['AAPL', 'MSFT']);
+    expect(aapl).toMatchObject({ priceScale: 0.25, priceOffset: -0.5, volumeScale: 4 });
+    expect(msft.validUntil).toBe(Infinity);
+
+    await bridge.adjustmentFactors('AAPL', 3000);
+    expect(server.requests).toHaveLength(1);
+    expect(bridge.cachedFactors('AAPL', 500)).toBe(null); // before validFrom
+  });
+
+  test('falls back to identity factors while the bridge is down', async () => {
+    const server = fakeServer(() => [{ error: 'corporate actions not loaded' }, {}]);
+    let clock = 0;
+    const bridge = new FeatureBridge({ connect: server.connect, schedule: nextTick, retryInterval: 1000, now: () => clock });
+    const errors = console.error;
+    console.error = () => {};
+    try {
+      expect(await bridge.adjustmentFactors('AAPL', 1)).toBe(IDENTITY_FACTORS);
+      expect(await bridge.adjustmentFactors('AAPL', 1)).toBe(IDENTITY_FACTORS);
+      expect(server.requests).toHaveLength(1);
+      clock = 1000;
+      await bridge.adjustmentFactors('AAPL', 1);
+      expect(server.requests).toHaveLength(2);
+    } finally {
+      console.error = errors;
+    }
+  });
+});
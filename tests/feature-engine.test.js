@@ -3,6 +3,7 @@ import { strict as assert } from 'node:assert';
 import Redis from 'ioredis';
 import { FeatureEngine } from '../feature-engine/realtime-features.js';
 import { OrderBookManager } from '../data-ingestion/orderbook-manager.js';
+import { orderFlow } from '../data-ingestion/order-flow.js';
 
 const redis = new Redis();
 const TEST_SYMBOL = 'TEST';
@@ -19,16 +20,13 @@ describe('Feature Engine', () => {
       asks: [[101, 400], [101.5, 600]]  // Total ask depth: 1000
     });
 
-    // Setup Tick Data
-    await redis.del(`ticks:${TEST_SYMBOL}`);
-    const tick1 = JSON.stringify({ price: 100.5, size: 100, conditions: ['B'], vwap: 100.3 });
-    const tick2 = JSON.stringify({ price: 100.4, size: 200, conditions: [], vwap: 100.5 });
-    await redis.zadd(`ticks:${TEST_SYMBOL}`, Date.now(), tick1, Date.now()+1, tick2);
+    // Setup Tick Data: classified against the 100 x 101 NBBO (mid 100.5)
+    orderFlow.applyTrade({ sym: TEST_SYMBOL, p: 100.8, s: 100 }); // buy
+    orderFlow.applyTrade({ sym: TEST_SYMBOL, p: 100.2, s: 200 }); // sell
   });
 
   after(async () => {
     await redis.del(`orderbook:${TEST_SYMBOL}`);
-    await redis.del(`ticks:${TEST_SYMBOL}`);
     await redis.quit();
   });
 
@@ -47,24 +45,13 @@ describe('Feature Engine', () => {
     );
   });
 
-  it('should calculate tick imbalance', async () => {
+  it('should calculate tick imbalance', () => {
     const engine = new FeatureEngine(TEST_SYMBOL, redis);
-    const imbalance = await engine._calculateTickImbalance();
-    
-    // Diagnostic logging
-    const rawTicks = await redis.zrange(`ticks:${TEST_SYMBOL}`, 0, -1, 'WITHSCORES');
-    console.log('\n[Tick Data Debug]');
-    console.log('Raw Redis Data:', rawTicks);
-    console.log('Expected Structure:', [
-      JSON.stringify({ price: 100.5, size: 100, conditions: ['B'], vwap: 100.3 }),
-      'score1',
-      JSON.stringify({ price: 100.4, size: 200, conditions: [], vwap: 100.5 }),
-      'score2'
-    ]);
+    const imbalance = engine._calculateTickImbalance();
   
     assert.ok(
       Math.abs(imbalance - 0) < 0.001,
-      `Imbalance should be 0 but got ${imbalance}. Check tick parsing logic.`
+      `Imbalance should be 0 but got ${imbalance}. Check trade classification.`
     );
   });
-});
\ No newline at end of file
+});
@@ -0,0 +1,25 @@
+import { FeatureNormalizer } from '../feature-engine/feature-normalization.js';
+
+const ORDER = FeatureNormalizer.getFeatureOrder();
+const sets = [
+  { atr5: 0.25, orderBookImbalance: 0.3, rsi3: 55, vwapDeviation: 0.005, volumeSpike: true, orderFlowImbalance: 0.2 },
+  { atr5: 1000, orderBookImbalance: -2, rsi3: 100, vwapDeviation: 10, volumeSpike: false, orderFlowImbalance: 5 }
+];
+const expected = sets.flatMap(set => {
+  const normalized = FeatureNormalizer.normalize(set);
+  return ORDER.map(k => normalized[k]);
+});
+
+describe('FeatureNormalizer typed-array paths', () => {
+  test('normalizeInto matches normalize', () => {
+    const out = new Float64Array(sets.length * ORDER.length);
+    sets.forEach((set, t) => FeatureNormalizer.normalizeInto(set, out, t * ORDER.length));
+    expect(Array.from(out)).toEqual(expected);
+  });
+
+  test('normalizeRows matches normalize, in place', () => {
+    const rows = new Float64Array(sets.flatMap(set => ORDER.map(k => Number(set[k]))));
+    expect(FeatureNormalizer.normalizeRows(rows)).toBe(rows);
+    expect(Array.from(rows)).toEqual(expected);
+  });
+});
@@ -0,0 +1,177 @@
+import { EventEmitter } from 'events';
+import { jest } from '@jest/globals';
+import { IngestPipeline } from '../data-ingestion/ingest-pipeline.js';
+import { RealTimePipeline } from '../feature-engine/realtime-pipeline.js';
+import { IDENTITY_FACTORS } from '../shared/feature-bridge.js';
+import { LatencyHistogram } from '../shared/latency-histogram.js';
+import { Tracer } from '../shared/tracing.js';
+
+function fakeRedis() {
+  const execs = [];
+  return {
+    execs,
+    pipeline() {
+      const commands = [];
+      const batch = {
+        commands,
+        exec: async () => {
+          execs.push(commands);
+          return commands.map(() => [null, 'OK']);
+        }
+      };
+      for (const name of ['xadd', 'hset', 'expire', 'lpush', 'ltrim', 'append', 'publish']) {
+        batch[name] = (...args) => { commands.push([name, ...args]); return batch; };
+      }
+      return batch;
+    }
+  };
+}
+
+describe('IngestPipeline', () => {
+  test('batches frames into a single pipeline per flush', async () => {
+    const redis = fakeRedis();
+    let clock = 0;
+    const pipeline = new IngestPipeline(redis, { now: () => clock });
+
+    pipeline.push(JSON.stringify([
+      { ev: 'T', sym: 'AAPL', t: 1, p: 150, s: 100 },
+      { ev: 'Q', sym: 'AAPL', t: 1, bp: 149.9, ap: 150.1, bs: 1, as: 2 }
+    ]));
+    pipeline.push(JSON.stringify([{ ev: 'Q', sym: 'AAPL', t: 2, bp: 150, ap: 150.2, bs: 3, as: 4 }]));
+    expect(redis.execs).toHaveLength(0);
+    expect(pipeline.getMetrics().queueDepth).toBe(3);
+
+    clock = 5;
+    await pipeline.flush();
+
+    expect(redis.execs).toHaveLength(1);
+    const commands = redis.execs[0];
+    expect(commands.filter(c => c[0] === 'xadd' && c[1] === 'market-data:raw')).toHaveLength(2);
+    expect(commands.filter(c => c[0] === 'xadd' && c[1] === 'trades:AAPL')).toHaveLength(1);
+    // Quotes are coalesced to the latest per symbol
+    const quotes = commands.filter(c => c[0] === 'hset' && c[1] === 'quote:AAPL');
+    expect(quotes).toHaveLength(1);
+    expect(quotes[0][2].bid).toBe(150);
+
+    const metrics = pipeline.getMetrics();
+    expect(metrics.queueDepth).toBe(0);
+    expect(metrics.maxQueueDepth).toBe(3);
+    expect(metrics.latency.count).toBe(2);
+    expect(metrics.latency.max).toBe(5);
+  });
+
+  test('does not fall through from quotes into trades', async () => {
+    const redis = fakeRedis();
+    const pipeline = new IngestPipeline(redis);
+    pipeline.push(JSON.stringify([{ ev: 'Q', sym: 'MSFT', t: 1, bp: 1, ap: 2 }]));
+    await pipeline.flush();
+    expect(redis.execs[0].some(c => c[1] === 'trades:MSFT')).toBe(false);
+  });
+
+  test('counts malformed frames without throwing', () => {
+    const pipeline = new IngestPipeline(fakeRedis());
+    expect(pipeline.push('not json')).toBe(0);
+    expect(pipeline.getMetrics().parseErrors).toBe(1);
+  });
+
+  test('flushes immediately when a batch is full', async () => {
+    const redis = fakeRedis();
+    const pipeline = new IngestPipeline(redis, { maxBatch: 2 });
+    pipeline.push(JSON.stringify([{ ev: 'T', sym: 'A', t: 1, p: 1, s: 1 }, { ev: 'T', sym: 'A', t: 2, p: 1, s: 1 }]));
+    await pipeline.flush();
+    expect(redis.execs).toHaveLength(1);
+  });
+
+  test('publishes every routed message to polygon:stream in arrival order', async () => {
+    const redis = fakeRedis();
+    const pipeline = new IngestPipeline(redis);
+    pipeline.push(JSON.stringify([
+      { ev: 'Q', sym: 'AAPL', t: 1, bp: 1, ap: 2 },
+      { ev: 'status', message: 'authenticated' },
+      { ev: 'T', sym: 'AAPL', t: 2, p: 1.5, s: 10 }
+    ]));
+    pipeline.push(JSON.stringify([{ ev: 'Q', sym: 'AAPL', t: 3, bp: 1.1, ap: 2 }]));
+    await pipeline.flush();
+
+    const messages = redis.execs[0].filter(c => c[0] === 'publish').map(c => JSON.parse(c[2]));
+    expect(redis.execs[0].filter(c => c[0] === 'publish').every(c => c[1] === 'polygon:stream')).toBe(true);
+    // Quotes are not coalesced here: order-flow classification needs each one
+    expect(messages.map(m => [m.symbol, m.data.ev, m.data.t])).toEqual([['AAPL', 'Q', 1], ['AAPL', 'T', 2], ['AAPL', 'Q', 3]]);
+    expect(messages.every(m => m.trace === undefined)).toBe(true);
+  });
+
+  test('carries a sampled frame trace through polygon:stream into model:input', async () => {
+    // The feature pipeline's drain loop and the polling below need real timers
+    jest.useRealTimers();
+    const tracer = new Tracer({ sampleRate: 1 });
+    const redis = fakeRedis();
+    const ingest = new IngestPipeline(redis, { tracer });
+
+    const commands = [];
+    const featureRedis = {
+      zrange: async () => [],
+      pipeline() {
+        const batch = { exec: async () => [] };
+        for (const name of ['xadd', 'zadd', 'zremrangebyscore']) {
+          batch[name] = (...args) => { commands.push([name, ...args]); return batch; };
+        }
+        return batch;
+      }
+    };
+    const subscriber = new EventEmitter();
+    subscriber.subscribe = async () => {};
+    subscriber.unsubscribe = async () => {};
+    const features = new RealTimePipeline({
+      symbols: ['AAPL'],
+      shards: 1,
+      redisClient: featureRedis,
+      subscriber,
+      bridge: { cachedFactors: () => IDENTITY_FACTORS },
+      drainInterval: 5,
+      tracer
+    });
+    await features.start();
+
+    try {
+      for (let i = 0; i < 10; i++) {
+        const close = 100 + (i % 3);
+        ingest.push(JSON.stringify([
+          { ev: 'A', sym: 'AAPL', s: 60000 * i, e: 60000 * (i + 1), o: close - 0.5, h: close + 1, l: close - 1, c: close, v: 1000, vw: close }
+        ]));
+      }
+      const traces = [...ingest.traces];
+      await ingest.flush();
+      for (const [name, channel, payload] of redis.execs[0]) {
+        if (name === 'publish') subscriber.emit('message', channel, payload);
+      }
+
+      const deadline = Date.now() + 5000;
+      const output = () => commands.filter(([name, key]) => name === 'xadd' && key === 'model:input:AAPL');
+      while (output().length === 0) {
+        if (Date.now() > deadline) throw new Error('Timed out waiting for pipeline output');
+        await new Promise(resolve => setTimeout(resolve, 10));
+      }
+
+      // Every frame is sampled; each output carries its own frame's trace
+      const trace = tracer.fromFields(output().at(-1).slice(6));
+      const sent = traces.find(t => t.id === trace.id);
+      expect(sent).toBeDefined();
+      expect(trace.origin).toBe(sent.origin);
+      expect(Object.keys(tracer.snapshot().stages)).toEqual(['ingest', 'transport', 'features', 'drain']);
+    } finally {
+      await features.stop();
+      jest.useFakeTimers();
+    }
+  });
+});
+
+describe('LatencyHistogram', () => {
+  test('percentiles are within bucket precision', () => {
+    const histogram = new LatencyHistogram();
+    for (let i = 1; i <= 1000; i++) histogram.record(i / 10);
+    expect(histogram.count).toBe(1000);
+    expect(Math.abs(histogram.percentile(50) - 50) / 50).toBeLessThan(0.05);
+    expect(Math.abs(histogram.percentile(99) - 99) / 99).toBeLessThan(0.05);
+    expect(histogram.percentile(100)).toBe(100);
+  });
+});
@@ -0,0 +1,42 @@
+import * as tf from '@tensorflow/tfjs-node';
+import { LivePredictor } from '../ml-core/live-predictor.js';
+
+// create_hybrid_model heads: direction (sigmoid), volatility, position
+function stubModel(direction, volatility, position) {
+  return {
+    predict: () => [tf.tensor2d([[direction]]), tf.tensor2d([[volatility]]), tf.tensor2d([[position]])]
+  };
+}
+
+function predictor(model) {
+  const live = new LivePredictor({ redisClient: {}, registry: { run: fn => fn(model) } });
+  live.inputs = {
+    track: async () => {},
+    poll: async () => {},
+    window: () => ({ ready: true, values: new Float32Array(4 * 3), length: 4, width: 3 }),
+    takeTrace: () => null
+  };
+  return live;
+}
+
+describe('LivePredictor', () => {
+  test('decodes the three hybrid model heads', async () => {
+    const signal = await predictor(stubModel(0.7, 0.02, 0.4)).predict('AAPL');
+    expect(signal.direction).toBe('LONG');
+    expect(signal.volatility).toBeCloseTo(0.02, 5);
+    expect(signal.positionSize).toBeCloseTo(0.4, 5);
+  });
+
+  test('reads a direction below 0.5 as SHORT', async () => {
+    const signal = await predictor(stubModel(0.2, 0.9, 0.6)).predict('AAPL');
+    expect(signal.direction).toBe('SHORT');
+    expect(signal.volatility).toBeCloseTo(0.9, 5);
+    expect(signal.positionSize).toBeCloseTo(0.6, 5);
+  });
+
+  test('returns null until the window is full', async () => {
+    const live = predictor(stubModel(0.7, 0.02, 0.4));
+    live.inputs.window = () => ({ ready: false });
+    expect(await live.predict('AAPL')).toBeNull();
+  });
+});
@@ -0,0 +1,56 @@
+// tests/lru-cache.test.js
+import { LRUCache } from '../shared/lru-cache.js';
+
+describe('LRUCache', () => {
+  let clock;
+  const now = () => clock;
+
+  beforeEach(() => {
+    clock = 0;
+  });
+
+  test('evicts least recently used entry when full', () => {
+    const evicted = [];
+    const cache = new LRUCache({ maxSize: 2, now, onEvict: key => evicted.push(key) });
+    cache.set('a', 1).set('b', 2);
+    cache.get('a'); // 'b' is now least recent
+    cache.set('c', 3);
+
+    expect(cache.has('a')).toBe(true);
+    expect(cache.has('b')).toBe(false);
+    expect(evicted).toEqual(['b']);
+    expect(cache.stats().evictions).toBe(1);
+  });
+
+  test('expires entries after ttl', () => {
+    const cache = new LRUCache({ maxSize: 10, ttl: 1000, now });
+    cache.set('a', 1);
+    clock = 999;
+    expect(cache.get('a')).toBe(1);
+    clock = 1001;
+    expect(cache.get('a')).toBeUndefined();
+    expect(cache.size).toBe(0);
+  });
+
+  test('prune removes only expired entries', () => {
+    const cache = new LRUCache({ maxSize: 10, ttl: 1000, now });
+    cache.set('old', 1);
+    clock = 600;
+    cache.set('new', 2);
+    clock = 1200;
+    expect(cache.prune()).toBe(1);
+    expect(cache.has('new')).toBe(true);
+  });
+
+  test('reports hit rate', () => {
+    const cache = new LRUCache({ maxSize: 10, now });
+    cache.set('a', 1);
+    cache.get('a');
+    cache.get('a');
+    cache.get('missing');
+    const stats = cache.stats();
+    expect(stats.hits).toBe(2);
+    expect(stats.misses).toBe(1);
+    expect(stats.hitRate).toBeCloseTo(2 / 3);
+  });
+});
@@ -0,0 +1,121 @@
+import { FeatureWindow, ModelInputStream } from '../ml-core/model-input-stream.js';
+
+// Minimal in-memory Redis streams: XADD (MAXLEN ~), XREVRANGE, XREAD COUNT
+function fakeStreams() {
+  const streams = new Map(); // key -> { entries: [[id, fields]] }
+  let seq = 0;
+  const stream = key => {
+    if (!streams.has(key)) streams.set(key, { entries: [] });
+    return streams.get(key);
+  };
+  const idNumber = id => Number(id.split('-')[1]);
+  return {
+    streams,
+    reads: [],
+    async xadd(key, ...args) {
+      let maxLen = Infinity;
+      if (args[0] === 'MAXLEN') {
+        maxLen = Number(args[2]);
+        args = args.slice(3);
+      }
+      const s = stream(key);
+      const id = `1-${++seq}`;
+      s.entries.push([id, args.slice(1)]);
+      if (s.entries.length > maxLen) s.entries.splice(0, s.entries.length - maxLen);
+      return id;
+    },
+    async xrevrange(key, end, start, _, count) {
+      return stream(key).entries.slice(-count).reverse();
+    },
+    async xread(...args) {
+      const count = Number(args[args.indexOf('COUNT') + 1]);
+      const keys = args.slice(args.indexOf('STREAMS') + 1);
+      const half = keys.length / 2;
+      const result = [];
+      for (let i = 0; i < half; i++) {
+        const last = idNumber(keys[half + i]);
+        const entries = stream(keys[i]).entries.filter(([id]) => idNumber(id) > last).slice(0, count);
+        this.reads.push(entries.length);
+        if (entries.length) result.push([keys[i], entries]);
+      }
+      return result.length ? result : null;
+    }
+  };
+}
+
+const features = i => JSON.stringify({
+  atr5: i, orderBookImbalance: 0.1, rsi3: 50, vwapDeviation: 0, volumeSpike: i % 2 === 0, orderFlowImbalance: -0.2
+});
+
+describe('FeatureWindow', () => {
+  test('shifts rows in place, oldest first', () => {
+    const window = new FeatureWindow(3, 2);
+    const values = window.values;
+    [[1, 1], [2, 2], [3, 3], [4, 4]].forEach(row => window.push(row));
+    expect(window.ready).toBe(true);
+    expect(Array.from(window.values)).toEqual([2, 2, 3, 3, 4, 4]);
+    expect(window.values).toBe(values);
+  });
+});
+
+describe('ModelInputStream', () => {
+  test('seeds from the newest entries and then reads only new ones', async () => {
+    const redis = fakeStreams();
+    for (let i = 0; i < 100; i++) await redis.xadd('model:input:AAPL', '*', 'features', features(i));
+
+    const inputs = new ModelInputStream(redis, { length: 60, width: 6 });
+    const window = await inputs.track('AAPL');
+    expect(window.ready).toBe(true);
+    expect(window.values[0]).toBe(40);                 // oldest seeded atr5
+    expect(window.values[59 * 6 + 4]).toBe(0);         // volumeSpike false -> 0
+
+    await redis.xadd('model:input:AAPL', '*', 'features', features(100));
+    expect(await inputs.poll()).toEqual(['AAPL']);
+    expect(redis.reads).toEqual([1]);
+    expect(window.values[59 * 6]).toBe(100);
+    expect(window.values[0]).toBe(41);
+
+    expect(await inputs.poll()).toEqual([]);
+    expect(inputs.lastIds.get('AAPL')).toBe('1-101');
+  });
+
+  test('every predictor process reads every entry', async () => {
+    const redis = fakeStreams();
+    for (let i = 0; i < 5; i++) await redis.xadd('model:input:MSFT', '*', 'features', features(i));
+    const first = new ModelInputStream(redis, { length: 3, width: 6 });
+    const second = new ModelInputStream(redis, { length: 3, width: 6 });
+    await first.track('MSFT');
+    await second.track('MSFT');
+
+    for (let i = 5; i < 9; i++) await redis.xadd('model:input:MSFT', '*', 'features', features(i));
+    await first.poll();
+    await second.poll();
+    for (const inputs of [first, second]) {
+      expect(Array.from(inputs.window('MSFT').values.filter((_, i) => i % 6 === 0))).toEqual([6, 7, 8]);
+    }
+    expect(await first.poll()).toEqual([]); // not redelivered
+  });
+
+  test('drains a backlog larger than the read count before returning', async () => {
+    const redis = fakeStreams();
+    const inputs = new ModelInputStream(redis, { length: 3, width: 6, count: 10 });
+    await inputs.track('AAPL');
+    await inputs.track('MSFT');
+    for (let i = 0; i < 25; i++) await redis.xadd('model:input:AAPL', '*', 'features', features(i));
+    await redis.xadd('model:input:MSFT', '*', 'features', features(0));
+
+    expect((await inputs.poll()).sort()).toEqual(['AAPL', 'MSFT']);
+    expect(redis.reads).toEqual([10, 1, 10, 5]); // only the truncated stream is re-read
+    expect(Array.from(inputs.window('AAPL').values.filter((_, i) => i % 6 === 0))).toEqual([22, 23, 24]);
+  });
+
+  test('capped streams keep the same window', async () => {
+    const redis = fakeStreams();
+    const inputs = new ModelInputStream(redis, { length: 3, width: 6 });
+    await inputs.track('NVDA');
+    for (let i = 0; i < 50; i++) await redis.xadd('model:input:NVDA', 'MAXLEN', '~', 10, '*', 'features', features(i));
+    await inputs.poll();
+    expect(redis.streams.get('model:input:NVDA').entries).toHaveLength(10);
+    expect(Array.from(inputs.window('NVDA').values.filter((_, i) => i % 6 === 0))).toEqual([47, 48, 49]);
+  });
+});
@@ -0,0 +1,70 @@
+import * as tf from '@tensorflow/tfjs-node';
+import { ModelRegistry } from '../ml-core/model-registry.js';
+
+// [batch, 4, 3] -> [batch, 2] with every output equal to `bias`
+function constantModel(bias, inputShape = [4, 3]) {
+  const model = tf.sequential();
+  model.add(tf.layers.flatten({ inputShape }));
+  model.add(tf.layers.dense({
+    units: 2,
+    kernelInitializer: 'zeros',
+    biasInitializer: tf.initializers.constant({ value: bias })
+  }));
+  return model;
+}
+
+const models = {
+  'v1': () => constantModel(0.5),
+  'v2': () => constantModel(0.6),
+  'drifted': () => constantModel(5),
+  'reshaped': () => constantModel(0.5, [5, 3])
+};
+
+const registry = () => new ModelRegistry({
+  loader: async url => models[url](),
+  warmupBatchSizes: [1, 4],
+  warmupRuns: 1,
+  probeBatch: 8,
+  maxOutputDrift: 0.25
+});
+
+const predict = model => tf.tidy(() => model.predict(tf.ones([1, 4, 3]))).data();
+
+describe('ModelRegistry', () => {
+  test('serves a warmed model and swaps to a validated version', async () => {
+    const models = registry();
+    await models.load('v1');
+    expect(models.version).toBe('v1');
+
+    await models.load('v2');
+    expect(models.version).toBe('v2');
+    const [value] = await models.run(predict);
+    expect(value).toBeCloseTo(0.6);
+  });
+
+  test('keeps the old version alive for in-flight predictions', async () => {
+    const models = registry();
+    const first = await models.load('v1');
+    const pinned = models.acquire();
+
+    await models.load('v2');
+    expect(first.retired).toBe(true);
+    expect(first.disposed).toBe(false);
+    expect((await predict(pinned.model))[0]).toBeCloseTo(0.5);
+
+    models.release(pinned);
+    expect(first.disposed).toBe(true);
+    expect(models.active.disposed).toBe(false);
+  });
+
+  test('rejects candidates that fail validation and keeps serving', async () => {
+    const models = registry();
+    await models.load('v1');
+    const tensors = tf.memory().numTensors;
+
+    await expect(models.load('drifted')).rejects.toThrow('drift');
+    await expect(models.load('reshaped')).rejects.toThrow('input shape');
+    expect(models.version).toBe('v1');
+    expect(tf.memory().numTensors).toBe(tensors);
+  });
+});
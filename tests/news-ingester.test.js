@@ -0,0 +1,119 @@
+// tests/news-ingester.test.js
+import { NewsIngester } from '../feature-engine/news-ingester.js';
+import { parseAlphaVantageTime, mentionsSymbol } from '../feature-engine/news-text.js';
+
+const HOUR = 3600000;
+const longText = (headline) => `${headline}. ${'Lorem ipsum dolor sit amet '.repeat(3)}`;
+
+function createAnalyzer(scoreFor) {
+  const analyzer = {
+    scored: [],
+    sources: {
+      Benzinga: { getMoversNews: async () => analyzer.benzinga },
+      AlphaVantage: { sectorSentiment: async () => analyzer.alphaVantage },
+      NewsAPI: { getCompanyNews: async (symbols) => { analyzer.newsApiCalls.push(symbols); return []; } }
+    },
+    benzinga: [],
+    alphaVantage: [],
+    newsApiCalls: [],
+    cacheKey: text => text.substring(0, 500).toLowerCase(),
+    scoreArticles: async (articles) => {
+      analyzer.scored.push(...articles.map(a => a.text));
+      return articles.map(a => scoreFor(a.text));
+    }
+  };
+  return analyzer;
+}
+
+describe('NewsIngester', () => {
+  let clock;
+  const now = () => clock;
+
+  beforeEach(() => {
+    clock = 10 * HOUR;
+  });
+
+  test('scores each article once across sources and polls', async () => {
+    const analyzer = createAnalyzer(() => 0.5);
+    const story = { text: longText('Apple beats'), timestamp: clock, symbols: ['AAPL'] };
+    analyzer.benzinga = [story];
+    analyzer.alphaVantage = [{ ...story, source: 'AlphaVantage' }];
+    const ingester = new NewsIngester(analyzer, { now });
+
+    await ingester.poll('Benzinga');
+    await ingester.poll('AlphaVantage');
+    await ingester.poll('Benzinga');
+
+    expect(analyzer.scored).toHaveLength(1);
+    expect(ingester.getScore('AAPL')).toBeCloseTo(0.5);
+  });
+
+  test('indexes by symbol and shares untagged news', async () => {
+    const analyzer = createAnalyzer(text => (text.startsWith('Tesla') ? -1 : 1));
+    analyzer.benzinga = [
+      { text: longText('Tesla recall'), timestamp: clock, symbols: ['TSLA'] },
+      { text: longText('Markets rally'), timestamp: clock, symbols: [] }
+    ];
+    const ingester = new NewsIngester(analyzer, { now });
+    await ingester.poll('Benzinga');
+
+    expect(ingester.getScore('TSLA')).toBeCloseTo(0);   // (-1 + 1) / 2
+    expect(ingester.getScore('MSFT')).toBeCloseTo(1);   // market-wide only
+  });
+
+  test('decays scores with half-life', async () => {
+    const analyzer = createAnalyzer(() => 0.8);
+    analyzer.benzinga = [{ text: longText('Nvidia upgrade'), timestamp: clock, symbols: ['NVDA'] }];
+    const ingester = new NewsIngester(analyzer, { now, halfLife: HOUR });
+    await ingester.poll('Benzinga');
+
+    clock += HOUR;
+    expect(ingester.getScore('NVDA')).toBeCloseTo(0.4);
+  });
+
+  test('skips stale and short articles', async () => {
+    const analyzer = createAnalyzer(() => 1);
+    analyzer.benzinga = [
+      { text: longText('Old news'), timestamp: clock - 2 * HOUR, symbols: ['AAPL'] },
+      { text: 'too short', timestamp: clock, symbols: ['AAPL'] }
+    ];
+    const ingester = new NewsIngester(analyzer, { now });
+    expect(await ingester.poll('Benzinga')).toBe(0);
+    expect(ingester.getScore('AAPL')).toBe(0);
+  });
+
+  test('drops articles with unparseable timestamps instead of poisoning buckets', async () => {
+    const analyzer = createAnalyzer(() => 1);
+    analyzer.alphaVantage = [
+      { text: longText('Fed holds rates'), timestamp: NaN, symbols: [] },
+      { text: longText('Apple beats'), timestamp: clock, symbols: ['AAPL'] }
+    ];
+    const ingester = new NewsIngester(analyzer, { now });
+    expect(await ingester.poll('AlphaVantage')).toBe(1);
+    expect(ingester.getScore('AAPL')).toBeCloseTo(1);
+    expect(ingester.getScore('MSFT')).toBe(0);
+  });
+
+  test('parses AlphaVantage compact timestamps', () => {
+    expect(parseAlphaVantageTime('20231115T201500')).toBe(Date.UTC(2023, 10, 15, 20, 15, 0));
+    expect(parseAlphaVantageTime('20231115T2015')).toBe(Date.UTC(2023, 10, 15, 20, 15, 0));
+    expect(Number.isNaN(parseAlphaVantageTime('Nov 15'))).toBe(true);
+    expect(Number.isNaN(parseAlphaVantageTime(undefined))).toBe(true);
+  });
+
+  test('matches symbols as whole, literal tickers', () => {
+    expect(mentionsSymbol('Buffett adds to BRK.B stake', 'BRK.B')).toBe(true);
+    expect(mentionsSymbol('Buffett adds to BRKXB stake', 'BRK.B')).toBe(false);
+    expect(mentionsSymbol('Buffett adds to BRK.B stake', 'BRK')).toBe(false);
+    expect(mentionsSymbol('Analysts upgrade AAPL.', 'AAPL')).toBe(true);
+    expect(mentionsSymbol('AAPLX fund inflows', 'AAPL')).toBe(false);
+  });
+
+  test('queries NewsAPI once for all watched symbols', async () => {
+    const analyzer = createAnalyzer(() => 0);
+    const ingester = new NewsIngester(analyzer, { now, symbols: ['AAPL'] });
+    ingester.getScore('MSFT');
+    await ingester.poll('NewsAPI');
+    expect(analyzer.newsApiCalls).toEqual([['AAPL', 'MSFT']]);
+  });
+});
@@ -0,0 +1,62 @@
+import { OrderFlowTracker, OrderFlowWindow, classifyTrade, tickRule } from '../data-ingestion/order-flow.js';
+import { OrderBookCache } from '../data-ingestion/orderbook-cache.js';
+
+// Same sequence and expected sides as tests/test_trade_classification.py
+const EVENTS = [
+  { ev: 'Q', sym: 'AAPL', t: 1, bp: 100, ap: 100.2 },
+  { ev: 'T', sym: 'AAPL', t: 2, p: 100.15, s: 100 },
+  { ev: 'T', sym: 'AAPL', t: 3, p: 100.05, s: 200 },
+  { ev: 'T', sym: 'AAPL', t: 4, p: 100.1, s: 50 },
+  { ev: 'T', sym: 'AAPL', t: 5, p: 100.1, s: 50 },
+  { ev: 'Q', sym: 'AAPL', t: 6, bp: 100.3, ap: 100.4 },
+  { ev: 'T', sym: 'AAPL', t: 6, p: 100.3, s: 100 },
+  { ev: 'T', sym: 'AAPL', t: 7, p: 100.35, s: 100 },
+  { ev: 'T', sym: 'MSFT', t: 8, p: 50, s: 10 },
+  { ev: 'T', sym: 'MSFT', t: 9, p: 50.1, s: 10 }
+];
+const EXPECTED_SIDES = [1, -1, 1, 1, -1, 1, 0, 1];
+
+describe('trade classification', () => {
+  test('quote rule with tick-rule fallback at the midpoint', () => {
+    expect(classifyTrade(100.15, 100, 100.2)).toBe(1);
+    expect(classifyTrade(100.05, 100, 100.2)).toBe(-1);
+    expect(classifyTrade(100.1, 100, 100.2, -1)).toBe(-1);
+    expect(classifyTrade(100.1, NaN, NaN, 1)).toBe(1);
+    expect(tickRule(100.1, 100.1, -1)).toBe(-1);
+    expect(tickRule(100, NaN)).toBe(0);
+  });
+
+  test('matches the offline classifier on a shared sequence', () => {
+    const books = new OrderBookCache();
+    const tracker = new OrderFlowTracker({ orderBooks: books });
+    const sides = [];
+    for (const event of EVENTS) {
+      if (event.ev === 'Q') books.applyQuote(event);
+      else sides.push(tracker.applyTrade(event));
+    }
+    expect(sides).toEqual(EXPECTED_SIDES);
+    expect(tracker.imbalance('AAPL', 1000)).toBeCloseTo(1 / 3);
+    expect(tracker.volumeImbalance('AAPL', 1000)).toBeCloseTo(0);
+    expect(tracker.imbalance('AAPL', 3)).toBeCloseTo(1 / 3);
+    expect(tracker.volumeImbalance('AAPL', 3)).toBeCloseTo(0.2);
+    expect(tracker.imbalance('MSFT', 1000)).toBeCloseTo(0.5);
+  });
+});
+
+describe('OrderFlowWindow', () => {
+  test('windows are differences of cumulative totals', () => {
+    const window = new OrderFlowWindow(4);
+    [1, 1, -1, 0, -1, -1].forEach(sign => window.push(sign, 10));
+    expect(window.count).toBe(4);
+    expect(window.window()).toEqual({ trades: 4, buys: 0, sells: 3, buyVolume: 0, sellVolume: 30 });
+    expect(window.window(2)).toEqual({ trades: 2, buys: 0, sells: 2, buyVolume: 0, sellVolume: 20 });
+    expect(window.imbalance()).toBe(-0.75);
+    expect(window.imbalance(100)).toBe(-0.75);
+  });
+
+  test('empty window reads as balanced', () => {
+    const window = new OrderFlowWindow(4);
+    expect(window.imbalance()).toBe(0);
+    expect(window.volumeImbalance()).toBe(0);
+  });
+});
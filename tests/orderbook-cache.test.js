@@ -0,0 +1,70 @@
+import { OrderBook, OrderBookCache } from '../data-ingestion/orderbook-cache.js';
+
+describe('OrderBook', () => {
+  test('quotes replace the top of book in place', () => {
+    const book = new OrderBook('AAPL');
+    const prices = book.bidPrice;
+    book.applyQuote({ bp: 150.1, bs: 3, ap: 150.2, as: 1, t: 1 });
+    book.applyQuote({ bp: 150.15, bs: 2, ap: 150.25, as: 2, t: 2 });
+    expect(book.bestBid).toBe(150.15);
+    expect(book.bestAsk).toBe(150.25);
+    expect(book.depthImbalance()).toBe(0);
+    expect(book.bidPrice).toBe(prices);
+  });
+
+  test('depth snapshots are merged and sorted best-first', () => {
+    const book = new OrderBook('AAPL');
+    book.applySnapshot({
+      bids: [[99.5, 300], [100, 200], [100, 300]],
+      asks: [[101.5, 600], [101, 400]]
+    });
+    expect(book.bestBid).toBe(100);
+    expect(book.bestAsk).toBe(101);
+    expect(book.levels('bids')).toEqual([[100, 500], [99.5, 300]]);
+    expect(book.depthImbalance(5)).toBeCloseTo(-200 / 1800);
+    expect(book.depthImbalance(1)).toBeCloseTo(100 / 900);
+  });
+
+  test('empty book reports NaN prices and zero imbalance', () => {
+    const book = new OrderBook('AAPL');
+    expect(book.isEmpty).toBe(true);
+    expect(Number.isNaN(book.bestBid)).toBe(true);
+    expect(book.depthImbalance()).toBe(0);
+  });
+});
+
+describe('OrderBookCache', () => {
+  function recorder() {
+    const commands = [];
+    return {
+      commands,
+      hset: (...args) => commands.push(['hset', ...args]),
+      expire: (...args) => commands.push(['expire', ...args])
+    };
+  }
+
+  test('snapshots changed books at most once per interval', () => {
+    let clock = 0;
+    const cache = new OrderBookCache({ snapshotInterval: 1000, now: () => clock });
+    cache.applyQuote({ sym: 'AAPL', bp: 1, bs: 1, ap: 2, as: 1 });
+
+    const first = recorder();
+    expect(cache.snapshotInto(first)).toBe(1);
+    expect(first.commands[0][1]).toBe('orderbook:AAPL');
+
+    cache.applyQuote({ sym: 'AAPL', bp: 1.5, bs: 1, ap: 2, as: 1 });
+    clock = 500;
+    expect(cache.snapshotDue()).toBe(false);
+    expect(cache.snapshotInto(recorder())).toBe(0);
+
+    clock = 1000;
+    expect(cache.snapshotDue()).toBe(true);
+    const second = recorder();
+    expect(cache.snapshotInto(second)).toBe(1);
+    expect(second.commands[0][2].bestBid).toBe(1.5);
+
+    // Unchanged books are never rewritten
+    clock = 5000;
+    expect(cache.snapshotInto(recorder())).toBe(0);
+  });
+});
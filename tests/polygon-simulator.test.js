@@ -0,0 +1,126 @@
+import fs from 'fs';
+import { jest } from '@jest/globals';
+import os from 'os';
+import path from 'path';
+import WebSocket from 'ws';
+import { PolygonSimulator, SyntheticMarket } from '../data-ingestion/polygon-simulator.js';
+
+const get = async url => {
+  const response = await fetch(url);
+  return { status: response.status, body: await response.json() };
+};
+
+async function fetchAll(url) {
+  const pages = [];
+  let next = url;
+  while (next) {
+    const { body } = await get(next);
+    pages.push(body.results);
+    next = body.next_url;
+  }
+  return pages;
+}
+
+describe('PolygonSimulator REST', () => {
+  let simulator;
+  let baseUrl;
+
+  beforeAll(async () => {
+    simulator = new PolygonSimulator({ market: new SyntheticMarket({ tradesPerDay: 2500, quotesPerDay: 100 }) });
+    ({ baseUrl } = await simulator.listen());
+  });
+
+  afterAll(() => simulator.close());
+
+  test('paginates trades through cursor next_urls without gaps or repeats', async () => {
+    const pages = await fetchAll(
+      `${baseUrl}/v3/trades/AAPL?timestamp.gte=2023-01-03T00:00:00.000Z&timestamp.lte=2023-01-03T23:59:59.999Z&limit=1000&sort=timestamp&order=asc`
+    );
+    expect(pages.map(page => page.length)).toEqual([1000, 1000, 500]);
+    const trades = pages.flat();
+    expect(trades.map(t => t.sequence_number)).toEqual(Array.from({ length: 2500 }, (_, i) => i + 1));
+    expect(new Date(trades[0].sip_timestamp / 1e6).toISOString().slice(0, 10)).toBe('2023-01-03');
+  });
+
+  test('serves the same data for the same query', async () => {
+    const url = `${baseUrl}/v2/aggs/ticker/MSFT/range/1/minute/2023-01-03/2023-01-04?adjusted=true&sort=asc&limit=500`;
+    const [first, second] = await Promise.all([fetchAll(url), fetchAll(url)]);
+    expect(first.flat()).toHaveLength(780); // two sessions of 390 minute bars
+    expect(second.flat()).toEqual(first.flat());
+    expect(Object.keys(first[0][0])).toEqual(['v', 'vw', 'o', 'c', 'h', 'l', 't', 'n']);
+  });
+
+  test('filters reference data by ticker and date', async () => {
+    const { body } = await get(
+      `${baseUrl}/v3/reference/dividends?ticker=AAPL&ex_dividend_date.gte=2020-01-01&ex_dividend_date.lte=2020-12-31&limit=1000`
+    );
+    for (const dividend of body.results) {
+      expect(dividend.ticker).toBe('AAPL');
+      expect(dividend.ex_dividend_date.startsWith('2020')).toBe(true);
+    }
+    expect((await get(`${baseUrl}/v3/nothing`)).status).toBe(404);
+  });
+
+  test('serves the last trade and NBBO in the single-result shape', async () => {
+    const trade = (await get(`${baseUrl}/v2/last/trade/AAPL`)).body.results;
+    const nbbo = (await get(`${baseUrl}/v2/last/nbbo/AAPL`)).body.results;
+    expect(trade.T).toBe('AAPL');
+    expect(trade.p).toBeGreaterThan(0);
+    expect(nbbo.P).toBeGreaterThan(nbbo.p);
+  });
+
+  test('injects errors and rate limits', async () => {
+    const flaky = new PolygonSimulator({ errorRate: 1, errorStatuses: [503] });
+    const limited = new PolygonSimulator({ rateLimit: { capacity: 2, refillPerSecond: 0.001 } });
+    const [a, b] = [await flaky.listen(), await limited.listen()];
+    try {
+      expect((await get(`${a.baseUrl}/v3/reference/tickers`)).status).toBe(503);
+      const statuses = [];
+      for (let i = 0; i < 3; i++) statuses.push((await get(`${b.baseUrl}/v3/reference/tickers?apiKey=k`)).status);
+      expect(statuses).toEqual([200, 200, 429]);
+    } finally {
+      await flaky.close();
+      await limited.close();
+    }
+  });
+});
+
+describe('PolygonSimulator websocket', () => {
+  // Frames are sent on a real interval and the test waits on the wall clock
+  beforeAll(() => jest.useRealTimers());
+  afterAll(() => jest.useFakeTimers());
+
+  test('authenticates, subscribes and streams frames at the configured rate', async () => {
+    const simulator = new PolygonSimulator({ wsRate: 2000, frameInterval: 5, apiKey: 'key' });
+    const { wsUrl } = await simulator.listen();
+    const socket = new WebSocket(wsUrl);
+    const events = [];
+    socket.on('message', data => events.push(...JSON.parse(data)));
+    await new Promise(resolve => socket.on('open', resolve));
+    socket.send(JSON.stringify({ action: 'auth', params: 'key' }));
+    socket.send(JSON.stringify({ action: 'subscribe', params: 'T.AAPL,Q.AAPL,A.MSFT' }));
+
+    await new Promise(resolve => setTimeout(resolve, 500));
+    socket.close();
+    await simulator.close();
+
+    const statuses = events.filter(e => e.ev === 'status').map(e => e.status);
+    expect(statuses).toEqual(['connected', 'auth_success', 'success']);
+    const market = events.filter(e => e.ev !== 'status');
+    expect(market.length).toBeGreaterThan(300);
+    expect(new Set(market.map(e => `${e.ev}.${e.sym}`))).toEqual(new Set(['T.AAPL', 'Q.AAPL', 'A.MSFT']));
+  });
+
+  test('skips empty recorded frames and rejects recordings without messages', () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'polygon-sim-'));
+    const file = path.join(dir, 'frames.jsonl');
+    fs.writeFileSync(file, '[]\n[{"ev":"T","sym":"AAPL","p":1,"s":1}]\n[]\n');
+    const simulator = new PolygonSimulator({ framesFile: file });
+    expect(simulator.recorded).toHaveLength(1);
+    expect(simulator._recordedFrame({ budget: 3 }).messages).toBe(3);
+
+    fs.writeFileSync(file, '[]\n[]\n');
+    expect(() => new PolygonSimulator({ framesFile: file })).toThrow('No messages');
+    fs.rmSync(dir, { recursive: true });
+  });
+});
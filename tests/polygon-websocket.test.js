@@ -1,5 +1,6 @@
 // tests/polygon-websocket.test.js
 import { client } from '../data-ingestion/polygon-websocket.js';
+import { TickStore } from '../data-ingestion/tick-persistence.js';
 import WS from 'jest-websocket-mock';
 import Redis from 'ioredis';
 import { jest } from '@jest/globals';
@@ -67,12 +68,12 @@ describe('Polygon WebSocket Integration', () => {
     server.send([mockTrade]);
     
     // 3. Verify Redis storage using retry logic
-    const key = `ticks:${testSymbol}:${new Date().toISOString().slice(0,10).replace(/-/g, '')}`;
+    const store = new TickStore(redis);
     
     await expect(async () => {
-      const ticks = await redis.zrange(key, '-inf', '+inf');
+      const ticks = await store.getTicks(testSymbol, mockTrade.t, mockTrade.t);
       expect(ticks.length).toBe(1);
-      expect(JSON.parse(ticks[0])).toMatchObject({
+      expect(ticks[0]).toMatchObject({
         price: 150.25,
         symbol: testSymbol
       });
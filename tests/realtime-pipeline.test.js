@@ -0,0 +1,186 @@
+import { EventEmitter } from 'events';
+import { jest } from '@jest/globals';
+import { RealTimePipeline } from '../feature-engine/realtime-pipeline.js';
+import { SharedRing } from '../feature-engine/shared-ring.js';
+import { IDENTITY_FACTORS } from '../shared/feature-bridge.js';
+import { Tracer, clock } from '../shared/tracing.js';
+
+function fakeRedis() {
+  const commands = [];
+  return {
+    commands,
+    zrange: async () => [],
+    pipeline() {
+      const batch = { exec: async () => [] };
+      for (const name of ['xadd', 'zadd', 'zremrangebyscore']) {
+        batch[name] = (...args) => { commands.push([name, ...args]); return batch; };
+      }
+      return batch;
+    }
+  };
+}
+
+function fakeSubscriber() {
+  const subscriber = new EventEmitter();
+  subscriber.subscribe = async () => {};
+  subscriber.unsubscribe = async () => {};
+  subscriber.publish = (channel, payload) => subscriber.emit('message', channel, JSON.stringify(payload));
+  return subscriber;
+}
+
+async function waitFor(predicate, timeout = 5000) {
+  const deadline = Date.now() + timeout;
+  while (!predicate()) {
+    if (Date.now() > deadline) throw new Error('Timed out waiting for pipeline output');
+    await new Promise(resolve => setTimeout(resolve, 10));
+  }
+}
+
+const published = (redis, symbol) =>
+  redis.commands.filter(([name, key]) => name === 'xadd' && key === `model:input:${symbol}`);
+
+function publishBars(subscriber, symbol, count, start = 0, trace = undefined) {
+  for (let i = start; i < start + count; i++) {
+    const close = 100 + (i % 3);
+    subscriber.publish('polygon:stream', {
+      symbol,
+      data: { ev: 'A', s: 60000 * i, o: close - 0.5, h: close + 1, l: close - 1, c: close, v: 1000, vw: close },
+      trace
+    });
+  }
+}
+
+describe('SharedRing', () => {
+  test('wraps its free-running counters and rejects pushes when full', () => {
+    const ring = new SharedRing({ capacity: 4, width: 2 });
+    const out = new Float64Array(2);
+    for (let round = 0; round < 3; round++) {
+      for (let i = 0; i < 4; i++) expect(ring.push([round, i])).toBe(true);
+      expect(ring.push([9, 9])).toBe(false);
+      for (let i = 0; i < 4; i++) {
+        ring.pop(out);
+        expect(Array.from(out)).toEqual([round, i]);
+      }
+      expect(ring.pop(out)).toBe(false);
+    }
+  });
+
+  test('reopens over the same buffer', () => {
+    const ring = new SharedRing({ capacity: 8, width: 1 });
+    const view = new SharedRing(ring.describe());
+    ring.push([42]);
+    const out = [0];
+    expect(view.pop(out)).toBe(true);
+    expect(out[0]).toBe(42);
+    expect(ring.size).toBe(0);
+  });
+});
+
+describe('RealTimePipeline', () => {
+  let redis;
+  let subscriber;
+  let pipeline;
+
+  // The drain loop (setImmediate, queueMicrotask) and waitFor's polling and
+  // deadline need the real scheduler and clock, not jest.setup.js's fakes
+  beforeAll(() => jest.useRealTimers());
+  afterAll(() => jest.useFakeTimers());
+
+  beforeEach(async () => {
+    redis = fakeRedis();
+    subscriber = fakeSubscriber();
+    pipeline = new RealTimePipeline({
+      symbols: ['AAPL', 'MSFT', 'NVDA'],
+      shards: 2,
+      ringCapacity: 1024,
+      redisClient: redis,
+      subscriber,
+      bridge: { cachedFactors: () => IDENTITY_FACTORS },
+      drainInterval: 5,
+      tracer: new Tracer({ sampleRate: 0 })
+    });
+    await pipeline.start();
+  });
+
+  afterEach(async () => {
+    await pipeline.stop();
+  });
+
+  test('shards symbols and publishes features computed in workers', async () => {
+    expect(pipeline.getMetrics().shards.map(s => s.symbols)).toEqual([['AAPL', 'NVDA'], ['MSFT']]);
+
+    for (const symbol of ['AAPL', 'MSFT', 'NVDA']) {
+      subscriber.publish('polygon:stream', { symbol, data: { ev: 'Q', t: 1, bp: 100, bs: 300, ap: 100.1, as: 100 } });
+      publishBars(subscriber, symbol, 10);
+    }
+    await waitFor(() => ['AAPL', 'MSFT', 'NVDA'].every(symbol => published(redis, symbol).length > 0));
+
+    const features = JSON.parse(published(redis, 'MSFT').at(-1).at(-1));
+    expect(Object.keys(features)).toEqual(
+      ['atr5', 'orderBookImbalance', 'rsi3', 'vwapDeviation', 'volumeSpike', 'orderFlowImbalance']
+    );
+    expect(features.orderBookImbalance).toBeCloseTo(0.5);
+    expect(typeof features.volumeSpike).toBe('boolean');
+    expect(redis.commands.filter(([name]) => name === 'zadd')).toHaveLength(30);
+
+    await waitFor(() => pipeline.getMetrics().shards[0].processed === 22); // 2 x (quote + 10 bars)
+    const metrics = pipeline.getMetrics();
+    expect(metrics.shards[1].lag.count).toBeGreaterThan(0);
+  });
+
+  test('subscribes and unsubscribes at runtime', async () => {
+    subscriber.publish('pipeline:control', { action: 'unsubscribe', symbol: 'NVDA' });
+    subscriber.publish('pipeline:control', { action: 'subscribe', symbol: 'TSLA' });
+    await waitFor(() => pipeline.symbols.has('TSLA'));
+    expect(pipeline.symbols.has('NVDA')).toBe(false);
+
+    publishBars(subscriber, 'NVDA', 10);
+    publishBars(subscriber, 'TSLA', 10);
+    await waitFor(() => published(redis, 'TSLA').length > 0);
+    expect(published(redis, 'NVDA')).toHaveLength(0);
+    expect(pipeline.getMetrics().unrouted).toBe(10);
+  });
+
+  test('buffers live messages while a new symbol is restored', async () => {
+    const origin = clock() - 5;
+    let release;
+    const restored = new Promise(resolve => { release = resolve; });
+    const snapshot = Array.from({ length: 5 }, (_, i) => JSON.stringify({
+      timestamp: 60000 * i, data: { ev: 'A', s: 60000 * i, o: 99.5, h: 101, l: 99, c: 100, v: 1000, vw: 100 }
+    }));
+    redis.zrange = () => restored.then(() => snapshot);
+
+    const subscribed = pipeline.subscribe('TSLA');
+    publishBars(subscriber, 'TSLA', 4, 5);
+    publishBars(subscriber, 'TSLA', 1, 9, `11:${origin}:${origin + 1}`);
+    expect(pipeline.getMetrics().unrouted).toBe(0);
+    expect(published(redis, 'TSLA')).toHaveLength(0);
+
+    release();
+    await subscribed;
+    await waitFor(() => published(redis, 'TSLA').length > 0);
+    const shard = pipeline.getMetrics().shards.find(s => s.symbols.includes('TSLA'));
+    expect(shard.routed).toBe(10);
+    // The live bars follow the restored ones: the newest output is the traced bar's
+    await waitFor(() => pipeline.tracer.fromFields(published(redis, 'TSLA').at(-1).slice(6)) !== null);
+    expect(pipeline.tracer.fromFields(published(redis, 'TSLA').at(-1).slice(6)).id).toBe(11);
+  });
+
+  test('carries traces through the shards into model:input entries', async () => {
+    const origin = clock() - 5;
+    publishBars(subscriber, 'AAPL', 9);
+    publishBars(subscriber, 'AAPL', 1, 9, `7:${origin}:${origin + 1}`);
+    await waitFor(() => published(redis, 'AAPL').length > 0);
+
+    const fields = published(redis, 'AAPL').at(-1).slice(6);
+    expect(fields[0]).toBe('features');
+    const trace = pipeline.tracer.fromFields(fields);
+    expect(trace.id).toBe(7);
+    expect(trace.origin).toBe(origin);
+    expect(trace.last).toBeGreaterThan(origin + 1);
+
+    const { stages } = pipeline.tracer.snapshot();
+    expect(Object.keys(stages)).toEqual(['transport', 'features', 'drain']);
+    expect(stages.drain.sinceOrigin.min).toBeGreaterThanOrEqual(5);
+  });
+});
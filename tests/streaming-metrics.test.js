@@ -0,0 +1,64 @@
+import { PositionLedger, RollingStats, StreamingMetrics } from '../risk-management/streaming-metrics.js';
+
+describe('PositionLedger', () => {
+  test('realizes PnL on reducing and flipping fills', () => {
+    const ledger = new PositionLedger(10000);
+    expect(ledger.applyFill({ symbol: 'AAPL', side: 'buy', qty: 10, price: 100 })).toBe(0);
+    expect(ledger.applyFill({ symbol: 'AAPL', side: 'buy', qty: 10, price: 110 })).toBe(0);
+    expect(ledger.positions.get('AAPL').avgPrice).toBe(105);
+
+    expect(ledger.applyFill({ symbol: 'AAPL', side: 'sell', qty: 5, price: 115 })).toBe(50);
+    // Sell 25 against 15 long: 15 closed at +5, 10 opened short at 110
+    expect(ledger.applyFill({ symbol: 'AAPL', side: 'sell', qty: 25, price: 110 })).toBe(75);
+    expect(ledger.positions.get('AAPL')).toEqual({ qty: -10, avgPrice: 110, mark: 110 });
+    expect(ledger.realizedPnL).toBe(125);
+    expect(ledger.equity).toBe(10125);
+  });
+
+  test('marks move equity incrementally', () => {
+    const ledger = new PositionLedger(1000);
+    ledger.applyFill({ symbol: 'MSFT', side: 'buy', qty: 2, price: 100 });
+    ledger.mark('MSFT', 90);
+    expect(ledger.equity).toBe(980);
+    ledger.mark('MSFT', 105);
+    expect(ledger.equity).toBe(1010);
+  });
+});
+
+describe('RollingStats', () => {
+  test('matches a direct computation over the window', () => {
+    const stats = new RollingStats(3);
+    [1, 2, 3, 10].forEach(v => stats.push(v));
+    expect(stats.mean).toBeCloseTo(5);
+    expect(stats.std).toBeCloseTo(Math.sqrt(((2 - 5) ** 2 + (3 - 5) ** 2 + (10 - 5) ** 2) / 2));
+  });
+});
+
+describe('StreamingMetrics', () => {
+  test('win rate and profit factor are count- and dollar-based respectively', () => {
+    const metrics = new StreamingMetrics({ startingEquity: 100000 });
+    metrics.recordTrade(3000);
+    metrics.recordTrade(-500);
+    metrics.recordTrade(-500);
+    expect(metrics.winRate).toBeCloseTo(1 / 3);
+    expect(metrics.profitFactor).toBe(3);
+    expect(metrics.dailyReturn).toBeCloseTo(0.02);
+  });
+
+  test('tracks peak-to-trough drawdown', () => {
+    const metrics = new StreamingMetrics({ startingEquity: 1000 });
+    metrics.recordTrade(200);  // peak 1200
+    metrics.recordTrade(-300); // 900
+    metrics.recordTrade(100);  // 1000
+    expect(metrics.maxDrawdown).toBeCloseTo(0.25);
+    expect(metrics.drawdown).toBeCloseTo(200 / 1200);
+  });
+
+  test('volatility ratio rises when recent returns widen', () => {
+    const metrics = new StreamingMetrics({ startingEquity: 100000, volatilityWindow: 5, baselineWindow: 50 });
+    for (let i = 0; i < 45; i++) metrics.recordTrade(i % 2 ? 10 : -10);
+    expect(metrics.volatilityRatio).toBeLessThan(1.5);
+    for (let i = 0; i < 5; i++) metrics.recordTrade(i % 2 ? 2000 : -2000);
+    expect(metrics.volatilityRatio).toBeGreaterThan(2.5);
+  });
+});
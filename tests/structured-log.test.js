@@ -0,0 +1,72 @@
+import { StructuredLog } from '../shared/structured-log.js';
+
+function capture(options = {}) {
+  let now = 0;
+  const written = [];
+  const log = new StructuredLog({
+    rate: 2, sampleEvery: 1, errorRate: 50, level: 'info', maxQueue: 100, flushInterval: 1000,
+    write: text => {
+      written.push(...text.trim().split('\n').map(line => JSON.parse(line)));
+      return Promise.resolve();
+    },
+    now: () => now,
+    ...options
+  });
+  return { log, written, advance: ms => { now += ms; } };
+}
+
+describe('StructuredLog', () => {
+  test('rate limits per category and reports what was suppressed', async () => {
+    const { log, written, advance } = capture();
+    for (let i = 0; i < 10; i++) log.info('ingest.frame', 'frame', { i });
+    log.info('ws.connection', 'connected');
+    advance(1000); // two tokens back
+    expect(log.info('ingest.frame', 'frame', { i: 10 })).toBe(true);
+    await log.flush();
+
+    const frames = written.filter(r => r.category === 'ingest.frame');
+    expect(frames.map(r => r.i)).toEqual([0, 1, 2, 3, 10]);
+    expect(frames[4].suppressed).toBe(6);
+    expect(written.some(r => r.category === 'ws.connection')).toBe(true);
+  });
+
+  test('samples info but never errors, which keep their stack', async () => {
+    const { log, written } = capture({ rate: 1000, sampleEvery: 5 });
+    let kept = 0;
+    for (let i = 0; i < 100; i++) kept += log.info('ingest.frame', 'frame');
+    expect(kept).toBe(20);
+
+    for (let i = 0; i < 30; i++) log.error('ingest.flush', 'flush failed', { error: new Error(`redis down ${i}`) });
+    await log.flush();
+    const errors = written.filter(r => r.level === 'error');
+    expect(errors).toHaveLength(30);
+    expect(errors[0].error.message).toBe('redis down 0');
+    expect(errors[0].error.stack).toContain('Error: redis down 0');
+  });
+
+  test('writes counters, leftover suppressions and drops as one stats record', async () => {
+    const { log, written } = capture({ maxQueue: 3 });
+    for (let i = 0; i < 1000; i++) log.count('ingest.messages');
+    log.count('ingest.bytes', 512);
+    for (let i = 0; i < 6; i++) log.warn(`ws.category${i}`, 'closed');
+    await log.flush();
+
+    expect(written).toHaveLength(4);
+    const [stats] = written.filter(r => r.category === 'stats');
+    expect(stats.counters).toEqual({ 'ingest.messages': 1000, 'ingest.bytes': 512 });
+    expect(stats.dropped).toBe(3);
+
+    written.length = 0;
+    await log.flush();
+    expect(written).toHaveLength(0); // nothing new, nothing written
+  });
+
+  test('drops records below the level threshold without queueing them', async () => {
+    const { log, written } = capture({ level: 'warn' });
+    expect(log.info('ingest.frame', 'frame')).toBe(false);
+    expect(log.debug('ingest.frame', 'frame')).toBe(false);
+    expect(log.warn('ws.connection', 'closed')).toBe(true);
+    await log.flush();
+    expect(written.map(r => r.level)).toEqual(['warn']);
+  });
+});
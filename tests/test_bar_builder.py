@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from bar_builder import dollar_bars, split_adjust, time_bars, volume_bars
+
+MINUTE = 60_000_000_000
+OPEN = pd.Timestamp('2023-01-03 14:30', tz='UTC').value
+
+
+def trades(rows):
+    return pd.DataFrame(rows, columns=['sip_timestamp', 'price', 'size', 'conditions'])
+
+
+TRADES = trades([
+    (OPEN + 1, 100.0, 100, [0]),
+    (OPEN + 2, 105.0, 10, [37]),           # odd lot: volume only
+    (OPEN + 3, 99.0, 200, [14]),           # intermarket sweep: regular
+    (OPEN + 4, 90.0, 0, [15]),             # official close print: ignored
+    (OPEN + MINUTE + 1, 98.0, 5, [37]),    # a minute with only odd lots
+    (OPEN + 2 * MINUTE + 5, 101.0, 50, None),
+    (OPEN + 2 * MINUTE + 1, 100.5, 50, [22]),  # prior reference price, out of order
+])
+
+
+def test_time_bars_follow_sip_update_rules():
+    bars = time_bars(TRADES, '1min')
+    assert list(bars.columns) == ['volume', 'vwap', 'open', 'close', 'high', 'low', 'n']
+    assert bars.index.dtype == 'datetime64[ns, UTC]'
+    assert bars.index.tolist() == [pd.Timestamp(OPEN, tz='UTC'), pd.Timestamp(OPEN + 2 * MINUTE, tz='UTC')]
+
+    first = bars.iloc[0]
+    assert (first['open'], first['close'], first['high'], first['low']) == (100.0, 99.0, 100.0, 99.0)
+    assert first['volume'] == 310 and first['n'] == 3
+    assert first['vwap'] == pytest.approx((100 * 100 + 105 * 10 + 99 * 200) / 310)
+
+    # The prior-reference trade sets high/low but not open/close
+    last = bars.iloc[1]
+    assert (last['open'], last['close'], last['high'], last['low']) == (101.0, 101.0, 101.0, 100.5)
+    assert last['volume'] == 100
+
+
+def test_all_trades_without_rules_and_arrow_input():
+    bars = time_bars(pa.Table.from_pandas(TRADES), '1min', rules={})
+    assert len(bars) == 3 and bars['high'].iloc[0] == 105.0 and bars['volume'].iloc[1] == 5
+    np.testing.assert_allclose(time_bars(pa.Table.from_pandas(TRADES), '1min').to_numpy(float),
+                               time_bars(TRADES, '1min').to_numpy(float))
+
+
+def test_all_null_conditions_count_every_trade():
+    rows = trades([(OPEN + 1, 100.0, 10, None), (OPEN + 2, 102.0, 20, None)])
+    for frame in (rows, pa.Table.from_pandas(rows)):
+        bars = time_bars(frame, '1min')
+        assert (bars['open'].iloc[0], bars['high'].iloc[0], bars['volume'].iloc[0]) == (100.0, 102.0, 30)
+
+
+def test_day_bars_start_at_midnight_eastern():
+    bars = time_bars(TRADES, '1D')
+    assert bars.index.tolist() == [pd.Timestamp('2023-01-03 05:00', tz='UTC')]
+    assert bars['volume'].iloc[0] == 415 and bars['low'].iloc[0] == 99.0
+
+
+def test_volume_and_dollar_bars_close_on_the_crossing_trade():
+    flat = trades([(OPEN + i, 10.0, size, [0]) for i, size in enumerate([60, 60, 30, 50, 10])])
+    bars = volume_bars(flat, 100)
+    assert bars['volume'].tolist() == [120, 80, 10]
+    assert bars.index[1] == pd.Timestamp(OPEN + 2, tz='UTC')
+    assert dollar_bars(flat, 1000)['n'].tolist() == [2, 2, 1]
+
+
+def test_split_adjust_scales_bars_before_each_split():
+    bars = time_bars(TRADES, '1min')
+    splits = pd.DataFrame({'execution_date': ['2023-01-03', '2023-01-04'], 'split_from': [1, 1], 'split_to': [2, 4]})
+    adjusted = split_adjust(bars, splits)
+    assert adjusted['close'].iloc[0] == pytest.approx(99.0 / 4)
+    assert adjusted['volume'].iloc[0] == 310 * 4
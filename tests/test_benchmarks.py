@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from harness import Case, Skip, compare, requires, select_baseline, time_case
+from synthetic_data import corporate_actions, minute_bars, session_minutes, tick_table
+
+
+def entry(commit, median, host='box', scale=1.0):
+    return {
+        'commit': commit, 'time': 't', 'scale': scale, 'machine': {'host': host, 'python': '3.11'},
+        'results': {'case': {'median': median}},
+    }
+
+
+def test_compare_flags_slowdowns_beyond_threshold_and_noise():
+    baseline = {'slow': {'median': 0.100}, 'fast': {'median': 0.100}, 'noise': {'median': 0.0001}, 'same': {'median': 0.1}}
+    results = {'slow': {'median': 0.130}, 'fast': {'median': 0.050}, 'noise': {'median': 0.0003},
+               'same': {'median': 0.11}, 'added': {'median': 1.0}}
+    changes = compare(results, baseline, threshold=0.2)
+    assert changes['slow']['status'] == 'regression' and changes['slow']['ratio'] == pytest.approx(1.3)
+    assert changes['fast']['status'] == 'improvement'
+    assert changes['noise']['status'] == 'unchanged'  # 3x slower but under the noise floor
+    assert changes['same']['status'] == 'unchanged'
+    assert changes['added']['status'] == 'new'
+
+
+def test_baseline_is_latest_other_commit_on_the_same_machine_and_scale():
+    history = [entry('aaa', 1), entry('bbb', 2), entry('ccc', 3, host='other'), entry('ddd', 4, scale=0.1), entry('eee', 5)]
+    run = entry('eee', 6)
+    assert select_baseline(history, run)['commit'] == 'bbb'
+    assert select_baseline(history, run, commit='aa')['commit'] == 'aaa'
+    assert select_baseline(history, entry('fff', 1, host='new')) is None
+
+
+def test_time_case_warms_up_then_repeats():
+    calls = []
+    result = time_case(Case('noop', lambda: calls.append(1), items=10), repeat=4)
+    assert len(calls) == 5 and result['repeat'] == 4
+    assert result['min'] <= result['median'] and result['rate'] > 0
+
+
+def test_missing_dependency_skips():
+    with pytest.raises(Skip):
+        requires('not_a_real_module')
+
+
+def test_synthetic_data_is_deterministic_and_consistent():
+    bars = minute_bars(1000, seed=3)
+    assert bars.equals(minute_bars(1000, seed=3))
+    assert (bars['low'] <= bars[['open', 'close']].min(axis=1)).all()
+    assert (bars['high'] >= bars[['open', 'close']].max(axis=1)).all()
+
+    index = session_minutes(391, start='2023-01-06')  # Friday: 390 minutes, then Monday's open
+    assert str(index[0]) == '2023-01-06 14:30:00+00:00' and str(index[-1]) == '2023-01-09 14:30:00+00:00'
+
+    trades = tick_table(1000).to_pandas()
+    assert trades['sip_timestamp'].is_monotonic_increasing
+    assert {tuple(c) for c in trades['conditions']} == {(0,), (12, 37)}
+
+    splits, dividends = corporate_actions(['AAA', 'BBB'], years=10)
+    assert set(splits.columns) == {'symbol', 'execution_date', 'split_from', 'split_to'}
+    assert np.all(dividends['cash_amount'] > 0)
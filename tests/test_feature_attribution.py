@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from feature_attribution import AttributionCache, accumulate, explain, fingerprint
+
+TIMESTEPS, FEATURES = 60, 6
+
+
+class LinearModel:
+    """Three linear outputs; gradient x input is exact for it"""
+
+    output_names = ['direction', 'volatility', 'position']
+
+    def __init__(self, seed=0):
+        self.weights = np.random.default_rng(seed).standard_normal((3, TIMESTEPS, FEATURES)).astype(np.float32)
+        self.calls = 0
+
+    def get_weights(self):
+        return [self.weights]
+
+    def explain(self, batch):
+        self.calls += 1
+        return self.weights[:, None] * batch[None]
+
+
+def windows(n=500, seed=1):
+    return np.random.default_rng(seed).standard_normal((n, TIMESTEPS, FEATURES)).astype(np.float32)
+
+
+def test_streamed_batches_match_the_full_computation():
+    model, data = LinearModel(), windows()
+    exact = model.explain(data)
+    count, mean, mean_abs, values = accumulate(model.explain, data, batch_size=64, keep=True)
+    assert count == 500 and model.calls == 1 + 8
+    np.testing.assert_allclose(mean, exact.mean(axis=1), rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(mean_abs, np.abs(exact).mean(axis=1), rtol=1e-5, atol=1e-6)
+    np.testing.assert_array_equal(values, exact)
+
+
+def test_per_feature_and_per_timestep_aggregates():
+    model = LinearModel()
+    model.weights[:] = 0
+    model.weights[0, :, 3] = 1.0   # direction depends on vwapDeviation only
+    model.weights[0, -1, 0] = 2.0  # and the last atr5
+    result = explain(model, np.ones((10, TIMESTEPS, FEATURES), np.float32), method='gradient',
+                     explainer=model.explain)
+    weights = result.weights('direction')
+    assert weights['vwapDeviation'] == pytest.approx(60 / 62)
+    assert weights['atr5'] == pytest.approx(2 / 62)
+    assert sum(weights.values()) == pytest.approx(1)
+    assert result.per_timestep[0, -1] == pytest.approx(3.0)
+    assert result.weights('volatility')['rsi3'] == pytest.approx(1 / 6)  # no signal: uniform
+
+
+def test_cache_is_keyed_by_model_version_slice_and_method(tmp_path):
+    cache = AttributionCache(str(tmp_path))
+    model, data = LinearModel(), windows(100)
+    first = explain(model, data, method='gradient', slice_key='AAPL:2024H1', cache=cache, explainer=model.explain)
+    calls = model.calls
+
+    again = explain(model, data, method='gradient', slice_key='AAPL:2024H1', cache=cache, explainer=model.explain)
+    assert model.calls == calls
+    np.testing.assert_array_equal(again.mean_abs, first.mean_abs)
+    assert again.weights() == pytest.approx(first.weights())
+    assert (again.samples, again.outputs, again.model_version) == (100, first.outputs, first.model_version)
+
+    explain(model, data, method='gradient', slice_key='AAPL:2024H2', cache=cache, explainer=model.explain)
+    retrained = LinearModel(seed=5)
+    explain(retrained, data, method='gradient', slice_key='AAPL:2024H1', cache=cache, explainer=retrained.explain)
+    assert model.calls == calls + 1 and retrained.calls > 0
+    assert len(list(tmp_path.glob('*.npz'))) == 3
+
+
+def test_fingerprint_is_content_based_and_works_on_memory_maps(tmp_path):
+    data = windows(300)
+    path = tmp_path / 'windows.npy'
+    np.save(path, data)
+    assert fingerprint(np.load(path, mmap_mode='r'), chunk=64) == fingerprint(data)
+    changed = data.copy()
+    changed[-1, -1, -1] += 1
+    assert fingerprint(changed) != fingerprint(data)
+
+
+@pytest.mark.parametrize('method', ['gradient', 'integrated', 'expected'])
+def test_keras_attributions_are_exact_for_a_linear_model(method):
+    tf = pytest.importorskip('tensorflow')
+    inputs = tf.keras.Input((TIMESTEPS, FEATURES))
+    flat = tf.keras.layers.Flatten()(inputs)
+    outputs = [tf.keras.layers.Dense(1, name=name)(flat) for name in LinearModel.output_names]
+    model = tf.keras.Model(inputs, outputs)
+
+    data, background = windows(40), windows(20, seed=2)
+    result = explain(model, data, method=method, background=background, steps=8, batch_size=16, keep=True)
+    kernels = np.stack([model.get_layer(name).kernel.numpy().reshape(TIMESTEPS, FEATURES)
+                        for name in LinearModel.output_names])
+    reference = {'gradient': 0, 'integrated': background.mean(axis=0)}.get(method)
+    if reference is not None:
+        np.testing.assert_allclose(result.values, kernels[:, None] * (data - reference), rtol=1e-3, atol=1e-4)
+    else:
+        # Completeness: attributions sum to f(x) - mean f(background), in expectation
+        predicted = np.stack([np.ravel(p) for p in model.predict(data, verbose=0)])
+        base = np.stack([np.ravel(p) for p in model.predict(background, verbose=0)]).mean(axis=1, keepdims=True)
+        np.testing.assert_allclose(result.values.sum(axis=(2, 3)).mean(), (predicted - base).mean(), atol=0.5)
@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from corporate_actions import CorporateActionsManager
+from feature_bridge import FeatureBridgeServer, decode_payload, encode_frame, read_frame
+
+
+@pytest.fixture
+def manager():
+    manager = CorporateActionsManager()
+    manager.splits = pd.DataFrame({
+        'symbol': ['AAPL'], 'execution_date': ['2024-06-10'], 'split_from': [1], 'split_to': [4]
+    })
+    manager.dividends = pd.DataFrame({
+        'symbol': ['AAPL', 'AAPL'], 'ex_dividend_date': ['2024-05-10', '2024-08-12'], 'cash_amount': [0.25, 0.25]
+    })
+    manager._create_adjustment_maps()
+    return manager
+
+
+def to_ms(index):
+    return ((index.tz_localize('UTC') - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=float)
+
+
+def test_frames_round_trip():
+    columns = {'timestamp': np.array([1.0, 2.5]), 'price': np.array([100.0, np.inf])}
+    frame = encode_frame(7, {'method': 'adjustments', 'symbols': ['AAPL', 'MSFT']}, columns)
+    assert len(frame) % 8 == 0
+    request_id, header, decoded = decode_payload(frame[4:])
+    assert request_id == 7 and header['symbols'] == ['AAPL', 'MSFT'] and header['rows'] == 2
+    np.testing.assert_array_equal(decoded['price'], columns['price'])
+
+
+def test_factors_match_apply_adjustments(manager):
+    index = pd.date_range('2024-05-01', '2024-09-01', freq='7D')
+    window = pd.DataFrame({
+        'open': 400.0, 'high': 404.0, 'low': 396.0, 'close': 401.0, 'volume': 1000.0
+    }, index=index)
+    expected = manager.apply_adjustments(window, 'AAPL')
+
+    factors = manager.adjustment_factors(['AAPL'] * len(index), to_ms(index))
+    for column in ['open', 'high', 'low', 'close']:
+        np.testing.assert_allclose(window[column] * factors['price_scale'] + factors['price_offset'], expected[column])
+    np.testing.assert_allclose(window['volume'] * factors['volume_scale'], expected['volume'])
+
+
+def test_factors_report_their_validity_interval(manager):
+    june = to_ms(pd.DatetimeIndex(['2024-06-10', '2024-08-12']))
+    factors = manager.adjustment_factors(['AAPL', 'MSFT'], [june[0] + 1, june[0]])
+    assert factors['valid_from'][0] == june[0] and factors['valid_until'][0] == june[1]
+    assert factors['price_scale'][1] == 1.0 and factors['valid_until'][1] == np.inf
+
+
+def test_factors_for_interleaved_symbols_match_per_symbol_calls(manager):
+    times = to_ms(pd.date_range('2024-05-01', '2024-09-01', freq='3D'))
+    symbols = np.array(['AAPL', 'MSFT', 'AAPL', 'TSLA'] * len(times))[:len(times)]
+    factors = manager.adjustment_factors(symbols, times)
+    for symbol in ['AAPL', 'MSFT', 'TSLA']:
+        rows = symbols == symbol
+        alone = manager.adjustment_factors([symbol] * int(rows.sum()), times[rows])
+        for name, values in alone.items():
+            np.testing.assert_array_equal(factors[name][rows], values)
+
+
+def test_server_answers_batched_requests(manager, tmp_path):
+    async def scenario():
+        path = str(tmp_path / 'bridge.sock')
+        task = asyncio.create_task(FeatureBridgeServer(manager).serve(path))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            try:
+                reader, writer = await asyncio.open_unix_connection(path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                continue
+        writer.write(encode_frame(1, {'method': 'adjustments', 'symbols': ['AAPL', 'MSFT']},
+                                  {'timestamp': np.array([2e12, 2e12])}))
+        writer.write(encode_frame(2, {'method': 'regime', 'symbols': ['AAPL'], 'lengths': [0]}))
+        responses = [await read_frame(reader), await read_frame(reader)]
+        writer.close()
+        task.cancel()
+        return responses
+
+    (first_id, _, factors), (second_id, error, _) = asyncio.run(scenario())
+    assert first_id == 1 and factors['price_scale'].tolist() == [0.25, 1.0]
+    assert second_id == 2 and error['error'] == 'regime classifier not loaded'
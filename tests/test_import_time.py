@@ -0,0 +1,46 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ['pandas', 'requests', 'pyarrow', 'tensorflow', 'sklearn', 'bar_builder']
+# Import budgets in seconds, measured in a fresh interpreter; numpy and asyncio
+# alone take ~0.15 s for the bridge
+BUDGETS = {
+    'historical_data_fetcher': 0.25,
+    'feature_bridge': 0.5,
+    'sentiment_model': 0.5,
+}
+
+PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'modules': sorted(sys.modules), 'handlers': len(logging.root.handlers)}}))
+"""
+
+
+def probe(module, cwd):
+    path = os.pathsep.join(os.path.join(ROOT, folder) for folder in ('ml-core', 'data-ingestion'))
+    env = {**os.environ, 'PYTHONPATH': path}
+    output = subprocess.run([sys.executable, '-c', PROBE.format(module=module)], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.mark.parametrize('module', sorted(BUDGETS))
+def test_import_is_cheap_and_side_effect_free(module, tmp_path):
+    if module == 'sentiment_model' and importlib.util.find_spec('retrying') is None:
+        pytest.skip('retrying not installed')
+    result = probe(module, tmp_path)
+    assert not [name for name in HEAVY if name in result['modules']]
+    assert result['handlers'] == 0  # logging is configured by entry points only
+    assert not list(tmp_path.iterdir())  # no data_ingestion.log / sentiment_training.log
+    # Best of three to ride out a cold disk cache
+    elapsed = min([result['elapsed']] + [probe(module, tmp_path)['elapsed'] for _ in range(2)])
+    assert elapsed < BUDGETS[module]
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from risk_simulator import baseline_signals, daily_loss_closed_fraction, realized_pnl, simulate
+
+DAY = 86_400_000
+OPEN = 1_760_621_400_000  # 2025-10-16 13:30 UTC (09:30 ET)
+
+
+def losing_day(start):
+    """Buy 100 @ 100, then marks slide to 90, then flatten"""
+    rows = [(start, 'AAPL', 'fill', 'buy', 100, 100.0)]
+    rows += [(start + (i + 1) * 60_000, 'AAPL', 'mark', None, None, 100.0 - i) for i in range(11)]
+    rows.append((start + 720_000, 'AAPL', 'fill', 'sell', 100, 90.0))
+    return rows
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['timestamp', 'symbol', 'type', 'side', 'qty', 'price'])
+
+
+def test_realized_pnl_matches_position_ledger():
+    symbols = np.array(['AAPL'] * 4)
+    signed = np.array([10.0, 10.0, -5.0, -25.0])
+    prices = np.array([100.0, 110.0, 115.0, 110.0])
+    # Same sequence as the PositionLedger test in streaming-metrics.test.js
+    assert realized_pnl(symbols, signed, prices).tolist() == [0.0, 0.0, 50.0, 75.0]
+
+
+def test_baseline_equity_marks_to_market():
+    signals = baseline_signals(frame(losing_day(OPEN)), starting_equity=100000.0)
+    assert signals['equity'][0] == pytest.approx(100000.0)
+    assert signals['equity'][-2] == pytest.approx(100000.0 - 1000.0)
+    assert signals['equity'][-1] == pytest.approx(99000.0)
+    assert signals['realized'][-1] == pytest.approx(-1000.0)
+
+
+def test_daily_loss_limit_closes_half_of_the_first_half_of_positions():
+    # closePosition(symbol, 50) on ceil(n/2) of n positions
+    assert daily_loss_closed_fraction(np.array([0, 1, 2, 3, 4])).tolist() == [0.0, 0.5, 0.25, 1 / 3, 0.25]
+    rows = [(OPEN, 'AAPL', 'fill', 'buy', 10, 100.0), (OPEN + 1, 'MSFT', 'fill', 'buy', 10, 100.0),
+            (OPEN + 2, 'AAPL', 'fill', 'sell', 10, 100.0)]
+    assert baseline_signals(frame(rows), 100000.0)['open_positions'].tolist() == [1, 2, 1]
+
+
+def test_unreachable_thresholds_reproduce_baseline():
+    results = simulate(frame(losing_day(OPEN)), [-1.0], [0.0], [np.inf])
+    row = results.iloc[0]
+    assert row['pnl'] == pytest.approx(-1000.0)
+    assert row['max_drawdown'] == pytest.approx(0.01)
+    assert row[['daily_loss_triggers', 'profit_factor_triggers', 'volatility_triggers']].sum() == 0
+
+
+def test_daily_loss_limit_cuts_the_remaining_loss():
+    results = simulate(frame(losing_day(OPEN)), [-0.005, -1.0], [0.0], [np.inf])
+    tight, off = results.iloc[0], results.iloc[1]
+    assert tight['daily_loss_triggers'] == 1 and off['daily_loss_triggers'] == 0
+    assert tight['pnl'] > off['pnl']
+
+
+def test_triggers_latch_once_per_day():
+    events = frame(losing_day(OPEN) + losing_day(OPEN + DAY))
+    results = simulate(events, [-0.005], [0.0], [np.inf])
+    assert results.iloc[0]['daily_loss_triggers'] == 2
+
+
+def test_batches_match_single_pass():
+    events = frame(losing_day(OPEN) + losing_day(OPEN + DAY))
+    grid = dict(daily_loss_limits=[-0.02, -0.005], profit_factor_thresholds=[0.5, 1.8], volatility_thresholds=[2.5, 10])
+    pd.testing.assert_frame_equal(simulate(events, **grid), simulate(events, batch_size=3, **grid))
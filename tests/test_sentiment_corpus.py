@@ -0,0 +1,64 @@
+import json
+import numpy as np
+import pytest
+from sentiment_corpus import (
+    preprocess_corpus,
+    build_vocabulary,
+    tokenize_corpus,
+    load_or_build_corpus,
+    export_vocabulary
+)
+
+TEXTS = [
+    "Apple beats earnings!\nShares surge 5% after-hours.",
+    "Analyst downgrades Tesla; shares drop on weak guidance.",
+    "Apple shares flat.",
+]
+LABELS = [1, -1, 0]
+
+def test_preprocess_corpus_matches_single_document_cleaning():
+    docs = preprocess_corpus(TEXTS)
+    assert docs[0] == "apple beats earnings shares surge afterhours"
+    assert len(docs) == len(TEXTS)
+    assert preprocess_corpus(TEXTS, max_words=2)[1] == "analyst downgrades"
+
+def test_vocabulary_layout():
+    vocab = build_vocabulary(preprocess_corpus(TEXTS), max_tokens=5)
+    assert vocab['<PAD>'] == 0 and vocab['<UNK>'] == 1
+    assert len(vocab) == 5
+    # Most frequent tokens rank first
+    assert vocab['shares'] == 2 and vocab['apple'] == 3
+
+def test_tokenize_pads_and_maps_unknowns():
+    vocab = {'<PAD>': 0, '<UNK>': 1, 'apple': 2}
+    ids = tokenize_corpus(["apple pie", ""], vocab, seq_length=4)
+    assert ids.dtype == np.int32
+    assert ids.tolist() == [[2, 1, 0, 0], [0, 0, 0, 0]]
+
+def test_corpus_cache_is_reused(tmp_path, monkeypatch):
+    tokens, labels, vocab, version = load_or_build_corpus(TEXTS, LABELS, cache_dir=str(tmp_path))
+    assert tokens.shape == (3, 100)
+
+    import sentiment_corpus
+    def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+    monkeypatch.setattr(sentiment_corpus, 'preprocess_corpus', fail)
+
+    cached, cached_labels, cached_vocab, cached_version = load_or_build_corpus(
+        TEXTS, LABELS, cache_dir=str(tmp_path)
+    )
+    assert isinstance(cached, np.memmap)
+    assert cached_version == version
+    assert cached_vocab == vocab
+    np.testing.assert_array_equal(cached, tokens)
+    np.testing.assert_array_equal(cached_labels, labels)
+
+def test_new_corpus_gets_new_version(tmp_path):
+    *_, first = load_or_build_corpus(TEXTS, LABELS, cache_dir=str(tmp_path))
+    *_, second = load_or_build_corpus(TEXTS[:2], LABELS[:2], cache_dir=str(tmp_path))
+    assert first != second
+
+def test_export_vocabulary(tmp_path):
+    path = export_vocabulary({'<PAD>': 0, '<UNK>': 1}, str(tmp_path / 'vocab.json'))
+    with open(path) as f:
+        assert json.load(f) == {'<PAD>': 0, '<UNK>': 1}
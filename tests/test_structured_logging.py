@@ -0,0 +1,121 @@
+import io
+import json
+import logging
+import sys
+
+import pytest
+import structured_logging
+from structured_logging import Counters, JsonFormatter, RateLimitFilter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(msg='page %d', level=logging.INFO, name='fetch', **extra):
+    entry = logging.LogRecord(name, level, __file__, 1, msg, (1,), None)
+    entry.__dict__.update(extra)
+    return entry
+
+
+def test_rate_limit_is_per_category_and_reports_suppressed_counts():
+    clock = Clock()
+    limiter = RateLimitFilter(rate=2, burst=3, clock=clock)
+    passed = [limiter.filter(record()) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert limiter.filter(record('other %d'))  # separate bucket
+
+    clock.now = 1.0  # two tokens refilled
+    first = record()
+    assert limiter.filter(first) and first.suppressed == 7
+    assert limiter.filter(record()) and not limiter.filter(record())
+    assert limiter.drain() == {'fetch:page %d': 1}
+    assert limiter.drain() == {}
+
+
+def test_sampling_keeps_every_nth_info_but_never_drops_errors():
+    limiter = RateLimitFilter(rate=1000, burst=1000, sample_every=4, clock=Clock())
+    assert sum(limiter.filter(record()) for _ in range(100)) == 25
+    assert all(limiter.filter(record('failed %d', logging.ERROR)) for _ in range(100))
+
+
+def test_counters_emit_one_record_per_interval(caplog):
+    clock = Clock()
+    counters = Counters(interval=1.0, clock=clock)
+    with caplog.at_level(logging.INFO, logger=structured_logging.STATS_LOGGER):
+        for _ in range(1000):
+            counters.increment('fetch.pages')
+        clock.now = 1.5
+        counters.increment('fetch.records', 50)
+    assert len(caplog.records) == 1
+    assert caplog.records[0].counters == {'fetch.pages': 1000, 'fetch.records': 50}
+    assert counters.totals == {'fetch.pages': 1000, 'fetch.records': 50}
+
+
+def test_json_formatter_keeps_extras_and_exceptions():
+    try:
+        raise ValueError('bad page')
+    except ValueError:
+        entry = logging.LogRecord('fetch', logging.ERROR, __file__, 1, 'failed %s', ('AAPL',), sys.exc_info())
+    entry.ticker = 'AAPL'
+    line = json.loads(JsonFormatter().format(entry))
+    assert line['message'] == 'failed AAPL' and line['level'] == 'ERROR' and line['ticker'] == 'AAPL'
+    assert 'ValueError: bad page' in line['exception']
+
+
+@pytest.fixture
+def root_logging():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    structured_logging.shutdown()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_configure_writes_json_off_thread_and_flushes_counters_on_shutdown(root_logging):
+    stream = io.StringIO()
+    structured_logging.configure([logging.StreamHandler(stream)], rate=5, interval=60)
+    log = logging.getLogger('fetch')
+    for page in range(100):
+        log.info('page %d', page, extra={'ticker': 'AAPL'})
+    log.error('request failed')
+    structured_logging.counters.increment('fetch.pages', 100)
+    structured_logging.shutdown()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    pages = [line for line in lines if line['message'].startswith('page')]
+    assert len(pages) == 10 and pages[0]['ticker'] == 'AAPL'
+    assert any(line['level'] == 'ERROR' for line in lines)
+    stats = lines[-1]
+    assert stats['counters'] == {'fetch.pages': 100}
+    assert stats['suppressed'] == {'fetch:page %d': 90}
+
+
+def test_per_symbol_messages_share_one_rate_limit_category(caplog):
+    pd = pytest.importorskip('pandas')
+    from corporate_actions import CorporateActionsManager
+
+    manager = CorporateActionsManager()
+    manager.splits = pd.DataFrame({
+        'symbol': ['AAPL', 'MSFT'], 'execution_date': ['2024-06-10'] * 2, 'split_from': [1, 1], 'split_to': [4, 2]
+    })
+    manager.dividends = pd.DataFrame({
+        'symbol': ['AAPL', 'MSFT'], 'ex_dividend_date': ['2024-05-10'] * 2, 'cash_amount': [0.25, 0.5]
+    })
+    manager._create_adjustment_maps()
+    window = pd.DataFrame({'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 1.0},
+                          index=pd.date_range('2024-05-01', periods=3, freq='30D'))
+    with caplog.at_level(logging.INFO, logger='corporate_actions'):
+        for symbol in ['AAPL', 'MSFT']:
+            manager.apply_adjustments(window, symbol)
+
+    applying = [entry for entry in caplog.records if entry.getMessage().startswith('Applying')]
+    assert [entry.getMessage() for entry in applying] == [
+        'Applying corporate actions to AAPL data', 'Applying corporate actions to MSFT data']
+    limiter = RateLimitFilter(rate=1, burst=1, clock=Clock())
+    assert [limiter.filter(entry) for entry in applying] == [True, False]
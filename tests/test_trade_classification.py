@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from trade_classification import add_order_flow_features, classify_trades, quote_rule, tick_rule
+
+# Same sequence and expected sides as tests/order-flow.test.js
+TRADES = pd.DataFrame({
+    'timestamp': [2, 3, 4, 5, 6, 7, 8, 9],
+    'symbol': ['AAPL'] * 6 + ['MSFT'] * 2,
+    'price': [100.15, 100.05, 100.1, 100.1, 100.3, 100.35, 50.0, 50.1],
+    'size': [100, 200, 50, 50, 100, 100, 10, 10],
+})
+QUOTES = pd.DataFrame({
+    'timestamp': [1, 6],
+    'symbol': ['AAPL', 'AAPL'],
+    'bid_price': [100.0, 100.3],
+    'ask_price': [100.2, 100.4],
+})
+EXPECTED_SIDES = [1, -1, 1, 1, -1, 1, 0, 1]
+
+
+def test_quote_rule_ignores_invalid_quotes():
+    assert quote_rule([101, 99, 100, 101], [99, 99, 99, 0], [101, 101, 101, 0]).tolist() == [1, -1, 0, 0]
+
+
+def test_tick_rule_carries_sign_through_zero_ticks():
+    assert tick_rule([10, 10, 11, 11, 10.5, 10.5]).tolist() == [0, 0, 1, 1, -1, -1]
+    assert tick_rule([10, 11, 5, 4], groups=['A', 'A', 'B', 'B']).tolist() == [0, 1, 0, -1]
+
+
+def test_matches_live_classifier_on_shared_sequence():
+    assert classify_trades(TRADES, QUOTES).tolist() == EXPECTED_SIDES
+
+
+def test_classification_keeps_input_order():
+    shuffled = TRADES.iloc[::-1]
+    assert classify_trades(shuffled, QUOTES).tolist() == EXPECTED_SIDES[::-1]
+
+
+def test_imbalance_windows_match_live_reads():
+    full = add_order_flow_features(TRADES, QUOTES, window=1000)
+    aapl = full[full['symbol'] == 'AAPL']
+    assert aapl['order_flow_imbalance'].iloc[-1] == pytest.approx(1 / 3)
+    assert aapl['volume_imbalance'].iloc[-1] == pytest.approx(0.0)
+    assert full['order_flow_imbalance'].iloc[-1] == pytest.approx(0.5)
+
+    short = add_order_flow_features(TRADES, QUOTES, window=3)
+    assert short['order_flow_imbalance'].iloc[5] == pytest.approx(1 / 3)
+    assert short['volume_imbalance'].iloc[5] == pytest.approx(0.2)
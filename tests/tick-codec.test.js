@@ -0,0 +1,37 @@
+// tests/tick-codec.test.js
+import {
+  TICK_RECORD_SIZE,
+  encodeTick,
+  decodeTicks,
+  columnsToTicks,
+  conditionsToMask,
+  maskToConditions
+} from '../data-ingestion/tick-codec.js';
+
+describe('Tick codec', () => {
+  test('packs condition codes into a 64-bit mask', () => {
+    const [lo, hi] = conditionsToMask([0, 14, 31, 37, 63, 'B', 99]);
+    expect(maskToConditions(lo, hi)).toEqual([0, 14, 31, 37, 63]);
+  });
+
+  test('decodes only the requested time range', () => {
+    const buffer = Buffer.alloc(3 * TICK_RECORD_SIZE);
+    let offset = 0;
+    offset = encodeTick(buffer, offset, { timestamp: 1000, price: 10.5, size: 100, conditions: [] });
+    offset = encodeTick(buffer, offset, { timestamp: 2000, price: 10.75, size: 200, conditions: [41] });
+    encodeTick(buffer, offset, { timestamp: 3000, price: 11, size: 300 });
+
+    const columns = decodeTicks(buffer, 1500, 3000);
+    expect(columns.length).toBe(2);
+    expect(Array.from(columns.price)).toEqual([10.75, 11]);
+    expect(columnsToTicks(columns)[0]).toEqual({
+      timestamp: 2000, price: 10.75, size: 200, conditions: [41]
+    });
+  });
+
+  test('ignores a trailing partial record', () => {
+    const buffer = Buffer.alloc(TICK_RECORD_SIZE + 5);
+    encodeTick(buffer, 0, { timestamp: 1, price: 1, size: 1 });
+    expect(decodeTicks(buffer).length).toBe(1);
+  });
+});
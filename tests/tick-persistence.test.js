@@ -1,4 +1,5 @@
-import { TickStore } from '../data-ingestion/tick-persistence.js';
+import { TickStore, tickKey } from '../data-ingestion/tick-persistence.js';
+import { TICK_RECORD_SIZE } from '../data-ingestion/tick-codec.js';
 import Redis from 'ioredis';
 
 describe('Tick Persistence', () => {
@@ -14,9 +15,67 @@ describe('Tick Persistence', () => {
 
   test('basic storage', async () => {
     const store = new TickStore(redis);
-    await store.saveTick('TEST', { timestamp: Date.now(), price: 100 });
+    const timestamp = Date.now();
+    await redis.del(tickKey('TEST', timestamp));
+    await store.saveTick('TEST', { timestamp, price: 100 });
     await store.flush();
-    const count = await redis.zcount(`ticks:TEST:20240101`, '-inf', '+inf');
-    expect(count).toBe(1);
+    const bytes = await redis.strlen(tickKey('TEST', timestamp));
+    expect(bytes).toBe(TICK_RECORD_SIZE);
   });
-});
\ No newline at end of file
+
+  test('round-trips ticks through binary blobs', async () => {
+    const store = new TickStore(redis);
+    const timestamp = Date.now();
+    await redis.del(tickKey('TEST', timestamp));
+    await store.saveTick('TEST', { timestamp, price: 101.25, size: 300, conditions: [12, 37] });
+    await store.flush();
+
+    const ticks = await store.getTicks('TEST', timestamp - 1, timestamp + 1);
+    expect(ticks).toEqual([
+      { timestamp, price: 101.25, size: 300, conditions: [12, 37], symbol: 'TEST' }
+    ]);
+    expect(await redis.ttl(tickKey('TEST', timestamp))).toBeGreaterThan(0);
+  });
+});
+
+describe('TickStore flush failures', () => {
+  // Records APPENDs; exec rejects while `down` is set
+  function createRedis() {
+    const redis = {
+      down: true,
+      appended: new Map(),
+      pipeline() {
+        const ops = [];
+        return {
+          append: (key, value) => ops.push([key, Buffer.from(value)]),
+          expire: () => {},
+          exec: async () => {
+            if (redis.down) throw new Error('connection lost');
+            for (const [key, value] of ops) {
+              redis.appended.set(key, Buffer.concat([redis.appended.get(key) ?? Buffer.alloc(0), value]));
+            }
+            return [];
+          }
+        };
+      }
+    };
+    return redis;
+  }
+
+  test('keeps ticks pending when the pipeline fails', async () => {
+    const redis = createRedis();
+    const store = new TickStore(redis);
+    const timestamp = 60000 * 1000;
+    store.bufferTick('TEST', { timestamp, price: 100 });
+    await expect(store.flush()).rejects.toThrow('connection lost');
+
+    store.bufferTick('TEST', { timestamp: timestamp + 1, price: 101 });
+    expect(store.batchSize).toBe(2);
+    redis.down = false;
+    await store.flush();
+
+    const blob = redis.appended.get(tickKey('TEST', timestamp));
+    expect(blob.length).toBe(2 * TICK_RECORD_SIZE);
+    expect(store.pending.size).toBe(0);
+  });
+});
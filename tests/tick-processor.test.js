@@ -1,43 +1,44 @@
 import { strict as assert } from 'node:assert';
 import { TickProcessor } from '../data-ingestion/tick-processor.js';
-import { RollingWindowManager } from '../data-ingestion/rolling-window-manager.js';
+import { OrderBookCache } from '../data-ingestion/orderbook-cache.js';
+import { OrderFlowTracker } from '../data-ingestion/order-flow.js';
 
 describe('Tick Processor', () => {
   const symbol = 'TEST';
+  let books;
   let processor;
 
-  beforeEach(async () => {
-    processor = new TickProcessor(symbol);
-    // Clear existing data
-    await new RollingWindowManager(`${symbol}:ticks`).trimWindow(0);
+  beforeEach(() => {
+    books = new OrderBookCache();
+    processor = new TickProcessor(symbol, new OrderFlowTracker({ orderBooks: books }));
   });
 
-  it('should process ticks and maintain window', async () => {
-    const testTick = {
-      timestamp: Date.now(),
-      price: 150.25,
-      size: 100,
-      conditions: ['B'],
-      vwap: 150.20
-    };
-    
-    await processor.processTick(testTick);
-    const imbalance = await processor.getOrderFlowImbalance();
-    
-    assert.equal(imbalance, 1); // Single buy tick
+  it('should classify ticks against the NBBO', () => {
+    books.applyQuote({ sym: symbol, bp: 150.2, ap: 150.3, bs: 1, as: 1 });
+    assert.equal(processor.processTick({ timestamp: Date.now(), price: 150.3, size: 100 }), 1);
+    assert.equal(processor.getOrderFlowImbalance(), 1); // Single buy tick
+  });
+
+  it('should fall back to the tick rule at the midpoint', () => {
+    books.applyQuote({ sym: symbol, bp: 150, ap: 150.5, bs: 1, as: 1 });
+    processor.processTick({ timestamp: 1, price: 150.3, size: 100 });  // buy (above mid)
+    processor.processTick({ timestamp: 2, price: 150.25, size: 100 }); // mid, downtick: sell
+    processor.processTick({ timestamp: 3, price: 150.25, size: 100 }); // mid, zero tick: sell
+    assert.equal(processor.getOrderFlowImbalance(), -1 / 3);
+    assert.equal(processor.getVolumeImbalance(2), -1);
   });
 
-  it('should trim excess ticks', async () => {
-    // Add 1100 test ticks
+  it('should trim excess ticks', () => {
+    // Add 1100 upticks without a quote: tick rule only
     for(let i = 0; i < 1100; i++) {
-      await processor.processTick({
+      processor.processTick({
         timestamp: Date.now() + i,
         price: 150 + i/1000,
         size: 100
       });
     }
     
-    const count = await new RollingWindowManager(`${symbol}:ticks`).getCount();
-    assert.equal(count, 1000);
+    assert.equal(processor.getCount(), 1000);
+    assert.equal(processor.getOrderFlowImbalance(), 1);
   });
-});
\ No newline at end of file
+});
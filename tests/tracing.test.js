@@ -0,0 +1,53 @@
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { Tracer } from '../shared/tracing.js';
+
+describe('Tracer', () => {
+  test('is a no-op when sampling is off', () => {
+    const tracer = new Tracer({ sampleRate: 0 });
+    const trace = tracer.start();
+    expect(trace).toBeNull();
+    expect(tracer.mark(trace, 'ingest')).toBeNull();
+    expect(tracer.inject(trace)).toBeNull();
+    expect(tracer.snapshot().stages).toEqual({});
+  });
+
+  test('records spans and time since origin per stage', () => {
+    let now = 1000;
+    const tracer = new Tracer({ sampleRate: 1, now: () => now });
+    const trace = tracer.start();
+    now = 1002;
+    tracer.mark(trace, 'ingest');
+    now = 1010;
+    tracer.mark(trace, 'features');
+
+    const { stages, started } = tracer.snapshot();
+    expect(started).toBe(1);
+    expect(stages.ingest.max).toBe(2);
+    expect(stages.features.max).toBe(8);
+    expect(stages.features.sinceOrigin.max).toBe(10);
+  });
+
+  test('round-trips through message and stream fields', () => {
+    const tracer = new Tracer({ sampleRate: 1, now: () => 1234.5 });
+    const trace = tracer.start();
+    const carried = tracer.extract(tracer.inject(trace));
+    expect(carried).toEqual(trace);
+    expect(tracer.fromFields(['features', '{}', 'trace', tracer.inject(trace)])).toEqual(trace);
+    expect(tracer.fromFields(['features', '{}'])).toBeNull();
+  });
+
+  test('exports snapshots as JSON lines and resets', async () => {
+    const exportPath = path.join(fs.mkdtempSync(path.join(os.tmpdir(), 'traces-')), 'traces.jsonl');
+    const tracer = new Tracer({ sampleRate: 1, exportPath });
+    tracer.record('submit', 12);
+    await tracer.export();
+    await tracer.export(); // nothing recorded since: no line
+
+    const lines = fs.readFileSync(exportPath, 'utf8').trim().split('\n');
+    expect(lines).toHaveLength(1);
+    expect(JSON.parse(lines[0]).stages.submit.count).toBe(1);
+    expect(tracer.snapshot().stages.submit.count).toBe(0);
+  });
+});